@@ -37,6 +37,7 @@ if sys.version_info < (3, 4):
 
 if sys.version_info[0] == 2:
     REQUIRES.append("configparser>=3.5.0,<=3.8.1")
+    REQUIRES.append("futures>=3.2.0")
 
 setup(
     name="aws-parallelcluster",
@@ -54,12 +55,13 @@ setup(
         "console_scripts": [
             "pcluster = pcluster.cli:main",
             "pcluster-config = pcluster_config.cli:main",
-            "awsbqueues = awsbatch.awsbqueues:main",
-            "awsbhosts = awsbatch.awsbhosts:main",
-            "awsbstat = awsbatch.awsbstat:main",
-            "awsbkill = awsbatch.awsbkill:main",
+            "awsbqueues = awsbatch.awsbatchd:awsbqueues",
+            "awsbhosts = awsbatch.awsbatchd:awsbhosts",
+            "awsbstat = awsbatch.awsbatchd:awsbstat",
+            "awsbkill = awsbatch.awsbatchd:awsbkill",
             "awsbsub = awsbatch.awsbsub:main",
-            "awsbout = awsbatch.awsbout:main",
+            "awsbout = awsbatch.awsbatchd:awsbout",
+            "awsbatchd = awsbatch.awsbatchd:main",
         ]
     },
     include_package_data=True,
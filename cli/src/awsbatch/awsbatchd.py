@@ -0,0 +1,366 @@
+#!/usr/bin/env python2.6
+
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file.
+# This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+"""
+Optional long-lived process running the AWS Batch CLI commands on behalf of the awsb* entry points.
+
+The entry points defined in this module send the command to awsbatchd through a Unix domain socket when the daemon
+is running, and run the command in the current process otherwise. The daemon keeps boto3 clients, cluster
+information and recently described jobs in memory, so that the commands don't pay the interpreter startup,
+the imports and the clients creation every time.
+
+This module must only import the standard library at the top level, to keep the entry points fast.
+"""
+from __future__ import print_function
+
+import errno
+import importlib
+import json
+import os
+import socket
+import sys
+import threading
+
+import argparse
+
+try:
+    from StringIO import StringIO  # Python 2
+except ImportError:
+    from io import StringIO
+
+SOCKET_FILE = os.path.expanduser(os.path.join("~", ".parallelcluster", "awsbatchd.sock"))
+PROTOCOL_VERSION = 1
+# Environment variables that must be the same for the client and the daemon, since they select account and region
+ENVIRONMENT_PREFIX = "AWS_"
+# Commands run by the daemon, with the check of the parsed options requiring the client process: the ones using the
+# client terminal or file system, and the streaming outputs, that the daemon would hold in memory until completion
+DELEGATED_COMMANDS = {
+    "awsbqueues": lambda args: False,
+    "awsbhosts": lambda args: False,
+    "awsbstat": lambda args: args.watch is not None or args.output != "table" or args.no_sort,
+    "awsbkill": lambda args: args.from_file is not None,
+    "awsbout": lambda args: args.stream,
+}
+DEFAULT_JOB_STATUS_TTL = 5
+
+
+def _get_environment():
+    """Return the environment variables selecting account and region."""
+    return dict((name, value) for name, value in os.environ.items() if name.startswith(ENVIRONMENT_PREFIX))
+
+
+def _parse_args(command, argv):
+    """
+    Parse the command arguments with the parser of the command, discarding the messages it prints.
+
+    :return: the parsed arguments, None if they are not valid or ask for the help
+    """
+    parser = importlib.import_module("awsbatch." + command)._get_parser()
+    # in the daemon the output of the current thread can be redirected, see _ThreadLocalStream
+    streams = [stream for stream in (sys.stdout, sys.stderr) if hasattr(stream, "set_buffer")]
+    for stream in streams:
+        stream.set_buffer(StringIO())
+    try:
+        return parser.parse_args(argv)
+    except SystemExit:
+        return None
+    finally:
+        for stream in streams:
+            stream.set_buffer(None)
+
+
+def _is_delegable(command, argv):
+    """
+    Check if the command can be run by the daemon.
+
+    The arguments are parsed by the daemon, which has the command modules already imported. Invalid arguments and
+    help requests are left to the client process, which prints the messages of the parser.
+
+    :param command: command name
+    :param argv: command arguments
+    :return: True if the command and all its options can be run by the daemon
+    """
+    if command not in DELEGATED_COMMANDS:
+        return False
+    args = _parse_args(command, argv)
+    return args is not None and not DELEGATED_COMMANDS[command](args)
+
+
+def _receive_all(connection):
+    chunks = []
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def delegate(command, argv, socket_file=None):
+    """
+    Run the command in awsbatchd, if running.
+
+    :param command: command name
+    :param argv: command arguments
+    :param socket_file: socket of the daemon, defaults to SOCKET_FILE
+    :return: the exit code of the command, or None if the command must be run in the current process
+    """
+    socket_file = socket_file or SOCKET_FILE
+    # the options are checked by the daemon, the client does not import the command modules
+    if os.environ.get("AWSBATCH_CLI_NO_DAEMON") or command not in DELEGATED_COMMANDS or not os.path.exists(socket_file):
+        return None
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            connection.settimeout(1)
+            connection.connect(socket_file)
+        except (IOError, OSError, socket.error):
+            # the daemon is not running, the socket file is stale
+            return None
+        # commands can take long, e.g. listing many jobs
+        connection.settimeout(None)
+        request = {"version": PROTOCOL_VERSION, "command": command, "argv": argv, "environment": _get_environment()}
+        connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        connection.shutdown(socket.SHUT_WR)
+        response = json.loads(_receive_all(connection).decode("utf-8"))
+    except (IOError, OSError, socket.error, ValueError) as e:
+        print("Error communicating with awsbatchd (%s). Failed with exception: %s" % (socket_file, e), file=sys.stderr)
+        return 1
+    finally:
+        connection.close()
+
+    if response.get("rejected"):
+        # the daemon cannot run the command, e.g. it has been started with a different environment
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stdout.flush()
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stderr.flush()
+    return response.get("exit_code", 1)
+
+
+def _entry_point(command):
+    """Return the entry point of the given command, trying awsbatchd first."""
+
+    def _main():
+        exit_code = delegate(command, sys.argv[1:])
+        if exit_code is None:
+            importlib.import_module("awsbatch." + command).main()
+        else:
+            sys.exit(exit_code)
+
+    _main.__doc__ = "Entry point of %s." % command
+    return _main
+
+
+awsbqueues = _entry_point("awsbqueues")
+awsbhosts = _entry_point("awsbhosts")
+awsbstat = _entry_point("awsbstat")
+awsbkill = _entry_point("awsbkill")
+awsbout = _entry_point("awsbout")
+
+
+class _ThreadLocalStream(object):
+    """
+    Stream writing to the buffer of the current thread, if any, and to the wrapped stream otherwise.
+
+    Worker threads started by a command are given the buffer of the command thread, see
+    awsbatch.utils.bind_output_streams.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.__get_target(), name)
+
+    def write(self, data):
+        self.__get_target().write(data)
+
+    def isatty(self):
+        return self.__get_target() is self.stream and self.stream.isatty()
+
+    def get_buffer(self):
+        """Return the buffer of the current thread, None if writing to the wrapped stream."""
+        return getattr(self.local, "buffer", None)
+
+    def set_buffer(self, buffer):
+        """Set the buffer of the current thread, None to write to the wrapped stream."""
+        self.local.buffer = buffer
+
+    def __get_target(self):
+        buffer = self.get_buffer()
+        return self.stream if buffer is None else buffer
+
+
+def _run_command(command, argv, stdout, stderr):
+    """
+    Run the command with the output of the current thread redirected to the given streams.
+
+    :return: the exit code
+    """
+    stdout.set_buffer(StringIO())
+    stderr.set_buffer(StringIO())
+    try:
+        try:
+            importlib.import_module("awsbatch." + command).main(argv)
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except Exception as e:
+            print("Unexpected error. Command failed with exception: %s" % e, file=sys.stderr)
+            exit_code = 1
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout.get_buffer().getvalue(),
+            "stderr": stderr.get_buffer().getvalue(),
+        }
+    finally:
+        stdout.set_buffer(None)
+        stderr.set_buffer(None)
+
+
+def _create_server(socket_file, log):
+    """
+    Create the server listening on the given socket.
+
+    Imports are local, to keep the entry points of this module fast.
+    """
+    from socketserver import StreamRequestHandler, ThreadingMixIn, UnixStreamServer
+
+    class _RequestHandler(StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline().decode("utf-8"))
+                command = request["command"]
+                argv = request["argv"]
+                if request.get("version") != PROTOCOL_VERSION or not _is_delegable(command, argv):
+                    response = {"rejected": "unsupported request"}
+                elif request.get("environment") != self.server.environment:
+                    response = {"rejected": "environment mismatch"}
+                else:
+                    log.info("Running %s %s" % (command, argv))
+                    response = _run_command(command, argv, self.server.stdout, self.server.stderr)
+            except (KeyError, TypeError, ValueError) as e:
+                response = {"rejected": "invalid request: %s" % e}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+    class _Server(ThreadingMixIn, UnixStreamServer):
+        daemon_threads = True
+
+    server = _Server(socket_file, _RequestHandler)
+    server.environment = _get_environment()
+    server.stdout = _ThreadLocalStream(sys.stdout)
+    server.stderr = _ThreadLocalStream(sys.stderr)
+    return server
+
+
+def _remove_stale_socket(socket_file):
+    """Remove the socket file left by a daemon not running anymore, fail if the daemon is running."""
+    from awsbatch.utils import fail
+
+    if not os.path.exists(socket_file):
+        return
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_file)
+        fail("Error: awsbatchd is already running on socket (%s)" % socket_file)
+    except (IOError, OSError, socket.error):
+        os.remove(socket_file)
+    finally:
+        connection.close()
+
+
+def serve(socket_file, job_status_ttl, log):
+    """
+    Run the daemon until interrupted.
+
+    :param socket_file: Unix domain socket to listen on
+    :param job_status_ttl: seconds for which jobs not in a terminal status are reused by the commands
+    :param log: log
+    """
+    from awsbatch import awsbstat
+    from pcluster.client_pool import install_client_pool
+
+    # share boto3 clients and described jobs among all the commands
+    install_client_pool()
+    if job_status_ttl > 0:
+        awsbstat.SHARED_DESCRIBED_JOBS_CACHE = awsbstat.SharedDescribedJobsCache(ttl=job_status_ttl)
+
+    socket_dir = os.path.dirname(socket_file)
+    try:
+        os.makedirs(socket_dir)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    _remove_stale_socket(socket_file)
+    # the socket is accessible by the current user only
+    previous_umask = os.umask(0o177)
+    try:
+        server = _create_server(socket_file, log)
+    finally:
+        os.umask(previous_umask)
+
+    sys.stdout, sys.stderr = server.stdout, server.stderr
+    log.info("awsbatchd listening on socket (%s)" % socket_file)
+    try:
+        server.serve_forever()
+    finally:
+        sys.stdout, sys.stderr = server.stdout.stream, server.stderr.stream
+        server.server_close()
+        os.remove(socket_file)
+
+
+def _get_parser():
+    """
+    Parse input parameters and return the ArgumentParser object.
+
+    :return: the ArgumentParser object
+    """
+    parser = argparse.ArgumentParser(
+        description="Runs the AWS Batch CLI commands in a long-lived process, to reduce the time they take. "
+        "The awsbqueues, awsbhosts, awsbstat, awsbkill and awsbout commands use it when it is running, "
+        "unless the AWSBATCH_CLI_NO_DAEMON environment variable is set."
+    )
+    parser.add_argument("--socket", help="Unix domain socket to listen on. Default is %s" % SOCKET_FILE)
+    parser.add_argument(
+        "--job-status-ttl",
+        help="Seconds for which the jobs not yet completed are reused by the awsbstat commands, 0 to disable. "
+        "Default is %s" % DEFAULT_JOB_STATUS_TTL,
+        type=int,
+        default=DEFAULT_JOB_STATUS_TTL,
+    )
+    parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="INFO")
+    return parser
+
+
+def main(argv=None):
+    """Command entrypoint."""
+    from awsbatch.common import config_logger
+
+    args = _get_parser().parse_args(argv)
+    log = config_logger(args.log_level)
+    try:
+        serve(args.socket or SOCKET_FILE, args.job_status_ttl, log)
+    except KeyboardInterrupt:
+        print("Exiting...")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,13 @@
 from __future__ import print_function
 
 import collections
+import itertools
 import sys
 
 import argparse
 
-from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, Output, config_logger
-from awsbatch.utils import fail
+from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, Output, config_logger, run_with_cluster_config
+from awsbatch.utils import DEFAULT_MAX_WORKERS, fail, ordered_concurrent_map, retry_on_throttling
 
 
 def _get_parser():
@@ -37,9 +38,23 @@ def _get_parser():
 
     :return: the ArgumentParser object
     """
-    parser = argparse.ArgumentParser(description="Shows the hosts belonging to the cluster's Compute Environment.")
+    parser = argparse.ArgumentParser(
+        prog="awsbhosts", description="Shows the hosts belonging to the cluster's Compute Environment."
+    )
     parser.add_argument("-c", "--cluster", help="Cluster to use")
     parser.add_argument("-d", "--details", help="Show hosts details", action="store_true")
+    parser.add_argument(
+        "-s",
+        "--summary",
+        help="Show the number of hosts and the vCPU and memory utilization for every instance type",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--max-workers",
+        help="Maximum number of concurrent requests to AWS ECS and EC2. Default is %s" % DEFAULT_MAX_WORKERS,
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+    )
     parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="ERROR")
     parser.add_argument(
         "instance_ids",
@@ -87,15 +102,54 @@ class Host(object):
         self.mem_avail = mem_avail
 
 
+class InstanceTypeSummary(object):
+    """Hosts of the same instance type."""
+
+    def __init__(self, instance_type):
+        """Initialize the object."""
+        self.instance_type = instance_type
+        self.hosts = 0
+        self.running_jobs = 0
+        self.cpu_registered = 0
+        self.cpu_used = 0
+        self.mem_registered = 0
+        self.mem_used = 0
+
+    def add_host(self, host):
+        """Add the resources of the given host."""
+        self.hosts += 1
+        self.running_jobs += host.running_jobs
+        if host.cpu_registered != "-" and host.cpu_avail != "-":
+            self.cpu_registered += host.cpu_registered
+            self.cpu_used += host.cpu_registered - host.cpu_avail
+        if host.mem_registered != "-" and host.mem_avail != "-":
+            self.mem_registered += host.mem_registered
+            self.mem_used += host.mem_registered - host.mem_avail
+
+    @property
+    def cpu_utilization(self):
+        """Percentage of the registered vCPUs used by jobs."""
+        return round(100.0 * self.cpu_used / self.cpu_registered, 1) if self.cpu_registered else "-"
+
+    @property
+    def mem_utilization(self):
+        """Percentage of the registered memory used by jobs."""
+        return round(100.0 * self.mem_used / self.mem_registered, 1) if self.mem_registered else "-"
+
+
 class AWSBhostsCommand(object):
     """awsbhosts command."""
 
-    def __init__(self, log, boto3_factory):
+    # Maximum number of container instances accepted by the describe_container_instances function
+    MAX_DESCRIBED_CONTAINER_INSTANCES = 100
+
+    def __init__(self, log, boto3_factory, max_workers=DEFAULT_MAX_WORKERS):
         """
         Initialize the object.
 
         :param log: log
         :param boto3_factory: an initialized Boto3ClientFactory object
+        :param max_workers: maximum number of concurrent requests
         """
         self.log = log
         mapping = collections.OrderedDict(
@@ -118,18 +172,23 @@ class AWSBhostsCommand(object):
         )
         self.output = Output(mapping=mapping)
         self.boto3_factory = boto3_factory
+        self.max_workers = max_workers
         self.ecs_client = boto3_factory.get_client("ecs")
+        self.ec2_client = boto3_factory.get_client("ec2")
 
-    def run(self, compute_environments, show_details=False, instance_ids=None):
+    def run(self, compute_environments, show_details=False, instance_ids=None, show_summary=False):
         """
         Print list of hosts associated to the compute environments.
 
         :param compute_environments: a list of compute environments
         :param show_details: show compute environment details
         :param instance_ids: instances to query
+        :param show_summary: show hosts and resources utilization for every instance type
         """
         self.__init_output(compute_environments, instance_ids)
-        if show_details or instance_ids:
+        if show_summary:
+            self.__show_summary()
+        elif show_details or instance_ids:
             self.output.show()
         else:
             self.output.show_table(
@@ -145,14 +204,52 @@ class AWSBhostsCommand(object):
         """
         ecs_clusters = self.__get_ecs_clusters(compute_environments)
         try:
-            for ecs_cluster in ecs_clusters:
-                self.log.info("Cluster ARN = %s" % ecs_cluster)
-                paginator = self.ecs_client.get_paginator("list_container_instances")
-                for page in paginator.paginate(cluster=ecs_cluster):
-                    self._add_host_items(ecs_cluster, page["containerInstanceArns"], instance_ids)
+            # the container instances of the next pages are listed while the previous pages are being described
+            hosts = ordered_concurrent_map(
+                lambda page: self._get_host_items(page[0], page[1], instance_ids),
+                self.__list_container_instances(ecs_clusters),
+                self.max_workers,
+            )
+            self.output.add(list(itertools.chain.from_iterable(hosts)))
         except Exception as e:
             fail("Error listing container instances from AWS ECS. Failed with exception: %s" % e)
 
+    def __list_container_instances(self, ecs_clusters):
+        """
+        List the container instances of the given ECS clusters.
+
+        :param ecs_clusters: ECS cluster arns
+        :return: a generator of (ECS cluster arn, page of container instance arns) tuples
+        """
+        for ecs_cluster in ecs_clusters:
+            self.log.info("Cluster ARN = %s" % ecs_cluster)
+            paginator = self.ecs_client.get_paginator("list_container_instances")
+            for page in paginator.paginate(
+                cluster=ecs_cluster, PaginationConfig={"PageSize": self.MAX_DESCRIBED_CONTAINER_INSTANCES}
+            ):
+                yield ecs_cluster, page["containerInstanceArns"]
+
+    def __show_summary(self):
+        """Print the number of hosts and the resources utilization for every instance type."""
+        summaries = collections.OrderedDict()
+        for host in sorted(self.output.items, key=lambda host: host.instance_type):
+            summaries.setdefault(host.instance_type, InstanceTypeSummary(host.instance_type)).add_host(host)
+
+        mapping = collections.OrderedDict(
+            [
+                ("instanceType", "instance_type"),
+                ("hosts", "hosts"),
+                ("runningJobs", "running_jobs"),
+                ("registeredCPUs", "cpu_registered"),
+                ("usedCPUs", "cpu_used"),
+                ("CPUUtilization[%]", "cpu_utilization"),
+                ("registeredMemory[MB]", "mem_registered"),
+                ("usedMemory[MB]", "mem_used"),
+                ("memoryUtilization[%]", "mem_utilization"),
+            ]
+        )
+        Output(mapping=mapping, items=list(summaries.values())).show_table()
+
     @staticmethod
     def __create_host_item(container_instance, ec2_instance):
         """
@@ -222,46 +319,55 @@ class AWSBhostsCommand(object):
                 memory = resource["integerValue"]
         return cpu, memory
 
-    def _add_host_items(self, ecs_cluster_arn, container_instances_arns, instance_ids=None):
+    def _get_host_items(self, ecs_cluster_arn, container_instances_arns, instance_ids=None):
         """
-        Add a list of Hosts to the output.
+        Get the Hosts of a page of container instances.
 
         :param ecs_cluster_arn: ECS Cluster arn
         :param container_instances_arns: container ids
         :param instance_ids: hosts requested
+        :return: a list of Host items
         """
         self.log.info("Container ARNs = %s" % container_instances_arns)
-        if container_instances_arns:
-            response = self.ecs_client.describe_container_instances(
-                cluster=ecs_cluster_arn, containerInstances=container_instances_arns
-            )
-            container_instances = response["containerInstances"]
-            self.log.debug("Container Instances = %s" % container_instances)
-            # get ec2_instance_ids
-            ec2_instances_ids = []
-            for container_instance in container_instances:
-                ec2_instances_ids.append(container_instance["ec2InstanceId"])
-
-            # get ec2 instances information
-            ec2_instances = {}
-            try:
-                ec2_client = self.boto3_factory.get_client("ec2")
-                paginator = ec2_client.get_paginator("describe_instances")
-                for page in paginator.paginate(InstanceIds=ec2_instances_ids):
-                    for reservation in page["Reservations"]:
-                        for instance in reservation["Instances"]:
-                            ec2_instances[instance["InstanceId"]] = instance
-            except Exception as e:
-                fail("Error listing EC2 instances from AWS EC2. Failed with exception: %s" % e)
-
-            # merge ec2 and container information
-            for container_instance in container_instances:
-                ec2_instance_id = container_instance["ec2InstanceId"]
-                # filter by instance_id if there
-                if not instance_ids or ec2_instance_id in instance_ids:
-                    self.log.debug("Container Instance = %s" % container_instance)
-                    self.log.debug("EC2 Instance = %s" % ec2_instances[ec2_instance_id])
-                    self.output.add(self.__create_host_item(container_instance, ec2_instances[ec2_instance_id]))
+        if not container_instances_arns:
+            return []
+
+        response = retry_on_throttling(
+            self.ecs_client.describe_container_instances,
+            cluster=ecs_cluster_arn,
+            containerInstances=container_instances_arns,
+        )
+        # filter by instance_id if there, before asking EC2 for the instances
+        container_instances = [
+            container_instance
+            for container_instance in response["containerInstances"]
+            if not instance_ids or container_instance["ec2InstanceId"] in instance_ids
+        ]
+        self.log.debug("Container Instances = %s" % container_instances)
+        if not container_instances:
+            return []
+
+        # get ec2 instances information
+        ec2_instances = {}
+        try:
+            paginator = self.ec2_client.get_paginator("describe_instances")
+            for page in paginator.paginate(
+                InstanceIds=[container_instance["ec2InstanceId"] for container_instance in container_instances]
+            ):
+                for reservation in page["Reservations"]:
+                    for instance in reservation["Instances"]:
+                        ec2_instances[instance["InstanceId"]] = instance
+        except Exception as e:
+            fail("Error listing EC2 instances from AWS EC2. Failed with exception: %s" % e)
+
+        # merge ec2 and container information
+        hosts = []
+        for container_instance in container_instances:
+            ec2_instance = ec2_instances[container_instance["ec2InstanceId"]]
+            self.log.debug("Container Instance = %s" % container_instance)
+            self.log.debug("EC2 Instance = %s" % ec2_instance)
+            hosts.append(self.__create_host_item(container_instance, ec2_instance))
+        return hosts
 
     @staticmethod
     def __get_clusters(compute_environments):
@@ -300,25 +406,33 @@ class AWSBhostsCommand(object):
         return ecs_clusters
 
 
-def main():
+def main(argv=None):
     """Command entrypoint."""
     try:
         # parse input parameters and  config file
-        args = _get_parser().parse_args()
+        args = _get_parser().parse_args(argv)
+        if args.max_workers < 1:
+            fail("Error: --max-workers must be greater than 0")
         log = config_logger(args.log_level)
         log.info("Input parameters: %s" % args)
         config = AWSBatchCliConfig(log, args.cluster)
-        boto3_factory = Boto3ClientFactory(
-            region=config.region,
-            proxy=config.proxy,
-            aws_access_key_id=config.aws_access_key_id,
-            aws_secret_access_key=config.aws_secret_access_key,
-        )
 
-        AWSBhostsCommand(log, boto3_factory).run(
-            compute_environments=[config.compute_environment], instance_ids=args.instance_ids, show_details=args.details
-        )
+        def _run(config):
+            boto3_factory = Boto3ClientFactory(
+                region=config.region,
+                proxy=config.proxy,
+                aws_access_key_id=config.aws_access_key_id,
+                aws_secret_access_key=config.aws_secret_access_key,
+            )
+
+            AWSBhostsCommand(log, boto3_factory, max_workers=args.max_workers).run(
+                compute_environments=[config.compute_environment],
+                instance_ids=args.instance_ids,
+                show_details=args.details,
+                show_summary=args.summary,
+            )
 
+        run_with_cluster_config(log, config, _run)
     except KeyboardInterrupt:
         print("Exiting...")
         sys.exit(0)
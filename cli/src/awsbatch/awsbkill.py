@@ -13,12 +13,24 @@
 # See the License for the specific language governing permissions and limitations under the License.
 from __future__ import print_function
 
+import fnmatch
+import itertools
+import re
 import sys
+from collections import OrderedDict
 
 import argparse
 
-from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, config_logger
-from awsbatch.utils import fail
+from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, config_logger, run_with_cluster_config
+from awsbatch.utils import (
+    DEFAULT_MAX_WORKERS,
+    concurrent_chain,
+    fail,
+    ordered_concurrent_map,
+    retry_on_throttling,
+)
+
+AWS_BATCH_ACTIVE_JOB_STATUS = ["SUBMITTED", "PENDING", "RUNNABLE", "STARTING", "RUNNING"]
 
 
 def _get_parser():
@@ -36,7 +48,7 @@ def _get_parser():
 
     :return: the ArgumentParser object
     """
-    parser = argparse.ArgumentParser(description="Cancels/terminates jobs submitted in the cluster.")
+    parser = argparse.ArgumentParser(prog="awsbkill", description="Cancels/terminates jobs submitted in the cluster.")
     parser.add_argument("-c", "--cluster", help="Cluster to use")
     parser.add_argument(
         "-r",
@@ -44,24 +56,68 @@ def _get_parser():
         help="A message to attach to the job that explains the reason for canceling it",
         default="Terminated by the user",
     )
+    parser.add_argument(
+        "-f",
+        "--from-file",
+        help="File with the job IDs to cancel/terminate, one per line. Use - to read them from the standard input",
+    )
+    parser.add_argument(
+        "-s",
+        "--status",
+        help="Cancel/terminate the jobs of the cluster's Job Queue in the given statuses. "
+        "Comma separated list, accepted values are: SUBMITTED, PENDING, RUNNABLE, STARTING, RUNNING",
+    )
+    parser.add_argument(
+        "-n",
+        "--name-pattern",
+        help="Cancel/terminate the jobs of the cluster's Job Queue with a name matching the given pattern, "
+        "e.g. sweep-*. If --status is not set, the jobs in all the statuses above are considered",
+    )
+    parser.add_argument(
+        "--max-workers",
+        help="Maximum number of concurrent requests to AWS Batch, defaults to %d" % DEFAULT_MAX_WORKERS,
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+    )
     parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="ERROR")
-    parser.add_argument("job_ids", help="A space separated list of job IDs to cancel/terminate", nargs="+")
+    parser.add_argument("job_ids", help="A space separated list of job IDs to cancel/terminate", nargs="*")
     return parser
 
 
+def _read_job_ids(file_name):
+    """
+    Read job ids from a file, one per line, skipping empty lines.
+
+    :param file_name: the file name, - for the standard input
+    :return: the list of job ids
+    """
+    if file_name == "-":
+        return [line.strip() for line in sys.stdin if line.strip()]
+    try:
+        with open(file_name) as job_ids_file:
+            return [line.strip() for line in job_ids_file if line.strip()]
+    except IOError as e:
+        fail("Error reading job IDs from file (%s). Failed with exception: %s" % (file_name, e))
+
+
 class AWSBkillCommand(object):
     """awsbkill command."""
 
-    def __init__(self, log, boto3_factory):
+    def __init__(self, log, boto3_factory, max_workers=DEFAULT_MAX_WORKERS):
         """
         Initialize the object.
 
         :param log: log
         :param boto3_factory: an initialized Boto3ClientFactory object
+        :param max_workers: maximum number of concurrent requests
         """
         self.log = log
         self.boto3_factory = boto3_factory
         self.batch_client = boto3_factory.get_client("batch")
+        self.max_workers = max_workers
+        self.summary = OrderedDict(
+            [("submitted", 0), ("already completed", 0), ("covered by parent", 0), ("not found", 0), ("failed", 0)]
+        )
 
     def run(self, job_ids, reason):
         """
@@ -70,62 +126,169 @@ class AWSBkillCommand(object):
         :param job_ids: list of job ids
         :param reason: optional reason
         """
-        jobs = self.batch_client.describe_jobs(jobs=job_ids)["jobs"]
+        job_ids = list(OrderedDict.fromkeys(job_ids))
+        jobs = self.__describe_jobs(job_ids)
         self.log.debug(jobs)
 
         if len(jobs) != len(job_ids):
-            available_job_ids = []
-            for job in jobs:
-                available_job_ids.append(job["jobId"])
+            available_job_ids = set(job["jobId"] for job in jobs)
             for job_id in job_ids:
                 if job_id not in available_job_ids:
                     print("Job (%s) not found." % job_id)
+                    self.summary["not found"] += 1
+        self.__kill_jobs(jobs, reason)
+
+    def run_by_queue(self, job_queue, job_status, name_pattern, reason):
+        """
+        Kill/cancel the jobs of the queue with the given status and name.
+
+        :param job_queue: job queue name or ARN
+        :param job_status: list of job status
+        :param name_pattern: shell-style pattern for the job name, all the jobs if None
+        :param reason: optional reason
+        """
+        # a job changing status while the statuses are listed can be returned twice
+        jobs = OrderedDict()
+        for jobs_page in self.__list_jobs(job_queue, job_status):
+            for job in jobs_page:
+                if not name_pattern or fnmatch.fnmatchcase(job["jobName"], name_pattern):
+                    jobs.setdefault(job["jobId"], job)
+        jobs = list(jobs.values())
+        self.log.debug(jobs)
+        if not jobs:
+            print("No jobs found in the job queue.")
         self.__kill_jobs(jobs, reason)
 
+    def print_summary(self):
+        """Print the number of jobs by outcome."""
+        print("Summary: %s" % ", ".join("%d %s" % (count, outcome) for outcome, count in self.summary.items()))
+
+    def __list_jobs(self, job_queue, job_status):
+        """Return a generator of pages of job summaries, listing all the statuses concurrently."""
+
+        def _list_jobs_pages(status):
+            next_token = ""
+            while next_token is not None:
+                response = retry_on_throttling(
+                    self.batch_client.list_jobs, jobQueue=job_queue, jobStatus=status, nextToken=next_token
+                )
+                yield response["jobSummaryList"]
+                next_token = response.get("nextToken")
+
+        try:
+            for jobs_page in concurrent_chain(_list_jobs_pages, job_status, self.max_workers):
+                yield jobs_page
+        except Exception as e:
+            fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
+
+    def __describe_jobs(self, job_ids):
+        """Describe the given jobs with concurrent requests of 100 jobs each."""
+
+        def _describe_jobs_chunk(index):
+            return retry_on_throttling(self.batch_client.describe_jobs, jobs=job_ids[index : index + 100])["jobs"]
+
+        try:
+            chunks = ordered_concurrent_map(_describe_jobs_chunk, range(0, len(job_ids), 100), self.max_workers)
+            return list(itertools.chain.from_iterable(chunks))
+        except Exception as e:
+            fail("Error describing jobs from AWS Batch. Failed with exception: %s" % e)
+
     def __kill_jobs(self, jobs, reason):
         """
-        Kill given jobs.
+        Kill given jobs concurrently.
 
-        :param jobs: a list of jobs ids
+        Children of array and MNP jobs are not killed when their parent is, since terminating the parent job
+        terminates the children as well.
+
+        :param jobs: a list of jobs
         :param reason: reason for canceling the job
         """
+        active_job_ids = set(job["jobId"] for job in jobs if job["status"] not in ["FAILED", "SUCCEEDED"])
+        jobs_to_kill = []
         for job in jobs:
             status = job["status"]
             job_id = job["jobId"]
+            parent_job_id = re.split(r"[:#]", job_id)[0]
             if status == "FAILED" or status == "SUCCEEDED":
                 print("Job (%s) is already in (%s) status." % (job_id, status))
+                self.summary["already completed"] += 1
+            elif parent_job_id != job_id and parent_job_id in active_job_ids:
+                self.log.info("Job (%s) is killed together with its parent job (%s)" % (job_id, parent_job_id))
+                self.summary["covered by parent"] += 1
             else:
-                try:
-                    self.batch_client.terminate_job(jobId=job_id, reason=reason)
-                    if status == "SUBMITTED" or status == "PENDING" or status == "RUNNABLE":
-                        action = "cancellation"
-                    else:
-                        # status == 'STARTING' or status == 'RUNNING'
-                        action = "termination"
-                    print(
-                        "Your job %s request for job (%s) in status (%s) has been submitted." % (action, job_id, status)
-                    )
-                except Exception as e:
-                    print("Error killing job (%s). Failed with exception: %s" % e)
-                    pass
-
-
-def main():
+                jobs_to_kill.append(job)
+
+        def _kill_job(job):
+            try:
+                retry_on_throttling(self.batch_client.terminate_job, jobId=job["jobId"], reason=reason)
+                return None
+            except Exception as e:
+                return e
+
+        # results are printed by the main thread, in the order of the jobs
+        for job, error in zip(jobs_to_kill, ordered_concurrent_map(_kill_job, jobs_to_kill, self.max_workers)):
+            status = job["status"]
+            job_id = job["jobId"]
+            if error:
+                print("Error killing job (%s). Failed with exception: %s" % (job_id, error))
+                self.summary["failed"] += 1
+                continue
+
+            if status == "SUBMITTED" or status == "PENDING" or status == "RUNNABLE":
+                action = "cancellation"
+            else:
+                # status == 'STARTING' or status == 'RUNNING'
+                action = "termination"
+            print("Your job %s request for job (%s) in status (%s) has been submitted." % (action, job_id, status))
+            self.summary["submitted"] += 1
+
+
+def main(argv=None):
     """Command entrypoint."""
     try:
         # parse input parameters and config file
-        args = _get_parser().parse_args()
+        args = _get_parser().parse_args(argv)
         log = config_logger(args.log_level)
         log.info("Input parameters: %s" % args)
+        job_ids = list(args.job_ids)
+        if args.from_file:
+            job_ids.extend(_read_job_ids(args.from_file))
+        job_status = None
+        if args.status or args.name_pattern:
+            if job_ids:
+                fail("Error: job IDs cannot be combined with --status and --name-pattern")
+            job_status = AWS_BATCH_ACTIVE_JOB_STATUS
+            if args.status:
+                job_status = list(OrderedDict((status.strip().upper(), "") for status in args.status.split(",")))
+            for status in job_status:
+                if status not in AWS_BATCH_ACTIVE_JOB_STATUS:
+                    fail("Error: invalid status (%s), accepted values are: %s" % (status, AWS_BATCH_ACTIVE_JOB_STATUS))
+        elif not job_ids:
+            fail("Error: job IDs, --from-file, --status or --name-pattern are required")
+        if args.max_workers < 1:
+            fail("Error: --max-workers must be greater than 0")
         config = AWSBatchCliConfig(log=log, cluster=args.cluster)
-        boto3_factory = Boto3ClientFactory(
-            region=config.region,
-            proxy=config.proxy,
-            aws_access_key_id=config.aws_access_key_id,
-            aws_secret_access_key=config.aws_secret_access_key,
-        )
-        AWSBkillCommand(log, boto3_factory).run(job_ids=args.job_ids, reason=args.reason)
 
+        def _run(config):
+            boto3_factory = Boto3ClientFactory(
+                region=config.region,
+                proxy=config.proxy,
+                aws_access_key_id=config.aws_access_key_id,
+                aws_secret_access_key=config.aws_secret_access_key,
+            )
+            command = AWSBkillCommand(log, boto3_factory, max_workers=args.max_workers)
+            if job_status:
+                command.run_by_queue(
+                    job_queue=config.job_queue,
+                    job_status=job_status,
+                    name_pattern=args.name_pattern,
+                    reason=args.reason,
+                )
+            else:
+                command.run(job_ids=job_ids, reason=args.reason)
+            command.print_summary()
+
+        run_with_cluster_config(log, config, _run, retry=False)
     except KeyboardInterrupt:
         print("Exiting...")
         sys.exit(0)
@@ -13,13 +13,28 @@
 # See the License for the specific language governing permissions and limitations under the License.
 from __future__ import print_function
 
+import itertools
 import sys
 import time
+from collections import OrderedDict
 
 import argparse
 
-from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, config_logger
-from awsbatch.utils import convert_to_date, fail, get_job_type
+from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, config_logger, run_with_cluster_config
+from awsbatch.utils import (
+    DEFAULT_MAX_WORKERS,
+    convert_to_date,
+    fail,
+    is_job_array,
+    is_mnp_job,
+    ordered_concurrent_map,
+    retry_on_throttling,
+)
+
+LOG_GROUP_NAME = "/aws/batch/job"
+# Milliseconds of events asked again by every streaming request, since CloudWatch Logs can ingest an event after the
+# ones with a later timestamp, e.g. in another log stream
+STREAM_LAG_WINDOW = 30 * 1000
 
 
 def _get_parser():
@@ -37,7 +52,7 @@ def _get_parser():
 
     :return: the ArgumentParser object
     """
-    parser = argparse.ArgumentParser(description="Shows the output of the given Job.")
+    parser = argparse.ArgumentParser(prog="awsbout", description="Shows the output of the given Job.")
     parser.add_argument("-c", "--cluster", help="Cluster to use")
     parser.add_argument("-hd", "--head", help="Gets the first <head> lines of the job output", type=int)
     parser.add_argument("-t", "--tail", help="Gets the last <tail> lines of the job output", type=int)
@@ -49,9 +64,20 @@ def _get_parser():
         "latest <tail> lines of the job output",
         action="store_true",
     )
-    parser.add_argument("-sp", "--stream-period", help="Sets the streaming period. Default is 5", type=int)
+    parser.add_argument(
+        "-sp",
+        "--stream-period",
+        help="Sets the maximum streaming period. The output is asked more often while it is growing. Default is 5",
+        type=int,
+    )
     parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="ERROR")
-    parser.add_argument("job_id", help="The job ID")
+    parser.add_argument(
+        "job_ids",
+        help="The job ID. If more job IDs are given, or for array and MNP jobs, "
+        "the output of all the jobs or children is shown, interleaved by timestamp",
+        nargs="+",
+        metavar="job_id",
+    )
     return parser
 
 
@@ -71,9 +97,43 @@ def _validate_parameters(args):
         fail("Parameters validation error: --stream-period can be used only with --stream option")
 
 
+class AdaptivePollingPeriod(object):
+    """
+    Period between two requests for new log events.
+
+    The period is halved, down to min_period, when new events are received and it is doubled,
+    up to max_period, when there are no new events.
+    """
+
+    def __init__(self, max_period, min_period=1):
+        """
+        Initialize the object.
+
+        :param max_period: maximum period in seconds
+        :param min_period: minimum period in seconds
+        """
+        self.max_period = max_period
+        self.min_period = min(min_period, max_period)
+        self.period = self.min_period
+
+    def update(self, events_received):
+        """
+        Update the period according to the result of the last request.
+
+        :param events_received: True if the last request returned new events
+        """
+        if events_received:
+            self.period = max(self.min_period, self.period / 2.0)
+        else:
+            self.period = min(self.max_period, self.period * 2)
+
+
 class AWSBoutCommand(object):
     """awsbout command."""
 
+    # Maximum number of log streams accepted by the filter_log_events function
+    MAX_FILTERED_LOG_STREAMS = 100
+
     def __init__(self, log, boto3_factory):
         """
         Initialize the object.
@@ -84,48 +144,83 @@ class AWSBoutCommand(object):
         self.log = log
         self.boto3_factory = boto3_factory
 
-    def run(self, job_id, head=None, tail=None, stream=None, stream_period=None):
-        """Print job output."""
-        log_stream = self.__get_log_stream(job_id)
-        if log_stream:
+    def run(self, job_ids, head=None, tail=None, stream=None, stream_period=None):
+        """Print the output of the jobs."""
+        log_streams, jobs_without_log_stream = self.__get_log_streams(job_ids)
+        for job in jobs_without_log_stream:
+            print("No log stream found for job (%s) in the status (%s)" % (job["jobId"], job["status"]))
+
+        if len(log_streams) == 1 and not jobs_without_log_stream:
+            log_stream = next(iter(log_streams))
             self.log.info("Log stream is (%s)" % log_stream)
             self.__print_log_stream(log_stream, head, tail, stream, stream_period)
+        elif log_streams or (stream and jobs_without_log_stream):
+            self.log.info("Log streams are (%s)" % list(log_streams))
+            self.__print_log_streams(log_streams, jobs_without_log_stream, head, tail, stream, stream_period)
+
+    def __describe_jobs(self, job_ids):
+        """Describe the given jobs with concurrent requests of 100 jobs each."""
+        batch_client = self.boto3_factory.get_client("batch")
+
+        def _describe_jobs_chunk(index):
+            return retry_on_throttling(batch_client.describe_jobs, jobs=job_ids[index : index + 100])["jobs"]
 
-    def __get_log_stream(self, job_id):
+        chunks = ordered_concurrent_map(_describe_jobs_chunk, range(0, len(job_ids), 100), DEFAULT_MAX_WORKERS)
+        return list(itertools.chain.from_iterable(chunks))
+
+    @staticmethod
+    def __get_job_log_stream(job):
+        if "nodeProperties" in job:
+            # MNP job
+            container = job["nodeProperties"]["nodeRangeProperties"][0]["container"]
+        elif "container" in job:
+            container = job["container"]
+        else:
+            container = {}
+        return container.get("logStreamName")
+
+    def __get_log_streams(self, job_ids):
         """
-        Get log stream for the given job.
+        Get log streams for the given jobs, expanding array and MNP jobs into their children.
 
-        :param job_id: job id (ARN)
-        :return: the log_stream if there, or None
+        :param job_ids: job ids (ARNs)
+        :return: an OrderedDict associating the log streams to the job ids, and the list of jobs without log stream
         """
-        log_stream = None
+        log_streams = OrderedDict()
+        jobs_without_log_stream = []
         try:
-            batch_client = self.boto3_factory.get_client("batch")
-            jobs = batch_client.describe_jobs(jobs=[job_id])["jobs"]
-            if len(jobs) == 1:
-                job = jobs[0]
-                self.log.debug(job)
-
-                if "nodeProperties" in job:
-                    # MNP job
-                    container = job["nodeProperties"]["nodeRangeProperties"][0]["container"]
-                elif "container" in job:
-                    container = job["container"]
+            jobs = self.__describe_jobs(job_ids)
+            self.log.debug(jobs)
+            found_job_ids = set(itertools.chain.from_iterable((job["jobId"], job.get("jobArn")) for job in jobs))
+            missing_job_ids = [job_id for job_id in job_ids if job_id not in found_job_ids]
+            if missing_job_ids:
+                fail("Error asking job output for job (%s). Job not found." % ", ".join(missing_job_ids))
+
+            simple_jobs = []
+            children_job_ids = []
+            for job in jobs:
+                if is_job_array(job):
+                    children_job_ids.extend(
+                        "{0}:{1}".format(job["jobId"], index) for index in range(job["arrayProperties"]["size"])
+                    )
+                elif is_mnp_job(job):
+                    children_job_ids.extend(
+                        "{0}#{1}".format(job["jobId"], index) for index in range(job["nodeProperties"]["numNodes"])
+                    )
                 else:
-                    container = {}
-
-                if get_job_type(job) != "SIMPLE":
-                    fail("No output available for the Job (%s). Please ask for its children." % job["jobId"])
+                    simple_jobs.append(job)
+            if children_job_ids:
+                simple_jobs.extend(self.__describe_jobs(children_job_ids))
+
+            for job in simple_jobs:
+                log_stream = self.__get_job_log_stream(job)
+                if log_stream:
+                    log_streams[log_stream] = job["jobId"]
                 else:
-                    if "logStreamName" in container:
-                        log_stream = container.get("logStreamName")
-                    else:
-                        print("No log stream found for job (%s) in the status (%s)" % (job_id, job["status"]))
-            else:
-                fail("Error asking job output for job (%s). Job not found." % job_id)
+                    jobs_without_log_stream.append(job)
         except Exception as e:
             fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
-        return log_stream
+        return log_streams, jobs_without_log_stream
 
     def __print_log_stream(self, log_stream, head=None, tail=None, stream=None, stream_period=None):  # noqa: C901 FIXME
         """
@@ -149,7 +244,7 @@ class AWSBoutCommand(object):
                 start_from_head = False
 
             response = logs_client.get_log_events(
-                logGroupName="/aws/batch/job", logStreamName=log_stream, limit=limit, startFromHead=start_from_head
+                logGroupName=LOG_GROUP_NAME, logStreamName=log_stream, limit=limit, startFromHead=start_from_head
             )
             events = response["events"]
             self.log.debug(response)
@@ -160,19 +255,20 @@ class AWSBoutCommand(object):
             if limit == max_limit or stream:
                 # get paginated items
                 next_token = response["nextForwardToken"]
+                polling_period = AdaptivePollingPeriod(max_period=stream_period if stream_period else 5)
                 while next_token is not None or stream:
                     self.log.info("Next Forward Token is (%s)" % next_token)
                     if stream:
-                        period = stream_period if stream_period else 5
-                        self.log.info("Waiting other %s seconds..." % period)
-                        time.sleep(period)
+                        self.log.info("Waiting other %s seconds..." % polling_period.period)
+                        time.sleep(polling_period.period)
                     response = logs_client.get_log_events(
-                        logGroupName="/aws/batch/job", logStreamName=log_stream, nextToken=next_token
+                        logGroupName=LOG_GROUP_NAME, logStreamName=log_stream, nextToken=next_token
                     )
                     self.__print_events(response["events"])
                     # if nextForwardToken is the same we passed in, we reached the end of the stream
                     if stream:
                         next_token = response["nextForwardToken"]
+                        polling_period.update(events_received=bool(response["events"]))
                     else:
                         next_token = (
                             response["nextForwardToken"] if response["nextForwardToken"] != next_token else None
@@ -183,37 +279,200 @@ class AWSBoutCommand(object):
         except Exception as e:
             fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
 
+    def __print_log_streams(
+        self, log_streams, jobs_without_log_stream, head=None, tail=None, stream=None, stream_period=None
+    ):
+        """
+        Ask for multiple log streams and print their events interleaved by timestamp.
+
+        :param log_streams: OrderedDict associating the log streams to the job ids
+        :param jobs_without_log_stream: jobs whose log stream is searched again while streaming
+        """
+        logs_client = self.boto3_factory.get_client("logs")
+        try:
+            if tail:
+                events = self.__get_last_log_events(logs_client, log_streams, tail)
+            else:
+                events = self.__filter_log_events(logs_client, list(log_streams), limit=head)
+            if not events:
+                print("No events found.")
+            self.__print_events(events, log_streams)
+
+            if stream:
+                # the events of the lag window are returned again by the next requests, printed ones are skipped
+                last_timestamp = events[-1]["timestamp"] if events else None
+                printed_events = {}
+                self.__add_printed_events(printed_events, events, last_timestamp)
+                polling_period = AdaptivePollingPeriod(max_period=stream_period if stream_period else 5)
+                while True:
+                    self.log.info("Waiting other %s seconds..." % polling_period.period)
+                    time.sleep(polling_period.period)
+                    if jobs_without_log_stream:
+                        jobs_without_log_stream = self.__add_started_jobs(log_streams, jobs_without_log_stream)
+                    start_time = max(0, last_timestamp - STREAM_LAG_WINDOW) if last_timestamp is not None else None
+                    events = [
+                        event
+                        for event in self.__filter_log_events(logs_client, list(log_streams), start_time=start_time)
+                        if not self.__is_printed_event(printed_events, event)
+                    ]
+                    self.__print_events(events, log_streams)
+                    if events:
+                        last_timestamp = max(last_timestamp or 0, events[-1]["timestamp"])
+                        self.__add_printed_events(printed_events, events, last_timestamp)
+                    polling_period.update(events_received=bool(events))
+        except KeyboardInterrupt:
+            self.log.info("Interrupted by the user")
+            exit(0)
+        except Exception as e:
+            fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
+
+    def __add_started_jobs(self, log_streams, jobs_without_log_stream):
+        """
+        Add the log streams of the jobs started since the previous request.
+
+        :return: the jobs still without log stream
+        """
+        jobs_still_without_log_stream = []
+        for job in self.__describe_jobs([job["jobId"] for job in jobs_without_log_stream]):
+            log_stream = self.__get_job_log_stream(job)
+            if log_stream:
+                self.log.info("Job (%s) log stream is (%s)" % (job["jobId"], log_stream))
+                log_streams[log_stream] = job["jobId"]
+            else:
+                jobs_still_without_log_stream.append(job)
+        return jobs_still_without_log_stream
+
+    @staticmethod
+    def __get_event_key(event):
+        """Return the key of the event, by message for the events of get_log_events, which have no eventId."""
+        return event.get("eventId") or (event["logStreamName"], event["timestamp"], event["message"])
+
+    def __is_printed_event(self, printed_events, event):
+        return (
+            self.__get_event_key(event) in printed_events
+            or (event["logStreamName"], event["timestamp"], event["message"]) in printed_events
+        )
+
+    def __add_printed_events(self, printed_events, events, last_timestamp):
+        """
+        Add the given events to the printed ones, forgetting the events older than the lag window.
+
+        :param printed_events: dict associating the keys of the printed events to their timestamp
+        """
+        for event in events:
+            printed_events[self.__get_event_key(event)] = event["timestamp"]
+        for key, timestamp in list(printed_events.items()):
+            if timestamp < last_timestamp - STREAM_LAG_WINDOW:
+                del printed_events[key]
+
+    @staticmethod
+    def __get_last_log_events(logs_client, log_streams, limit):
+        """
+        Get the last events of the given log streams, with a concurrent request for each log stream.
+
+        :return: the last limit events, sorted by timestamp
+        """
+
+        def _get_log_events(log_stream):
+            events = retry_on_throttling(
+                logs_client.get_log_events,
+                logGroupName=LOG_GROUP_NAME,
+                logStreamName=log_stream,
+                limit=limit,
+                startFromHead=False,
+            )["events"]
+            for event in events:
+                event["logStreamName"] = log_stream
+            return events
+
+        events = itertools.chain.from_iterable(
+            ordered_concurrent_map(_get_log_events, log_streams, DEFAULT_MAX_WORKERS)
+        )
+        return sorted(events, key=lambda event: event["timestamp"])[-limit:]
+
+    def __filter_log_events(self, logs_client, log_streams, start_time=None, limit=None):
+        """
+        Get the events of the given log streams, with a concurrent request for each group of 100 log streams.
+
+        :param start_time: get only the events with a timestamp equal or greater than start_time
+        :param limit: maximum number of events to get, starting from the first one
+        :return: the events, sorted by timestamp
+        """
+
+        def _filter_log_events(index):
+            request_args = {
+                "logGroupName": LOG_GROUP_NAME,
+                "logStreamNames": log_streams[index : index + self.MAX_FILTERED_LOG_STREAMS],
+            }
+            if start_time is not None:
+                request_args["startTime"] = start_time
+            events = []
+            while True:
+                if limit:
+                    request_args["limit"] = limit - len(events)
+                response = retry_on_throttling(logs_client.filter_log_events, **request_args)
+                events.extend(response["events"])
+                if "nextToken" not in response or (limit and len(events) >= limit):
+                    return events
+                request_args["nextToken"] = response["nextToken"]
+
+        chunks = ordered_concurrent_map(
+            _filter_log_events, range(0, len(log_streams), self.MAX_FILTERED_LOG_STREAMS), DEFAULT_MAX_WORKERS
+        )
+        events = sorted(itertools.chain.from_iterable(chunks), key=lambda event: event["timestamp"])
+        return events[:limit] if limit else events
+
     @staticmethod
-    def __print_events(events):
+    def __print_events(events, log_streams=None):
         """
-        Print given events.
+        Print given events with a single write.
 
         :param events: events to print
+        :param log_streams: association between log streams and job ids, to prefix the events with the job id
         """
+        lines = []
         for event in events:
-            print("{0}: {1}".format(convert_to_date(event["timestamp"]), event["message"]))
+            if log_streams:
+                lines.append(
+                    "{0}: [{1}] {2}\n".format(
+                        convert_to_date(event["timestamp"]), log_streams[event["logStreamName"]], event["message"]
+                    )
+                )
+            else:
+                lines.append("{0}: {1}\n".format(convert_to_date(event["timestamp"]), event["message"]))
+        if lines:
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
 
 
-def main():
+def main(argv=None):
     """Command entrypoint."""
     try:
         # parse input parameters and config file
-        args = _get_parser().parse_args()
+        args = _get_parser().parse_args(argv)
         _validate_parameters(args)
         log = config_logger(args.log_level)
         log.info("Input parameters: %s" % args)
         config = AWSBatchCliConfig(log=log, cluster=args.cluster)
-        boto3_factory = Boto3ClientFactory(
-            region=config.region,
-            proxy=config.proxy,
-            aws_access_key_id=config.aws_access_key_id,
-            aws_secret_access_key=config.aws_secret_access_key,
-        )
 
-        AWSBoutCommand(log, boto3_factory).run(
-            job_id=args.job_id, head=args.head, tail=args.tail, stream=args.stream, stream_period=args.stream_period
-        )
+        def _run(config):
+            boto3_factory = Boto3ClientFactory(
+                region=config.region,
+                proxy=config.proxy,
+                aws_access_key_id=config.aws_access_key_id,
+                aws_secret_access_key=config.aws_secret_access_key,
+            )
+
+            AWSBoutCommand(log, boto3_factory).run(
+                job_ids=args.job_ids,
+                head=args.head,
+                tail=args.tail,
+                stream=args.stream,
+                stream_period=args.stream_period,
+            )
 
+        # the events are printed while retrieved, running the command again would print them twice
+        run_with_cluster_config(log, config, _run, retry=False)
     except KeyboardInterrupt:
         print("Exiting...")
         sys.exit(0)
@@ -18,7 +18,7 @@ import sys
 
 import argparse
 
-from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, Output, config_logger
+from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, Output, config_logger, run_with_cluster_config
 from awsbatch.utils import fail
 
 
@@ -37,7 +37,7 @@ def _get_parser():
 
     :return: the ArgumentParser object
     """
-    parser = argparse.ArgumentParser(description="Shows the Job Queue associated to the cluster.")
+    parser = argparse.ArgumentParser(prog="awsbqueues", description="Shows the Job Queue associated to the cluster.")
     parser.add_argument("-c", "--cluster", help="Cluster to use")
     parser.add_argument("-d", "--details", help="Show queues details", action="store_true")
     parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="ERROR")
@@ -132,29 +132,32 @@ class AWSBqueuesCommand(object):
             fail("Error building Queue item. Key (%s) not found." % e)
 
 
-def main():
+def main(argv=None):
     """Command entrypoint."""
     try:
         # parse input parameters and config file
-        args = _get_parser().parse_args()
+        args = _get_parser().parse_args(argv)
         log = config_logger(args.log_level)
         log.info("Input parameters: %s" % args)
         config = AWSBatchCliConfig(log=log, cluster=args.cluster)
-        boto3_factory = Boto3ClientFactory(
-            region=config.region,
-            proxy=config.proxy,
-            aws_access_key_id=config.aws_access_key_id,
-            aws_secret_access_key=config.aws_secret_access_key,
-        )
 
-        if args.job_queues:
-            job_queues = args.job_queues
-            show_details = True
-        else:
-            job_queues = [config.job_queue]
-            show_details = args.details
-        AWSBqueuesCommand(log, boto3_factory).run(job_queues=job_queues, show_details=show_details)
+        def _run(config):
+            boto3_factory = Boto3ClientFactory(
+                region=config.region,
+                proxy=config.proxy,
+                aws_access_key_id=config.aws_access_key_id,
+                aws_secret_access_key=config.aws_secret_access_key,
+            )
+
+            if args.job_queues:
+                job_queues = args.job_queues
+                show_details = True
+            else:
+                job_queues = [config.job_queue]
+                show_details = args.details
+            AWSBqueuesCommand(log, boto3_factory).run(job_queues=job_queues, show_details=show_details)
 
+        run_with_cluster_config(log, config, _run)
     except KeyboardInterrupt:
         print("Exiting...")
         sys.exit(0)
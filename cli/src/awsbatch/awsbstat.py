@@ -14,25 +14,64 @@
 from __future__ import print_function
 
 import collections
+import itertools
 import re
 import sys
+import threading
+import time
 from builtins import range
 from collections import OrderedDict
 
 import argparse
-
-from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, Output, config_logger
+from dateutil import parser as date_parser
+
+from awsbatch.common import (
+    AWSBatchCliConfig,
+    Boto3ClientFactory,
+    LiveDisplay,
+    Output,
+    StreamingOutput,
+    config_logger,
+    run_with_cluster_config,
+)
 from awsbatch.utils import (
+    DEFAULT_MAX_WORKERS,
+    concurrent_chain,
     convert_to_date,
     fail,
     get_job_definition_name_by_arn,
     get_job_type,
     is_job_array,
     is_mnp_job,
+    ordered_concurrent_map,
+    retry_on_throttling,
     shell_join,
 )
 
 AWS_BATCH_JOB_STATUS = ["SUBMITTED", "PENDING", "RUNNABLE", "STARTING", "RUNNING", "SUCCEEDED", "FAILED"]
+AWS_BATCH_TERMINAL_JOB_STATUS = ["SUCCEEDED", "FAILED"]
+SINCE_UNITS_IN_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+# Cache of the described jobs shared by all the commands run by the same process, installed by awsbatchd
+SHARED_DESCRIBED_JOBS_CACHE = None
+
+
+def _parse_since(value):
+    """
+    Parse the --since parameter.
+
+    :param value: a duration like 30m, 12h or 2d, or a date like 2020-11-23T10:00:00Z
+    :return: the number of milliseconds since epoch
+    """
+    match = re.match(r"^(\d+)([smhd])$", value)
+    if match:
+        return int((time.time() - int(match.group(1)) * SINCE_UNITS_IN_SECONDS[match.group(2)]) * 1000)
+    try:
+        date = date_parser.parse(value)
+    except (ValueError, OverflowError):
+        raise argparse.ArgumentTypeError("invalid value (%s), must be a duration like 12h or a date" % value)
+    if date.tzinfo is None:
+        return int(time.mktime(date.timetuple()) * 1000)
+    return int((date - date_parser.parse("1970-01-01T00:00:00Z")).total_seconds() * 1000)
 
 
 def _get_parser():
@@ -50,7 +89,9 @@ def _get_parser():
 
     :return: the ArgumentParser object
     """
-    parser = argparse.ArgumentParser(description="Shows the jobs submitted in the cluster's Job Queue.")
+    parser = argparse.ArgumentParser(
+        prog="awsbstat", description="Shows the jobs submitted in the cluster's Job Queue."
+    )
     parser.add_argument("-c", "--cluster", help="Cluster to use")
     parser.add_argument(
         "-s",
@@ -64,6 +105,39 @@ def _get_parser():
         "-e", "--expand-children", help="Expand jobs with children (array and MNP)", action="store_true"
     )
     parser.add_argument("-d", "--details", help="Show jobs details", action="store_true")
+    parser.add_argument(
+        "--since",
+        help="Show only the jobs created after the given time. "
+        "Accepted values are durations like 30m, 12h or 2d, or dates like 2020-11-23T10:00:00Z",
+        type=_parse_since,
+    )
+    parser.add_argument("--name-prefix", help="Show only the jobs with a name starting with the given prefix")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Output format. Jobs are printed as a table by default. With ndjson (one JSON object per line) "
+        "or csv, jobs are printed with all their attributes as soon as they are retrieved",
+        choices=["table"] + StreamingOutput.FORMATS,
+        default="table",
+    )
+    parser.add_argument(
+        "--no-sort",
+        help="Print jobs in the order they are retrieved, without sorting them. Valid only with ndjson and csv output",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        help="Show the jobs until interrupted, updating them every WATCH seconds. "
+        "Only the jobs not yet succeeded or failed are asked again to AWS Batch",
+        type=int,
+    )
+    parser.add_argument(
+        "--max-workers",
+        help="Maximum number of concurrent requests to AWS Batch, defaults to %d" % DEFAULT_MAX_WORKERS,
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+    )
     parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="ERROR")
     parser.add_argument(
         "job_ids",
@@ -247,17 +321,66 @@ class ArrayJobConverter(JobConverter):
         return "-", "-"
 
 
+class SharedDescribedJobsCache(object):
+    """
+    Thread safe cache of described jobs, shared by the commands run by a long-lived process.
+
+    Jobs in a terminal status don't change anymore and are kept until evicted by newer jobs, while the other jobs
+    expire after ttl seconds.
+    """
+
+    def __init__(self, ttl, max_size=10000):
+        """
+        Initialize the object.
+
+        :param ttl: time to live in seconds of the jobs not in a terminal status
+        :param max_size: maximum number of cached jobs
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.__jobs = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, job_id):
+        """
+        Return the described job, or None if missing or expired.
+
+        :param job_id: the job id
+        """
+        with self.__lock:
+            job, expires_at = self.__jobs.get(job_id, (None, None))
+            if job and (expires_at is None or expires_at > time.time()):
+                return job
+            return None
+
+    def put(self, job):
+        """
+        Store the given described job.
+
+        :param job: the job dictionary returned by AWS Batch api
+        """
+        expires_at = None if job.get("status") in AWS_BATCH_TERMINAL_JOB_STATUS else time.time() + self.ttl
+        with self.__lock:
+            self.__jobs.pop(job["jobId"], None)
+            self.__jobs[job["jobId"]] = (job, expires_at)
+            if len(self.__jobs) > self.max_size:
+                self.__jobs.popitem(last=False)
+
+
 class AWSBstatCommand(object):
     """awsbstat command."""
 
     __JOB_CONVERTERS = {"SIMPLE": JobConverter(), "ARRAY": ArrayJobConverter(), "MNP": MNPJobConverter()}
+    # Maximum number of described jobs kept to be reused when the same job is described again
+    DESCRIBED_JOBS_CACHE_SIZE = 10000
 
-    def __init__(self, log, boto3_factory):
+    def __init__(self, log, boto3_factory, max_workers=DEFAULT_MAX_WORKERS):
         """
         Initialize the object.
 
         :param log: log
         :param boto3_factory: an initialized Boto3ClientFactory object
+        :param max_workers: maximum number of concurrent describe_jobs requests
         """
         self.log = log
         mapping = collections.OrderedDict(
@@ -283,24 +406,54 @@ class AWSBstatCommand(object):
             ]
         )
         self.output = Output(mapping=mapping)
+        self.stream_output = False
         self.boto3_factory = boto3_factory
         self.batch_client = boto3_factory.get_client("batch")
+        self.max_workers = max_workers
+        self.__described_jobs = OrderedDict()
+        # jobs shown in watch mode, by job id
+        self.__watched_jobs = None
+        self.__listed_job_ids = set()
 
-    def run(self, job_status, expand_children, job_queue=None, job_ids=None, show_details=False):
+    def run(
+        self,
+        job_status,
+        expand_children,
+        job_queue=None,
+        job_ids=None,
+        show_details=False,
+        output_format="table",
+        sort_output=True,
+        created_after=None,
+        name_prefix=None,
+    ):
         """Print list of jobs, by filtering by queue or by ids."""
+        sort_keys_function = self.__sort_by_status_startedat_jobid() if not job_ids else self.__sort_by_key(job_ids)
+        if output_format in StreamingOutput.FORMATS:
+            # jobs are written while pages are retrieved, without keeping the whole queue in memory
+            self.output = StreamingOutput(
+                mapping=self.output.mapping,
+                output_format=output_format,
+                sort_keys_function=sort_keys_function if sort_output else None,
+            )
+            self.stream_output = True
+
         if job_ids:
             self.__populate_output_by_job_ids(job_ids, show_details or len(job_ids) == 1, include_parents=True)
             # explicitly asking for job details,
             # or asking for a single simple job (the output is not a list of jobs)
             details_required = show_details or (len(job_ids) == 1 and self.output.length() == 1)
         elif job_queue:
-            self.__populate_output_by_queue(job_queue, job_status, expand_children, show_details)
+            self.__populate_output_by_queue(
+                job_queue, job_status, expand_children, show_details, created_after, name_prefix
+            )
             details_required = show_details
         else:
             fail("Error listing jobs from AWS Batch. job_ids or job_queue must be defined")
 
-        sort_keys_function = self.__sort_by_status_startedat_jobid() if not job_ids else self.__sort_by_key(job_ids)
-        if details_required:
+        if self.stream_output:
+            self.output.close()
+        elif details_required:
             self.output.show(sort_keys_function=sort_keys_function)
         else:
             self.output.show_table(
@@ -308,6 +461,137 @@ class AWSBstatCommand(object):
                 sort_keys_function=sort_keys_function,
             )
 
+    def watch(
+        self,
+        interval,
+        job_status,
+        expand_children,
+        job_queue=None,
+        job_ids=None,
+        show_details=False,
+        created_after=None,
+        name_prefix=None,
+        iterations=None,
+    ):
+        """
+        Show list of jobs, by filtering by queue or by ids, updating it every interval seconds.
+
+        The jobs are kept between the polls and only the ones in a non-terminal status are described again.
+        New jobs are searched by listing the non-terminal statuses. Jobs in a terminal status are listed at the
+        first poll, then only the ones created since the previous poll, if list_jobs filters are supported.
+
+        :param interval: seconds between two polls
+        :param iterations: number of polls, if None the jobs are shown until interrupted
+        """
+        self.__watched_jobs = OrderedDict()
+        self.__listed_job_ids = set()
+        sort_keys_function = self.__sort_by_status_startedat_jobid() if not job_ids else self.__sort_by_key(job_ids)
+        display = LiveDisplay()
+        iteration = 0
+        last_poll_time = None
+        while True:
+            poll_time = int(time.time() * 1000)
+            # rows are built from the watched jobs, the output only collects the jobs added by this poll
+            self.output = Output(mapping=self.output.mapping)
+            if iteration == 0:
+                if job_ids:
+                    self.__populate_output_by_job_ids(job_ids, show_details or len(job_ids) == 1, include_parents=True)
+                    details_required = show_details or (len(job_ids) == 1 and self.output.length() == 1)
+                elif job_queue:
+                    self.__populate_output_by_queue(
+                        job_queue, job_status, expand_children, show_details, created_after, name_prefix
+                    )
+                    details_required = show_details
+                else:
+                    fail("Error listing jobs from AWS Batch. job_ids or job_queue must be defined")
+            else:
+                self.__refresh_watched_jobs(
+                    None if job_ids else job_queue,
+                    job_status,
+                    expand_children,
+                    show_details,
+                    created_after,
+                    name_prefix,
+                    last_poll_time,
+                )
+            last_poll_time = poll_time
+
+            output = Output(mapping=self.output.mapping)
+            try:
+                for job in self.__watched_jobs.values():
+                    output.add(self.__JOB_CONVERTERS[get_job_type(job)].convert(job))
+            except KeyError as e:
+                fail("Error building Job item. Key (%s) not found." % e)
+            if details_required:
+                text = output.format(sort_keys_function=sort_keys_function)
+            else:
+                text = output.format_table(
+                    keys=["jobId", "jobName", "status", "startedAt", "stoppedAt", "exitCode"],
+                    sort_keys_function=sort_keys_function,
+                )
+            display.update("Every {0}s: awsbstat    {1}\n\n{2}".format(interval, time.strftime("%c"), text))
+
+            iteration += 1
+            if iterations is not None and iteration >= iterations:
+                break
+            time.sleep(interval)
+
+    def __refresh_watched_jobs(
+        self,
+        job_queue,
+        job_status,
+        expand_children,
+        details,
+        created_after=None,
+        name_prefix=None,
+        last_poll_time=None,
+    ):
+        """
+        Update the watched jobs, describing the ones in a non-terminal status and adding the new ones.
+
+        :param job_queue: job queue name or ARN, if None only the watched jobs are updated
+        :param job_status: list of job status to show
+        :param expand_children: if True, the job with children will be expanded by creating a row for each child
+        :param details: ask for job details
+        :param created_after: search new jobs created after the given time, in milliseconds since epoch
+        :param name_prefix: search new jobs with a name starting with the given prefix
+        :param last_poll_time: time of the previous poll, in milliseconds since epoch
+        """
+        active_job_ids = [
+            job_id
+            for job_id, job in self.__watched_jobs.items()
+            if job.get("status") not in AWS_BATCH_TERMINAL_JOB_STATUS
+        ]
+        try:
+            for jobs in self.__chunked_describe_jobs(active_job_ids):
+                for job in jobs:
+                    if job_queue and job.get("status") not in job_status:
+                        # e.g. a job terminated while asking only for active jobs
+                        self.__watched_jobs.pop(job["jobId"], None)
+                    else:
+                        self.__watched_jobs[job["jobId"]] = job
+        except Exception as e:
+            fail("Error describing jobs from AWS Batch. Failed with exception: %s" % e)
+
+        if job_queue:
+            active_job_status = [status for status in job_status if status not in AWS_BATCH_TERMINAL_JOB_STATUS]
+            if active_job_status:
+                self.__populate_output_by_queue(
+                    job_queue, active_job_status, expand_children, details, created_after, name_prefix
+                )
+            terminal_job_status = [status for status in job_status if status in AWS_BATCH_TERMINAL_JOB_STATUS]
+            if terminal_job_status and self.__list_jobs_filters_supported():
+                # jobs terminated without being listed in a non-terminal status by the previous poll.
+                # A minute of margin for the clock difference with AWS Batch, jobs already listed are skipped anyway
+                self.__populate_output_by_queue(
+                    job_queue,
+                    terminal_job_status,
+                    expand_children,
+                    details,
+                    max(created_after or 0, last_poll_time - 60000),
+                    name_prefix,
+                )
+
     @staticmethod
     def __sort_by_key(ordered_keys):  # noqa: D202
         """
@@ -365,7 +649,7 @@ class AWSBstatCommand(object):
                 self.log.info("Describing jobs (%s), details (%s)" % (job_ids, details))
                 parent_jobs = []
                 jobs_with_children = []
-                jobs = self.__chunked_describe_jobs(job_ids)
+                jobs = self.__describe_jobs(job_ids)
                 for job in jobs:
                     # always add parent job
                     if include_parents or get_job_type(job) == "SIMPLE":
@@ -390,18 +674,14 @@ class AWSBstatCommand(object):
         :param parent_jobs: list of triplets (job_id, job_id_separator, job_size)
         """
         try:
-            expanded_job_ids = []
-            for parent_job in parent_jobs:
-                expanded_job_ids.extend(
-                    [
-                        "{JOB_ID}{SEPARATOR}{INDEX}".format(JOB_ID=parent_job[0], SEPARATOR=parent_job[1], INDEX=i)
-                        for i in range(0, parent_job[2])
-                    ]
-                )
-
-            if expanded_job_ids:
-                jobs = self.__chunked_describe_jobs(expanded_job_ids)
+            # children ids are generated lazily, array jobs can have up to 10000 children each
+            expanded_job_ids = (
+                "{JOB_ID}{SEPARATOR}{INDEX}".format(JOB_ID=parent_job[0], SEPARATOR=parent_job[1], INDEX=i)
+                for parent_job in parent_jobs
+                for i in range(0, parent_job[2])
+            )
 
+            for jobs in self.__chunked_describe_jobs(expanded_job_ids):
                 # forcing details to be False since already retrieved.
                 self.__add_jobs(jobs)
         except Exception as e:
@@ -413,15 +693,51 @@ class AWSBstatCommand(object):
 
         describe_jobs API call has a hard limit on the number of job that can be
         retrieved with a single call. In case job_ids has more than 100 items, this function
-        distributes the describe_jobs call across multiple requests.
+        distributes the describe_jobs call across multiple concurrent requests.
+
+        :param job_ids: iterable of ids for the jobs to describe.
+        :return: a generator of lists of described jobs, one for each request, in the order of job_ids.
+        """
+
+        def _describe_jobs_chunk(jobs_chunk):
+            return retry_on_throttling(self.batch_client.describe_jobs, jobs=jobs_chunk)["jobs"]
+
+        return ordered_concurrent_map(_describe_jobs_chunk, self.__split_in_chunks(job_ids, 100), self.max_workers)
 
-        :param job_ids: list of ids for the jobs to describe.
+    @staticmethod
+    def __split_in_chunks(items, chunk_size):
+        items = iter(items)
+        chunk = list(itertools.islice(items, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = list(itertools.islice(items, chunk_size))
+
+    def __describe_jobs(self, job_ids):
+        """
+        Describe the given jobs, reusing the jobs already described.
+
+        :param job_ids: iterable of ids for the jobs to describe.
         :return: list of described jobs.
         """
         jobs = []
-        for index in range(0, len(job_ids), 100):
-            jobs_chunk = job_ids[index : index + 100]  # noqa: E203
-            jobs.extend(self.batch_client.describe_jobs(jobs=jobs_chunk)["jobs"])
+        missing_job_ids = OrderedDict()
+        for job_id in job_ids:
+            shared_job = SHARED_DESCRIBED_JOBS_CACHE.get(job_id) if SHARED_DESCRIBED_JOBS_CACHE else None
+            if job_id in self.__described_jobs:
+                jobs.append(self.__described_jobs[job_id])
+            elif shared_job:
+                jobs.append(shared_job)
+            else:
+                missing_job_ids[job_id] = None
+
+        for jobs_chunk in self.__chunked_describe_jobs(missing_job_ids):
+            for job in jobs_chunk:
+                if SHARED_DESCRIBED_JOBS_CACHE:
+                    SHARED_DESCRIBED_JOBS_CACHE.put(job)
+                self.__described_jobs[job["jobId"]] = job
+                if len(self.__described_jobs) > self.DESCRIBED_JOBS_CACHE_SIZE:
+                    self.__described_jobs.popitem(last=False)
+                jobs.append(job)
         return jobs
 
     def __add_jobs(self, jobs, details=False):
@@ -436,12 +752,14 @@ class AWSBstatCommand(object):
                 self.log.debug("Adding jobs to the output (%s)" % jobs)
                 if details:
                     self.log.info("Asking for jobs details")
-                    jobs_to_show = self.__chunked_describe_jobs([job["jobId"] for job in jobs])
+                    jobs_to_show = self.__describe_jobs([job["jobId"] for job in jobs])
                 else:
                     jobs_to_show = jobs
 
                 for job in jobs_to_show:
                     self.log.debug("Adding job to the output (%s)", job)
+                    if self.__watched_jobs is not None:
+                        self.__watched_jobs[job["jobId"]] = job
 
                     job_converter = self.__JOB_CONVERTERS[get_job_type(job)]
 
@@ -451,7 +769,63 @@ class AWSBstatCommand(object):
         except Exception as e:
             fail("Error adding jobs to the output. Failed with exception: %s" % e)
 
-    def __populate_output_by_queue(self, job_queue, job_status, expand_children, details):
+    def __list_jobs_filters_supported(self):
+        """Check if list_jobs accepts the filters parameter, not available with older botocore versions."""
+        operation_model = self.batch_client.meta.service_model.operation_model("ListJobs")
+        return "filters" in operation_model.input_shape.members
+
+    def __list_jobs(self, job_queue, job_status, created_after=None, name_prefix=None):
+        """
+        List the jobs of the queue with the given status, with a concurrent listing for each status.
+
+        When supported, created_after or name_prefix are applied server-side with a single listing,
+        because list_jobs returns jobs in any status when a filter is given.
+        In any case all the conditions are checked on the received jobs.
+
+        :param job_queue: job queue name or ARN
+        :param job_status: list of job status to ask
+        :param created_after: list only the jobs created after the given time, in milliseconds since epoch
+        :param name_prefix: list only the jobs with a name starting with the given prefix
+        :return: a generator of lists of job summaries, with no duplicated jobs
+        """
+        listings = [{"jobStatus": status} for status in job_status]
+        if (created_after or name_prefix) and self.__list_jobs_filters_supported():
+            # only one filter is accepted by list_jobs, created_after is preferred to skip the jobs history
+            if created_after:
+                list_filter = {"name": "AFTER_CREATED_AT", "values": [str(created_after)]}
+            else:
+                list_filter = {"name": "JOB_NAME", "values": [name_prefix + "*"]}
+            listings = [{"filters": [list_filter]}]
+
+        def _list_jobs_pages(listing):
+            next_token = ""
+            while next_token is not None:
+                response = retry_on_throttling(
+                    self.batch_client.list_jobs, jobQueue=job_queue, nextToken=next_token, **listing
+                )
+                yield response["jobSummaryList"]
+                next_token = response.get("nextToken")
+
+        # a job changing status while the statuses are listed can be returned twice,
+        # in watch mode jobs listed by the previous polls are skipped as well
+        listed_job_ids = self.__listed_job_ids if self.__watched_jobs is not None else set()
+        for jobs_page in concurrent_chain(_list_jobs_pages, listings, self.max_workers):
+            jobs = []
+            for job in jobs_page:
+                if (
+                    job["jobId"] in listed_job_ids
+                    or ("status" in job and job["status"] not in job_status)
+                    or (created_after and job.get("createdAt", 0) <= created_after)
+                    or (name_prefix and not job.get("jobName", "").startswith(name_prefix))
+                ):
+                    continue
+                listed_job_ids.add(job["jobId"])
+                jobs.append(job)
+            yield jobs
+
+    def __populate_output_by_queue(
+        self, job_queue, job_status, expand_children, details, created_after=None, name_prefix=None
+    ):
         """
         Add Job items to the output asking for given queue and status.
 
@@ -459,21 +833,25 @@ class AWSBstatCommand(object):
         :param job_status: list of job status to ask
         :param expand_children: if True, the job with children will be expanded by creating a row for each child
         :param details: ask for job details
+        :param created_after: show only the jobs created after the given time, in milliseconds since epoch
+        :param name_prefix: show only the jobs with a name starting with the given prefix
         """
         try:
             single_jobs = []
             jobs_with_children = []
-            for status in job_status:
-                next_token = ""
-                while next_token is not None:
-                    response = self.batch_client.list_jobs(jobStatus=status, jobQueue=job_queue, nextToken=next_token)
-
-                    for job in response["jobSummaryList"]:
-                        if get_job_type(job) != "SIMPLE" and expand_children is True:
-                            jobs_with_children.append(job["jobId"])
-                        else:
-                            single_jobs.append(job)
-                    next_token = response.get("nextToken")
+            for jobs_page in self.__list_jobs(job_queue, job_status, created_after, name_prefix):
+                for job in jobs_page:
+                    if get_job_type(job) != "SIMPLE" and expand_children is True:
+                        jobs_with_children.append(job["jobId"])
+                    else:
+                        single_jobs.append(job)
+
+                if self.stream_output:
+                    # write the page right away instead of holding the whole queue in memory
+                    self.__populate_output_by_job_ids(jobs_with_children, details)
+                    self.__add_jobs(single_jobs, details)
+                    single_jobs = []
+                    jobs_with_children = []
 
             # create output items for job array children
             self.__populate_output_by_job_ids(jobs_with_children, details)
@@ -492,28 +870,58 @@ def main(argv=None):
         args = _get_parser().parse_args(argv)
         log = config_logger(args.log_level)
         log.info("Input parameters: %s" % args)
+        if args.no_sort and args.output == "table":
+            fail("Error: --no-sort requires ndjson or csv output")
+        if args.max_workers < 1:
+            fail("Error: --max-workers must be greater than 0")
+        if args.watch is not None:
+            if args.watch < 1:
+                fail("Error: --watch must be greater than 0")
+            if args.output != "table":
+                fail("Error: --watch requires table output")
         config = AWSBatchCliConfig(log=log, cluster=args.cluster)
-        boto3_factory = Boto3ClientFactory(
-            region=config.region,
-            proxy=config.proxy,
-            aws_access_key_id=config.aws_access_key_id,
-            aws_secret_access_key=config.aws_secret_access_key,
-        )
 
-        job_status_set = OrderedDict((status.strip().upper(), "") for status in args.status.split(","))
-        if "ALL" in job_status_set:
-            # add all the statuses in the list
-            job_status_set = OrderedDict((status, "") for status in AWS_BATCH_JOB_STATUS)
-        job_status = list(job_status_set)
-
-        AWSBstatCommand(log, boto3_factory).run(
-            job_status=job_status,
-            expand_children=args.expand_children,
-            job_ids=args.job_ids,
-            job_queue=config.job_queue,
-            show_details=args.details,
-        )
+        def _run(config):
+            boto3_factory = Boto3ClientFactory(
+                region=config.region,
+                proxy=config.proxy,
+                aws_access_key_id=config.aws_access_key_id,
+                aws_secret_access_key=config.aws_secret_access_key,
+            )
+
+            job_status_set = OrderedDict((status.strip().upper(), "") for status in args.status.split(","))
+            if "ALL" in job_status_set:
+                # add all the statuses in the list
+                job_status_set = OrderedDict((status, "") for status in AWS_BATCH_JOB_STATUS)
+            job_status = list(job_status_set)
+
+            command = AWSBstatCommand(log, boto3_factory, max_workers=args.max_workers)
+            if args.watch:
+                command.watch(
+                    interval=args.watch,
+                    job_status=job_status,
+                    expand_children=args.expand_children,
+                    job_ids=args.job_ids,
+                    job_queue=config.job_queue,
+                    show_details=args.details,
+                    created_after=args.since,
+                    name_prefix=args.name_prefix,
+                )
+            else:
+                command.run(
+                    job_status=job_status,
+                    expand_children=args.expand_children,
+                    job_ids=args.job_ids,
+                    job_queue=config.job_queue,
+                    show_details=args.details,
+                    output_format=args.output,
+                    sort_output=not args.no_sort,
+                    created_after=args.since,
+                    name_prefix=args.name_prefix,
+                )
 
+        # watched and streaming outputs are printed while running, running them again would print jobs twice
+        run_with_cluster_config(log, config, _run, retry=not args.watch and args.output == "table")
     except KeyboardInterrupt:
         print("Exiting...")
         sys.exit(0)
@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and limitations under the License.
 from __future__ import print_function
 
+import collections
+import csv
 import os
 import pipes
 import re
@@ -23,8 +25,18 @@ import time
 
 import argparse
 
-from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, config_logger
-from awsbatch.utils import S3Uploader, fail, shell_join
+from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, Output, config_logger, run_with_cluster_config
+from awsbatch.utils import (
+    DEFAULT_MAX_WORKERS,
+    FileHashCache,
+    S3Uploader,
+    fail,
+    ordered_concurrent_map,
+    retry_on_throttling,
+    shell_join,
+)
+
+MANIFEST_INTEGER_COLUMNS = ["vcpus", "memory", "array_size", "retry_attempts", "timeout"]
 
 
 def _get_parser():
@@ -144,6 +156,20 @@ def _get_parser():
         "with a job ID for array jobs so that each index child of this job must wait for the corresponding index "
         "child of each dependency to complete before it can begin. Syntax: jobId=<string>,type=<string>;...",
     )
+    parser.add_argument(
+        "-mf",
+        "--manifest",
+        help="CSV file describing the jobs to submit, one per row. Columns are name and command (required), "
+        "input_files and depends_on (semicolon separated lists of files and of job names or IDs), vcpus, memory, "
+        "array_size, retry_attempts and timeout. Empty values default to the command line parameters",
+    )
+    parser.add_argument(
+        "--max-workers",
+        help="Maximum number of concurrent uploads, and of submissions with --manifest. Default is %s"
+        % DEFAULT_MAX_WORKERS,
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+    )
     parser.add_argument("-aws", "--awscli", help=argparse.SUPPRESS, action="store_true")
     parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="ERROR")
     parser.add_argument(
@@ -163,7 +189,9 @@ def _validate_parameters(args):
 
     :param args: args variable
     """
-    if args.command_file:
+    if args.manifest:
+        _validate_manifest_parameters(args)
+    elif args.command_file:
         if not type(args.command) == str:
             fail("The command parameter is required with --command-file option")
         elif not os.path.isfile(args.command):
@@ -184,6 +212,24 @@ def _validate_parameters(args):
     if args.working_dir and args.parent_working_dir:
         fail("--parent-working-dir and --working-dir parameters cannot be used at the same time")
 
+    if args.max_workers < 1:
+        fail("Error: --max-workers must be greater than 0")
+
+
+def _validate_manifest_parameters(args):
+    """
+    Validate input parameters used with --manifest.
+
+    :param args: args variable
+    """
+    if not os.path.isfile(args.manifest):
+        fail("The --manifest parameter (%s) must be an existing file" % args.manifest)
+    if type(args.command) == str or args.arguments:
+        fail("Error: command and arguments cannot be specified with --manifest option.")
+    for option in ["command_file", "job_name", "nodes", "depends_on"]:
+        if getattr(args, option):
+            fail("--%s parameter cannot be used with --manifest option" % option.replace("_", "-"))
+
 
 def _generate_unique_job_key(job_name):
     """
@@ -211,17 +257,21 @@ def _upload_and_get_command(boto3_factory, args, job_s3_folder, job_name, config
     # create S3 folder for the job
     s3_uploader = S3Uploader(boto3_factory, config.s3_bucket, job_s3_folder)
 
-    # upload input files, if there
-    if args.input_file:
-        for file in args.input_file:
-            s3_uploader.put_file(file, os.path.basename(file))
-
     # upload command, if needed
     if args.command_file or not sys.stdin.isatty() or args.env:
         # define job script name
         job_script = job_name + ".sh"
         log.info("Using command-file option or stdin. Job script name: %s" % job_script)
 
+        # stage input files and existing script file by content, they are copied by hash to the job working directory
+        input_files = list(args.input_file or [])
+        if args.command_file:
+            input_files.append(args.command)
+        staged_files = _stage_input_files(s3_uploader, _get_cas_folder(config), input_files, args.max_workers, log)
+        job_files = [(staged_files[input_file], os.path.basename(input_file)) for input_file in args.input_file or []]
+        if args.command_file:
+            job_files.append((staged_files[args.command], job_script))
+
         env_file = None
         if args.env:
             env_file = job_name + ".env.sh"
@@ -230,21 +280,20 @@ def _upload_and_get_command(boto3_factory, args, job_s3_folder, job_name, config
             _get_env_and_upload(s3_uploader, args.env, env_blacklist, env_file, log)
 
         # upload job script
-        if args.command_file:
-            # existing script file
-            try:
-                s3_uploader.put_file(args.command, job_script)
-            except Exception as e:
-                fail("Error creating job script. Failed with exception: %s" % e)
-        elif not sys.stdin.isatty():
+        if not args.command_file and not sys.stdin.isatty():
             # stdin
             _get_stdin_and_upload(s3_uploader, job_script)
 
         # define command to execute
-        bash_command = _compose_bash_command(args, config.s3_bucket, config.region, job_s3_folder, job_script, env_file)
+        bash_command = _compose_bash_command(
+            args, config.s3_bucket, config.region, job_s3_folder, job_script, env_file, job_files
+        )
         command = ["/bin/bash", "-c", bash_command]
     elif type(args.command) == str:
         log.info("Using command parameter")
+        # upload input files, if there, for the command to get them from the job S3 folder
+        for file in args.input_file or []:
+            s3_uploader.put_file(file, os.path.basename(file))
         command = [args.command] + args.arguments
     else:
         fail("Unexpected error. Command cannot be empty.")
@@ -291,7 +340,7 @@ def _get_env_and_upload(s3_uploader, env, env_blacklist, env_file, log):
         fail("Error creating environment file. Failed with exception: %s" % e)
 
 
-def _compose_bash_command(args, s3_bucket, region, job_s3_folder, job_script, env_file):
+def _compose_bash_command(args, s3_bucket, region, job_s3_folder, job_script, env_file, job_files=None):
     """
     Define bash command to execute.
 
@@ -301,9 +350,79 @@ def _compose_bash_command(args, s3_bucket, region, job_s3_folder, job_script, en
     :param job_s3_folder: S3 job folder
     :param job_script: job script file
     :param env_file: environment file
+    :param job_files: list of (S3 key, file name) tuples of the staged files to download in the working directory
     :return: composed bash command
     """
+    bash_command = _compose_working_dir_commands(args)
+
+    # download all job files to the job folder
+    bash_command.append(
+        "aws s3 --region {REGION} sync s3://{BUCKET}/{S3_FOLDER} . >/dev/null".format(
+            REGION=region, BUCKET=s3_bucket, S3_FOLDER=job_s3_folder
+        )
+    )
+    bash_command.extend(_compose_download_commands(region, s3_bucket, job_files or []))
+    if env_file:  # source the environment file
+        bash_command.append("source {ENV_FILE}".format(ENV_FILE=env_file))
+
+    # execute the job script + arguments
     command_args = shell_join(args.arguments)
+    bash_command.append("chmod +x {SCRIPT} && ./{SCRIPT} {ARGS}".format(SCRIPT=job_script, ARGS=command_args))
+    return " && ".join(bash_command)
+
+
+def _compose_manifest_bash_command(args, s3_bucket, region, s3_folder, input_files, env_file, command):
+    """
+    Define bash command to execute for a job of the manifest.
+
+    :param args: input arguments
+    :param s3_bucket: S3 bucket
+    :param region: AWS region
+    :param s3_folder: S3 folder of the manifest submission
+    :param input_files: list of (S3 key, file name) tuples of the input files to download in the working directory
+    :param env_file: environment file, in the S3 folder of the manifest submission
+    :param command: the command line of the job
+    :return: composed bash command
+    """
+    bash_command = _compose_working_dir_commands(args)
+
+    # download the input files of the job, staged once for all the jobs of the manifest
+    bash_command.extend(
+        _compose_download_commands(
+            region, s3_bucket, input_files + ([(s3_folder + env_file, env_file)] if env_file else [])
+        )
+    )
+    if env_file:  # source the environment file
+        bash_command.append("source {ENV_FILE}".format(ENV_FILE=env_file))
+
+    bash_command.append(command)
+    return " && ".join(bash_command)
+
+
+def _compose_download_commands(region, s3_bucket, files):
+    """
+    Define the bash commands to download the given files in the current directory.
+
+    :param region: AWS region
+    :param s3_bucket: S3 bucket
+    :param files: list of (S3 key, file name) tuples
+    :return: list of bash commands
+    """
+    return [
+        "aws s3 --region {REGION} cp s3://{BUCKET}/{S3_KEY} {FILE} >/dev/null".format(
+            REGION=region, BUCKET=s3_bucket, S3_KEY=s3_key, FILE=pipes.quote(file_name)
+        )
+        for s3_key, file_name in files
+    ]
+
+
+def _compose_working_dir_commands(args):
+    """
+    Define the bash commands to prepare the environment and move to the job working directory.
+
+    :param args: input arguments
+    :return: list of bash commands
+    """
     # download awscli, if required.
     bash_command = []
     if args.awscli:
@@ -327,19 +446,7 @@ def _compose_bash_command(args, s3_bucket, region, job_s3_folder, job_script, en
 
         # create subfolder named job-<$AWS_BATCH_JOB_ID>
         bash_command.append("mkdir -p job-${AWS_BATCH_JOB_ID} && cd job-${AWS_BATCH_JOB_ID}")
-
-    # download all job files to the job folder
-    bash_command.append(
-        "aws s3 --region {REGION} sync s3://{BUCKET}/{S3_FOLDER} . >/dev/null".format(
-            REGION=region, BUCKET=s3_bucket, S3_FOLDER=job_s3_folder
-        )
-    )
-    if env_file:  # source the environment file
-        bash_command.append("source {ENV_FILE}".format(ENV_FILE=env_file))
-
-    # execute the job script + arguments
-    bash_command.append("chmod +x {SCRIPT} && ./{SCRIPT} {ARGS}".format(SCRIPT=job_script, ARGS=command_args))
-    return " && ".join(bash_command)
+    return bash_command
 
 
 def _get_env_key_value_list(env_vars, log, env_blacklist_vars=None):
@@ -420,6 +527,207 @@ def _get_depends_on(args):
     return depends_on
 
 
+class ManifestJob(object):
+    """Job of a manifest file."""
+
+    def __init__(self, name, command, input_files, depends_on, vcpus, memory, array_size, retry_attempts, timeout):
+        """Initialize the object."""
+        self.name = name
+        self.command = command
+        self.input_files = input_files
+        self.depends_on = depends_on
+        self.vcpus = vcpus
+        self.memory = memory
+        self.array_size = array_size
+        self.retry_attempts = retry_attempts
+        self.timeout = timeout
+        self.job_id = "-"
+
+
+def _split_manifest_list(value):
+    """
+    Split a semicolon separated list of a manifest cell.
+
+    :param value: the value of the cell
+    :return: list of not empty items
+    """
+    return [item.strip() for item in value.split(";") if item.strip()] if value else []
+
+
+def _read_manifest(manifest_file, args):
+    """
+    Read the jobs of the manifest file.
+
+    :param manifest_file: CSV file with a header row
+    :param args: input arguments, used for the values not specified in the manifest
+    :return: list of ManifestJob
+    """
+    jobs = []
+    try:
+        with open(manifest_file) as manifest:
+            for line, row in enumerate(csv.DictReader(manifest), start=2):
+                row = dict((key.strip(), (value or "").strip()) for key, value in row.items() if key)
+                error_prefix = "Error reading manifest (%s), line %d:" % (manifest_file, line)
+                if not row.get("name") or not row.get("command"):
+                    fail("%s name and command are required" % error_prefix)
+                if any(job.name == row["name"] for job in jobs):
+                    fail("%s job name (%s) is duplicated" % (error_prefix, row["name"]))
+
+                input_files = (args.input_file or []) + _split_manifest_list(row.get("input_files"))
+                for input_file in input_files:
+                    if not os.path.isfile(input_file):
+                        fail("%s input file (%s) must be an existing file" % (error_prefix, input_file))
+
+                integer_values = {}
+                for column in MANIFEST_INTEGER_COLUMNS:
+                    try:
+                        integer_values[column] = int(row[column]) if row.get(column) else getattr(args, column)
+                    except ValueError:
+                        fail("%s %s (%s) must be an integer" % (error_prefix, column, row[column]))
+
+                jobs.append(
+                    ManifestJob(
+                        name=row["name"],
+                        command=row["command"],
+                        input_files=input_files,
+                        depends_on=_split_manifest_list(row.get("depends_on")),
+                        **integer_values
+                    )
+                )
+    except (IOError, csv.Error) as e:
+        fail("Error reading manifest (%s). Failed with exception: %s" % (manifest_file, e))
+
+    if not jobs:
+        fail("Error: no jobs found in the manifest (%s)" % manifest_file)
+    return jobs
+
+
+def _get_submission_waves(jobs):
+    """
+    Group the jobs of the manifest so that every job depends only on jobs of the previous groups.
+
+    :param jobs: list of ManifestJob
+    :return: list of groups of ManifestJob
+    """
+    job_names = set(job.name for job in jobs)
+    waves = []
+    grouped_job_names = set()
+    remaining_jobs = jobs
+    while remaining_jobs:
+        wave = [
+            job
+            for job in remaining_jobs
+            if all(dependency in grouped_job_names or dependency not in job_names for dependency in job.depends_on)
+        ]
+        if not wave:
+            fail(
+                "Error: circular dependencies between the jobs (%s) of the manifest"
+                % ", ".join(job.name for job in remaining_jobs)
+            )
+        waves.append(wave)
+        grouped_job_names.update(job.name for job in wave)
+        remaining_jobs = [job for job in remaining_jobs if job.name not in grouped_job_names]
+    return waves
+
+
+def _get_cas_folder(config):
+    """
+    Get the S3 folder of the content-addressed storage, shared by all the submissions to the cluster.
+
+    :param config: config object
+    :return: the S3 folder
+    """
+    return "{prefix}/batch/cas/".format(prefix=config.artifact_directory)
+
+
+def _stage_input_files(s3_uploader, cas_folder, input_files, max_workers, log):
+    """
+    Upload every distinct content of the given files to the content-addressed storage, if not already there.
+
+    Files are stored by the SHA-256 digest of their content, which is cached locally by path, modification time and
+    size, so that unchanged files uploaded by previous submissions are neither read nor uploaded again.
+
+    :param s3_uploader: S3Uploader object
+    :param cas_folder: S3 folder of the content-addressed storage
+    :param input_files: list of files, possibly repeated
+    :param max_workers: maximum number of concurrent uploads
+    :param log: log
+    :return: a dict associating every file to the S3 key of its content
+    """
+    file_paths = list(collections.OrderedDict.fromkeys(input_files))
+    file_hashes = {}
+    try:
+        file_hash_cache = FileHashCache()
+        file_hashes = dict(zip(file_paths, ordered_concurrent_map(file_hash_cache.get_hash, file_paths, max_workers)))
+        file_hash_cache.save()
+        contents = collections.OrderedDict()
+        for file_path in file_paths:
+            contents.setdefault(file_hashes[file_path], file_path)
+
+        def _upload_if_missing(content):
+            file_hash, file_path = content
+            if s3_uploader.exists(file_hash, folder=cas_folder):
+                return False
+            # large files are uploaded in concurrent parts by the S3 transfer manager
+            s3_uploader.put_file(file_path, file_hash, folder=cas_folder)
+            return True
+
+        uploaded_files = sum(ordered_concurrent_map(_upload_if_missing, contents.items(), max_workers))
+        log.info("Uploaded %d input files, %d already staged" % (uploaded_files, len(contents) - uploaded_files))
+    except Exception as e:
+        fail("Error uploading input files. Failed with exception: %s" % e)
+
+    return dict((file_path, cas_folder + file_hash) for file_path, file_hash in file_hashes.items())
+
+
+def _submit_manifest(boto3_factory, args, config, log):
+    """
+    Stage the input files of the jobs of the manifest and submit them.
+
+    :param boto3_factory: initialized Boto3ClientFactory object
+    :param args: input arguments
+    :param config: config object
+    :param log: log
+    """
+    jobs = _read_manifest(args.manifest, args)
+    waves = _get_submission_waves(jobs)
+
+    s3_folder = "{prefix}/batch/{job_key}/".format(
+        prefix=config.artifact_directory, job_key=_generate_unique_job_key("manifest")
+    )
+    s3_uploader = S3Uploader(boto3_factory, config.s3_bucket, s3_folder)
+    staged_files = _stage_input_files(
+        s3_uploader,
+        _get_cas_folder(config),
+        [input_file for job in jobs for input_file in job.input_files],
+        args.max_workers,
+        log,
+    )
+    env_file = None
+    if args.env:
+        env_file = "manifest.env.sh"
+        env_blacklist = args.env_blacklist if args.env_blacklist else config.env_blacklist
+        _get_env_and_upload(s3_uploader, args.env, env_blacklist, env_file, log)
+
+    for job in jobs:
+        input_files = [(staged_files[input_file], os.path.basename(input_file)) for input_file in job.input_files]
+        bash_command = _compose_manifest_bash_command(
+            args, config.s3_bucket, config.region, s3_folder, input_files, env_file, job.command
+        )
+        job.command = ["/bin/bash", "-c", bash_command]
+
+    AWSBsubCommand(log, boto3_factory).run_manifest(
+        waves,
+        job_definition=config.job_definition,
+        job_queue=config.job_queue,
+        env=[
+            ("MASTER_IP", config.master_ip),
+            ("PCLUSTER_JOB_S3_URL", "s3://{0}/{1}".format(config.s3_bucket, s3_folder)),
+        ],
+        max_workers=args.max_workers,
+    )
+
+
 class AWSBsubCommand(object):
     """awsbsub command."""
 
@@ -433,7 +741,7 @@ class AWSBsubCommand(object):
         self.log = log
         self.batch_client = boto3_factory.get_client("batch")
 
-    def run(  # noqa: C901 FIXME
+    def run(
         self,
         job_definition,
         job_name,
@@ -450,126 +758,218 @@ class AWSBsubCommand(object):
     ):
         """Submit the job."""
         try:
-            # array properties
-            array_properties = {}
-            if array_size:
-                array_properties.update(size=array_size)
-
-            retry_strategy = {"attempts": retry_attempts}
-
-            depends_on = dependencies if dependencies else []
-
-            # populate container overrides
-            container_overrides = {"command": command}
-            if vcpus:
-                container_overrides.update(vcpus=vcpus)
-            if memory:
-                container_overrides.update(memory=memory)
-            # populate environment variables
-            environment = []
-            for env_var in env:
-                environment.append({"name": env_var[0], "value": env_var[1]})
-            container_overrides.update(environment=environment)
-
-            # common submission arguments
-            submission_args = {
-                "jobName": job_name,
-                "jobQueue": job_queue,
-                "dependsOn": depends_on,
-                "retryStrategy": retry_strategy,
-            }
-
-            if nodes:
-                submission_args.update({"jobDefinition": job_definition})
-
-                target_nodes = "0:"
-                # populate node overrides
-                node_overrides = {
-                    "numNodes": nodes,
-                    "nodePropertyOverrides": [{"targetNodes": target_nodes, "containerOverrides": container_overrides}],
-                }
-                submission_args.update({"nodeOverrides": node_overrides})
-                if timeout:
-                    submission_args.update({"timeout": {"attemptDurationSeconds": timeout}})
-            else:
-                # Standard submission
-                submission_args.update({"jobDefinition": job_definition})
-                submission_args.update({"containerOverrides": container_overrides})
-                submission_args.update({"arrayProperties": array_properties})
-                if timeout:
-                    submission_args.update({"timeout": {"attemptDurationSeconds": timeout}})
-
+            submission_args = self.__get_submission_args(
+                job_definition,
+                job_name,
+                job_queue,
+                command,
+                nodes,
+                vcpus,
+                memory,
+                array_size,
+                retry_attempts,
+                timeout,
+                dependencies,
+                env,
+            )
             self.log.debug("Job submission args: %s" % submission_args)
             response = self.batch_client.submit_job(**submission_args)
             print("Job %s (%s) has been submitted." % (response["jobId"], response["jobName"]))
         except Exception as e:
             fail("Error submitting job to AWS Batch. Failed with exception: %s" % e)
 
+    def run_manifest(self, waves, job_definition, job_queue, env, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Submit the jobs of a manifest, a group after the other, and print their job IDs.
 
-def main():
+        :param waves: groups of ManifestJob, every job depends only on jobs of the previous groups
+        :param max_workers: maximum number of concurrent submissions
+        """
+        # job IDs of the jobs of the manifest, None when the job has not been submitted
+        job_ids = {}
+
+        def _submit_job(job):
+            dependencies = []
+            for dependency in job.depends_on:
+                if dependency in job_ids and not job_ids[dependency]:
+                    return None, "Job (%s) not submitted since job (%s) has not been submitted." % (
+                        job.name,
+                        dependency,
+                    )
+                dependencies.append({"jobId": job_ids.get(dependency, dependency)})
+            try:
+                submission_args = self.__get_submission_args(
+                    job_definition,
+                    job.name,
+                    job_queue,
+                    job.command,
+                    vcpus=job.vcpus,
+                    memory=job.memory,
+                    array_size=job.array_size,
+                    retry_attempts=job.retry_attempts,
+                    timeout=job.timeout,
+                    dependencies=dependencies,
+                    env=env,
+                )
+                self.log.debug("Job submission args: %s" % submission_args)
+                return retry_on_throttling(self.batch_client.submit_job, **submission_args)["jobId"], None
+            except Exception as e:
+                return None, "Error submitting job (%s) to AWS Batch. Failed with exception: %s" % (job.name, e)
+
+        failed_jobs = 0
+        for wave in waves:
+            for job, (job_id, error) in zip(wave, ordered_concurrent_map(_submit_job, wave, max_workers)):
+                job_ids[job.name] = job_id
+                if job_id:
+                    job.job_id = job_id
+                else:
+                    failed_jobs += 1
+                    print(error, file=sys.stderr)
+
+        jobs = [job for wave in waves for job in wave]
+        Output(mapping=collections.OrderedDict([("jobName", "name"), ("jobId", "job_id")]), items=jobs).show_table()
+        if failed_jobs:
+            fail("Error: %d of %d jobs have not been submitted." % (failed_jobs, len(jobs)))
+
+    @staticmethod
+    def __get_submission_args(  # noqa: C901 FIXME
+        job_definition,
+        job_name,
+        job_queue,
+        command,
+        nodes=None,
+        vcpus=None,
+        memory=None,
+        array_size=None,
+        retry_attempts=1,
+        timeout=None,
+        dependencies=None,
+        env=None,
+    ):
+        """Get the arguments of the submit_job function."""
+        # array properties
+        array_properties = {}
+        if array_size:
+            array_properties.update(size=array_size)
+
+        retry_strategy = {"attempts": retry_attempts}
+
+        depends_on = dependencies if dependencies else []
+
+        # populate container overrides
+        container_overrides = {"command": command}
+        if vcpus:
+            container_overrides.update(vcpus=vcpus)
+        if memory:
+            container_overrides.update(memory=memory)
+        # populate environment variables
+        environment = []
+        for env_var in env:
+            environment.append({"name": env_var[0], "value": env_var[1]})
+        container_overrides.update(environment=environment)
+
+        # common submission arguments
+        submission_args = {
+            "jobName": job_name,
+            "jobQueue": job_queue,
+            "dependsOn": depends_on,
+            "retryStrategy": retry_strategy,
+        }
+
+        if nodes:
+            submission_args.update({"jobDefinition": job_definition})
+
+            target_nodes = "0:"
+            # populate node overrides
+            node_overrides = {
+                "numNodes": nodes,
+                "nodePropertyOverrides": [{"targetNodes": target_nodes, "containerOverrides": container_overrides}],
+            }
+            submission_args.update({"nodeOverrides": node_overrides})
+            if timeout:
+                submission_args.update({"timeout": {"attemptDurationSeconds": timeout}})
+        else:
+            # Standard submission
+            submission_args.update({"jobDefinition": job_definition})
+            submission_args.update({"containerOverrides": container_overrides})
+            submission_args.update({"arrayProperties": array_properties})
+            if timeout:
+                submission_args.update({"timeout": {"attemptDurationSeconds": timeout}})
+        return submission_args
+
+
+def main(argv=None):
     """Command entrypoint."""
     try:
         # parse input parameters and config file
-        args = _get_parser().parse_args()
+        args = _get_parser().parse_args(argv)
         _validate_parameters(args)
         log = config_logger(args.log_level)
         log.info("Input parameters: %s" % args)
         config = AWSBatchCliConfig(log=log, cluster=args.cluster)
-        boto3_factory = Boto3ClientFactory(
-            region=config.region,
-            proxy=config.proxy,
-            aws_access_key_id=config.aws_access_key_id,
-            aws_secret_access_key=config.aws_secret_access_key,
-        )
 
-        # define job name
-        if args.job_name:
-            job_name = args.job_name
-        else:
-            # set a default job name if not specified
-            if not sys.stdin.isatty():
-                # stdin
-                job_name = "STDIN"
+        def _run(config):
+            boto3_factory = Boto3ClientFactory(
+                region=config.region,
+                proxy=config.proxy,
+                aws_access_key_id=config.aws_access_key_id,
+                aws_secret_access_key=config.aws_secret_access_key,
+            )
+
+            if args.manifest:
+                _submit_manifest(boto3_factory, args, config, log)
+                return
+
+            # define job name
+            if args.job_name:
+                job_name = args.job_name
             else:
-                # normalize name
-                job_name = re.sub(r"\W+", "_", os.path.basename(args.command))
-            log.info("Job name not specified, setting it to (%s)" % job_name)
-
-        # generate an internal unique job-id
-        job_key = _generate_unique_job_key(job_name)
-        job_s3_folder = "{prefix}/batch/{job_key}/".format(prefix=config.artifact_directory, job_key=job_key)
-        # upload script, if needed, and get related command
-        command = _upload_and_get_command(boto3_factory, args, job_s3_folder, job_name, config, log)
-        # parse and validate depends_on parameter
-        depends_on = _get_depends_on(args)
-
-        # select submission (standard vs MNP)
-        if args.nodes and args.nodes > 1:
-            if not hasattr(config, "job_definition_mnp"):
-                fail("Current cluster does not support MNP jobs submission")
-            job_definition = config.job_definition_mnp
-            nodes = args.nodes
-        else:
-            job_definition = config.job_definition
-            nodes = None
-
-        AWSBsubCommand(log, boto3_factory).run(
-            job_definition=job_definition,
-            job_name=job_name,
-            job_queue=config.job_queue,
-            command=command,
-            nodes=nodes,
-            vcpus=args.vcpus,
-            memory=args.memory,
-            array_size=args.array_size,
-            dependencies=depends_on,
-            retry_attempts=args.retry_attempts,
-            timeout=args.timeout,
-            env=[
-                ("MASTER_IP", config.master_ip),  # TODO remove
-                ("PCLUSTER_JOB_S3_URL", "s3://{0}/{1}".format(config.s3_bucket, job_s3_folder)),
-            ],
-        )
+                # set a default job name if not specified
+                if not sys.stdin.isatty():
+                    # stdin
+                    job_name = "STDIN"
+                else:
+                    # normalize name
+                    job_name = re.sub(r"\W+", "_", os.path.basename(args.command))
+                log.info("Job name not specified, setting it to (%s)" % job_name)
+
+            # generate an internal unique job-id
+            job_key = _generate_unique_job_key(job_name)
+            job_s3_folder = "{prefix}/batch/{job_key}/".format(prefix=config.artifact_directory, job_key=job_key)
+            # upload script, if needed, and get related command
+            command = _upload_and_get_command(boto3_factory, args, job_s3_folder, job_name, config, log)
+            # parse and validate depends_on parameter
+            depends_on = _get_depends_on(args)
+
+            # select submission (standard vs MNP)
+            if args.nodes and args.nodes > 1:
+                if not hasattr(config, "job_definition_mnp"):
+                    fail("Current cluster does not support MNP jobs submission")
+                job_definition = config.job_definition_mnp
+                nodes = args.nodes
+            else:
+                job_definition = config.job_definition
+                nodes = None
+
+            AWSBsubCommand(log, boto3_factory).run(
+                job_definition=job_definition,
+                job_name=job_name,
+                job_queue=config.job_queue,
+                command=command,
+                nodes=nodes,
+                vcpus=args.vcpus,
+                memory=args.memory,
+                array_size=args.array_size,
+                dependencies=depends_on,
+                retry_attempts=args.retry_attempts,
+                timeout=args.timeout,
+                env=[
+                    ("MASTER_IP", config.master_ip),  # TODO remove
+                    ("PCLUSTER_JOB_S3_URL", "s3://{0}/{1}".format(config.s3_bucket, job_s3_folder)),
+                ],
+            )
+
+        run_with_cluster_config(log, config, _run, retry=False)
     except KeyboardInterrupt:
         print("Exiting...")
         sys.exit(0)
@@ -13,9 +13,17 @@
 # See the License for the specific language governing permissions and limitations under the License.
 from __future__ import print_function
 
+import csv
 import errno
+import heapq
+import json
 import logging
 import os
+import pickle
+import sys
+import tempfile
+import time
+from collections import OrderedDict
 from logging.handlers import RotatingFileHandler
 
 import boto3
@@ -24,9 +32,26 @@ from botocore.exceptions import ClientError, ParamValidationError
 from configparser import ConfigParser, NoOptionError, NoSectionError
 from tabulate import tabulate
 
-from awsbatch.utils import fail, get_region_by_stack_id, hide_keys
+from awsbatch.utils import fail, get_region_by_stack_id, hide_keys, read_json_file, write_json_file
 from pcluster.config.pcluster_config import default_config_file_path
 
+CLUSTER_CONFIG_CACHE_FILE = os.path.expanduser(os.path.join("~", ".parallelcluster", "awsbatch-cli-clusters.json"))
+# Time to live of the cached cluster information, in seconds
+CLUSTER_CONFIG_CACHE_TTL = 10 * 60
+# AWSBatchCliConfig attributes retrieved from the CloudFormation stack
+CLUSTER_CONFIG_STACK_ATTRIBUTES = [
+    "stack_name",
+    "region",
+    "proxy",
+    "s3_bucket",
+    "artifact_directory",
+    "compute_environment",
+    "job_queue",
+    "job_definition",
+    "job_definition_mnp",
+    "master_ip",
+]
+
 PCLUSTER_STACK_PREFIX = "parallelcluster-"
 
 
@@ -34,6 +59,11 @@ def _get_stack_name(cluster_name):
     return PCLUSTER_STACK_PREFIX + cluster_name
 
 
+def _get_stack_version(stack):
+    """Return the ID and the last update time of the given stack, which change when it is recreated or updated."""
+    return stack.get("StackId"), str(stack.get("LastUpdatedTime", stack.get("CreationTime")))
+
+
 class Output(object):
     """Generic Output object."""
 
@@ -61,6 +91,15 @@ class Output(object):
         """
         Print the items table.
 
+        :param keys: show a specific list of keys (optional)
+        :param sort_keys_function: function to sort table rows (optional)
+        """
+        print(self.format_table(keys, sort_keys_function))
+
+    def format_table(self, keys=None, sort_keys_function=None):
+        """
+        Return the items table.
+
         :param keys: show a specific list of keys (optional)
         :param sort_keys_function: function to sort table rows (optional)
         """
@@ -72,22 +111,32 @@ class Output(object):
             for output_key in output_keys:
                 row.append(getattr(item, self.mapping[output_key]))
             rows.append(row)
-        print(tabulate(rows, output_keys))
+        return tabulate(rows, output_keys)
 
     def show(self, keys=None, sort_keys_function=None):
         """
         Print the items in a key value format.
 
+        :param keys: show a specific list of keys (optional)
+        """
+        print(self.format(keys, sort_keys_function))
+
+    def format(self, keys=None, sort_keys_function=None):
+        """
+        Return the items in a key value format.
+
         :param keys: show a specific list of keys (optional)
         """
         output_keys = keys or self.keys
         if not self.items:
-            print("No items to show")
-        else:
-            for item in self.__get_items(sort_keys_function):
-                for output_key in output_keys:
-                    print("{0:25}: {1!s}".format(output_key, getattr(item, self.mapping[output_key])))
-                print("-" * 25)
+            return "No items to show"
+
+        lines = []
+        for item in self.__get_items(sort_keys_function):
+            for output_key in output_keys:
+                lines.append("{0:25}: {1!s}".format(output_key, getattr(item, self.mapping[output_key])))
+            lines.append("-" * 25)
+        return "\n".join(lines)
 
     def length(self):
         """Return number of items in Output."""
@@ -100,6 +149,150 @@ class Output(object):
         return self.items
 
 
+class StreamingOutput(object):
+    """
+    Output object writing items in a machine-readable format as soon as they are added.
+
+    When a sort function is given the items are sorted with an external merge sort: sorted runs of
+    SORT_BUFFER_SIZE items are spilled to temporary files and merged when the output is closed,
+    so that memory usage does not depend on the number of items.
+    """
+
+    FORMATS = ["ndjson", "csv"]
+    SORT_BUFFER_SIZE = 10000
+
+    def __init__(self, mapping, output_format, keys=None, sort_keys_function=None):
+        """
+        Create a streaming output.
+
+        :param mapping: association between keys and item attributes
+        :param output_format: one of FORMATS
+        :param keys: write a specific list of keys (optional)
+        :param sort_keys_function: function to sort the items (optional)
+        """
+        self.mapping = mapping
+        self.keys = keys or list(mapping.keys())
+        self.output_format = output_format
+        self.sort_keys_function = sort_keys_function
+        self.__count = 0
+        self.__sort_buffer = []
+        self.__sorted_runs = []
+        self.__csv_writer = None
+
+    def add(self, items):
+        """Write items to the output, or hold them for sorting if a sort function is defined."""
+        if type(items) != list:
+            items = [items]
+        for item in items:
+            row = [getattr(item, self.mapping[key]) for key in self.keys]
+            if self.sort_keys_function:
+                # the counter keeps the sort stable and avoids comparing rows of items with the same key
+                self.__sort_buffer.append((self.sort_keys_function(item), self.__count, row))
+                if len(self.__sort_buffer) >= self.SORT_BUFFER_SIZE:
+                    self.__spill_sort_buffer()
+            else:
+                self.__write(row)
+            self.__count += 1
+
+    def close(self):
+        """Write the items held for sorting and release the temporary files."""
+        try:
+            self.__sort_buffer.sort()
+            runs = [self.__read_sorted_run(run) for run in self.__sorted_runs] + [iter(self.__sort_buffer)]
+            for _, _, row in heapq.merge(*runs):
+                self.__write(row)
+            if self.output_format == "csv" and not self.__csv_writer:
+                # always write the header, even if there are no items
+                self.__get_csv_writer()
+        finally:
+            for run in self.__sorted_runs:
+                run.close()
+            self.__sorted_runs = []
+            self.__sort_buffer = []
+
+    def length(self):
+        """Return number of items added to the output."""
+        return self.__count
+
+    def __write(self, row):
+        if self.output_format == "csv":
+            self.__get_csv_writer().writerow(row)
+        else:
+            print(json.dumps(OrderedDict(zip(self.keys, row))))
+
+    def __get_csv_writer(self):
+        if not self.__csv_writer:
+            self.__csv_writer = csv.writer(sys.stdout, lineterminator="\n")
+            self.__csv_writer.writerow(self.keys)
+        return self.__csv_writer
+
+    def __spill_sort_buffer(self):
+        """Sort the buffered items and move them to a temporary file."""
+        self.__sort_buffer.sort()
+        run = tempfile.TemporaryFile()
+        for record in self.__sort_buffer:
+            pickle.dump(record, run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        self.__sorted_runs.append(run)
+        self.__sort_buffer = []
+
+    @staticmethod
+    def __read_sorted_run(run):
+        while True:
+            try:
+                yield pickle.load(run)
+            except EOFError:
+                return
+
+
+class LiveDisplay(object):
+    """
+    Terminal display showing a text that is updated periodically.
+
+    On a terminal only the lines changed since the previous update are redrawn, and lines exceeding the
+    terminal size are truncated, otherwise the whole text is printed at every update.
+    """
+
+    def __init__(self):
+        """Initialize the object."""
+        self.__lines = None
+
+    def update(self, text):
+        """
+        Show the given text in place of the previous one.
+
+        :param text: the text to show
+        """
+        if not sys.stdout.isatty():
+            print(text)
+            print()
+            return
+
+        columns, rows = self.__get_terminal_size()
+        lines = [line[:columns] for line in text.split("\n")][: rows - 1]
+        if self.__lines is None:
+            # clear the screen on the first update
+            sys.stdout.write("\x1b[H\x1b[2J")
+            self.__lines = []
+        for index, line in enumerate(lines):
+            if index >= len(self.__lines) or self.__lines[index] != line:
+                # move the cursor to the line, write it and clear the rest of the old one
+                sys.stdout.write("\x1b[{0};1H{1}\x1b[K".format(index + 1, line))
+        # clear the lines left from the previous update and leave the cursor below the text
+        sys.stdout.write("\x1b[{0};1H\x1b[J".format(len(lines) + 1))
+        sys.stdout.flush()
+        self.__lines = lines
+
+    @staticmethod
+    def __get_terminal_size():
+        try:
+            size = os.get_terminal_size(sys.stdout.fileno())
+            return size.columns, size.lines
+        except (AttributeError, ValueError, OSError):
+            # python 2 or stdout without file descriptor
+            return 1000, 1000
+
+
 class Boto3ClientFactory(object):
     """Boto3 configuration object."""
 
@@ -131,6 +324,86 @@ class Boto3ClientFactory(object):
             fail("AWS %s service failed with exception: %s" % (service, e))
 
 
+class ClusterConfigCache(object):
+    """
+    Persistent cache of the cluster information retrieved from the CloudFormation stacks.
+
+    Entries are stored by region, cluster name and credentials, together with the ID and the last update time of the
+    stack they have been retrieved from, and expire after ttl seconds. Knowing whether the stack has been updated or
+    recreated requires describing it, which is done when a command using cached information fails, see
+    run_with_cluster_config.
+    """
+
+    def __init__(self, log, cache_file=None, ttl=CLUSTER_CONFIG_CACHE_TTL):
+        """
+        Initialize the object.
+
+        :param log: log
+        :param cache_file: JSON file storing the entries, defaults to CLUSTER_CONFIG_CACHE_FILE
+        :param ttl: time to live of the entries in seconds, 0 disables the cache
+        """
+        self.log = log
+        self.cache_file = cache_file or CLUSTER_CONFIG_CACHE_FILE
+        self.ttl = ttl
+
+    def get(self, key):
+        """
+        Return the entry stored for the given key, or None if missing or expired.
+
+        :param key: the key of the entry
+        :return: a dict with the attributes, the stack_id and the last_updated_time of the stack
+        """
+        if self.ttl <= 0:
+            return None
+        entry = read_json_file(self.cache_file).get(key)
+        now = time.time()
+        if entry and entry.get("stored_at", 0) <= now < entry.get("stored_at", 0) + self.ttl:
+            return entry
+        return None
+
+    def remove(self, key):
+        """
+        Remove the entry stored for the given key, if any.
+
+        :param key: the key of the entry
+        """
+        entries = read_json_file(self.cache_file)
+        if entries.pop(key, None) is None:
+            return
+        try:
+            write_json_file(self.cache_file, entries)
+        except (IOError, OSError) as e:
+            self.log.info("Unable to write cluster information cache file (%s): %s" % (self.cache_file, e))
+
+    def put(self, key, stack, attributes):
+        """
+        Store the attributes retrieved from the given stack, removing the expired entries.
+
+        :param key: the key of the entry
+        :param stack: the stack returned by the describe_stacks function
+        :param attributes: a dict of JSON serializable attributes
+        """
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        entries = dict(
+            (entry_key, entry)
+            for entry_key, entry in read_json_file(self.cache_file).items()
+            if entry.get("stored_at", 0) + self.ttl > now
+        )
+        stack_id, last_updated_time = _get_stack_version(stack)
+        entries[key] = {
+            "stack_id": stack_id,
+            "last_updated_time": last_updated_time,
+            "stored_at": now,
+            "attributes": attributes,
+        }
+        try:
+            write_json_file(self.cache_file, entries)
+        except (IOError, OSError) as e:
+            self.log.info("Unable to write cluster information cache file (%s): %s" % (self.cache_file, e))
+
+
 class AWSBatchCliConfig(object):
     """AWS ParallelCluster AWS Batch CLI configuration object."""
 
@@ -149,6 +422,9 @@ class AWSBatchCliConfig(object):
         self.aws_secret_access_key = None
         self.region = None
         self.env_blacklist = None
+        self.cache_ttl = CLUSTER_CONFIG_CACHE_TTL
+        # ID and last update time of the stack the cached cluster information has been retrieved from, if any
+        self.cached_stack_version = None
         parallelcluster_config_file = default_config_file_path()
         if os.path.isfile(parallelcluster_config_file):
             self.__init_from_parallelcluster_config(parallelcluster_config_file, log)
@@ -245,6 +521,14 @@ class AWSBatchCliConfig(object):
                 self.env_blacklist = config.get("main", "env_blacklist")
             except NoOptionError:
                 pass
+            try:
+                self.cache_ttl = config.getint("main", "cache_ttl")
+            except NoOptionError:
+                pass
+            except ValueError:
+                fail(
+                    "Error: the option (cache_ttl) of the configuration file (%s) must be an integer" % cli_config_file
+                )
 
             try:
                 self.stack_name = _get_stack_name(cluster_name)
@@ -276,13 +560,55 @@ class AWSBatchCliConfig(object):
                     % (e.option, e.section, cli_config_file)
                 )
 
-    def __init_from_stack(self, cluster, log):  # noqa: C901 FIXME
+    def __init_from_stack(self, cluster, log):
         """
-        Init object attributes by asking to the stack.
+        Init object attributes from the cache, or by asking to the stack.
 
         :param cluster: cluster name
         :param log: log
         """
+        cache = ClusterConfigCache(log, ttl=self.cache_ttl)
+        cache_key = self.__get_cache_key(cluster)
+        entry = cache.get(cache_key)
+        if entry:
+            log.info("Using cached information of cluster (%s)" % cluster)
+            for attribute, value in entry.get("attributes", {}).items():
+                setattr(self, attribute, value)
+            self.cached_stack_version = (entry.get("stack_id"), entry.get("last_updated_time"))
+            self.__cached_cluster = (cluster, cache_key)
+            return
+
+        self.__describe_stack(cluster, log, cache, cache_key)
+
+    def refresh(self, log):
+        """
+        Describe the cluster stack again, if the cluster information has been read from the cache.
+
+        The cache entry is removed first, and replaced with the information retrieved from the stack.
+
+        :param log: log
+        :return: True if the stack has been recreated or updated since the information was cached
+        """
+        if not self.cached_stack_version:
+            return False
+        cached_stack_version = self.cached_stack_version
+        cluster, cache_key = self.__cached_cluster
+        self.cached_stack_version = None
+        cache = ClusterConfigCache(log, ttl=self.cache_ttl)
+        cache.remove(cache_key)
+        stack = self.__describe_stack(cluster, log, cache, cache_key)
+        return _get_stack_version(stack) != tuple(cached_stack_version)
+
+    def __describe_stack(self, cluster, log, cache, cache_key):  # noqa: C901 FIXME
+        """
+        Init object attributes by asking to the stack, and store them in the cache.
+
+        :param cluster: cluster name
+        :param log: log
+        :param cache: ClusterConfigCache to store the attributes in
+        :param cache_key: key of the cache entry
+        :return: the stack returned by the describe_stacks function
+        """
         try:
             self.stack_name = _get_stack_name(cluster)
             log.info("Describing stack (%s)" % self.stack_name)
@@ -326,12 +652,66 @@ class AWSBatchCliConfig(object):
                         if not self.proxy == "NONE":
                             log.info("Configured proxy is: %s" % self.proxy)
                         break
+                cache.put(
+                    cache_key,
+                    stack,
+                    dict(
+                        (attribute, getattr(self, attribute))
+                        for attribute in CLUSTER_CONFIG_STACK_ATTRIBUTES
+                        if hasattr(self, attribute)
+                    ),
+                )
+                return stack
             else:
                 fail("The cluster is in the (%s) status." % stack_status)
 
         except (ClientError, ParamValidationError) as e:
             fail("Error getting cluster information from AWS CloudFormation. Failed with exception: %s" % e)
 
+    def __get_cache_key(self, cluster):
+        """
+        Get the key of the cluster information in the cache, unique for region, cluster name and credentials.
+
+        :param cluster: cluster name
+        :return: the key
+        """
+        region = self.region or boto3.session.Session().region_name
+        credentials = self.aws_access_key_id or os.environ.get("AWS_ACCESS_KEY_ID") or os.environ.get("AWS_PROFILE")
+        return ":".join([str(region), cluster, str(credentials)])
+
+
+def run_with_cluster_config(log, config, run, retry=True):
+    """
+    Run a command with the given cluster configuration, describing the cluster stack again if the command fails.
+
+    Cluster information read from the cache is outdated when the cluster has been updated or recreated after it was
+    cached. When the command fails, the cache entry is replaced with the information of the current stack and, if
+    the stack has changed, the command is run once more with it.
+
+    :param log: log
+    :param config: AWSBatchCliConfig object
+    :param run: function taking the configuration and running the command
+    :param retry: False to not run again commands that are not safe to repeat or that print their output while
+        running, asking the user to do it
+    """
+    try:
+        run(config)
+        return
+    except SystemExit as e:
+        if not e.code:
+            raise
+        error = e
+    except Exception as e:
+        error = e
+
+    if not config.refresh(log):
+        raise error
+    if not retry:
+        fail("The cluster has been updated after its information was cached, please run the command again.")
+    log.info("Running the command again with the updated cluster information")
+    print("The cluster has been updated after its information was cached, running the command again.", file=sys.stderr)
+    run(config)
+
 
 def config_logger(log_level):
     """
@@ -352,11 +732,12 @@ def config_logger(log_level):
 
     formatter = logging.Formatter("%(asctime)s %(levelname)s [%(module)s:%(funcName)s] %(message)s")
 
-    logfile_handler = RotatingFileHandler(logfile, maxBytes=5 * 1024 * 1024, backupCount=1)
-    logfile_handler.setFormatter(formatter)
-
     logger = logging.getLogger("awsbatch-cli")
-    logger.addHandler(logfile_handler)
+    # the logger is configured again by every command run by the same process, e.g. by awsbatchd
+    if not any(getattr(handler, "baseFilename", None) == logfile for handler in logger.handlers):
+        logfile_handler = RotatingFileHandler(logfile, maxBytes=5 * 1024 * 1024, backupCount=1)
+        logfile_handler.setFormatter(formatter)
+        logger.addHandler(logfile_handler)
     try:
         logger.setLevel(log_level.upper())
     except (TypeError, ValueError) as e:
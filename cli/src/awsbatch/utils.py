@@ -13,13 +13,29 @@
 # See the License for the specific language governing permissions and limitations under the License.
 from __future__ import print_function
 
+import collections
+import errno
+import hashlib
+import json
+import os
 import pipes
+import random
 import re
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from queue import Full, Queue
 
+from botocore.exceptions import ClientError
 from dateutil import tz
 
+DEFAULT_MAX_WORKERS = 8
+THROTTLING_ERROR_CODES = ["Throttling", "ThrottlingException", "TooManyRequestsException", "RequestLimitExceeded"]
+FILE_HASH_CACHE_FILE = os.path.expanduser(os.path.join("~", ".parallelcluster", "awsbatch-cli-hashes.json"))
+
 
 def fail(error_message):
     """
@@ -129,6 +145,280 @@ def get_job_type(job):
     return "SIMPLE"
 
 
+def retry_on_throttling(func, max_attempts=8, base_delay=0.5, max_delay=20, **kwargs):
+    """
+    Call a boto3 client method, retrying with exponential backoff when the request is throttled.
+
+    :param func: the boto3 client method to call
+    :param max_attempts: maximum number of attempts before raising the throttling error
+    :param base_delay: maximum delay in seconds before the first retry, doubled at every attempt
+    :param max_delay: upper bound for the delay in seconds
+    :param kwargs: arguments of the method
+    :return: the response of the method
+    """
+    attempt = 1
+    while True:
+        try:
+            return func(**kwargs)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in THROTTLING_ERROR_CODES or attempt >= max_attempts:
+                raise
+            # random delay (full jitter), to avoid concurrent workers retrying all at the same time
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1))))
+            attempt += 1
+
+
+def bind_output_streams(func):
+    """
+    Return a function calling func with the output streams of the calling thread, to be run by worker threads.
+
+    awsbatchd redirects the output of every command to buffers local to the thread running it, the messages printed
+    by the worker threads started by the command, e.g. by fail(), must go to the same buffers.
+
+    :param func: function to call in a worker thread
+    :return: the wrapped function, or func when the output is not redirected
+    """
+    streams = [stream for stream in (sys.stdout, sys.stderr) if hasattr(stream, "set_buffer")]
+    buffers = [stream.get_buffer() for stream in streams]
+    if all(buffer is None for buffer in buffers):
+        return func
+
+    def _func(*args, **kwargs):
+        for stream, buffer in zip(streams, buffers):
+            stream.set_buffer(buffer)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            for stream in streams:
+                stream.set_buffer(None)
+
+    return _func
+
+
+def ordered_concurrent_map(func, items, max_workers):
+    """
+    Call func on every item with a pool of threads, yielding the results in the order of the items.
+
+    At most 2 * max_workers items are submitted ahead of the result being yielded, so that items and results
+    don't need to be held in memory all together.
+
+    :param func: function to call with a single item
+    :param items: iterable of items
+    :param max_workers: maximum number of concurrent calls, with 1 func is called in the calling thread
+    :return: a generator of the results
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    func = bind_output_streams(func)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = collections.deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def concurrent_chain(func, items, max_workers):
+    """
+    Consume the iterables returned by func for every item in a pool of threads, yielding elements as they arrive.
+
+    Elements of the same iterable are yielded in order, while elements of different iterables are interleaved.
+    At most 2 * max_workers elements are held waiting for the caller to consume them.
+
+    :param func: function returning an iterable for a single item
+    :param items: iterable of items
+    :param max_workers: maximum number of concurrent iterables, with 1 the iterables are consumed one after the other
+    :return: a generator of the elements
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        for item in items:
+            for element in func(item):
+                yield element
+        return
+
+    elements = Queue(maxsize=2 * max_workers)
+    stopped = threading.Event()
+    iterable_done = object()
+
+    def _put(entry):
+        while not stopped.is_set():
+            try:
+                elements.put(entry, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _consume(item):
+        try:
+            for element in func(item):
+                if not _put((element, None)):
+                    return
+        except (Exception, SystemExit) as e:
+            # errors, including the exit of fail(), are raised by the calling thread
+            _put((None, e))
+        finally:
+            _put(iterable_done)
+
+    consume = bind_output_streams(_consume)
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+    try:
+        for item in items:
+            executor.submit(consume, item)
+        remaining = len(items)
+        while remaining:
+            entry = elements.get()
+            if entry is iterable_done:
+                remaining -= 1
+                continue
+            element, error = entry
+            if error:
+                raise error
+            yield element
+    finally:
+        # let the workers still running exit without waiting for the caller
+        stopped.set()
+        executor.shutdown(wait=True)
+
+
+def read_json_file(file_path):
+    """
+    Read a JSON object from a file.
+
+    :param file_path: file to read
+    :return: the object, an empty dict if the file is missing or corrupted
+    """
+    try:
+        with open(file_path) as f:
+            content = json.load(f)
+        if isinstance(content, dict):
+            return content
+    except (IOError, OSError, ValueError):
+        pass
+    return {}
+
+
+def write_json_file(file_path, content):
+    """
+    Atomically write a JSON object to a file, creating its folder if needed.
+
+    The object is written to a temporary file which is then renamed, to never leave a partially written file
+    to other commands reading it concurrently.
+
+    :param file_path: file to write
+    :param content: JSON serializable object
+    """
+    file_dir = os.path.dirname(file_path)
+    try:
+        os.makedirs(file_dir)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    file_descriptor, tmp_file = tempfile.mkstemp(dir=file_dir, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as f:
+            json.dump(content, f)
+        getattr(os, "replace", os.rename)(tmp_file, file_path)
+    except Exception:
+        os.remove(tmp_file)
+        raise
+
+
+def compute_file_hash(file_path):
+    """
+    Compute the SHA-256 digest of the file content.
+
+    :param file_path: file to read
+    :return: the hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as input_file:
+        for chunk in iter(lambda: input_file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileHashCache(object):
+    """
+    Persistent cache of the SHA-256 digests of local files.
+
+    Digests are stored by absolute path and are computed again when the modification time or the size of the file
+    change. When the number of entries grows over max_entries, the least recently used ones are evicted.
+    """
+
+    MAX_ENTRIES = 10000
+
+    def __init__(self, cache_file=None, max_entries=MAX_ENTRIES):
+        """
+        Initialize the object.
+
+        :param cache_file: JSON file storing the digests, defaults to FILE_HASH_CACHE_FILE
+        :param max_entries: maximum number of stored digests
+        """
+        self.cache_file = cache_file or FILE_HASH_CACHE_FILE
+        self.max_entries = max_entries
+        self.__entries = None
+        self.__updated = False
+        self.__lock = threading.Lock()
+
+    def get_hash(self, file_path):
+        """
+        Return the digest of the given file, computing it only if the file changed since it was stored.
+
+        :param file_path: file to hash
+        :return: the hexadecimal SHA-256 digest
+        """
+        file_path = os.path.abspath(file_path)
+        file_stat = os.stat(file_path)
+        with self.__lock:
+            entry = self.__get_entries().get(file_path)
+        if entry and entry.get("mtime") == file_stat.st_mtime and entry.get("size") == file_stat.st_size:
+            digest = entry["sha256"]
+        else:
+            digest = compute_file_hash(file_path)
+        with self.__lock:
+            self.__entries[file_path] = {
+                "mtime": file_stat.st_mtime,
+                "size": file_stat.st_size,
+                "sha256": digest,
+                "used_at": time.time(),
+            }
+            self.__updated = True
+        return digest
+
+    def save(self):
+        """Atomically write the digests to the cache file, ignoring write errors."""
+        with self.__lock:
+            if not self.__updated:
+                return
+            entries = self.__entries
+            if len(entries) > self.max_entries:
+                kept_paths = sorted(entries, key=lambda path: entries[path]["used_at"])[-self.max_entries :]
+                entries = dict((path, entries[path]) for path in kept_paths)
+            try:
+                write_json_file(self.cache_file, entries)
+                self.__updated = False
+            except (IOError, OSError):
+                pass
+
+    def __get_entries(self):
+        """Load the digests from the cache file, ignoring missing or corrupted files."""
+        if self.__entries is None:
+            self.__entries = read_json_file(self.cache_file)
+        return self.__entries
+
+
 class S3Uploader(object):
     """S3 uploader."""
 
@@ -166,3 +456,20 @@ class S3Uploader(object):
         """
         s3_folder = folder if folder else self.default_folder
         self.s3_client.upload_file(file_path, self.s3_bucket, s3_folder + key_name)
+
+    def exists(self, key_name, folder=None):
+        """
+        Check if an object exists in the s3 bucket.
+
+        :param key_name: S3 key to check
+        :param folder: S3 folder of the key (optional)
+        :return: True if the object exists
+        """
+        s3_folder = folder if folder else self.default_folder
+        try:
+            self.s3_client.head_object(Bucket=self.s3_bucket, Key=s3_folder + key_name)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ["404", "NoSuchKey", "NotFound"]:
+                return False
+            raise
@@ -0,0 +1,255 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import errno
+import hashlib
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from pcluster.client_pool import install_client_pool
+from pcluster.metadata_cache import get_default_cache_dir
+from pcluster.utils import get_installed_version, zip_dir
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+# Objects of at least MULTIPART_THRESHOLD bytes are uploaded in parts of MULTIPART_CHUNKSIZE bytes
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+
+
+def get_artifacts_cache_dir():
+    return os.path.join(get_default_cache_dir(), "artifacts", get_installed_version())
+
+
+def compute_etag(body):
+    """
+    Return the ETag S3 assigns to the given content, when uploaded by ArtifactUploader.
+
+    The ETag is the MD5 digest of the content for single part uploads, and the MD5 digest of the digests of the parts
+    followed by the number of parts for multipart uploads. Objects encrypted with KMS keys have different ETags, so
+    they are always uploaded again.
+
+    :param body: bytes, or binary file object read from its current position to the end, a part at a time
+    """
+    if isinstance(body, bytes):
+        body = BytesIO(body)
+    digest = hashlib.md5()
+    part_digests = []
+    size = 0
+    for part in iter(lambda: body.read(MULTIPART_CHUNKSIZE), b""):
+        digest.update(part)
+        part_digests.append(hashlib.md5(part).digest())
+        size += len(part)
+    if size < MULTIPART_THRESHOLD:
+        return digest.hexdigest()
+    return "{0}-{1}".format(hashlib.md5(b"".join(part_digests)).hexdigest(), len(part_digests))
+
+
+def get_zip_artifact(path, cache_dir=None):
+    """
+    Return the zip archive of the given directory, reusing the one built by a previous invocation.
+
+    Archives are stored in a directory for each installed version of ParallelCluster, by name of the archived directory
+    and by a fingerprint of the names, sizes and modification times of the archived files. They are written straight
+    to the cache, so that they are never held in memory.
+
+    :param path: directory to archive
+    :param cache_dir: directory to store the archives in, defaults to the one of the installed version
+    :return: a binary file object pointing to the archive, to be closed by the caller
+    """
+    cache_dir = cache_dir or get_artifacts_cache_dir()
+    fingerprint = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            stat = os.stat(file_path)
+            fingerprint.update(
+                "{0}:{1}:{2!r}\n".format(os.path.relpath(file_path, path), stat.st_size, stat.st_mtime).encode("utf-8")
+            )
+    name = os.path.basename(os.path.normpath(path))
+    cache_file = os.path.join(cache_dir, "{0}-{1}.zip".format(name, fingerprint.hexdigest()))
+
+    try:
+        archive = open(cache_file, "rb")
+        LOGGER.debug("Reusing archive %s for %s", cache_file, path)
+        return archive
+    except (IOError, OSError):
+        pass
+
+    try:
+        try:
+            os.makedirs(cache_dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        # Archives built for previous contents of the directory are not needed anymore
+        for previous_file in os.listdir(cache_dir):
+            if previous_file.startswith(name + "-") and previous_file.endswith(".zip"):
+                os.remove(os.path.join(cache_dir, previous_file))
+        file_descriptor, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w+b") as f:
+                zip_dir(path, f)
+            getattr(os, "replace", os.rename)(tmp_file, cache_file)
+        except Exception:
+            os.remove(tmp_file)
+            raise
+        return open(cache_file, "rb")
+    except (IOError, OSError) as e:
+        LOGGER.debug("Unable to store archive %s: %s", cache_file, e)
+    return zip_dir(path)
+
+
+class ArtifactUploader(object):
+    """
+    Upload the artifacts of a cluster to its directory in the S3 bucket, with concurrent requests.
+
+    Each upload starts as soon as its artifact is added, so that uploads overlap with the preparation of the other
+    artifacts. Objects already in the bucket with the same content, according to their ETag, are not uploaded again.
+    The uploader must be used as a context manager, to wait for the pending uploads when leaving it.
+    """
+
+    def __init__(self, bucket_name, artifact_directory, skip_existing=True, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Initialize the uploader.
+
+        :param bucket_name: name of the S3 bucket
+        :param artifact_directory: directory of the cluster in the bucket
+        :param skip_existing: False to not look for the objects in the bucket, e.g. for a new artifact directory
+        :param max_workers: maximum number of concurrent uploads
+        """
+        # boto3 default session is not thread safe, make sure workers share a pool of thread safe clients
+        install_client_pool()
+        self.bucket_name = bucket_name
+        self.artifact_directory = artifact_directory
+        self.skip_existing = skip_existing
+        self.__list_bucket_allowed = None
+        self.skipped_keys = []
+        self.__s3_client = boto3.client("s3")
+        self.__transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD, multipart_chunksize=MULTIPART_CHUNKSIZE
+        )
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.__futures = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__executor.shutdown(wait=True)
+
+    def add_object(self, key, body):
+        """Start uploading the given bytes or text to {artifact_directory}/{key}."""
+        if not isinstance(body, bytes):
+            body = body.encode("utf-8")
+        self.__submit(key, lambda: BytesIO(body))
+
+    def add_file(self, key, path):
+        """Start uploading the given file to {artifact_directory}/{key}."""
+        self.__submit(key, lambda: open(path, "rb"))
+
+    def add_resources_dir(self, root):
+        """
+        Start uploading the content of the directory rooted in root path.
+
+        All dirs contained in root dir are uploaded as zip files to {artifact_directory}/{dir_name}/artifacts.zip.
+        All files contained in root dir are uploaded to {artifact_directory}/{file_name}.
+        Archives are built by the workers too, concurrently with the other uploads.
+        """
+        for res in sorted(os.listdir(root)):
+            path = os.path.join(root, res)
+            if os.path.isdir(path):
+                self.__submit("{0}/artifacts.zip".format(res), partial(get_zip_artifact, path))
+            elif os.path.isfile(path):
+                self.add_file(res, path)
+
+    def upload_object(self, key, body):
+        """
+        Upload the given bytes or text to {artifact_directory}/{key} and wait for the upload to complete.
+
+        :return: the version ID of the object, None if the bucket is not versioned
+        """
+        self.add_object(key, body)
+        return self.__futures[key].result()
+
+    def wait(self):
+        """
+        Wait for all the uploads to complete, raising the error of the first failed one.
+
+        :return: an OrderedDict with the version IDs of the uploaded objects, by key
+        """
+        return OrderedDict((key, future.result()) for key, future in self.__futures.items())
+
+    def __submit(self, key, open_body):
+        """
+        Start uploading the object returned by open_body to {artifact_directory}/{key}.
+
+        :param open_body: function returning a seekable binary file object, closed once the object is uploaded
+        """
+        self.__futures[key] = self.__executor.submit(self.__upload, key, open_body)
+
+    def __upload(self, key, open_body):
+        object_key = "{0}/{1}".format(self.artifact_directory, key)
+        with open_body() as body:
+            if self.skip_existing:
+                existing_object = self.__head_object(object_key)
+                if existing_object and existing_object.get("ETag", "").strip('"') == compute_etag(body):
+                    LOGGER.debug("Skipping upload of %s, already in bucket %s", object_key, self.bucket_name)
+                    self.skipped_keys.append(key)
+                    return existing_object.get("VersionId")
+            return self.__put_object(object_key, body)
+
+    def __head_object(self, object_key):
+        """Return the metadata of the given object, None if it is not in the bucket."""
+        try:
+            return self.__s3_client.head_object(Bucket=self.bucket_name, Key=object_key)
+        except ClientError as e:
+            error_code = e.response.get("Error").get("Code")
+            # A missing object is reported as forbidden without the s3:ListBucket permission
+            if error_code in ["404", "NoSuchKey"] or (error_code == "403" and not self.__is_list_bucket_allowed()):
+                return None
+            raise
+
+    def __is_list_bucket_allowed(self):
+        """Check once if the s3:ListBucket permission is granted on the artifact directory."""
+        if self.__list_bucket_allowed is None:
+            try:
+                self.__s3_client.list_objects_v2(
+                    Bucket=self.bucket_name, Prefix="{0}/".format(self.artifact_directory), MaxKeys=1
+                )
+                self.__list_bucket_allowed = True
+            except ClientError as e:
+                if e.response.get("Error").get("Code") not in ["AccessDenied", "403"]:
+                    raise
+                self.__list_bucket_allowed = False
+        return self.__list_bucket_allowed
+
+    def __put_object(self, object_key, body):
+        """Upload the whole content of the given file object, returning the version ID of the object if any."""
+        LOGGER.debug("Uploading %s to bucket %s", object_key, self.bucket_name)
+        body.seek(0, os.SEEK_END)
+        size = body.tell()
+        body.seek(0)
+        if size < MULTIPART_THRESHOLD:
+            return self.__s3_client.put_object(Bucket=self.bucket_name, Key=object_key, Body=body).get("VersionId")
+        # Large objects are read a part at a time
+        self.__s3_client.upload_fileobj(body, self.bucket_name, object_key, Config=self.__transfer_config)
+        return None
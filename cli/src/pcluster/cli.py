@@ -19,73 +19,114 @@ import textwrap
 from logging.handlers import RotatingFileHandler
 
 import argparse
-from botocore.exceptions import NoCredentialsError
-
-import pcluster.cli_commands.delete as pcluster_delete
-import pcluster.cli_commands.start as pcluster_start
-import pcluster.cli_commands.stop as pcluster_stop
-import pcluster.cli_commands.update as pcluster_update
-import pcluster.commands as pcluster
-import pcluster.configure.easyconfig as easyconfig
-import pcluster.createami as createami
-import pcluster.utils as utils
-from pcluster.dcv.connect import dcv_connect
+
+from pcluster.constants import CLI_LOG_FILE
 
 LOGGER = logging.getLogger(__name__)
 
+# Subcommand modules and their dependencies (boto3, jinja2, tabulate, the config mappings) are imported on demand by
+# the functions below, to keep the CLI startup fast for commands like "pcluster version" and "pcluster --help".
+
 
 def create(args):
+    import pcluster.commands as pcluster
+
     pcluster.create(args)
 
 
 def configure(args):
+    import pcluster.configure.easyconfig as easyconfig
+
     easyconfig.configure(args)
 
 
 def ssh(args, extra_args):
+    import pcluster.commands as pcluster
+
     pcluster.ssh(args, extra_args)
 
 
 def dcv(args):
+    from pcluster.dcv.connect import dcv_connect
+
     dcv_connect(args)
 
 
 def status(args):
-    pcluster.status(args)
+    if args.all or args.regions:
+        import pcluster.cli_commands.fleet_status as pcluster_fleet_status
+
+        pcluster_fleet_status.fleet_status(args)
+    else:
+        import pcluster.commands as pcluster
+
+        pcluster.status(args)
 
 
 def list_stacks(args):
+    import pcluster.commands as pcluster
+
     pcluster.list_stacks(args)
 
 
 def delete(args):
+    import pcluster.cli_commands.delete as pcluster_delete
+
     pcluster_delete.delete(args)
 
 
 def instances(args):
+    import pcluster.commands as pcluster
+
     pcluster.instances(args)
 
 
 def update(args):
+    import pcluster.cli_commands.update as pcluster_update
+
     pcluster_update.execute(args)
 
 
 def version(args):
-    print(pcluster.version())
+    print(_get_installed_version())
 
 
 def start(args):
+    import pcluster.cli_commands.start as pcluster_start
+
     pcluster_start.start(args)
 
 
 def stop(args):
+    import pcluster.cli_commands.stop as pcluster_stop
+
     pcluster_stop.stop(args)
 
 
 def create_ami(args):
+    import pcluster.createami as createami
+
     createami.create_ami(args)
 
 
+def cache(args):
+    from pcluster.metadata_cache import METADATA_CACHE
+
+    METADATA_CACHE.clear()
+    print("Cache directory {0} cleared.".format(METADATA_CACHE.cache_dir))
+
+
+def _get_installed_version():
+    """Get the version of the installed aws-parallelcluster package, without importing pkg_resources if possible."""
+    try:
+        from importlib.metadata import version as get_distribution_version  # Python >= 3.8
+    except ImportError:
+        import pkg_resources
+
+        return pkg_resources.get_distribution("aws-parallelcluster").version
+    return get_distribution_version("aws-parallelcluster")
+
+
 def config_logger():
     logger = logging.getLogger("pcluster")
     file_only_logger = logging.getLogger("cli_log_file")
@@ -96,7 +137,7 @@ def config_logger():
     log_stream_handler.setFormatter(logging.Formatter("%(message)s"))
     logger.addHandler(log_stream_handler)
 
-    logfile = utils.get_cli_log_file()
+    logfile = os.path.expanduser(CLI_LOG_FILE)
     try:
         os.makedirs(os.path.dirname(logfile))
     except OSError as e:
@@ -124,6 +165,16 @@ def _addarg_nowait(subparser):
     )
 
 
+def _addarg_nocache(subparser):
+    subparser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        default=False,
+        help="Do not use the EC2 metadata and templates cached in ~/.parallelcluster/cache and do not update them.",
+    )
+
+
 def _get_parser():
     """
     Initialize ArgumentParser for pcluster commands.
@@ -162,6 +213,7 @@ Examples::
     _addarg_config(pcreate)
     _addarg_region(pcreate)
     _addarg_nowait(pcreate)
+    _addarg_nocache(pcreate)
     pcreate.add_argument(
         "-nr", "--norollback", action="store_true", default=False, help="Disables stack rollback on error."
     )
@@ -203,6 +255,7 @@ Examples::
     _addarg_config(pupdate)
     _addarg_region(pupdate)
     _addarg_nowait(pupdate)
+    _addarg_nocache(pupdate)
     pupdate.add_argument(
         "-nr",
         "--norollback",
@@ -283,11 +336,31 @@ Examples::
     pstop.set_defaults(func=stop)
 
     # status command subparser
-    pstatus = subparsers.add_parser("status", help="Pulls the current status of the cluster.")
-    pstatus.add_argument("cluster_name", help="Shows the status of the cluster with the name provided here.")
+    pstatus = subparsers.add_parser(
+        "status",
+        help="Pulls the current status of the cluster.",
+        epilog="With --all or --regions, shows the status of all the clusters in a table, without waiting for "
+        "the stack operations in progress.",
+    )
+    pstatus.add_argument("cluster_name", nargs="?", help="Shows the status of the cluster with the name provided here.")
     _addarg_config(pstatus)
     _addarg_region(pstatus)
     _addarg_nowait(pstatus)
+    pstatus.add_argument(
+        "--all", action="store_true", default=False, help="Shows the status of all the clusters in the region."
+    )
+    pstatus.add_argument(
+        "--regions", help="Shows the status of all the clusters in the given comma separated list of regions."
+    )
+    pstatus.add_argument(
+        "--json", action="store_true", default=False, help="Prints the status of all the clusters as JSON."
+    )
+    pstatus.add_argument(
+        "--max-workers",
+        type=int,
+        default=16,
+        help="Maximum number of concurrent requests when showing the status of all the clusters. Default is 16.",
+    )
     pstatus.set_defaults(func=status)
 
     # list command subparser
@@ -413,6 +486,7 @@ Variables substituted::
     pconfigure = subparsers.add_parser("configure", help="Start the AWS ParallelCluster configuration.")
     _addarg_config(pconfigure)
     _addarg_region(pconfigure)
+    _addarg_nocache(pconfigure)
     pconfigure.set_defaults(func=configure)
 
     # version command subparser
@@ -439,6 +513,20 @@ Variables substituted::
     pdcv_connect.add_argument("--show-url", "-s", action="store_true", default=False, help="Print URL and exit")
     pdcv.set_defaults(func=dcv)
 
+    # cache command subparser
+    pcache = subparsers.add_parser(
+        "cache",
+        help="Manages the data cached by AWS ParallelCluster.",
+        epilog='For cache subcommand specific flags, please run: "pcluster cache [subcommand] --help"',
+    )
+    cache_subparsers = pcache.add_subparsers()
+    cache_subparsers.required = True
+    cache_subparsers.dest = "subcommand"
+    cache_subparsers.add_parser(
+        "clear", help="Removes all the cached EC2 metadata, templates and archives of the cluster resources."
+    )
+    pcache.set_defaults(func=cache)
+
     return parser
 
 
@@ -457,6 +545,19 @@ def main():
         if "region" in args and args.region:
             os.environ["AWS_DEFAULT_REGION"] = args.region
 
+        if "no_cache" in args and args.no_cache:
+            from pcluster.metadata_cache import METADATA_CACHE
+            from pcluster.template_cache import TEMPLATE_CACHE
+
+            METADATA_CACHE.enabled = False
+            TEMPLATE_CACHE.enabled = False
+
+        if args.func is not version:
+            # share boto3 clients among all the modules, for the whole process
+            from pcluster.client_pool import install_client_pool
+
+            install_client_pool()
+
         if args.func.__name__ == "ssh":
             args.func(args, extra_args)
         else:
@@ -465,14 +566,16 @@ def main():
                 print("Invalid arguments %s..." % extra_args)
                 sys.exit(1)
             args.func(args)
-    except NoCredentialsError:
-        LOGGER.error("AWS Credentials not found.")
-        sys.exit(1)
     except KeyboardInterrupt:
         LOGGER.info("Exiting...")
         sys.exit(1)
     except Exception as e:
-        LOGGER.exception("Unexpected error of type %s: %s", type(e).__name__, e)
+        from botocore.exceptions import NoCredentialsError
+
+        if isinstance(e, NoCredentialsError):
+            LOGGER.error("AWS Credentials not found.")
+        else:
+            LOGGER.exception("Unexpected error of type %s: %s", type(e).__name__, e)
         sys.exit(1)
 
 
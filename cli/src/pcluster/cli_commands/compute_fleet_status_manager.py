@@ -63,9 +63,9 @@ class ComputeFleetStatusManager:
 
         pass
 
-    def __init__(self, cluster_name):
+    def __init__(self, cluster_name, region=None):
         self._table_name = "parallelcluster-" + cluster_name
-        self._ddb_resource = boto3.resource("dynamodb")
+        self._ddb_resource = boto3.resource("dynamodb", region_name=region)
         self._table = self._ddb_resource.Table(self._table_name)
 
     def get_status(self, fallback=None):
@@ -10,7 +10,6 @@
 # limitations under the License.
 import logging
 import sys
-import time
 
 import boto3
 from botocore.config import Config
@@ -18,6 +17,7 @@ from botocore.exceptions import ClientError
 
 from pcluster import utils
 from pcluster.config.pcluster_config import PclusterConfig
+from pcluster.stack_progress import StackEventPrinter, StackProgressTracker
 from pcluster.utils import NodeType, paginate_boto3
 
 LOGGER = logging.getLogger(__name__)
@@ -89,20 +89,18 @@ def _delete_cluster(cluster_name, nowait):
         # Use describe_stacks to explicitly check if the stack exists
         cfn.delete_stack(StackName=stack_name)
         saw_update = True
-        stack_status = utils.get_stack(stack_name, cfn).get("StackStatus")
+        stack = utils.get_stack(stack_name, cfn)
+        stack_status = stack.get("StackStatus")
         sys.stdout.write("\rStatus: %s" % stack_status)
         sys.stdout.flush()
         LOGGER.debug("Status: %s", stack_status)
         if not nowait:
-            while stack_status == "DELETE_IN_PROGRESS":
-                time.sleep(5)
-                stack_status = utils.get_stack(stack_name, cfn, raise_on_error=True).get("StackStatus")
-                events = utils.get_stack_events(stack_name, raise_on_error=True)[0]
-                resource_status = (
-                    "Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))
-                ).ljust(80)
-                sys.stdout.write("\r%s" % resource_status)
-                sys.stdout.flush()
+            # the stack is followed by ID, since it cannot be described by name once deleted
+            tracker = StackProgressTracker(stack, cfn, callbacks=[StackEventPrinter()])
+            stack_status = tracker.wait(in_progress_statuses=["DELETE_IN_PROGRESS"])
+            if stack_status == "DELETE_COMPLETE":
+                LOGGER.info("\nCluster deleted successfully.")
+                sys.exit(0)
             sys.stdout.write("\rStatus: %s\n" % stack_status)
             sys.stdout.flush()
             LOGGER.debug("Status: %s", stack_status)
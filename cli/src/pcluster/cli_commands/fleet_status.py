@@ -0,0 +1,220 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.exceptions import ClientError
+from tabulate import tabulate
+
+from pcluster import utils
+from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatusManager
+from pcluster.client_pool import install_client_pool
+from pcluster.config.pcluster_config import PclusterConfig
+from pcluster.constants import PCLUSTER_STACK_PREFIX
+from pcluster.utils import NodeType
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+# Maximum number of items accepted by a single describe call of each service
+MAX_STACKS_PER_FILTER = 200
+MAX_ASGS_PER_CALL = 50
+MAX_COMPUTE_ENVIRONMENTS_PER_CALL = 100
+
+
+def fleet_status(args):
+    """Show the status of all the clusters of the given regions."""
+    PclusterConfig.init_aws(config_file=args.config_file)
+    if args.cluster_name:
+        utils.error("The cluster name cannot be specified together with --all or --regions")
+    regions = [region.strip() for region in args.regions.split(",") if region.strip()] if args.regions else []
+    try:
+        clusters = get_fleet_status(regions or [utils.get_region()], max_workers=args.max_workers)
+    except ClientError as e:
+        LOGGER.critical(e.response.get("Error").get("Message"))
+        sys.exit(1)
+
+    if args.json:
+        LOGGER.info(json.dumps(clusters, indent=2))
+    else:
+        LOGGER.info(
+            tabulate(
+                [
+                    [
+                        cluster["cluster_name"],
+                        cluster["region"],
+                        cluster["stack_status"],
+                        cluster["version"] or "-",
+                        cluster["head_node_state"] or "-",
+                        cluster["compute_fleet_status"] or "-",
+                        _format_capacity(cluster["capacity"]),
+                    ]
+                    for cluster in clusters
+                ],
+                headers=["Cluster", "Region", "Status", "Version", "HeadNode", "ComputeFleet", "Capacity"],
+                tablefmt="plain",
+            )
+        )
+
+
+def _format_capacity(capacity):
+    if not capacity:
+        return "-"
+    return "{desired} ({min}-{max}) {unit}".format(**capacity)
+
+
+def get_fleet_status(regions, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Retrieve the status of all the clusters of the given regions, with concurrent requests.
+
+    The cluster stacks of every region are listed first. Head nodes, Auto Scaling groups and AWS Batch compute
+    environments are then described with a few calls per region, while the compute fleet status of the clusters
+    storing it in DynamoDB requires a call per cluster.
+
+    :param regions: the regions to look for clusters in
+    :param max_workers: maximum number of concurrent requests
+    :return: a list of dictionaries, sorted by region and cluster name
+    """
+    # boto3 default session is not thread safe, make sure workers share a pool of thread safe clients
+    install_client_pool()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        stacks_by_region = list(zip(regions, executor.map(_list_cluster_stacks, regions)))
+
+        futures = []
+        for region, stacks in stacks_by_region:
+            stack_names = [stack.get("StackName") for stack in stacks]
+            asg_names = [name for name in (_get_output(stack, "ASGName") for stack in stacks) if name]
+            ce_arns = [arn for arn in (_get_output(stack, "BatchComputeEnvironmentArn") for stack in stacks) if arn]
+            futures.append(
+                (
+                    executor.submit(_describe_head_nodes, region, stack_names),
+                    [
+                        executor.submit(_describe_auto_scaling_groups, region, chunk)
+                        for chunk in _chunks(asg_names, MAX_ASGS_PER_CALL)
+                    ],
+                    [
+                        executor.submit(_describe_compute_environments, region, chunk)
+                        for chunk in _chunks(ce_arns, MAX_COMPUTE_ENVIRONMENTS_PER_CALL)
+                    ],
+                    # boto3 resources are not thread safe, the status managers are created by the main thread
+                    {
+                        stack.get("StackName"): executor.submit(
+                            ComputeFleetStatusManager(utils.get_cluster_name(stack.get("StackName")), region).get_status
+                        )
+                        for stack in stacks
+                        if _get_output(stack, "IsHITCluster") == "true"
+                    },
+                )
+            )
+
+        clusters = []
+        for (region, stacks), (head_nodes, asgs, compute_environments, compute_fleet_statuses) in zip(
+            stacks_by_region, futures
+        ):
+            head_nodes = head_nodes.result()
+            capacities = {}
+            for future in asgs + compute_environments:
+                capacities.update(future.result())
+            for stack in sorted(stacks, key=lambda stack: stack.get("StackName")):
+                stack_name = stack.get("StackName")
+                compute_fleet_status = compute_fleet_statuses.get(stack_name)
+                compute_fleet_status = compute_fleet_status.result() if compute_fleet_status else None
+                clusters.append(
+                    {
+                        "cluster_name": utils.get_cluster_name(stack_name),
+                        "region": region,
+                        "stack_status": stack.get("StackStatus"),
+                        "version": next(
+                            (tag.get("Value") for tag in stack.get("Tags", []) if tag.get("Key") == "Version"), None
+                        ),
+                        "scheduler": utils.get_cfn_param(stack.get("Parameters", []), "Scheduler"),
+                        "head_node_state": head_nodes.get(stack_name),
+                        "compute_fleet_status": str(compute_fleet_status) if compute_fleet_status else None,
+                        "capacity": capacities.get(_get_output(stack, "ASGName"))
+                        or capacities.get(_get_output(stack, "BatchComputeEnvironmentArn")),
+                    }
+                )
+        return clusters
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _chunks(items, size):
+    return [items[index : index + size] for index in range(0, len(items), size)]  # noqa: E203
+
+
+def _get_output(stack, output_key):
+    return utils.get_stack_output_value(stack.get("Outputs", []), output_key)
+
+
+def _list_cluster_stacks(region):
+    """Return the cluster stacks of the given region, as returned by DescribeStacks."""
+    cfn = boto3.client("cloudformation", region_name=region)
+    return [
+        stack
+        for stack in utils.paginate_boto3(cfn.describe_stacks)
+        if stack.get("ParentId") is None and stack.get("StackName").startswith(PCLUSTER_STACK_PREFIX)
+    ]
+
+
+def _describe_head_nodes(region, stack_names):
+    """Return the state of the head node of the given cluster stacks, with a DescribeInstances call for all of them."""
+    ec2 = boto3.client("ec2", region_name=region)
+    states = {}
+    # Clusters created before the node type tag was introduced are looked up by Name
+    for node_tag in ["tag:aws-parallelcluster-node-type", "tag:Name"]:
+        missing_stack_names = [stack_name for stack_name in stack_names if stack_name not in states]
+        for chunk in _chunks(missing_stack_names, MAX_STACKS_PER_FILTER):
+            filters = [
+                {"Name": "tag:Application", "Values": chunk},
+                {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]},
+                {"Name": node_tag, "Values": [str(NodeType.master)]},
+            ]
+            for reservation in utils.paginate_boto3(ec2.describe_instances, Filters=filters):
+                for instance in reservation.get("Instances", []):
+                    stack_name = next(
+                        (tag.get("Value") for tag in instance.get("Tags", []) if tag.get("Key") == "Application"), None
+                    )
+                    states[stack_name] = instance.get("State").get("Name")
+    return states
+
+
+def _describe_auto_scaling_groups(region, asg_names):
+    """Return the capacity of the given Auto Scaling groups, by name."""
+    autoscaling = boto3.client("autoscaling", region_name=region)
+    return {
+        asg.get("AutoScalingGroupName"): {
+            "desired": asg.get("DesiredCapacity"),
+            "min": asg.get("MinSize"),
+            "max": asg.get("MaxSize"),
+            "unit": "instances",
+        }
+        for asg in utils.paginate_boto3(autoscaling.describe_auto_scaling_groups, AutoScalingGroupNames=asg_names)
+    }
+
+
+def _describe_compute_environments(region, ce_arns):
+    """Return the capacity of the given AWS Batch compute environments, by ARN."""
+    batch = boto3.client("batch", region_name=region)
+    capacities = {}
+    for compute_environment in utils.paginate_boto3(batch.describe_compute_environments, computeEnvironments=ce_arns):
+        compute_resources = compute_environment.get("computeResources", {})
+        capacities[compute_environment.get("computeEnvironmentArn")] = {
+            "desired": compute_resources.get("desiredvCpus"),
+            "min": compute_resources.get("minvCpus"),
+            "max": compute_resources.get("maxvCpus"),
+            "unit": "vCPUs",
+        }
+    return capacities
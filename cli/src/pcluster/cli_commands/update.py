@@ -13,7 +13,6 @@ from __future__ import print_function
 
 import logging
 import sys
-import time
 from builtins import input
 
 import boto3
@@ -26,6 +25,7 @@ from pcluster.commands import evaluate_pcluster_template_url, upload_dashboard_r
 from pcluster.config.config_patch import ConfigPatch
 from pcluster.config.pcluster_config import PclusterConfig
 from pcluster.config.update_policy import UpdatePolicy
+from pcluster.stack_progress import StackEventPrinter, StackProgressTracker
 
 LOGGER = logging.getLogger(__name__)
 
@@ -123,17 +123,9 @@ def _update_cluster(
         if template_url:
             update_stack_args["TemplateURL"] = template_url
         cfn.update_stack(**update_stack_args)
-        stack_status = utils.get_stack(stack_name, cfn).get("StackStatus")
         if not args.nowait:
-            while stack_status in ["UPDATE_IN_PROGRESS", "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS"]:
-                stack_status = utils.get_stack(stack_name, cfn).get("StackStatus")
-                events = cfn.describe_stack_events(StackName=stack_name).get("StackEvents")[0]
-                resource_status = (
-                    "Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))
-                ).ljust(80)
-                sys.stdout.write("\r%s" % resource_status)
-                sys.stdout.flush()
-                time.sleep(5)
+            tracker = StackProgressTracker(utils.get_stack(stack_name, cfn), cfn, callbacks=[StackEventPrinter()])
+            tracker.wait(in_progress_statuses=["UPDATE_IN_PROGRESS", "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS"])
         else:
             stack_status = utils.get_stack(stack_name, cfn).get("StackStatus")
             LOGGER.info("Status: %s", stack_status)
@@ -0,0 +1,90 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import logging
+import threading
+
+import boto3
+from botocore.config import Config
+
+LOGGER = logging.getLogger(__name__)
+
+# Retry configuration applied to all the clients, unless overridden by the caller
+DEFAULT_CLIENT_CONFIG = Config(retries={"max_attempts": 10, "mode": "adaptive"})
+
+
+def _get_client_config(config):
+    """Merge the given config with the default one, keeping the default retry options not set by the caller."""
+    if config:
+        retries = dict(DEFAULT_CLIENT_CONFIG.retries, **(config.retries or {}))
+        config = DEFAULT_CLIENT_CONFIG.merge(config).merge(Config(retries=retries))
+    else:
+        config = DEFAULT_CLIENT_CONFIG
+    # botocore modifies the retries options in place, so every client needs its own copy of the config
+    return copy.deepcopy(config)
+
+
+class ClientPoolSession(boto3.session.Session):
+    """
+    boto3 Session reusing the clients created for the same service, region, credentials and configuration.
+
+    Creating a client requires loading and parsing the botocore service model, so clients are created once and
+    shared for the whole process. Clients are thread safe, while client creation is serialized because the
+    underlying botocore session is not.
+    Resources are not pooled, but the clients backing them are.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ClientPoolSession, self).__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        self.__clients = {}
+        self.hits = 0
+        self.misses = 0
+
+    def client(self, service_name, region_name=None, config=None, **kwargs):
+        """Return the pooled client for the given arguments, creating it if needed. See boto3.session.Session.client."""
+        config = _get_client_config(config)
+        # Region is resolved now, since it could be changed in the environment after the client creation
+        region_name = region_name or self.region_name
+        key = (
+            service_name,
+            region_name,
+            repr(sorted(kwargs.items())),
+            repr(sorted(config._user_provided_options.items())),
+        )
+        with self.__lock:
+            client = self.__clients.get(key)
+            if client:
+                self.hits += 1
+            else:
+                self.misses += 1
+                LOGGER.debug("Creating %s client for region %s", service_name, region_name)
+                client = super(ClientPoolSession, self).client(
+                    service_name, region_name=region_name, config=config, **kwargs
+                )
+                self.__clients[key] = client
+        return client
+
+    def clear(self):
+        """Remove all the pooled clients."""
+        with self.__lock:
+            self.__clients.clear()
+
+
+def install_client_pool():
+    """
+    Make boto3.client and boto3.resource calls use a ClientPoolSession for the rest of the process.
+
+    The function is idempotent and returns the installed session.
+    """
+    if not isinstance(boto3.DEFAULT_SESSION, ClientPoolSession):
+        boto3.DEFAULT_SESSION = ClientPoolSession()
+    return boto3.DEFAULT_SESSION
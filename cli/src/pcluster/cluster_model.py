@@ -15,6 +15,7 @@ from abc import abstractmethod
 import boto3
 from botocore.exceptions import ClientError
 
+from pcluster.metadata_cache import LATEST_ALINUX_AMI_TTL, METADATA_CACHE
 from pcluster.utils import (
     error,
     get_availability_zone_of_subnet,
@@ -60,8 +61,23 @@ class ClusterModel(ABC):
         """Get the stop command for the model."""
         pass
 
-    def _ec2_run_instance(self, pcluster_config, **kwargs):  # noqa: C901 FIXME!!!
+    def _ec2_run_instance(self, pcluster_config, **kwargs):
         """Wrap ec2 run_instance call. Useful since a successful run_instance call signals 'DryRunOperation'."""
+        errors, warnings = self._ec2_run_instance_dryrun(**kwargs)
+        for warning in warnings:
+            pcluster_config.warn(warning)
+        for error_message in errors:
+            pcluster_config.error(error_message)
+
+    def _ec2_run_instance_dryrun(self, **kwargs):  # noqa: C901 FIXME!!!
+        """
+        Call ec2 run_instance in dry-run mode and return the errors and warnings to report.
+
+        This method does not report anything, so that it can be called concurrently for multiple instance types.
+        :return: a (errors, warnings) tuple of lists of messages
+        """
+        errors = []
+        warnings = []
         try:
             boto3.client("ec2").run_instances(**kwargs)
         except ClientError as e:
@@ -72,17 +88,18 @@ class ClusterModel(ABC):
                 pass
             elif code == "UnsupportedOperation":
                 if "does not support specifying CpuOptions" in message:
-                    pcluster_config.error(message.replace("CpuOptions", "disable_hyperthreading"))
-                pcluster_config.error(message)
+                    errors.append(message.replace("CpuOptions", "disable_hyperthreading"))
+                else:
+                    errors.append(message)
             elif code == "InstanceLimitExceeded":
-                pcluster_config.error(
+                errors.append(
                     "You've reached the limit on the number of instances you can run concurrently "
                     "for the configured instance type.\n{0}".format(message)
                 )
             elif code == "InsufficientInstanceCapacity":
-                pcluster_config.error("There is not enough capacity to fulfill your request.\n{0}".format(message))
+                errors.append("There is not enough capacity to fulfill your request.\n{0}".format(message))
             elif code == "InsufficientFreeAddressesInSubnet":
-                pcluster_config.error(
+                errors.append(
                     "The specified subnet does not contain enough free private IP addresses "
                     "to fulfill your request.\n{0}".format(message)
                 )
@@ -90,7 +107,7 @@ class ClusterModel(ABC):
                 if "associatePublicIPAddress" in message:
                     # Instances with multiple Network Interfaces cannot currently take public IPs.
                     # This check is meant to warn users about this problem until services are fixed.
-                    pcluster_config.warn(
+                    warnings.append(
                         "The instance type '{0}' cannot take public IPs. "
                         "Please make sure that the subnet with id '{1}' has the proper routing configuration to allow "
                         "private IPs reaching the Internet (e.g. a NAT Gateway and a valid route table).".format(
@@ -104,31 +121,22 @@ class ClusterModel(ABC):
                 # Therefore, we need to write our own code to tell the specific problem
                 current_az = get_availability_zone_of_subnet(subnet_id)
                 qualified_az = get_supported_az_for_one_instance_type(kwargs["InstanceType"])
-                pcluster_config.error(
+                errors.append(
                     "Your requested instance type ({0}) is not supported in the Availability Zone ({1}) of "
                     "your requested subnet ({2}). Please retry your request by choosing a subnet in "
                     "{3}. ".format(kwargs["InstanceType"], current_az, subnet_id, qualified_az)
                 )
             else:
-                pcluster_config.error(
+                errors.append(
                     "Unable to validate configuration parameters for instance type '{0}'. "
                     "Please double check your cluster configuration.\n{1}".format(kwargs["InstanceType"], message)
                 )
 
+        return errors, warnings
+
     def _get_latest_alinux_ami_id(self):
         """Get latest alinux ami id."""
-        try:
-            alinux_ami_id = (
-                boto3.client("ssm")
-                .get_parameters_by_path(Path="/aws/service/ami-amazon-linux-latest")
-                .get("Parameters")[0]
-                .get("Value")
-            )
-        except ClientError as e:
-            error("Unable to retrieve Amazon Linux AMI id.\n{0}".format(e.response.get("Error").get("Message")))
-            raise
-
-        return alinux_ami_id
+        return METADATA_CACHE.get("latest_alinux_ami_id", _get_latest_alinux_ami_id, LATEST_ALINUX_AMI_TTL)
 
     def public_ips_in_compute_subnet(self, pcluster_config, network_interfaces_count):
         """Tell if public IPs will be used in compute subnet."""
@@ -167,6 +175,22 @@ class ClusterModel(ABC):
         return network_interfaces
 
 
+def _get_latest_alinux_ami_id():
+    """Retrieve the latest alinux ami id from the SSM public parameters."""
+    try:
+        alinux_ami_id = (
+            boto3.client("ssm")
+            .get_parameters_by_path(Path="/aws/service/ami-amazon-linux-latest")
+            .get("Parameters")[0]
+            .get("Value")
+        )
+    except ClientError as e:
+        error("Unable to retrieve Amazon Linux AMI id.\n{0}".format(e.response.get("Error").get("Message")))
+        raise
+
+    return alinux_ami_id
+
+
 def infer_cluster_model(config_parser=None, cluster_label=None, cfn_stack=None):
     """
     Infer the cluster model from the provided configuration.
@@ -30,10 +30,13 @@ from botocore.exceptions import ClientError
 from tabulate import tabulate
 
 import pcluster.utils as utils
+from pcluster.artifacts import ArtifactUploader
 from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatusManager
 from pcluster.config.hit_converter import HitConverter
 from pcluster.config.pcluster_config import PclusterConfig
 from pcluster.constants import PCLUSTER_NAME_MAX_LENGTH, PCLUSTER_NAME_REGEX, PCLUSTER_STACK_PREFIX
+from pcluster.stack_progress import StackEventPrinter, StackProgressTracker, is_in_progress
+from pcluster.template_cache import TEMPLATE_CACHE
 
 LOGGER = logging.getLogger(__name__)
 
@@ -87,26 +90,50 @@ def _upload_cluster_artifacts(
         if scheduler == "awsbatch":
             resources_dirs.append("resources/batch")
 
-        for resources_dir in resources_dirs:
-            resources = pkg_resources.resource_filename(__name__, resources_dir)
-            utils.upload_resources_artifacts(
+        # The artifact directory is new, no object can be there already
+        with ArtifactUploader(s3_bucket_name, artifact_directory, skip_existing=False) as uploader:
+            for resources_dir in resources_dirs:
+                uploader.add_resources_dir(pkg_resources.resource_filename(__name__, resources_dir))
+            if utils.is_hit_enabled_scheduler(scheduler):
+                upload_hit_resources(
+                    s3_bucket_name, artifact_directory, pcluster_config, storage_data.json_params, tags, uploader
+                )
+
+            upload_dashboard_resource(
                 s3_bucket_name,
                 artifact_directory,
-                root=resources,
+                pcluster_config,
+                storage_data.json_params,
+                storage_data.cfn_params,
+                uploader,
             )
-        if utils.is_hit_enabled_scheduler(scheduler):
-            upload_hit_resources(s3_bucket_name, artifact_directory, pcluster_config, storage_data.json_params, tags)
-
-        upload_dashboard_resource(
-            s3_bucket_name, artifact_directory, pcluster_config, storage_data.json_params, storage_data.cfn_params
-        )
+            uploader.wait()
     except Exception as e:
         LOGGER.error("Unable to upload cluster resources to the S3 bucket %s due to exception: %s", s3_bucket_name, e)
         utils.cleanup_s3_resources(s3_bucket_name, artifact_directory, remove_bucket_on_deletion)
         raise
 
 
-def upload_hit_resources(bucket_name, artifact_directory, pcluster_config, json_params, tags=None):
+def _upload_with(uploader, bucket_name, artifact_directory, upload_func):
+    """
+    Call upload_func with the given uploader, or with a new one waiting for the uploads to complete if None.
+
+    :param upload_func: function taking the uploader
+    """
+    if uploader:
+        upload_func(uploader)
+    else:
+        with ArtifactUploader(bucket_name, artifact_directory) as new_uploader:
+            upload_func(new_uploader)
+            new_uploader.wait()
+
+
+def upload_hit_resources(bucket_name, artifact_directory, pcluster_config, json_params, tags=None, uploader=None):
+    """
+    Upload the cluster configuration and the compute fleet template rendered with it.
+
+    :param uploader: ArtifactUploader to add the uploads to, if None the function waits for the uploads to complete
+    """
     if tags is None:
         tags = []
     hit_template_url = pcluster_config.get_section("cluster").get_param_value(
@@ -114,37 +141,35 @@ def upload_hit_resources(bucket_name, artifact_directory, pcluster_config, json_
     ) or "{bucket_url}/templates/compute-fleet-hit-substack-{version}.cfn.yaml".format(
         bucket_url=utils.get_bucket_url(pcluster_config.region), version=utils.get_installed_version()
     )
-    s3_client = boto3.client("s3")
 
-    try:
-        result = s3_client.put_object(
-            Bucket=bucket_name,
-            Body=json.dumps(json_params),
-            Key="{artifact_directory}/configs/cluster-config.json".format(artifact_directory=artifact_directory),
-        )
-        file_contents = utils.read_remote_file(hit_template_url)
-        rendered_template = utils.render_template(file_contents, json_params, tags, result.get("VersionId"))
-    except ClientError as client_error:
-        LOGGER.error("Error when uploading cluster configuration file to bucket %s: %s", bucket_name, client_error)
-        raise
-    except Exception as e:
-        LOGGER.error("Error when generating CloudFormation template from url %s: %s", hit_template_url, e)
-        raise
+    def _upload(uploader):
+        try:
+            # The template refers to the version of the configuration, which must be uploaded first
+            config_version = uploader.upload_object("configs/cluster-config.json", json.dumps(json_params))
+            file_contents = TEMPLATE_CACHE.read(hit_template_url)
+            rendered_template = utils.render_template(file_contents, json_params, tags, config_version)
+        except ClientError as client_error:
+            LOGGER.error("Error when uploading cluster configuration file to bucket %s: %s", bucket_name, client_error)
+            raise
+        except Exception as e:
+            LOGGER.error("Error when generating CloudFormation template from url %s: %s", hit_template_url, e)
+            raise
+
+        uploader.add_object("templates/compute-fleet-hit-substack.rendered.cfn.yaml", rendered_template)
 
     try:
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Body=rendered_template,
-            Key="{artifact_directory}/templates/compute-fleet-hit-substack.rendered.cfn.yaml".format(
-                artifact_directory=artifact_directory
-            ),
-        )
-    except Exception as e:
+        _upload_with(uploader, bucket_name, artifact_directory, _upload)
+    except ClientError as e:
         LOGGER.error("Error when uploading CloudFormation template to bucket %s: %s", bucket_name, e)
         raise
 
 
-def upload_dashboard_resource(bucket_name, artifact_directory, pcluster_config, json_params, cfn_params):
+def upload_dashboard_resource(bucket_name, artifact_directory, pcluster_config, json_params, cfn_params, uploader=None):
+    """
+    Upload the CloudWatch dashboard template rendered with the cluster configuration.
+
+    :param uploader: ArtifactUploader to add the upload to, if None the function waits for the upload to complete
+    """
     params = {"json_params": json_params, "cfn_params": cfn_params}
     cw_dashboard_template_url = pcluster_config.get_section("cluster").get_param_value(
         "cw_dashboard_template_url"
@@ -154,7 +179,7 @@ def upload_dashboard_resource(bucket_name, artifact_directory, pcluster_config,
     )
 
     try:
-        file_contents = utils.read_remote_file(cw_dashboard_template_url)
+        file_contents = TEMPLATE_CACHE.read(cw_dashboard_template_url)
         rendered_template = utils.render_template(file_contents, params, {})
     except Exception as e:
         LOGGER.error(
@@ -163,11 +188,12 @@ def upload_dashboard_resource(bucket_name, artifact_directory, pcluster_config,
         raise
 
     try:
-        boto3.client("s3").put_object(
-            Bucket=bucket_name,
-            Body=rendered_template,
-            Key="{artifact_directory}/templates/cw-dashboard-substack.rendered.cfn.yaml".format(
-                artifact_directory=artifact_directory
+        _upload_with(
+            uploader,
+            bucket_name,
+            artifact_directory,
+            lambda uploader: uploader.add_object(
+                "templates/cw-dashboard-substack.rendered.cfn.yaml", rendered_template
             ),
         )
     except Exception as e:
@@ -528,6 +554,8 @@ def ssh(args, extra_args):  # noqa: C901 FIXME!!!
 
 
 def status(args):  # noqa: C901 FIXME!!!
+    if not args.cluster_name:
+        utils.error("The cluster name is required, unless --all or --regions is specified")
     stack_name = utils.get_stack_name(args.cluster_name)
 
     # Parse configuration file to read the AWS section
@@ -539,22 +567,10 @@ def status(args):  # noqa: C901 FIXME!!!
         sys.stdout.write("\rStatus: %s" % stack.get("StackStatus"))
         sys.stdout.flush()
         if not args.nowait:
-            while stack.get("StackStatus") not in [
-                "CREATE_COMPLETE",
-                "UPDATE_COMPLETE",
-                "UPDATE_ROLLBACK_COMPLETE",
-                "ROLLBACK_COMPLETE",
-                "CREATE_FAILED",
-                "DELETE_FAILED",
-            ]:
-                time.sleep(5)
+            if is_in_progress(stack.get("StackStatus")):
+                StackProgressTracker(stack, cfn, callbacks=[StackEventPrinter()]).wait()
+                # the stack outputs are only available when describing the stack
                 stack = utils.get_stack(stack_name, cfn)
-                events = utils.get_stack_events(stack_name)[0]
-                resource_status = (
-                    "Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))
-                ).ljust(80)
-                sys.stdout.write("\r%s" % resource_status)
-                sys.stdout.flush()
             sys.stdout.write("\rStatus: %s\n" % stack.get("StackStatus"))
             sys.stdout.flush()
             if stack.get("StackStatus") in ["CREATE_COMPLETE", "UPDATE_COMPLETE", "UPDATE_ROLLBACK_COMPLETE"]:
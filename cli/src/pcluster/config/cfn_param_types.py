@@ -16,6 +16,7 @@ import yaml
 
 from pcluster.config.iam_policy_rules import AWSBatchFullAccessInclusionRule, CloudWatchAgentServerPolicyInclusionRule
 from pcluster.config.param_types import LOGGER, Param, Section, SettingsParam, StorageData, _ensure_section_existence
+from pcluster.config.refresh_tracker import refresh_depends_on
 from pcluster.config.resource_map import ResourceMap
 from pcluster.constants import PCLUSTER_ISSUES_LINK
 from pcluster.utils import (
@@ -52,7 +53,7 @@ class CfnParam(Param):
 
         :param cfn_params: list of all the CFN parameters, used if "cfn_param_mapping" is specified in the definition
         """
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
         if cfn_params:
             cfn_value = get_cfn_param(cfn_params, cfn_converter) if cfn_converter else "NONE"
             self.value = self.get_value_from_string(cfn_value)
@@ -72,7 +73,7 @@ class CfnParam(Param):
     def to_cfn(self):
         """Convert param to CFN representation, if "cfn_param_mapping" attribute is present in the Param definition."""
         cfn_params = {}
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
 
         if cfn_converter:
             cfn_value = self.get_cfn_value()
@@ -311,6 +312,7 @@ class ExtraJsonCfnParam(JsonCfnParam):
             self.value["cfncluster"] = self.value.pop("cluster")
         return self.get_string_value()
 
+    @refresh_depends_on(("cluster", "extra_json"))
     def refresh(self):
         """
         Refresh the extra_jason.
@@ -342,7 +344,7 @@ class SharedDirCfnParam(CfnParam):
             len(ebs_labels.split(",")) == 1
             and not self.pcluster_config.get_section("ebs", ebs_labels).get_param_value("shared_dir")
         ):
-            cfn_params[self.definition.get("cfn_param_mapping")] = self.get_cfn_value()
+            cfn_params[self.definition.cfn_param_mapping] = self.get_cfn_value()
         # else: there are shared_dir specified in EBS sections
         # let the EBSSettings populate the SharedDir CFN parameter.
         return cfn_params
@@ -383,7 +385,7 @@ class SpotPriceCfnParam(FloatCfnParam):
 
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing CFN input only if the scheduler is a traditional one."""
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
         if cfn_converter and cfn_params:
             if get_cfn_param(cfn_params, "Scheduler") != "awsbatch":
                 self.value = float(get_cfn_param(cfn_params, cfn_converter))
@@ -404,7 +406,7 @@ class SpotPriceCfnParam(FloatCfnParam):
 
         cluster_config = self.pcluster_config.get_section(self.section_key)
         if cluster_config.get_param_value("scheduler") != "awsbatch":
-            cfn_params[self.definition.get("cfn_param_mapping")] = self.get_cfn_value()
+            cfn_params[self.definition.cfn_param_mapping] = self.get_cfn_value()
 
         return cfn_params
 
@@ -420,7 +422,7 @@ class SpotBidPercentageCfnParam(IntCfnParam):
 
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing CFN input only if the scheduler is awsbatch."""
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
         if cfn_converter and cfn_params:
             if get_cfn_param(cfn_params, "Scheduler") == "awsbatch":
                 # we have the same CFN input parameters for both spot_price and spot_bid_percentage
@@ -435,7 +437,7 @@ class SpotBidPercentageCfnParam(IntCfnParam):
 
         cluster_config = self.pcluster_config.get_section(self.section_key)
         if cluster_config.get_param_value("scheduler") == "awsbatch":
-            cfn_params[self.definition.get("cfn_param_mapping")] = self.get_cfn_value()
+            cfn_params[self.definition.cfn_param_mapping] = self.get_cfn_value()
 
         return cfn_params
 
@@ -451,7 +453,7 @@ class QueueSizeCfnParam(IntCfnParam):
 
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing the right CFN input according to the scheduler."""
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
         if cfn_converter and cfn_params:
             cfn_value = get_cfn_param(cfn_params, cfn_converter) if cfn_converter else "NONE"
 
@@ -483,7 +485,7 @@ class QueueSizeCfnParam(IntCfnParam):
             and (self.key == "desired_vcpus" or self.key == "max_vcpus" or self.key == "min_vcpus")
         ):
             cfn_value = cluster_config.get_param_value(self.key)
-            cfn_params[self.definition.get("cfn_param_mapping")] = str(cfn_value)
+            cfn_params[self.definition.cfn_param_mapping] = str(cfn_value)
 
         return cfn_params
 
@@ -499,7 +501,7 @@ class MaintainInitialSizeCfnParam(BoolCfnParam):
 
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing the right CFN input."""
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
         if cfn_converter and cfn_params:
             # initialize the value from cfn only if the scheduler is a traditional one
             if get_cfn_param(cfn_params, "Scheduler") != "awsbatch":
@@ -518,7 +520,7 @@ class MaintainInitialSizeCfnParam(BoolCfnParam):
         if cluster_config.get_param_value("scheduler") != "awsbatch":
             cfn_value = cluster_config.get_param_value("maintain_initial_size")
             min_size_value = cluster_config.get_param_value("initial_queue_size") if cfn_value else "0"
-            cfn_params.update({self.definition.get("cfn_param_mapping"): str(min_size_value)})
+            cfn_params.update({self.definition.cfn_param_mapping: str(min_size_value)})
 
         return cfn_params
 
@@ -546,6 +548,13 @@ class AdditionalIamPoliciesCfnParam(CommaSeparatedCfnParam):
         non_conditional_iam_policies = self._non_conditional_iam_policies()
         return str(",".join(non_conditional_iam_policies)) if non_conditional_iam_policies else None
 
+    @refresh_depends_on(
+        ("cluster", "additional_iam_policies"),
+        ("cluster", "scheduler"),
+        ("cluster", "cw_log_settings"),
+        ("cw_log", None),
+        ("cw_log", "enable"),
+    )
     def refresh(self):
         """Refresh the additional IAM policies by adding conditional policies, if needed."""
         additional_policies = set(self.value)
@@ -635,7 +644,7 @@ class DisableHyperThreadingCfnParam(BoolCfnParam):
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing the right CFN input."""
         try:
-            cfn_converter = self.definition.get("cfn_param_mapping", None)
+            cfn_converter = self.definition.cfn_param_mapping
             if cfn_converter and cfn_params:
                 cores = get_cfn_param(cfn_params, cfn_converter)
                 if cores and not cores.startswith("NONE,NONE"):
@@ -670,7 +679,7 @@ class DisableHyperThreadingCfnParam(BoolCfnParam):
 
         :return: string (cores_master,cores_compute,master_supports_cpu_options,compute_supports_cpu_options)
         """
-        cfn_params = {self.definition.get("cfn_param_mapping"): "NONE,NONE,NONE,NONE"}
+        cfn_params = {self.definition.cfn_param_mapping: "NONE,NONE,NONE,NONE"}
         cluster_config = self.pcluster_config.get_section(self.section_key)
         if self.value:
             master_instance_type = cluster_config.get_param_value("master_instance_type")
@@ -703,7 +712,7 @@ class DisableHyperThreadingCfnParam(BoolCfnParam):
                     )
             cfn_params.update(
                 {
-                    self.definition.get("cfn_param_mapping"): "{0},{1},{2},{3}".format(
+                    self.definition.cfn_param_mapping: "{0},{1},{2},{3}".format(
                         master_cores,
                         compute_cores,
                         str(disable_master_ht_via_cpu_options).lower(),
@@ -753,6 +762,10 @@ class ClusterConfigMetadataCfnParam(JsonCfnParam):
         """Get default value from the Param definition."""
         return self.definition.get("default", {"sections": {}})
 
+    def get_refresh_dependencies(self):
+        """The configuration metadata is refreshed when any section is added, removed or renamed."""
+        return [(section_key, None) for section_key in self.pcluster_config.get_section_keys()]
+
     def refresh(self):
         """
         Refresh the configuration metadata.
@@ -813,6 +826,7 @@ class BaseOSCfnParam(CfnParam):
         #       compute instance types.
         return master_inst_supported_architectures[0]
 
+    @refresh_depends_on(("cluster", "base_os"), ("cluster", "master_instance_type"))
     def refresh(self):
         """Initialize the private architecture param."""
         if self.value:
@@ -834,7 +848,7 @@ class ArgsCfnParam(CfnParam):
 
         :param cfn_params: list of all the CFN parameters, used if "cfn_param_mapping" is specified in the definition
         """
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
         if cfn_params:
             cfn_value = get_cfn_param(cfn_params, cfn_converter) if cfn_converter else "NONE"
             self.value = self.get_value_from_string(json.loads('"' + cfn_value + '"'))
@@ -844,7 +858,7 @@ class ArgsCfnParam(CfnParam):
     def to_cfn(self):
         """Convert param to CFN representation, if "cfn_param_mapping" attribute is present in the Param definition."""
         cfn_params = {}
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
 
         if cfn_converter:
             cfn_value = self.get_cfn_value()
@@ -903,7 +917,7 @@ class SettingsCfnParam(SettingsParam):
         """Convert the referred section to CFN representation."""
         section_labels = self.get_metadata_labels()
 
-        if self.referred_section_definition.get("max_resources", 1) > 1:
+        if self.referred_section_definition.max_resources > 1:
             # Multiple section
             for section_label in [section_label for section_label in section_labels if section_label is not None]:
                 section = self.pcluster_config.get_section(self.referred_section_key, section_label.strip())
@@ -942,7 +956,7 @@ class SettingsCfnParam(SettingsParam):
         #      contain all default parameter values)
         #   2) in unit tests that build the configuration on the fly
         if not section_labels:
-            max_resources = int(self.referred_section_definition.get("max_resources", "1"))
+            max_resources = self.referred_section_definition.max_resources
             section_labels = metadata.create_section_resources(
                 self.referred_section_key, expected_num_labels, max_resources
             )
@@ -975,16 +989,16 @@ class EBSSettingsCfnParam(SettingsCfnParam):
                 labels = self.get_metadata_labels(expected_num_labels=num_of_ebs, include_none_values=False)
                 for index in range(len(labels)):
                     # create empty section
-                    referred_section_type = self.referred_section_definition.get("type", CfnSection)
+                    referred_section_type = self.referred_section_definition.type or CfnSection
                     referred_section = referred_section_type(
                         self.referred_section_definition, self.pcluster_config, labels[index]
                     )
 
-                    for param_key, param_definition in self.referred_section_definition.get("params").items():
-                        cfn_converter = param_definition.get("cfn_param_mapping", None)
+                    for param_key, param_definition in self.referred_section_definition.params.items():
+                        cfn_converter = param_definition.cfn_param_mapping
                         if cfn_converter:
 
-                            param_type = param_definition.get("type", CfnParam)
+                            param_type = param_definition.type or CfnParam
                             cfn_value = get_cfn_param(cfn_params, cfn_converter).split(",")[index]
                             param = param_type(
                                 referred_section.key,
@@ -1039,7 +1053,7 @@ class EBSSettingsCfnParam(SettingsCfnParam):
 
         cfn_params = storage_params.cfn_params
         number_of_ebs_sections = len(sections)
-        for param_key, param_definition in self.referred_section_definition.get("params").items():
+        for param_key, param_definition in self.referred_section_definition.params.items():
             if param_key == "shared_dir":
                 # The same CFN parameter is used for both single and multiple EBS cases
                 # if there are no EBS volumes, or if user does not specify shared_dir when using 1 EBS volume
@@ -1049,7 +1063,7 @@ class EBSSettingsCfnParam(SettingsCfnParam):
                 ):
                     continue
 
-            cfn_converter = param_definition.get("cfn_param_mapping", None)
+            cfn_converter = param_definition.cfn_param_mapping
             if cfn_converter:
 
                 cfn_value_list = []
@@ -1059,7 +1073,7 @@ class EBSSettingsCfnParam(SettingsCfnParam):
                         param = section.get_param(param_key)
                     else:
                         # Create a default param
-                        param_type = param_definition.get("type", CfnParam)
+                        param_type = param_definition.type or CfnParam
                         param = param_type(
                             self.referred_section_key, "default", param_key, param_definition, self.pcluster_config
                         )
@@ -1081,6 +1095,9 @@ class NetworkInterfacesCountCfnParam(CommaSeparatedCfnParam):
     on master and compute nodes.
     """
 
+    @refresh_depends_on(
+        ("cluster", "scheduler"), ("cluster", "master_instance_type"), ("cluster", "compute_instance_type")
+    )
     def refresh(self):
         """Compute the number of network interfaces for master and compute nodes."""
         cluster_section = self.pcluster_config.get_section("cluster")
@@ -1099,13 +1116,13 @@ class CfnSection(Section):
 
     def from_storage(self, storage_params):
         """Initialize section configuration parameters by parsing CFN parameters."""
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
         if cfn_converter:
             # It is a section converted to a single CFN parameter
             cfn_values = get_cfn_param(storage_params.cfn_params, cfn_converter).split(",")
 
             cfn_param_index = 0
-            for param_key, param_definition in self.definition.get("params").items():
+            for param_key, param_definition in self.definition.params.items():
                 try:
                     cfn_value = cfn_values[cfn_param_index]
                 except IndexError:
@@ -1113,7 +1130,7 @@ class CfnSection(Section):
                     # so it is set to a single NONE value
                     cfn_value = "NONE"
 
-                param_type = param_definition.get("type", CfnParam)
+                param_type = param_definition.type or CfnParam
                 param = param_type(
                     self.key, self.label, param_key, param_definition, self.pcluster_config, owner_section=self
                 ).from_cfn_value(cfn_value)
@@ -1121,8 +1138,8 @@ class CfnSection(Section):
                 self.add_param(param)
                 cfn_param_index += 1
         else:
-            for param_key, param_definition in self.definition.get("params").items():
-                param_type = param_definition.get("type", CfnParam)
+            for param_key, param_definition in self.definition.params.items():
+                param_type = param_definition.type or CfnParam
                 param = param_type(
                     self.key, self.label, param_key, param_definition, self.pcluster_config, owner_section=self
                 ).from_storage(storage_params)
@@ -1140,33 +1157,33 @@ class CfnSection(Section):
         if not storage_params:
             storage_params = StorageData({}, {})
 
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
         if cfn_converter:
             # it is a section converted to a single CFN parameter
             cfn_items = []
-            for param_key, param_definition in self.definition.get("params").items():
+            for param_key, param_definition in self.definition.params.items():
                 param = self.get_param(param_key)
                 if param:
                     cfn_items.append(param.get_cfn_value())
                 else:
-                    param_type = param_definition.get("type", CfnParam)
+                    param_type = param_definition.type or CfnParam
                     param = param_type(self.key, self.label, param_key, param_definition, self.pcluster_config)
                     cfn_items.append(param.get_cfn_value())
 
             if cfn_items[0] == "NONE":
                 # empty dict or first item is NONE --> set all values to NONE
-                cfn_items = ["NONE"] * len(self.definition.get("params"))
+                cfn_items = ["NONE"] * len(self.definition.params)
 
             storage_params.cfn_params[cfn_converter] = ",".join(cfn_items)
         else:
             # get value from config object
-            for param_key, param_definition in self.definition.get("params").items():
+            for param_key, param_definition in self.definition.params.items():
                 param = self.get_param(param_key)
                 if param:
                     param.to_storage(storage_params)
                 else:
                     # set CFN value from a default param
-                    param_type = param_definition.get("type", Param)
+                    param_type = param_definition.type or Param
                     param = param_type(self.key, self.label, param_key, param_definition, self.pcluster_config)
                     param.to_storage(storage_params)
 
@@ -1195,15 +1212,15 @@ class EFSCfnSection(CfnSection):
         if not storage_params:
             storage_params = StorageData({}, {})
         cfn_params = storage_params.cfn_params
-        cfn_converter = self.definition.get("cfn_param_mapping", None)
+        cfn_converter = self.definition.cfn_param_mapping
 
         cfn_items = []
-        for param_key, param_definition in self.definition.get("params").items():
+        for param_key, param_definition in self.definition.params.items():
             param = self.get_param(param_key)
             if param:
                 cfn_items.append(param.get_cfn_value())
             else:
-                param_type = param_definition.get("type", CfnParam)
+                param_type = param_definition.type or CfnParam
                 param = param_type(self.key, self.label, param_key, param_definition, self.pcluster_config)
                 cfn_items.append(param.get_cfn_value())
 
@@ -1213,7 +1230,7 @@ class EFSCfnSection(CfnSection):
             master_avail_zone = "fake_az1"
             compute_avail_zone = "fake_az2"
             # empty dict or first item is NONE --> set all values to NONE
-            cfn_items = ["NONE"] * len(self.definition.get("params"))
+            cfn_items = ["NONE"] * len(self.definition.params)
         else:
             # add another CFN param that will identify if create or not a Mount Target for the given EFS FS Id
             master_avail_zone = self.pcluster_config.get_master_availability_zone()
@@ -1266,6 +1283,7 @@ class ClusterCfnSection(CfnSection):
 class VolumeSizeParam(IntCfnParam):
     """Class to manage ebs volume_size parameter."""
 
+    @refresh_depends_on(("ebs", "volume_size"), ("ebs", "ebs_snapshot_id"))
     def refresh(self):
         """
         We need this method to check whether the user have an input on ebs volume_size.
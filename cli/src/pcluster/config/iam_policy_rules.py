@@ -56,7 +56,7 @@ class CloudWatchAgentServerPolicyInclusionRule(EC2IAMPolicyInclusionRule):
             should_include_policy = cw_log_section and cw_log_section.get_param_value("enable")
         else:
             # A cw_log section was not referenced from the config file's cluster section
-            should_include_policy = cw_log_settings.referred_section_definition["params"]["enable"]["default"]
+            should_include_policy = cw_log_settings.referred_section_definition.params["enable"].default
         return should_include_policy
 
     @classmethod
@@ -12,6 +12,7 @@ from collections import OrderedDict
 
 from pcluster import utils
 from pcluster.config.param_types import Param, Section, SettingsParam
+from pcluster.config.refresh_tracker import refresh_depends_on
 
 # ---------------------- Params ---------------------- #
 
@@ -103,6 +104,7 @@ class FloatJsonParam(JsonParam):
 class ScaleDownIdleTimeJsonParam(JsonParam):
     """JsonParam to manage scaledown_idletime for Json configuration."""
 
+    @refresh_depends_on(("scaling", "scaledown_idletime"))
     def refresh(self):
         """Take the value from the scaledown_idletime cfn parameter."""
         self.value = self.owner_section.get_param("scaledown_idletime").value
@@ -115,11 +117,14 @@ class ScaleDownIdleTimeJsonParam(JsonParam):
 class DefaultComputeQueueJsonParam(JsonParam):
     """JsonParam to manage default_queue parameter in cluster section."""
 
+    @refresh_depends_on(("cluster", "queue_settings"), ("queue", None))
     def refresh(self):
         """Take the label of the first queue as value."""
         queue_settings_param = self.pcluster_config.get_section("cluster").get_param("queue_settings")
         # First queue is the default one
         if queue_settings_param:
+            # queue_settings follows default_queue in the cluster section, so it could be not refreshed yet
+            queue_settings_param.refresh_if_changed()
             queue_settings_param_value = queue_settings_param.value
 
             if queue_settings_param_value:
@@ -183,7 +188,7 @@ class SettingsJsonParam(SettingsParam):
         json_subdict = _get_storage_subdict(self, json_params)
         labels = None
         if json_subdict:
-            if self.referred_section_definition.get("max_resources", 1) > 1:
+            if self.referred_section_definition.max_resources > 1:
                 # Multiple sections: the dict is under <section_key>_settings
                 json_subdict = json_subdict.get(self.key)
                 if json_subdict:
@@ -214,8 +219,8 @@ class JsonSection(Section):
 
     def from_storage(self, storage_params):
         """Load the section from storage params."""
-        for param_key, param_definition in self.definition.get("params").items():
-            param_type = param_definition.get("type", Param)
+        for param_key, param_definition in self.definition.params.items():
+            param_type = param_definition.type or Param
             param = param_type(
                 self.key, self.label, param_key, param_definition, self.pcluster_config, owner_section=self
             ).from_storage(storage_params)
@@ -224,7 +229,7 @@ class JsonSection(Section):
 
     def to_storage(self, storage_params):
         """Write the section into storage params."""
-        for param_key, _ in self.definition.get("params").items():
+        for param_key, _ in self.definition.params.items():
             param = self.get_param(param_key)
             if param:
                 param.to_storage(storage_params)
@@ -237,21 +242,38 @@ class JsonSection(Section):
         """Get the default Param type managed by the Section type."""
         return JsonParam
 
-    def refresh(self):
+    def refresh(self, only_changed=False):
         """Refresh the Json section."""
-        self.refresh_section()
-        super(JsonSection, self).refresh()
+        self.refresh_section(only_changed)
+        super(JsonSection, self).refresh(only_changed)
+
+    def refresh_section(self, only_changed=False):
+        """
+        Perform custom refresh operations.
 
-    def refresh_section(self):
-        """Perform custom refresh operations."""
+        :param only_changed: if True, only the settings whose dependencies changed since the previous refresh are
+        refreshed
+        """
         pass
 
 
 class QueueJsonSection(JsonSection):
     """JSon Section for queues."""
 
-    def refresh_section(self):
-        """Take values of disable_hyperthreading and enable_efa from cluster section if not specified."""
+    # Params of the queue read by refresh_compute_resource
+    COMPUTE_RESOURCE_REFRESH_PARAM_KEYS = ["disable_hyperthreading", "enable_efa", "enable_efa_gdr"]
+
+    def __init__(self, section_definition, pcluster_config, section_label=None, parent_section=None):
+        self.__compute_resource_fingerprints = {}
+        super(QueueJsonSection, self).__init__(section_definition, pcluster_config, section_label, parent_section)
+
+    def refresh_section(self, only_changed=False):
+        """
+        Take values of disable_hyperthreading and enable_efa from cluster section if not specified.
+
+        The settings of the linked compute resources are refreshed only if their instance type or the related queue
+        settings changed.
+        """
         if self.get_param_value("disable_hyperthreading") is None:
             cluster_disable_hyperthreading = self.pcluster_config.get_section("cluster").get_param_value(
                 "disable_hyperthreading"
@@ -273,11 +295,24 @@ class QueueJsonSection(JsonSection):
             # None value at cluster level is converted to False at queue level
             self.get_param("enable_efa_gdr").value = cluster_enable_efa_gdr == "compute"
 
-        compute_resource_labels = self.get_param("compute_resource_settings").referred_section_labels
+        # Linked compute resources could have been added or removed since the previous refresh
+        compute_resource_settings_param = self.get_param("compute_resource_settings")
+        compute_resource_settings_param.refresh_if_changed(force=not only_changed)
+        compute_resource_labels = compute_resource_settings_param.referred_section_labels
         if compute_resource_labels:
+            queue_values = tuple(
+                self.get_param_value(param_key) for param_key in self.COMPUTE_RESOURCE_REFRESH_PARAM_KEYS
+            )
             for compute_resource_label in compute_resource_labels:
                 compute_resource_section = self.pcluster_config.get_section("compute_resource", compute_resource_label)
-                self.refresh_compute_resource(compute_resource_section)
+                fingerprint = (
+                    compute_resource_section,
+                    compute_resource_section.get_param_value("instance_type"),
+                    queue_values,
+                )
+                if not only_changed or self.__compute_resource_fingerprints.get(compute_resource_label) != fingerprint:
+                    self.refresh_compute_resource(compute_resource_section)
+                    self.__compute_resource_fingerprints[compute_resource_label] = fingerprint
 
     def refresh_compute_resource(self, compute_resource_section):
         """
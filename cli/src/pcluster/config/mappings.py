@@ -49,7 +49,7 @@ from pcluster.config.json_param_types import (
     ScaleDownIdleTimeJsonParam,
     SettingsJsonParam,
 )
-from pcluster.config.param_types import Visibility
+from pcluster.config.param_types import SectionDefinition, Visibility
 from pcluster.config.update_policy import UpdatePolicy
 from pcluster.config.validators import (
     architecture_os_validator,
@@ -1137,3 +1137,7 @@ CLUSTER_HIT = {
 }
 
 # fmt: on
+
+# Compile all the definitions once, sections and params refer to the compiled descriptors
+for _section_definition in [AWS, GLOBAL, ALIASES, CLUSTER_SIT, CLUSTER_HIT]:
+    SectionDefinition.of(_section_definition)
@@ -13,14 +13,22 @@ import logging
 import re
 import sys
 from abc import abstractmethod
+from collections import OrderedDict
 from enum import Enum
 
 from configparser import NoSectionError
 
+from pcluster.config.refresh_tracker import get_refresh_fingerprint, refresh_depends_on
 from pcluster.config.update_policy import UpdatePolicy
+from pcluster.config.validation_scheduler import ValidationScheduler
 from pcluster.config.validators import settings_validator
 from pcluster.utils import get_file_section_name
 
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
 LOGGER = logging.getLogger(__name__)
 
 if sys.version_info >= (3, 4):
@@ -47,6 +55,160 @@ class Visibility(Enum):
     PUBLIC = "PUBLIC"  # Can be specified in config file
 
 
+# ---------------------- Definitions ---------------------- #
+class _Definition(Mapping):
+    """
+    Base class for the immutable descriptors compiled from the section and param definitions in mappings.py.
+
+    Descriptors are read-only mappings exposing the same keys of the original definition, with nested definitions
+    compiled as well, and precomputed attributes for the values used when creating and validating the configuration.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items, **attributes):
+        object.__setattr__(self, "_items", items)
+        for name, value in attributes.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def of(cls, definition):
+        """Return the descriptor compiled from the given definition dictionary, compiling it at the first call."""
+        if isinstance(definition, cls):
+            return definition
+        # The definition is stored together with its descriptor, so that its id cannot be reused by another object
+        compiled = _COMPILED_DEFINITIONS.get(id(definition))
+        if compiled is None or compiled[0] is not definition:
+            compiled = (definition, cls(definition))
+            _COMPILED_DEFINITIONS[id(definition)] = compiled
+        return compiled[1]
+
+    def __getitem__(self, key):
+        return self._items[key]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{0} is immutable".format(self.__class__.__name__))
+
+    def __repr__(self):
+        return "{0}({1!r})".format(self.__class__.__name__, self._items)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # Descriptors are immutable, so they are shared by copies of sections and params
+        return self
+
+
+class ParamDefinition(_Definition):
+    """Compiled definition of a configuration parameter."""
+
+    __slots__ = (
+        "type",
+        "default",
+        "required",
+        "allowed_values",
+        "allowed_values_set",
+        "allowed_values_regex",
+        "validators",
+        "update_policy",
+        "visibility",
+        "cfn_param_mapping",
+        "referred_section",
+    )
+
+    def __init__(self, definition):
+        items = dict(definition)
+        validators = tuple(definition.get("validators", ()))
+        referred_section = definition.get("referred_section")
+        if referred_section is not None:
+            referred_section = items["referred_section"] = SectionDefinition.of(referred_section)
+            # Labels of the referred sections are validated for all the settings params
+            validators += (settings_validator,)
+        if validators:
+            items["validators"] = validators
+
+        allowed_values = definition.get("allowed_values")
+        super(ParamDefinition, self).__init__(
+            items,
+            type=definition.get("type"),
+            default=definition.get("default"),
+            required=definition.get("required", False),
+            allowed_values=allowed_values,
+            allowed_values_set=frozenset(allowed_values) if isinstance(allowed_values, list) else None,
+            allowed_values_regex=(
+                re.compile(allowed_values) if allowed_values and not isinstance(allowed_values, list) else None
+            ),
+            validators=validators,
+            update_policy=definition.get("update_policy", UpdatePolicy.UNKNOWN),
+            visibility=definition.get("visibility", Visibility.PUBLIC),
+            cfn_param_mapping=definition.get("cfn_param_mapping"),
+            referred_section=referred_section,
+        )
+
+
+class SectionDefinition(_Definition):
+    """Compiled definition of a configuration section."""
+
+    __slots__ = (
+        "key",
+        "type",
+        "autocreate",
+        "default_label",
+        "max_resources",
+        "validators",
+        "params",
+        "public_param_keys",
+        "refresh_param_keys",
+        "cfn_param_mapping",
+        "cluster_model",
+    )
+
+    def __init__(self, definition):
+        items = dict(definition)
+        params = items["params"] = OrderedDict(
+            (param_key, ParamDefinition.of(param_definition))
+            for param_key, param_definition in definition.get("params", {}).items()
+        )
+        validators = tuple(definition.get("validators", ()))
+        if validators:
+            items["validators"] = validators
+
+        super(SectionDefinition, self).__init__(
+            items,
+            key=definition.get("key"),
+            type=definition.get("type"),
+            autocreate=definition.get("autocreate", False),
+            default_label=definition.get("default_label"),
+            max_resources=int(definition.get("max_resources", 1)),
+            validators=validators,
+            params=params,
+            public_param_keys=frozenset(
+                param_key
+                for param_key, param_definition in params.items()
+                if param_definition.visibility == Visibility.PUBLIC
+            ),
+            # Params implementing refresh, the default param types of the sections don't
+            refresh_param_keys=tuple(
+                param_key
+                for param_key, param_definition in params.items()
+                if param_definition.type and getattr(param_definition.type.refresh, "dependencies", None) != ()
+            ),
+            cfn_param_mapping=definition.get("cfn_param_mapping"),
+            cluster_model=definition.get("cluster_model"),
+        )
+
+
+# Descriptors compiled so far, by id of the definition dictionary
+_COMPILED_DEFINITIONS = {}
+
+
 # ---------------------- Param ---------------------- #
 class Param(ABC):
     """
@@ -60,12 +222,13 @@ class Param(ABC):
         self.section_key = section_key
         self.section_label = section_label
         self.key = param_key
-        self.definition = param_definition
+        self.definition = ParamDefinition.of(param_definition)
         self.pcluster_config = pcluster_config
         self.owner_section = owner_section
 
         # initialize parameter value by using default specified in the mappings file
         self.value = None
+        self.__refresh_fingerprint = None
         self._from_definition()
 
     def get_value_from_string(self, string_value):
@@ -130,46 +293,62 @@ class Param(ABC):
 
     def _check_allowed_values(self):
         """Verify if the parameter value is one of the allowed values specified in the mapping file."""
-        allowed_values = self.definition.get("allowed_values", None)
+        allowed_values = self.definition.allowed_values
         if allowed_values:
-            if isinstance(allowed_values, list):
-                if self.value not in allowed_values:
+            if self.definition.allowed_values_set is not None:
+                if self.value not in self.definition.allowed_values_set:
                     self.pcluster_config.error(
                         "The configuration parameter '{0}' has an invalid value '{1}'\n"
                         "Allowed values are: {2}".format(self.key, self.value, allowed_values)
                     )
             else:
-                # convert to regex
-                if not re.compile(allowed_values).match(str(self.value)):
+                if not self.definition.allowed_values_regex.match(str(self.value)):
                     self.pcluster_config.error(
                         "The configuration parameter '{0}' has an invalid value '{1}'\n"
                         "Allowed values are: {2}".format(self.key, self.value, allowed_values)
                     )
 
-    def validate(self):
-        """Call validation functions for the parameter, if there."""
-        if self.definition.get("required") and self.value is None:
+    def validate(self, validation_scheduler=None):
+        """
+        Call validation functions for the parameter, if there.
+
+        :param validation_scheduler: scheduler collecting the validators to call. If not specified, validators are
+        called immediately.
+        """
+        if self.definition.required and self.value is None:
             sys.exit("Configuration parameter '{0}' must have a value".format(self.key))
 
-        for validation_func in self.definition.get("validators", []):
+        run_validators = validation_scheduler is None
+        if run_validators:
+            validation_scheduler = ValidationScheduler(max_workers=1)
+
+        for validation_func in self.definition.validators:
             if self.value is None:
                 LOGGER.debug("Configuration parameter '%s' has no value", self.key)
             else:
-                errors, warnings = validation_func(self.key, self.value, self.pcluster_config)
-                if errors:
-                    self.pcluster_config.error(
-                        "The configuration parameter '{0}' generated the following errors:\n{1}".format(
-                            self.key, "\n".join(errors)
-                        )
-                    )
-                elif warnings:
-                    self.pcluster_config.warn(
-                        "The configuration parameter '{0}' generated the following warnings:\n{1}".format(
-                            self.key, "\n".join(warnings)
-                        )
-                    )
-                else:
-                    LOGGER.debug("Configuration parameter '%s' is valid", self.key)
+                validation_scheduler.add_task(
+                    validation_func, (self.key, self.value, self.pcluster_config), self._report_validation_result
+                )
+
+        if run_validators:
+            validation_scheduler.run()
+
+    def _report_validation_result(self, errors, warnings):
+        """Report errors and warnings returned by a validator of the parameter."""
+        if errors:
+            self.pcluster_config.error(
+                "The configuration parameter '{0}' generated the following errors:\n{1}".format(
+                    self.key, "\n".join(errors)
+                )
+            )
+        elif warnings:
+            self.pcluster_config.warn(
+                "The configuration parameter '{0}' generated the following warnings:\n{1}".format(
+                    self.key, "\n".join(warnings)
+                )
+            )
+        else:
+            LOGGER.debug("Configuration parameter '%s' is valid", self.key)
 
     def to_file(self, config_parser, write_defaults=False):
         """Set parameter in the config_parser in the right section."""
@@ -200,7 +379,7 @@ class Param(ABC):
         is contained within. Otherwise, pass the literal value, defaulting to
         None if not specified.
         """
-        default = self.definition.get("default", None)
+        default = self.definition.default
         if callable(default):
             # Assume that functions are used to set default values conditionally
             # based on the value of other parameters within the same section.
@@ -214,18 +393,40 @@ class Param(ABC):
         """Reset parameter to default value."""
         self.value = self.get_default_value()
 
+    @refresh_depends_on()
     def refresh(self):
         """
         Refresh the parameter's value.
 
         Does nothing by default. Subclasses can implement this method by updating parameter's value based on
-        PClusterConfig status.
+        PClusterConfig status, declaring the configuration parameters they read with refresh_depends_on.
         """
         pass
 
+    def get_refresh_dependencies(self):
+        """Return the (section_key, param_key) tuples read by the refresh method, None if not declared."""
+        return getattr(type(self).refresh, "dependencies", None)
+
+    def refresh_if_changed(self, force=False):
+        """
+        Refresh the parameter if the values of its refresh dependencies changed since its previous refresh.
+
+        Parameters not declaring their refresh dependencies are always refreshed.
+        :param force: refresh the parameter even if its dependencies did not change
+        """
+        dependencies = self.get_refresh_dependencies()
+        if not dependencies:
+            # Without dependencies, the refresh is done only when undeclared or explicitly requested
+            if force or dependencies is None:
+                self.refresh()
+        elif force or get_refresh_fingerprint(self.pcluster_config, dependencies) != self.__refresh_fingerprint:
+            self.refresh()
+            # The fingerprint is computed after the refresh, which could update the dependencies themselves
+            self.__refresh_fingerprint = get_refresh_fingerprint(self.pcluster_config, dependencies)
+
     def get_update_policy(self):
         """Get the update policy of the parameter."""
-        return self.definition.get("update_policy", UpdatePolicy.UNKNOWN)
+        return self.definition.update_policy
 
     def __eq__(self, other):
         return other and (self.key == other.key) and self._value_eq(other)
@@ -257,10 +458,10 @@ class SettingsParam(Param):
 
     def __init__(self, section_key, section_label, param_key, param_definition, pcluster_config, owner_section=None):
         """Extend Param by adding info regarding the section referred by the settings."""
-        self.referred_section_definition = param_definition.get("referred_section")
-        self.referred_section_key = self.referred_section_definition.get("key")
-        self.referred_section_type = self.referred_section_definition.get("type")
-        param_definition.get("validators", []).append(settings_validator)
+        param_definition = ParamDefinition.of(param_definition)
+        self.referred_section_definition = param_definition.referred_section
+        self.referred_section_key = self.referred_section_definition.key
+        self.referred_section_type = self.referred_section_definition.type
         super(SettingsParam, self).__init__(
             section_key, section_label, param_key, param_definition, pcluster_config, owner_section
         )
@@ -272,7 +473,7 @@ class SettingsParam(Param):
         If the referred section has the "autocreate" attribute, it means that it is required to initialize
         the settings param and the related section with default values (i.e. vpc, scaling).
         """
-        return "default" if self.referred_section_definition.get("autocreate", False) else None
+        return "default" if self.referred_section_definition.autocreate else None
 
     def _from_definition(self):
         self.value = self.get_default_value()
@@ -322,7 +523,7 @@ class SettingsParam(Param):
 
         return self
 
-    def validate(self):
+    def validate(self, validation_scheduler=None):
         """
         Validate the Settings Parameter.
 
@@ -333,7 +534,7 @@ class SettingsParam(Param):
         section).
         """
         labels = None if not self.value else self.value.split(",")  # Section labels in the settings param
-        max_resources = self.referred_section_definition.get("max_resources", 1)  # Max resources per parent section
+        max_resources = self.referred_section_definition.max_resources  # Max resources per parent section
 
         if labels and len(labels) > max_resources:
             self.pcluster_config.error(
@@ -342,7 +543,7 @@ class SettingsParam(Param):
                 )
             )
 
-        super(SettingsParam, self).validate()
+        super(SettingsParam, self).validate(validation_scheduler)
 
     def _value_eq(self, other):
         """Compare settings labels ignoring positions and extra spaces."""
@@ -363,13 +564,11 @@ class SettingsParam(Param):
         that any existing default section of the same type will be removed from the configuration before adding the new
         one.
         """
-        self.pcluster_config.remove_section(
-            self.referred_section_key, self.referred_section_definition.get("default_label")
-        )
+        self.pcluster_config.remove_section(self.referred_section_key, self.referred_section_definition.default_label)
         self.pcluster_config.add_section(section)
 
     def _add_sections(self, sections):
-        if self.referred_section_definition.get("max_resources", 1) == 1:
+        if self.referred_section_definition.max_resources == 1:
             # Single section management
             if len(sections) > 1:
                 self.pcluster_config.error(
@@ -388,6 +587,10 @@ class SettingsParam(Param):
                     )
                 self.pcluster_config.add_section(section)
 
+    def get_refresh_dependencies(self):
+        """Settings params are refreshed when the referred sections are added, removed or renamed."""
+        return ((self.referred_section_key, None),)
+
     def refresh(self):
         """Update SettingsParam value to make it match actual sections in config."""
         sections_labels = [
@@ -405,12 +608,12 @@ class SettingsParam(Param):
             # evaluate all the parameters of the section and
             # add "*_settings = *" to the parent section
             # only if at least one parameter value is different from the default
-            for param_key, param_definition in self.referred_section_definition.get("params").items():
+            for param_key, param_definition in self.referred_section_definition.params.items():
                 param_value = section.get_param_value(param_key)
 
                 section_name = get_file_section_name(self.section_key, self.section_label)
                 if not config_parser.has_option(section_name, self.key) and (
-                    write_defaults or (param_value != param_definition.get("default", None))
+                    write_defaults or (param_value != param_definition.default)
                 ):
                     _ensure_section_existence(config_parser, section_name)
                     config_parser.set(section_name, self.key, self.get_string_value())
@@ -429,13 +632,13 @@ class Section(ABC):
     """Base class to manage configuration sections (e.g vpc, scaling, aws, etc)."""
 
     def __init__(self, section_definition, pcluster_config, section_label=None, parent_section=None):
-        self.definition = section_definition
-        self.key = section_definition.get("key")
-        self.autocreate = section_definition.get("autocreate", False)
-        self._label = section_label or self.definition.get("default_label", "")
+        self.definition = SectionDefinition.of(section_definition)
+        self.key = self.definition.key
+        self.autocreate = self.definition.autocreate
+        self._label = section_label or self.definition.default_label or ""
         # All sections have only 1 resource by default, which means they refer to a single Cfn resource or set
         # of resources
-        self.max_resources = int(section_definition.get("max_resources", "1"))
+        self.max_resources = self.definition.max_resources
         self.pcluster_config = pcluster_config
 
         self.parent_section = parent_section
@@ -457,21 +660,14 @@ class Section(ABC):
 
     def from_file(self, config_parser, fail_on_absence=False):
         """Initialize section configuration parameters by parsing config file."""
-        params_definitions = self.definition.get("params")
         section_name = get_file_section_name(self.key, self.label)
 
         # Only params with PUBLIC visibility can be specified in config file
-        public_param_keys = set(
-            [
-                key
-                for key, definition in params_definitions.items()
-                if definition.get("visibility", Visibility.PUBLIC) == Visibility.PUBLIC
-            ]
-        )
+        public_param_keys = self.definition.public_param_keys
 
         if config_parser.has_section(section_name):
-            for param_key, param_definition in params_definitions.items():
-                param_type = param_definition.get("type", self.get_default_param_type())
+            for param_key, param_definition in self.definition.params.items():
+                param_type = param_definition.type or self.get_default_param_type()
 
                 param = param_type(
                     self.key,
@@ -500,59 +696,77 @@ class Section(ABC):
 
     def _from_definition(self):
         """Initialize parameters with default values."""
-        for param_key, param_definition in self.definition.get("params").items():
-            param_type = param_definition.get("type", self.get_default_param_type())
+        for param_key, param_definition in self.definition.params.items():
+            param_type = param_definition.type or self.get_default_param_type()
             param = param_type(
                 self.key, self.label, param_key, param_definition, self.pcluster_config, owner_section=self
             )
             self.add_param(param)
 
-    def validate(self):
-        """Call the validator function of the section and of all the parameters."""
+    def validate(self, validation_scheduler=None):
+        """
+        Call the validator function of the section and of all the parameters.
+
+        :param validation_scheduler: scheduler collecting the validators to call. If not specified, validators are
+        called immediately.
+        """
         if self.params:
+            run_validators = validation_scheduler is None
+            if run_validators:
+                validation_scheduler = ValidationScheduler(max_workers=1)
+
             section_name = get_file_section_name(self.key, self.label)
-            LOGGER.debug("Validating section '[%s]'...", section_name)
+            LOGGER.debug("Collecting validators of section '[%s]'...", section_name)
 
             # validate section
-            for validation_func in self.definition.get("validators", []):
-                errors, warnings = validation_func(self.key, self.label, self.pcluster_config)
-                if errors:
-                    self.pcluster_config.error(
-                        "The section [{0}] is wrongly configured\n" "{1}".format(section_name, "\n".join(errors))
-                    )
-                elif warnings:
-                    self.pcluster_config.warn(
-                        "The section [{0}] is wrongly configured\n{1}".format(section_name, "\n".join(warnings))
-                    )
-                else:
-                    LOGGER.debug("Section '[%s]' is valid", section_name)
+            for validation_func in self.definition.validators:
+                validation_scheduler.add_task(
+                    validation_func, (self.key, self.label, self.pcluster_config), self._report_validation_result
+                )
 
             # validate items
-            LOGGER.debug("Validating parameters of section '[%s]'...", section_name)
-            for param_key, param_definition in self.definition.get("params").items():
-                param_type = param_definition.get("type", self.get_default_param_type())
+            for param_key, param_definition in self.definition.params.items():
+                param_type = param_definition.type or self.get_default_param_type()
 
                 param = self.get_param(param_key)
                 if param:
-                    param.validate()
-                else:
-                    # define a default param and validate it
-                    param_type(self.key, self.label, param_key, param_definition, self.pcluster_config).validate()
-            LOGGER.debug("Parameters validation of section '[%s]' completed correctly.", section_name)
+                    param.validate(validation_scheduler)
+                elif param_definition.validators or param_definition.required:
+                    # define a default param and validate it, if there is anything to validate
+                    param_type(self.key, self.label, param_key, param_definition, self.pcluster_config).validate(
+                        validation_scheduler
+                    )
+
+            if run_validators:
+                validation_scheduler.run()
+
+    def _report_validation_result(self, errors, warnings):
+        """Report errors and warnings returned by a validator of the section."""
+        section_name = get_file_section_name(self.key, self.label)
+        if errors:
+            self.pcluster_config.error(
+                "The section [{0}] is wrongly configured\n" "{1}".format(section_name, "\n".join(errors))
+            )
+        elif warnings:
+            self.pcluster_config.warn(
+                "The section [{0}] is wrongly configured\n{1}".format(section_name, "\n".join(warnings))
+            )
+        else:
+            LOGGER.debug("Section '[%s]' is valid", section_name)
 
     def to_file(self, config_parser, write_defaults=False):
         """Create the section and add all the parameters in the config_parser."""
         section_name = get_file_section_name(self.key, self.label)
 
-        for param_key, param_definition in self.definition.get("params").items():
-            if param_definition.get("visibility", Visibility.PUBLIC) == Visibility.PUBLIC:
+        for param_key, param_definition in self.definition.params.items():
+            if param_definition.visibility == Visibility.PUBLIC:
                 param = self.get_param(param_key)
                 if not param:
                     # generate a default param
-                    param_type = param_definition.get("type", self.get_default_param_type())
+                    param_type = param_definition.type or self.get_default_param_type()
                     param = param_type(self.key, self.label, param_key, param_definition, self.pcluster_config)
 
-                if write_defaults or param.value != param_definition.get("default", None):
+                if write_defaults or param.value != param_definition.default:
                     # add section in the config file only if at least one parameter value is different by the default
                     _ensure_section_existence(config_parser, section_name)
 
@@ -600,10 +814,21 @@ class Section(ABC):
         """
         return self.get_param(param_key).value if self.get_param(param_key) else None
 
-    def refresh(self):
-        """Refresh all parameters."""
-        for _, param in self.params.items():
-            param.refresh()
+    def refresh(self, only_changed=False):
+        """
+        Refresh all parameters.
+
+        :param only_changed: if True, only the parameters whose refresh dependencies changed since their previous
+        refresh are refreshed
+        """
+        if only_changed:
+            for param_key in self.definition.refresh_param_keys:
+                param = self.params.get(param_key)
+                if param:
+                    param.refresh_if_changed()
+        else:
+            for _, param in self.params.items():
+                param.refresh_if_changed(force=True)
 
     @abstractmethod
     def from_storage(self, storage_params):
@@ -16,6 +16,7 @@ import logging
 import os
 import stat
 import sys
+from contextlib import contextmanager
 
 import boto3
 import configparser
@@ -25,7 +26,9 @@ from pcluster.cluster_model import ClusterModel, get_cluster_model, infer_cluste
 from pcluster.config.cfn_param_types import ClusterCfnSection
 from pcluster.config.mappings import ALIASES, AWS, GLOBAL
 from pcluster.config.param_types import StorageData
+from pcluster.config.validation_scheduler import ValidationScheduler
 from pcluster.utils import (
+    INSTANCE_TYPE_INFO_CATALOG,
     get_cfn_param,
     get_file_section_name,
     get_installed_version,
@@ -33,10 +36,14 @@ from pcluster.utils import (
     get_stack_name,
     get_stack_version,
     is_hit_enabled_cluster,
+    is_instance_type_format,
 )
 
 LOGGER = logging.getLogger(__name__)
 
+# Keys of the params whose value is one or more (comma separated) EC2 instance types
+INSTANCE_TYPE_PARAM_KEYS = ["master_instance_type", "compute_instance_type", "instance_type"]
+
 
 def default_config_file_path():
     """Return the default path for the ParallelCluster configuration file."""
@@ -75,12 +82,15 @@ class PclusterConfig(object):
         # "From Stack" initialization parameters:
         :param cluster_name: the cluster name associated to a running Stack,
         if specified the initialization will start from the running Stack
-        :param auto_refresh: if set, refresh() method will be called every time something changes in the structure of
-        the configuration, like a section being added, removed or renamed.
+        :param auto_refresh: if set, the configuration will be refreshed every time something changes in the structure
+        of the configuration, like a section being added, removed or renamed. Only the sections and parameters affected
+        by the changes applied since the previous refresh are refreshed.
         :param enforce_version: when True enforces the CLI version to be of the same version as the cluster the user
         is interacting with.
         """
         self.__autorefresh = False  # Initialization in progress
+        self.__batch_update_depth = 0
+        self.__refresh_pending = False
         self.fail_on_error = fail_on_error
         self.cfn_stack = None
         self.__sections = OrderedDict({})
@@ -103,6 +113,8 @@ class PclusterConfig(object):
 
         self.__autorefresh = auto_refresh  # Initialization completed
 
+        self.register_instance_types()
+
         # Refresh sections and parameters
         self._config_updated()
 
@@ -217,7 +229,7 @@ class PclusterConfig(object):
         if section.key not in self.__sections:
             self.__sections[section.key] = OrderedDict({})
 
-        section_label = section.label if section.label else section.definition.get("default_label", "default")
+        section_label = section.label if section.label else section.definition.default_label or "default"
         self.__sections[section.key][section_label] = section
         self._config_updated()
 
@@ -265,7 +277,7 @@ class PclusterConfig(object):
         cluster_model = ClusterModel.SIT
         cluster_section = self.get_section("cluster")
         if cluster_section:
-            cluster_model = get_cluster_model(cluster_section.definition.get("cluster_model"))
+            cluster_model = get_cluster_model(cluster_section.definition.cluster_model)
         return cluster_model
 
     @property
@@ -420,6 +432,22 @@ class PclusterConfig(object):
         """Enable or disable the configuration autorefresh."""
         self.__autorefresh = refresh_enabled
 
+    @contextmanager
+    def batch_update(self):
+        """
+        Defer the automatic refresh of the configuration until the end of the with block.
+
+        The sections and parameters affected by all the changes applied in the block are refreshed once on exit, if
+        autorefresh is enabled. Blocks can be nested, in which case the refresh happens on exit of the outermost one.
+        """
+        self.__batch_update_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_update_depth -= 1
+        if self.__refresh_pending:
+            self._config_updated()
+
     def _config_updated(self):
         """
         Notify the PclusterConfig instance that the configuration structure has changed.
@@ -429,7 +457,11 @@ class PclusterConfig(object):
         or not the autofresh function is enabled.
         """
         if self.__autorefresh:
-            self.refresh()
+            if self.__batch_update_depth:
+                self.__refresh_pending = True
+            else:
+                self.__refresh_pending = False
+                self.__refresh_sections(only_changed=True)
 
     def refresh(self):
         """
@@ -438,6 +470,16 @@ class PclusterConfig(object):
         This method must be called if structural configuration changes have been applied, like updating a section
         label, adding or removing a section etc.
         """
+        self.__refresh_sections()
+
+    def __refresh_sections(self, only_changed=False):
+        """
+        Reload the sections structure and refresh the configuration sections.
+
+        :param only_changed: if True, only the parameters whose dependencies changed since their previous refresh are
+        refreshed. Parameters are refreshed in section order, so changes are propagated to the parameters depending on
+        them in the same pass.
+        """
         # Rebuild the new sections structure
         new_sections = OrderedDict({})
         for key, sections in self.__sections.items():
@@ -447,10 +489,33 @@ class PclusterConfig(object):
             new_sections[key] = new_sections_map
         self.__sections = new_sections
 
+        # Fetch all the referenced instance types at once, before sections start to look them up one by one
+        self.register_instance_types()
+
         # Refresh all sections
         for _, sections in self.__sections.items():
             for _, section in sections.items():
-                section.refresh()
+                section.refresh(only_changed)
+
+    def get_instance_types(self):
+        """Return the list of the EC2 instance types referenced by the configuration, without duplicates."""
+        instance_types = []
+        for _, sections in self.__sections.items():
+            for _, section in sections.items():
+                for param_key in INSTANCE_TYPE_PARAM_KEYS:
+                    param = section.params.get(param_key)
+                    if not param or not param.value:
+                        continue
+                    for instance_type in str(param.value).split(","):
+                        instance_type = instance_type.strip()
+                        # Skip batch instance families and "optimal"
+                        if is_instance_type_format(instance_type) and instance_type not in instance_types:
+                            instance_types.append(instance_type)
+        return instance_types
+
+    def register_instance_types(self):
+        """Register the referenced instance types in the catalog, so that they are retrieved with batched calls."""
+        INSTANCE_TYPE_INFO_CATALOG.register(self.get_instance_types())
 
     def __init_sections_from_cfn(self, cluster_name):
         try:
@@ -487,9 +552,12 @@ class PclusterConfig(object):
 
     def validate(self):
         """Validate the configuration."""
+        # Collect the validators of all the sections first, so that they can be run concurrently
+        validation_scheduler = ValidationScheduler()
         for _, sections in self.__sections.items():
             for _, section in sections.items():
-                section.validate()
+                section.validate(validation_scheduler)
+        validation_scheduler.run()
 
         # test provided configuration
         self.__test_configuration()
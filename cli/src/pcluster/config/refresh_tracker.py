@@ -0,0 +1,47 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+def refresh_depends_on(*dependencies):
+    """
+    Declare the configuration parameters read by the refresh function of a Param.
+
+    Together, the declared dependencies form the dependency graph of the configuration: when the configuration is
+    refreshed after a change, only the params whose dependencies have a different value since their previous refresh
+    are refreshed again. Refresh functions without declared dependencies are always called.
+    :param dependencies: (section_key, param_key) tuples, values are read from all the sections with the given key.
+    A None param_key refers to the labels of the sections, so that the function is called again when a section with
+    the given key is added, removed or renamed.
+    """
+
+    def decorator(refresh_func):
+        refresh_func.dependencies = dependencies
+        return refresh_func
+
+    return decorator
+
+
+def get_refresh_fingerprint(pcluster_config, dependencies):
+    """Return a tuple identifying the current values of the given (section_key, param_key) dependencies."""
+    dependency_values = []
+    for section_key, param_key in dependencies:
+        sections = pcluster_config.get_sections(section_key)
+        if param_key is None:
+            dependency_values.append((section_key, tuple(sections)))
+            continue
+        for section_label, section in sections.items():
+            param = section.params.get(param_key)
+            value = param.value if param else None
+            # Containers can be modified in place, so their content is compared rather than the object itself
+            if isinstance(value, (dict, list)):
+                value = repr(value)
+            dependency_values.append((section_key, section_label, param_key, value))
+    return tuple(dependency_values)
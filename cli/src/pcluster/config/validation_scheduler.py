@@ -0,0 +1,225 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pcluster.client_pool import install_client_pool
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ValidationTask(object):
+    """A validator call, together with the function to invoke to report its result."""
+
+    def __init__(self, validation_func, args, report_func):
+        self.validation_func = validation_func
+        self.args = args
+        self.report_func = report_func
+        self.result = None
+        self.exc_info = None
+
+    @property
+    def remote_services(self):
+        """Return the remote services called by the validator, as declared with the remote_services decorator."""
+        return getattr(self.validation_func, "remote_services", ())
+
+    def execute(self):
+        """Call the validator and store its result or the raised exception."""
+        try:
+            if hasattr(self.validation_func, "dependencies"):
+                self.result = VALIDATION_MEMO.get(self.validation_func, self.args)
+            else:
+                self.result = self.validation_func(*self.args)
+        except BaseException:  # SystemExit included, to be raised again when reporting
+            self.exc_info = sys.exc_info()
+
+    def report(self):
+        """Report the validator result, raising again the exception, if any."""
+        if self.exc_info:
+            raise self.exc_info[1]
+        errors, warnings = self.result
+        self.report_func(errors, warnings)
+
+
+class ValidationScheduler(object):
+    """
+    Collect all the validators to call for a configuration and run them on a bounded thread pool.
+
+    Validators calling remote services are executed concurrently, limiting the number of concurrent calls to each
+    service. Other validators are executed in the calling thread.
+    Results are always reported in the same order in which tasks were added, so that errors and warnings are printed
+    in a deterministic section/param order. Since errors make the process exit, the first error in that order wins.
+    """
+
+    MAX_WORKERS = 8
+    DEFAULT_SERVICE_MAX_CONCURRENCY = 4
+    SERVICE_MAX_CONCURRENCY = {"ec2": 6, "iam": 2}
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.__tasks = []
+
+    def add_task(self, validation_func, args, report_func):
+        """
+        Add a validator call to the scheduler.
+
+        :param validation_func: the validator function
+        :param args: the positional arguments of the validator
+        :param report_func: function called with errors and warnings returned by the validator
+        """
+        self.__tasks.append(ValidationTask(validation_func, args, report_func))
+
+    def run(self):
+        """Execute all the collected validators and report their results in order."""
+        tasks, self.__tasks = self.__tasks, []
+        remote_tasks = [task for task in tasks if task.remote_services]
+        if self.max_workers > 1 and len(remote_tasks) > 1:
+            LOGGER.debug("Running %d remote validators with %d workers", len(remote_tasks), self.max_workers)
+            self.__execute_concurrently(remote_tasks)
+            for task in tasks:
+                if not task.remote_services:
+                    task.execute()
+                task.report()
+        else:
+            for task in tasks:
+                task.execute()
+                task.report()
+
+    def __execute_concurrently(self, tasks):
+        # boto3 default session is not thread safe, make sure workers share a pool of thread safe clients
+        install_client_pool()
+
+        services = set(service for task in tasks for service in task.remote_services)
+        semaphores = {
+            service: threading.BoundedSemaphore(
+                self.SERVICE_MAX_CONCURRENCY.get(service, self.DEFAULT_SERVICE_MAX_CONCURRENCY)
+            )
+            for service in services
+        }
+
+        def _execute(task):
+            # Acquire semaphores in a fixed order to avoid deadlocks between validators calling multiple services
+            task_semaphores = [semaphores[service] for service in sorted(task.remote_services)]
+            for semaphore in task_semaphores:
+                semaphore.acquire()
+            try:
+                task.execute()
+            finally:
+                for semaphore in reversed(task_semaphores):
+                    semaphore.release()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for future in [executor.submit(_execute, task) for task in tasks]:
+                future.result()
+        finally:
+            executor.shutdown(wait=True)
+
+
+def remote_services(*services):
+    """
+    Declare the remote services called by a validator.
+
+    Validators declaring remote services are run concurrently by the ValidationScheduler, with a limit on the number of
+    concurrent calls to each service.
+    """
+
+    def decorator(validation_func):
+        validation_func.remote_services = services
+        return validation_func
+
+    return decorator
+
+
+class ValidationMemo(object):
+    """
+    Process-wide memo of the results of the validators declaring their dependencies.
+
+    A result is reused when a validator is called again with the same fingerprint, made of the parameter key and value,
+    the region and the current values of the configuration parameters declared with the depends_on decorator.
+    Validators raising exceptions are never memoized.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__results = {}
+        self.__fingerprint_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, validation_func, args):
+        """
+        Return the result of the validator for the given arguments, calling it only if not memoized yet.
+
+        :param validation_func: the validator function, decorated with depends_on
+        :param args: the (key, value, pcluster_config) arguments of the validator
+        """
+        key = (validation_func, self.__fingerprint(validation_func, args))
+        with self.__lock:
+            fingerprint_lock = self.__fingerprint_locks.setdefault(key, threading.Lock())
+
+        # Concurrent calls with the same fingerprint wait for the first one to complete
+        with fingerprint_lock:
+            with self.__lock:
+                result = self.__results.get(key)
+                if result is not None:
+                    self.hits += 1
+                    LOGGER.debug("Reusing result of %s for %s", validation_func.__name__, args[0])
+                    return copy.deepcopy(result)
+                self.misses += 1
+
+            result = validation_func(*args)
+            with self.__lock:
+                self.__results[key] = copy.deepcopy(result)
+            return result
+
+    def clear(self):
+        """Remove all the memoized results."""
+        with self.__lock:
+            self.__results.clear()
+            self.__fingerprint_locks.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @staticmethod
+    def __fingerprint(validation_func, args):
+        """Return a string identifying the arguments of the validator and the configuration values it depends on."""
+        key, value, pcluster_config = args
+        dependency_values = []
+        for section_key, param_key in validation_func.dependencies:
+            for section_label, section in sorted(
+                pcluster_config.get_sections(section_key).items(), key=lambda item: str(item[0])
+            ):
+                param = section.params.get(param_key)
+                dependency_values.append((section_key, section_label, param_key, param.value if param else None))
+        return repr((key, value, pcluster_config.region, dependency_values))
+
+
+VALIDATION_MEMO = ValidationMemo()
+
+
+def depends_on(*dependencies):
+    """
+    Declare the configuration parameters, other than the validated one, read by a validator.
+
+    Results of validators declaring their dependencies are memoized by VALIDATION_MEMO, so that a validator is not
+    called again for a value already validated with the same dependencies.
+    :param dependencies: (section_key, param_key) tuples, values are read from all the sections with the given key
+    """
+
+    def decorator(validation_func):
+        validation_func.dependencies = dependencies
+        return validation_func
+
+    return decorator
@@ -17,6 +17,7 @@ from urllib.parse import urlparse
 import boto3
 from botocore.exceptions import ClientError, ParamValidationError
 
+from pcluster.config.validation_scheduler import depends_on, remote_services
 from pcluster.constants import CIDR_ALL_IPS, FSX_HDD_THROUGHPUT, FSX_SSD_THROUGHPUT
 from pcluster.dcv.utils import get_supported_dcv_os
 from pcluster.utils import (
@@ -115,6 +116,8 @@ def _check_sg_rules_for_port(rule, port_to_check):
     return False
 
 
+@remote_services("ec2", "efs")
+@depends_on(("vpc", "master_availability_zone"))
 def efs_id_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -240,6 +243,8 @@ def fsx_architecture_os_validator(section_key, section_label, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2", "fsx")
+@depends_on(("vpc", "master_subnet_id"))
 def fsx_id_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -412,6 +417,8 @@ def fsx_imported_file_chunk_size_validator(param_key, param_value, pcluster_conf
     return errors, warnings
 
 
+@remote_services("kms")
+@depends_on()
 def kms_key_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -424,6 +431,7 @@ def kms_key_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
 def efa_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -505,6 +513,8 @@ def _validate_efa_sg(pcluster_config, errors):
             errors.append(e.response.get("Error").get("Message"))
 
 
+@remote_services("ec2")
+@depends_on()
 def ec2_key_pair_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -516,6 +526,8 @@ def ec2_key_pair_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("iam")
+@depends_on()
 def ec2_iam_policies_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -531,6 +543,8 @@ def ec2_iam_policies_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
+@depends_on()
 def ec2_instance_type_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -553,6 +567,8 @@ def head_node_instance_type_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
+@depends_on()
 def ec2_vpc_id_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -580,6 +596,8 @@ def ec2_vpc_id_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
+@depends_on()
 def ec2_subnet_id_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -591,6 +609,8 @@ def ec2_subnet_id_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
+@depends_on()
 def ec2_security_group_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -602,6 +622,8 @@ def ec2_security_group_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
+@depends_on(("cluster", "architecture"))
 def ec2_ami_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -634,6 +656,8 @@ def ec2_ami_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
+@depends_on()
 def ec2_placement_group_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -649,6 +673,8 @@ def ec2_placement_group_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("http", "s3")
+@depends_on(("cluster", "s3_read_resource"), ("cluster", "s3_read_write_resource"))
 def url_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -673,6 +699,8 @@ def url_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("s3")
+@depends_on(("cluster", "s3_read_resource"), ("cluster", "s3_read_write_resource"))
 def s3_uri_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -714,6 +742,8 @@ def s3_uri_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("s3")
+@depends_on()
 def s3_bucket_uri_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -732,6 +762,8 @@ def s3_bucket_uri_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("s3")
+@depends_on()
 def s3_bucket_validator(param_key, param_value, pcluster_config):
     """Validate S3 bucket can be used to store cluster artifacts."""
     errors = []
@@ -779,6 +811,7 @@ def _process_generic_s3_bucket_error(client_error, bucket_name, warnings, errors
         )
 
 
+@remote_services("s3")
 def fsx_lustre_auto_import_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -817,6 +850,7 @@ def fsx_lustre_auto_import_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@depends_on(("ebs", "shared_dir"))
 def ebs_settings_validator(param_key, param_value, pcluster_config):
     """
     Validate the following cases.
@@ -849,6 +883,7 @@ def ebs_settings_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@depends_on()
 def shared_dir_validator(param_key, param_value, pcluster_config):
     """Validate that user is not specifying /NONE or NONE as shared_dir for any filesystem."""
     errors = []
@@ -860,6 +895,8 @@ def shared_dir_validator(param_key, param_value, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
+@depends_on()
 def ec2_volume_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -964,6 +1001,7 @@ def cluster_validator(section_key, section_label, pcluster_config):
     return errors, warnings
 
 
+@remote_services("ec2")
 def instances_architecture_compatibility_validator(param_key, param_value, pcluster_config):
     """Verify that master and compute instance types imply compatible architectures."""
     errors = []
@@ -994,6 +1032,8 @@ def instances_architecture_compatibility_validator(param_key, param_value, pclus
     return errors, warnings
 
 
+@remote_services("batch", "ec2")
+@depends_on(("cluster", "scheduler"), ("cluster", "max_vcpus"))
 def compute_instance_type_validator(param_key, param_value, pcluster_config):
     """Validate compute instance type, calling ec2_instance_type_validator if the scheduler is not awsbatch."""
     errors = []
@@ -1286,6 +1326,7 @@ def _get_efa_enabled_instance_types(errors):
     return instance_types
 
 
+@remote_services("fsx")
 def fsx_lustre_backup_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
@@ -1447,6 +1488,7 @@ def validate_backup_options(
         errors.append("Backups cannot be created on S3-linked file systems")
 
 
+@remote_services("ec2")
 def ebs_volume_size_snapshot_validator(section_key, section_label, pcluster_config):
     """
     Validate the following cases.
@@ -8,6 +8,7 @@
 # or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
+import os
 
 PCLUSTER_STACK_PREFIX = "parallelcluster-"
 PCLUSTER_NAME_MAX_LENGTH = 60
@@ -18,3 +19,4 @@ DEFAULT_ARCHITECTURE = "x86_64"
 SUPPORTED_ARCHITECTURES = ["x86_64", "arm64"]
 FSX_SSD_THROUGHPUT = [50, 100, 200]
 FSX_HDD_THROUGHPUT = [12, 40]
+CLI_LOG_FILE = os.path.join("~", ".parallelcluster", "pcluster-cli.log")
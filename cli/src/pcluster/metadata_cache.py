@@ -0,0 +1,169 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import errno
+import functools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import boto3
+import pkg_resources
+from botocore.exceptions import BotoCoreError, ClientError
+
+LOGGER = logging.getLogger(__name__)
+
+# Time to live of the cached entries, in seconds
+SUPPORTED_INSTANCE_TYPES_TTL = 24 * 60 * 60
+INSTANCE_TYPE_OFFERINGS_TTL = 24 * 60 * 60
+BATCH_INSTANCE_TYPES_TTL = 24 * 60 * 60
+LATEST_ALINUX_AMI_TTL = 6 * 60 * 60
+
+
+def get_default_cache_dir():
+    return os.path.expanduser(os.path.join("~", ".parallelcluster", "cache"))
+
+
+class MetadataCache(object):
+    """
+    Persistent on-disk cache of region-level EC2 metadata.
+
+    Entries are stored in a JSON file for each ParallelCluster version, AWS account and region, so that data is never
+    shared between different accounts or CLI versions. Each entry expires after its own TTL.
+    When the cache file grows over max_file_size, the oldest entries are evicted.
+    """
+
+    # Version of the cache file format, to be increased on incompatible changes
+    FORMAT_VERSION = 1
+    MAX_FILE_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_file_size=MAX_FILE_SIZE):
+        self.cache_dir = cache_dir or get_default_cache_dir()
+        self.max_file_size = max_file_size
+        self.enabled = True
+        self.__account_id = None
+
+    def get(self, key, loader, ttl):
+        """
+        Return the value stored for the given key, calling loader and storing its result if missing or expired.
+
+        :param key: the key of the cache entry
+        :param loader: function to call to retrieve the value, the result must be JSON serializable
+        :param ttl: time to live of the entry in seconds
+        """
+        cache_file = self.__get_cache_file() if self.enabled else None
+        if not cache_file:
+            return loader()
+
+        entries = self.__read(cache_file)
+        now = time.time()
+        entry = entries.get(key)
+        if entry and entry.get("expires_at", 0) > now:
+            LOGGER.debug("Metadata cache hit for %s", key)
+            return entry.get("value")
+
+        LOGGER.debug("Metadata cache miss for %s", key)
+        value = loader()
+        entries[key] = {"value": value, "stored_at": now, "expires_at": now + ttl}
+        self.__write(cache_file, entries)
+        return value
+
+    def clear(self):
+        """Remove all the cached entries, for all the versions, accounts and regions."""
+        if os.path.isdir(self.cache_dir):
+            LOGGER.debug("Removing metadata cache directory %s", self.cache_dir)
+            shutil.rmtree(self.cache_dir)
+
+    def __get_cache_file(self):
+        """Return the path of the cache file for the current version, account and region, or None if not available."""
+        region = os.environ.get("AWS_DEFAULT_REGION")
+        account_id = self.__get_account_id()
+        if not region or not account_id:
+            return None
+        version = pkg_resources.get_distribution("aws-parallelcluster").version
+        return os.path.join(self.cache_dir, version, account_id, "{0}.json".format(region))
+
+    def __get_account_id(self):
+        if not self.__account_id:
+            try:
+                self.__account_id = boto3.client("sts").get_caller_identity().get("Account")
+            except (BotoCoreError, ClientError) as e:
+                LOGGER.debug("Unable to retrieve AWS account id, disabling metadata cache: %s", e)
+                self.enabled = False
+        return self.__account_id
+
+    def __read(self, cache_file):
+        """Read the entries stored in the cache file, ignoring files that are missing, corrupted or outdated."""
+        try:
+            with open(cache_file) as f:
+                content = json.load(f)
+            if content.get("format_version") == self.FORMAT_VERSION:
+                return content.get("entries", {})
+        except (IOError, OSError, ValueError, AttributeError) as e:
+            LOGGER.debug("Unable to read metadata cache file %s: %s", cache_file, e)
+        return {}
+
+    def __write(self, cache_file, entries):
+        """Atomically write the given entries to the cache file, after removing expired and exceeding entries."""
+        now = time.time()
+        entries = {key: entry for key, entry in entries.items() if entry.get("expires_at", 0) > now}
+        content = json.dumps({"format_version": self.FORMAT_VERSION, "entries": entries})
+        while len(content) > self.max_file_size and entries:
+            oldest_key = min(entries, key=lambda key: entries[key].get("stored_at", 0))
+            LOGGER.debug("Evicting %s from metadata cache", oldest_key)
+            entries.pop(oldest_key)
+            content = json.dumps({"format_version": self.FORMAT_VERSION, "entries": entries})
+
+        try:
+            cache_dir = os.path.dirname(cache_file)
+            try:
+                os.makedirs(cache_dir)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+            # Write to a temporary file in the same directory and then rename it,
+            # to never leave a partially written cache file to concurrent CLI invocations
+            file_descriptor, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "w") as f:
+                    f.write(content)
+                getattr(os, "replace", os.rename)(tmp_file, cache_file)
+            except Exception:
+                os.remove(tmp_file)
+                raise
+        except (IOError, OSError) as e:
+            LOGGER.debug("Unable to write metadata cache file %s: %s", cache_file, e)
+
+
+METADATA_CACHE = MetadataCache()
+
+
+def cached(key, ttl):
+    """
+    Decorate a function to store its results in the metadata cache.
+
+    The arguments of the function, if any, are appended to the key of the cache entry.
+    :param key: prefix of the key of the cache entry
+    :param ttl: time to live of the entry in seconds
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            entry_key = ":".join([key] + [str(arg) for arg in args])
+            return METADATA_CACHE.get(entry_key, lambda: func(*args), ttl)
+
+        return wrapper
+
+    return decorator
@@ -8,8 +8,12 @@
 # or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 from botocore.exceptions import ClientError
 
+from pcluster.client_pool import install_client_pool
 from pcluster.cluster_model import ClusterModel
 from pcluster.config import mappings
 from pcluster.utils import disable_ht_via_cpu_options, get_default_threads_per_core, get_instance_type
@@ -18,6 +22,9 @@ from pcluster.utils import disable_ht_via_cpu_options, get_default_threads_per_c
 class HITClusterModel(ClusterModel):
     """HIT (Heterogeneous Instance Type model) cluster model."""
 
+    # Max number of concurrent dry-run tests of the compute resources
+    MAX_DRYRUN_WORKERS = 8
+
     def __init__(self):
         super(HITClusterModel, self).__init__("HIT")
 
@@ -95,7 +102,9 @@ class HITClusterModel(ClusterModel):
                 DryRun=True,
             )
 
-            for _, queue_section in pcluster_config.get_sections("queue").items():
+            # Test all the Compute Resources of all the queues
+            dryrun_tests = []
+            for queue_label, queue_section in pcluster_config.get_sections("queue").items():
                 queue_placement_group = queue_section.get_param_value("placement_group")
                 queue_placement_group = (
                     {"GroupName": queue_placement_group}
@@ -103,42 +112,74 @@ class HITClusterModel(ClusterModel):
                     else {}
                 )
 
-                compute_resource_section = self.select_dryrun_compute_resource(queue_section, pcluster_config)
-
-                disable_hyperthreading = compute_resource_section.get_param_value(
-                    "disable_hyperthreading"
-                ) and compute_resource_section.get_param_value("disable_hyperthreading_via_cpu_options")
-                self.__test_compute_resource(
-                    pcluster_config,
-                    compute_resource_section,
-                    disable_hyperthreading=disable_hyperthreading,
-                    ami_id=latest_alinux_ami_id,
-                    subnet=compute_subnet,
-                    security_groups_ids=security_groups_ids,
-                    placement_group=queue_placement_group,
-                )
-
+                compute_resource_labels = queue_section.get_param("compute_resource_settings").referred_section_labels
+                for compute_resource_label in compute_resource_labels:
+                    compute_resource_section = pcluster_config.get_section("compute_resource", compute_resource_label)
+                    disable_hyperthreading = compute_resource_section.get_param_value(
+                        "disable_hyperthreading"
+                    ) and compute_resource_section.get_param_value("disable_hyperthreading_via_cpu_options")
+                    launch_kwargs = self.__build_compute_resource_launch_kwargs(
+                        pcluster_config,
+                        compute_resource_section,
+                        disable_hyperthreading=disable_hyperthreading,
+                        ami_id=latest_alinux_ami_id,
+                        subnet=compute_subnet,
+                        security_groups_ids=security_groups_ids,
+                        placement_group=queue_placement_group,
+                    )
+                    dryrun_tests.append(("{0}/{1}".format(queue_label, compute_resource_label), launch_kwargs))
+
+            self.__test_compute_resources(pcluster_config, dryrun_tests)
         except ClientError:
             pcluster_config.error("Unable to validate configuration parameters.")
 
-    def select_dryrun_compute_resource(self, queue_section, pcluster_config):
+    def __test_compute_resources(self, pcluster_config, dryrun_tests):
         """
-        Select the "best" compute resource to run dryrun tests against.
+        Test the Compute Resources Instance Configurations concurrently.
 
-        Resources with multiple NICs are preferred among others.
+        Warnings are reported for every Compute Resource, while errors are collected and reported all together.
+        :param dryrun_tests: list of (compute resource name, run_instances arguments) tuples
         """
-        # Temporarily limiting dryrun tests to 1 per queue to save boto3 calls.
-        compute_resource_labels = queue_section.get_param("compute_resource_settings").referred_section_labels
-        dryrun_section = pcluster_config.get_section("compute_resource", compute_resource_labels[0])
-        for section_label in compute_resource_labels:
-            compute_resource_section = pcluster_config.get_section("compute_resource", section_label)
-            if compute_resource_section.get_param_value("network_interfaces") > 1:
-                dryrun_section = compute_resource_section
-                break
-
-        return dryrun_section
-
-    def __test_compute_resource(
+        # Compute resources with the same configuration need to be tested only once
+        unique_launch_kwargs = OrderedDict()
+        for _, launch_kwargs in dryrun_tests:
+            unique_launch_kwargs.setdefault(repr(sorted(launch_kwargs.items())), launch_kwargs)
+
+        results = {}
+        if unique_launch_kwargs:
+            # boto3 default session is not thread safe, make sure workers share a pool of thread safe clients
+            install_client_pool()
+            executor = ThreadPoolExecutor(max_workers=min(self.MAX_DRYRUN_WORKERS, len(unique_launch_kwargs)))
+            try:
+                futures = {
+                    key: executor.submit(self._ec2_run_instance_dryrun, **launch_kwargs)
+                    for key, launch_kwargs in unique_launch_kwargs.items()
+                }
+                results = {key: future.result() for key, future in futures.items()}
+            finally:
+                executor.shutdown(wait=True)
+
+        failures = []
+        reported_keys = set()
+        for compute_resource_name, launch_kwargs in dryrun_tests:
+            key = repr(sorted(launch_kwargs.items()))
+            errors, warnings = results[key]
+            if key not in reported_keys:
+                reported_keys.add(key)
+                for warning in warnings:
+                    pcluster_config.warn(warning)
+            failures.extend((compute_resource_name, error_message) for error_message in errors)
+
+        if len(failures) == 1:
+            pcluster_config.error(failures[0][1])
+        elif failures:
+            pcluster_config.error(
+                "Dry-run tests failed for the following compute resources:\n{0}".format(
+                    "\n".join("- {0}: {1}".format(name, error_message) for name, error_message in failures)
+                )
+            )
+
+    def __build_compute_resource_launch_kwargs(
         self,
         pcluster_config,
         compute_resource_section,
@@ -148,7 +189,7 @@ class HITClusterModel(ClusterModel):
         security_groups_ids=None,
         placement_group=None,
     ):
-        """Test Compute Resource Instance Configuration."""
+        """Build the run_instances arguments to test Compute Resource Instance Configuration."""
         vcpus = compute_resource_section.get_param_value("vcpus")
         compute_cpu_options = {"CoreCount": vcpus, "ThreadsPerCore": 1} if disable_hyperthreading else {}
         network_interfaces_count = compute_resource_section.get_param_value("network_interfaces")
@@ -162,8 +203,7 @@ class HITClusterModel(ClusterModel):
             use_public_ips,
         )
 
-        self._ec2_run_instance(
-            pcluster_config,
+        return dict(
             InstanceType=compute_resource_section.get_param_value("instance_type"),
             MinCount=1,
             MaxCount=1,
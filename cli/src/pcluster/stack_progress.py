@@ -0,0 +1,197 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import random
+import sys
+import time
+from collections import OrderedDict
+
+import boto3
+from botocore.exceptions import ClientError
+
+LOGGER = logging.getLogger(__name__)
+
+STACK_TYPE = "AWS::CloudFormation::Stack"
+# Polling period bounds, in seconds
+MIN_POLLING_PERIOD = 5
+MAX_POLLING_PERIOD = 30
+
+
+def is_in_progress(stack_status):
+    return stack_status.endswith("_IN_PROGRESS")
+
+
+class StackProgressTracker(object):
+    """
+    Follow the progress of a CloudFormation stack and of its nested stacks through their events.
+
+    Every poll only retrieves the events newer than the last seen one, so that a long-running operation costs a
+    single DescribeStackEvents call per stack when nothing happens. The status of the stack is taken from its own
+    events, without describing the stack. The polling period doubles while no event is received, up to max_period,
+    and goes back to min_period as soon as new events arrive. Sleeps are randomized to avoid synchronized polling
+    when many stacks are followed at the same time.
+
+    Callbacks are called with every new event, in chronological order, for the stack and for its nested stacks.
+    """
+
+    def __init__(
+        self,
+        stack,
+        cfn_client=None,
+        callbacks=None,
+        min_period=MIN_POLLING_PERIOD,
+        max_period=MAX_POLLING_PERIOD,
+        follow_nested_stacks=True,
+    ):
+        """
+        Initialize the tracker.
+
+        :param stack: the stack to follow, as returned by DescribeStacks
+        :param cfn_client: boto3 cloudformation client
+        :param callbacks: functions to call with every new stack event
+        :param min_period: minimum polling period, in seconds
+        :param max_period: maximum polling period, in seconds
+        :param follow_nested_stacks: True to retrieve the events of the nested stacks in progress too
+        """
+        self.stack_id = stack.get("StackId")
+        self.stack_status = stack.get("StackStatus")
+        self.cfn_client = cfn_client or boto3.client("cloudformation")
+        self.callbacks = list(callbacks or [])
+        self.min_period = min_period
+        self.max_period = max_period
+        self.period = min_period
+        self.follow_nested_stacks = follow_nested_stacks
+        # Stacks to poll, with the ID of the last event seen, None if not polled yet
+        self.__stacks = OrderedDict([(self.stack_id, None)])
+        # Nested stacks to stop polling, once their last events have been read
+        self.__completed_stacks = set()
+        self.__initialized = False
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def poll(self):
+        """
+        Retrieve the new events of the followed stacks and dispatch them to the callbacks.
+
+        The first poll only records the last event of each stack, without dispatching the past events.
+
+        :return: the new events, in chronological order
+        """
+        new_events = []
+        throttled = False
+        polled_stacks = set()
+        # Nested stacks found in progress are polled right away
+        pending_stacks = list(self.__stacks)
+        while pending_stacks:
+            for stack_id in pending_stacks:
+                polled_stacks.add(stack_id)
+                try:
+                    events = self.__get_new_events(stack_id)
+                except ClientError as e:
+                    if e.response.get("Error").get("Code") != "Throttling":
+                        raise
+                    LOGGER.debug("Throttling when retrieving the events of stack %s", stack_id)
+                    throttled = True
+                    continue
+                for event in events:
+                    self.__process_event(event)
+                new_events.extend(events)
+            pending_stacks = [
+                stack_id
+                for stack_id in self.__stacks
+                # Nested stacks completed before the first poll are not read at all
+                if stack_id not in polled_stacks and (self.__initialized or stack_id not in self.__completed_stacks)
+            ]
+        for stack_id in self.__completed_stacks:
+            self.__stacks.pop(stack_id, None)
+        self.__completed_stacks.clear()
+
+        if throttled:
+            self.period = min(self.period * 2, self.max_period)
+        if not self.__initialized:
+            # The first poll is repeated if throttled, to not dispatch the past events with the next one
+            self.__initialized = not throttled
+            return []
+
+        if not throttled:
+            self.period = self.min_period if new_events else min(self.period * 2, self.max_period)
+        # Events of different stacks are interleaved, Timestamps are datetime objects
+        new_events.sort(key=lambda event: event.get("Timestamp"))
+        for event in new_events:
+            for callback in self.callbacks:
+                callback(event)
+        return new_events
+
+    def wait(self, in_progress_statuses=None):
+        """
+        Poll the stack events until the stack operation is completed.
+
+        :param in_progress_statuses: statuses to wait for the end of, by default all the *_IN_PROGRESS statuses
+        :return: the final stack status
+        """
+
+        def _in_progress():
+            if in_progress_statuses is None:
+                return is_in_progress(self.stack_status)
+            return self.stack_status in in_progress_statuses
+
+        self.poll()
+        while _in_progress():
+            time.sleep(random.uniform(self.period / 2.0, self.period))
+            self.poll()
+        return self.stack_status
+
+    def __get_new_events(self, stack_id):
+        """Return the events of the given stack newer than the last seen one, in chronological order."""
+        last_event_id = self.__stacks.get(stack_id)
+        # The first poll only needs the last event, nested stacks created later are read from their first event
+        first_page_only = not self.__initialized
+        events = []
+        kwargs = {"StackName": stack_id}
+        while True:
+            response = self.cfn_client.describe_stack_events(**kwargs)
+            for event in response.get("StackEvents", []):
+                if event.get("EventId") == last_event_id:
+                    return list(reversed(events))
+                events.append(event)
+            kwargs["NextToken"] = response.get("NextToken")
+            if first_page_only or not kwargs["NextToken"]:
+                return list(reversed(events))
+
+    def __process_event(self, event):
+        """Update the last seen event, the stack status and the followed nested stacks."""
+        stack_id = event.get("StackId")
+        if stack_id in self.__stacks:
+            self.__stacks[stack_id] = event.get("EventId")
+        if event.get("ResourceType") != STACK_TYPE:
+            return
+        resource_id = event.get("PhysicalResourceId")
+        if resource_id == self.stack_id:
+            self.stack_status = event.get("ResourceStatus")
+        elif resource_id and resource_id != stack_id and self.follow_nested_stacks:
+            if is_in_progress(event.get("ResourceStatus")):
+                self.__stacks.setdefault(resource_id, None)
+                self.__completed_stacks.discard(resource_id)
+            elif resource_id in self.__stacks:
+                self.__completed_stacks.add(resource_id)
+
+
+class StackEventPrinter(object):
+    """Print the last stack event on the current terminal line."""
+
+    def __init__(self):
+        self.last_line = ""
+
+    def __call__(self, event):
+        self.last_line = ("Status: %s - %s" % (event.get("LogicalResourceId"), event.get("ResourceStatus"))).ljust(80)
+        sys.stdout.write("\r%s" % self.last_line)
+        sys.stdout.flush()
@@ -0,0 +1,158 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+# fmt: off
+from __future__ import absolute_import  # isort:skip
+from future import standard_library  # isort:skip
+standard_library.install_aliases()
+# fmt: on
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import urllib.request
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+
+import boto3
+from botocore.exceptions import ClientError
+from jinja2 import BaseLoader, Environment
+from jinja2.utils import LRUCache
+
+from pcluster.metadata_cache import get_default_cache_dir
+
+LOGGER = logging.getLogger(__name__)
+
+# Maximum number of compiled templates kept in memory
+MAX_COMPILED_TEMPLATES = 50
+
+
+def _create_jinja_environment():
+    environment = Environment(loader=BaseLoader)
+    environment.filters["sha1"] = lambda value: hashlib.sha1(value.strip().encode()).hexdigest()
+    environment.filters["bool"] = lambda value: value.lower() == "true"
+    return environment
+
+
+# Environments are thread safe once configured, the same one compiles all the templates
+JINJA_ENVIRONMENT = _create_jinja_environment()
+_COMPILED_TEMPLATES = LRUCache(MAX_COMPILED_TEMPLATES)
+
+
+def get_jinja_template(template_str):
+    """Return the Jinja template compiled from the given source, compiling every source once per process."""
+    key = hashlib.sha256(template_str.encode("utf-8")).hexdigest()
+    template = _COMPILED_TEMPLATES.get(key)
+    if template is None:
+        template = JINJA_ENVIRONMENT.from_string(template_str)
+        _COMPILED_TEMPLATES[key] = template
+    return template
+
+
+class TemplateCache(object):
+    """
+    Persistent on-disk cache of the templates downloaded from HTTP or S3 urls.
+
+    Every template is stored with its ETag and revalidated with a conditional request on each read, so that an
+    unchanged template is not downloaded again while an updated one is never served from the cache.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(get_default_cache_dir(), "templates")
+        self.enabled = True
+
+    def read(self, url):
+        """
+        Return the content of the template at the given HTTP or S3 url.
+
+        :param url: url of the template, e.g. https://bucket.s3.amazonaws.com/template.yaml or s3://bucket/template.yaml
+        :return: the content of the template as a string
+        """
+        cache_file = os.path.join(self.cache_dir, "{0}.json".format(hashlib.sha256(url.encode("utf-8")).hexdigest()))
+        entry = self.__read_entry(cache_file, url) if self.enabled else {}
+        try:
+            content, etag = self.__fetch(url, entry.get("etag"))
+        except Exception as e:
+            LOGGER.error("Failed when reading remote file from url %s: %s", url, e)
+            raise
+
+        if content is None:
+            LOGGER.debug("Template %s not modified, reading it from cache", url)
+            return entry.get("content")
+        if self.enabled and etag:
+            self.__write_entry(cache_file, {"url": url, "etag": etag, "content": content})
+        return content
+
+    @staticmethod
+    def __fetch(url, etag):
+        """
+        Download the template at the given url, unless its ETag is still the given one.
+
+        :return: a tuple with the content of the template, None if not modified, and its ETag
+        """
+        if urlparse(url).scheme == "s3":
+            match = re.match(r"s3://(.*?)/(.*)", url)
+            kwargs = {"Bucket": match.group(1), "Key": match.group(2)}
+            if etag:
+                kwargs["IfNoneMatch"] = etag
+            try:
+                response = boto3.client("s3").get_object(**kwargs)
+            except ClientError as e:
+                if etag and e.response.get("Error").get("Code") in ["304", "NotModified"]:
+                    return None, etag
+                raise
+            return response["Body"].read().decode("utf-8"), response.get("ETag")
+
+        request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+        try:
+            with urllib.request.urlopen(request) as f:
+                return f.read().decode("utf-8"), f.info().get("ETag")
+        except HTTPError as e:
+            if etag and e.code == 304:
+                return None, etag
+            raise
+
+    @staticmethod
+    def __read_entry(cache_file, url):
+        """Read the entry stored in the cache file, ignoring files that are missing, corrupted or for another url."""
+        try:
+            with open(cache_file) as f:
+                entry = json.load(f)
+            if entry.get("url") == url and entry.get("etag") and entry.get("content") is not None:
+                return entry
+        except (IOError, OSError, ValueError, AttributeError) as e:
+            LOGGER.debug("Unable to read template cache file %s: %s", cache_file, e)
+        return {}
+
+    def __write_entry(self, cache_file, entry):
+        """Atomically write the given entry to the cache file."""
+        try:
+            try:
+                os.makedirs(self.cache_dir)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            file_descriptor, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "w") as f:
+                    json.dump(entry, f)
+                getattr(os, "replace", os.rename)(tmp_file, cache_file)
+            except Exception:
+                os.remove(tmp_file)
+                raise
+        except (IOError, OSError) as e:
+            LOGGER.debug("Unable to write template cache file %s: %s", cache_file, e)
+
+
+TEMPLATE_CACHE = TemplateCache()
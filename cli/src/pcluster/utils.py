@@ -14,33 +14,47 @@ from future import standard_library  # isort:skip
 standard_library.install_aliases()
 # fmt: on
 
-import hashlib
 import json
 import logging
 import os
 import random
 import re
+import shutil
 import string
 import sys
+import tempfile
+import threading
 import time
 import urllib.request
 import zipfile
+from collections import OrderedDict
 from enum import Enum
-from io import BytesIO
-from urllib.parse import urlparse
 
 import boto3
 import pkg_resources
 from botocore.exceptions import ClientError, EndpointConnectionError
-from jinja2 import BaseLoader, Environment
 from pkg_resources import packaging
 
 from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatus, ComputeFleetStatusManager
-from pcluster.constants import PCLUSTER_STACK_PREFIX, SUPPORTED_ARCHITECTURES
+from pcluster.constants import CLI_LOG_FILE, PCLUSTER_STACK_PREFIX, SUPPORTED_ARCHITECTURES
+from pcluster.metadata_cache import (
+    BATCH_INSTANCE_TYPES_TTL,
+    INSTANCE_TYPE_OFFERINGS_TTL,
+    METADATA_CACHE,
+    SUPPORTED_INSTANCE_TYPES_TTL,
+    cached,
+)
+from pcluster.stack_progress import StackEventPrinter, StackProgressTracker
+from pcluster.template_cache import get_jinja_template
 
 LOGGER = logging.getLogger(__name__)
 
 STACK_TYPE = "AWS::CloudFormation::Stack"
+# Timestamp of the files added to the zip archives, the earliest supported by the zip format
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# Archives built by zip_dir are kept in memory up to ZIP_SPOOL_THRESHOLD bytes, files are compressed by chunks
+ZIP_SPOOL_THRESHOLD = 8 * 1024 * 1024
+ZIP_CHUNK_SIZE = 1024 * 1024
 
 
 class NodeType(Enum):
@@ -267,23 +281,36 @@ def _add_file_to_zip(zip_file, path, arcname):
     :param arcname: string; filename to put bytes from path under in created archive
     """
     with open(path, "rb") as input_file:
-        zinfo = zipfile.ZipInfo(filename=arcname)
+        # Fixed timestamp, so that archives of the same files are identical
+        zinfo = zipfile.ZipInfo(filename=arcname, date_time=ZIP_DATE_TIME)
         zinfo.external_attr = 0o644 << 16
-        zip_file.writestr(zinfo, input_file.read())
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        if sys.version_info >= (3, 6):
+            # The expected size lets zipfile use the ZIP64 format for large files
+            zinfo.file_size = os.fstat(input_file.fileno()).st_size
+            with zip_file.open(zinfo, "w") as output_file:
+                shutil.copyfileobj(input_file, output_file, ZIP_CHUNK_SIZE)
+        else:
+            zip_file.writestr(zinfo, input_file.read())
 
 
-def zip_dir(path):
+def zip_dir(path, file_out=None):
     """
     Create a zip archive containing all files and dirs rooted in path.
 
-    The archive is created in memory and a file handler is returned by the function.
+    The archive is written to file_out, or to a temporary file kept in memory until it exceeds ZIP_SPOOL_THRESHOLD
+    bytes, and a file handler is returned by the function.
+    Files are added in a stable order and with a fixed timestamp, so the archive only depends on their content.
     :param path: directory containing the resources to archive.
+    :param file_out: seekable binary file object to write the archive to.
     :return file handler pointing to the compressed archive.
     """
-    file_out = BytesIO()
+    if file_out is None:
+        file_out = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_THRESHOLD)
     with zipfile.ZipFile(file_out, "w", zipfile.ZIP_DEFLATED) as ziph:
-        for root, _, files in os.walk(path):
-            for file in files:
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file in sorted(files):
                 _add_file_to_zip(
                     ziph,
                     os.path.join(root, file),
@@ -293,24 +320,6 @@ def zip_dir(path):
     return file_out
 
 
-def upload_resources_artifacts(bucket_name, artifact_directory, root):
-    """
-    Upload to the specified S3 bucket the content of the directory rooted in root path.
-
-    All dirs contained in root dir will be uploaded as zip files to $bucket_name/$dir_name/artifacts.zip.
-    All files contained in root dir will be uploaded to $bucket_name.
-
-    :param bucket_name: name of the S3 bucket where files are uploaded
-    :param root: root directory containing the resources to upload.
-    """
-    bucket = boto3.resource("s3").Bucket(bucket_name)
-    for res in os.listdir(root):
-        if os.path.isdir(os.path.join(root, res)):
-            bucket.upload_fileobj(zip_dir(os.path.join(root, res)), "%s/%s/artifacts.zip" % (artifact_directory, res))
-        elif os.path.isfile(os.path.join(root, res)):
-            bucket.upload_file(os.path.join(root, res), "%s/%s" % (artifact_directory, res))
-
-
 def get_instance_vcpus(instance_type, instance_info=None):
     """
     Get number of vcpus for the given instance type.
@@ -330,6 +339,7 @@ def get_instance_vcpus(instance_type, instance_info=None):
     return vcpus
 
 
+@cached("supported_instance_types", SUPPORTED_INSTANCE_TYPES_TTL)
 def get_supported_instance_types():
     """Return the list of instance types available in the given region."""
     ec2_client = boto3.client("ec2")
@@ -421,6 +431,18 @@ def _parse_supported_instance_types_and_families_from_cce_emsg(emsg):
         )
 
 
+@cached("batch_instance_types_and_families", BATCH_INSTANCE_TYPES_TTL)
+def _get_batch_instance_types_and_families_from_cce_emsg():
+    """
+    Return the instance types and families parsed from the error message of CreateComputeEnvironment.
+
+    Only successfully parsed lists are cached: any other error, e.g. throttling, is raised and asked again next time.
+    """
+    return _parse_supported_instance_types_and_families_from_cce_emsg(
+        _get_cce_emsg_containing_supported_instance_types()
+    )
+
+
 def is_instance_type_format(candidate):
     """Return a boolean describing whether or not candidate is of the format of an instance type."""
     return re.search(r"^([a-z0-9\-]+)\.", candidate) is not None
@@ -458,8 +480,7 @@ def get_supported_batch_instance_types():
     known_exceptions = ["optimal"]
     supported_instance_types_and_families = supported_instance_types + supported_instance_families + known_exceptions
     try:
-        emsg = _get_cce_emsg_containing_supported_instance_types()
-        parsed_instance_types_and_families = _parse_supported_instance_types_and_families_from_cce_emsg(emsg)
+        parsed_instance_types_and_families = _get_batch_instance_types_and_families_from_cce_emsg()
         if _batch_instance_types_and_families_are_supported(
             parsed_instance_types_and_families, supported_instance_types_and_families
         ):
@@ -529,14 +550,11 @@ def get_supported_az_for_multi_instance_types(instance_types):
         else:
             missing_instance_types.append(instance_type)
     if missing_instance_types:
-        ec2_client = boto3.client("ec2")
-        paginator = ec2_client.get_paginator("describe_instance_type_offerings")
-        page_iterator = paginator.paginate(
-            LocationType="availability-zone", Filters=[{"Name": "instance-type", "Values": missing_instance_types}]
+        offerings = METADATA_CACHE.get(
+            "instance_type_offerings:{0}".format(",".join(sorted(missing_instance_types))),
+            lambda: _get_instance_type_offerings_by_az(missing_instance_types),
+            INSTANCE_TYPE_OFFERINGS_TTL,
         )
-        offerings = []
-        for page in page_iterator:
-            offerings.extend(page["InstanceTypeOfferings"])
         for instance_type in missing_instance_types:
             cache[instance_type] = tuple(
                 offering["Location"] for offering in offerings if offering["InstanceType"] == instance_type
@@ -545,6 +563,22 @@ def get_supported_az_for_multi_instance_types(instance_types):
     return result
 
 
+def _get_instance_type_offerings_by_az(instance_types):
+    """Return the availability zone offerings of the given instance types from DescribeInstanceTypeOfferings."""
+    ec2_client = boto3.client("ec2")
+    paginator = ec2_client.get_paginator("describe_instance_type_offerings")
+    page_iterator = paginator.paginate(
+        LocationType="availability-zone", Filters=[{"Name": "instance-type", "Values": instance_types}]
+    )
+    offerings = []
+    for page in page_iterator:
+        offerings.extend(
+            {"InstanceType": offering["InstanceType"], "Location": offering["Location"]}
+            for offering in page["InstanceTypeOfferings"]
+        )
+    return offerings
+
+
 def get_availability_zone_of_subnet(subnet_id):
     """
     Return the availability zone of the subnet.
@@ -690,20 +724,12 @@ def verify_stack_creation(stack_name, cfn_client):
     :param cfn_client: the CloudFormation client to use to verify stack status
     :return: True if the creation was successful, false otherwise.
     """
-    status = get_stack(stack_name, cfn_client).get("StackStatus")
-    resource_status = ""
-    while status == "CREATE_IN_PROGRESS":
-        status = get_stack(stack_name, cfn_client).get("StackStatus")
-        events = get_stack_events(stack_name, raise_on_error=True)[0]
-        resource_status = ("Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))).ljust(
-            80
-        )
-        sys.stdout.write("\r%s" % resource_status)
-        sys.stdout.flush()
-        time.sleep(5)
+    printer = StackEventPrinter()
+    tracker = StackProgressTracker(get_stack(stack_name, cfn_client), cfn_client, callbacks=[printer])
+    status = tracker.wait(in_progress_statuses=["CREATE_IN_PROGRESS"])
     # print the last status update in the logs
-    if resource_status != "":
-        LOGGER.debug(resource_status)
+    if printer.last_line != "":
+        LOGGER.debug(printer.last_line)
     if status != "CREATE_COMPLETE":
         LOGGER.critical("\nCluster creation failed.  Failed events:")
         _log_stack_failure_recursive(stack_name)
@@ -970,7 +996,7 @@ def get_supported_architectures_for_instance_type(instance_type):
 
 
 def get_cli_log_file():
-    return os.path.expanduser(os.path.join("~", ".parallelcluster", "pcluster-cli.log"))
+    return os.path.expanduser(CLI_LOG_FILE)
 
 
 def retry(func, func_args, attempts=1, wait=0):
@@ -1094,10 +1120,133 @@ def cluster_has_running_capacity(stack_name):
     return cluster_has_running_capacity.cached_result
 
 
+class InstanceTypeInfoCatalog(object):
+    """
+    Process-wide catalog of the information returned by EC2's DescribeInstanceTypes API.
+
+    Instance types can be registered in advance (e.g. all the ones referenced by a PclusterConfig) so that the first
+    lookup fetches all of them with batched DescribeInstanceTypes calls. Subsequent lookups are served from memory.
+    Calls are made without holding the catalog lock: lookups of instance types being fetched by another thread wait
+    for that fetch only, while the other lookups are served meanwhile.
+    """
+
+    # Max number of instance types accepted by a single DescribeInstanceTypes call
+    MAX_INSTANCE_TYPES_PER_CALL = 100
+
+    def __init__(self):
+        self.__lock = threading.RLock()
+        self.__instance_types = {}
+        self.__pending_instance_types = OrderedDict()
+        # Event set once the fetch of the instance type completes, by (region, instance type)
+        self.__in_flight_instance_types = {}
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, instance_types):
+        """Register the given instance types to be fetched with the next DescribeInstanceTypes batch."""
+        region = get_region()
+        with self.__lock:
+            for instance_type in instance_types:
+                key = (region, instance_type)
+                if key not in self.__instance_types and key not in self.__in_flight_instance_types:
+                    self.__pending_instance_types[key] = None
+
+    def get(self, instance_type):
+        """
+        Return the DescribeInstanceTypes information for the given instance type.
+
+        :param instance_type: the instance type to search for
+        :raise ClientError if DescribeInstanceTypes fails for the given instance type
+        """
+        region = get_region()
+        key = (region, instance_type)
+        while True:
+            with self.__lock:
+                instance_type_info = self.__instance_types.get(key)
+                if instance_type_info:
+                    self.hits += 1
+                    return instance_type_info
+
+                in_flight = self.__in_flight_instance_types.get(key)
+                if not in_flight:
+                    self.misses += 1
+                    fetched = threading.Event()
+                    instance_types = [instance_type] + [
+                        pending_type
+                        for pending_region, pending_type in self.__pending_instance_types
+                        if pending_region == region
+                        and pending_type != instance_type
+                        and (region, pending_type) not in self.__in_flight_instance_types
+                    ]
+                    for fetched_type in instance_types:
+                        self.__pending_instance_types.pop((region, fetched_type), None)
+                        self.__in_flight_instance_types[(region, fetched_type)] = fetched
+                    break
+            # Fetched by another thread, if it failed for this instance type the next iteration fetches it alone
+            in_flight.wait()
+
+        instance_type_infos, errors = {}, {}
+        try:
+            self.__fetch(instance_types, instance_type_infos, errors)
+        finally:
+            with self.__lock:
+                for fetched_type, instance_type_info in instance_type_infos.items():
+                    self.__instance_types[(region, fetched_type)] = instance_type_info
+                for fetched_type in instance_types:
+                    self.__in_flight_instance_types.pop((region, fetched_type), None)
+            fetched.set()
+
+        if instance_type in errors:
+            raise errors[instance_type]
+        return instance_type_infos[instance_type]
+
+    def __fetch(self, instance_types, instance_type_infos, errors):
+        """
+        Retrieve the given instance types in chunks of MAX_INSTANCE_TYPES_PER_CALL.
+
+        Chunks failing because of invalid instance types are bisected until the invalid ones are isolated, so that the
+        valid instance types in the chunk are retrieved anyway.
+
+        :param instance_type_infos: dict to store the retrieved information in, by instance type
+        :param errors: dict to store the errors of the invalid instance types in, by instance type
+        """
+        ec2_client = boto3.client("ec2")
+        chunks = [
+            instance_types[i : i + self.MAX_INSTANCE_TYPES_PER_CALL]  # noqa: E203
+            for i in range(0, len(instance_types), self.MAX_INSTANCE_TYPES_PER_CALL)
+        ]
+        while chunks:
+            chunk = chunks.pop(0)
+            try:
+                response = ec2_client.describe_instance_types(InstanceTypes=chunk)
+            except ClientError as e:
+                if e.response.get("Error").get("Code") != "InvalidInstanceType":
+                    raise
+                if len(chunk) == 1:
+                    errors[chunk[0]] = e
+                else:
+                    LOGGER.debug("Failed when retrieving instance types %s: %s", ", ".join(chunk), e)
+                    middle = len(chunk) // 2
+                    chunks[:0] = [chunk[:middle], chunk[middle:]]
+                continue
+            for instance_type_info in response.get("InstanceTypes"):
+                instance_type_infos[instance_type_info.get("InstanceType")] = instance_type_info
+
+    def clear(self):
+        """Remove all the cached and pending instance types and reset the counters."""
+        with self.__lock:
+            self.__instance_types.clear()
+            self.__pending_instance_types.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+INSTANCE_TYPE_INFO_CATALOG = InstanceTypeInfoCatalog()
+
+
 def get_instance_type(instance_type):
-    ec2_client = boto3.client("ec2")
     try:
-        return ec2_client.describe_instance_types(InstanceTypes=[instance_type]).get("InstanceTypes")[0]
+        return INSTANCE_TYPE_INFO_CATALOG.get(instance_type)
     except Exception as e:
         LOGGER.error("Failed when retrieving instance type data for instance type %s: %s", instance_type, e)
         raise e
@@ -1148,34 +1297,16 @@ def is_hit_enabled_cluster(cfn_stack):
     )
 
 
-def read_remote_file(url):
-    """Read a remote file from an HTTP or S3 url."""
-    try:
-        if urlparse(url).scheme == "s3":
-            match = re.match(r"s3://(.*?)/(.*)", url)
-            bucket, key = match.group(1), match.group(2)
-            file_contents = boto3.resource("s3").Object(bucket, key).get()["Body"].read().decode("utf-8")
-        else:
-            with urllib.request.urlopen(url) as f:
-                file_contents = f.read().decode("utf-8")
-        return file_contents
-    except Exception as e:
-        LOGGER.error("Failed when reading remote file from url %s: %s", url, e)
-        raise e
-
-
 def render_template(template_str, params_dict, tags, config_version=None):
     """
     Render a Jinja template and return the rendered output.
 
+    Templates are compiled once per process, by a shared Jinja environment.
     :param template_str: Template file contents as a string
     :param params_dict: Template parameters dict
     """
     try:
-        environment = Environment(loader=BaseLoader)
-        environment.filters["sha1"] = lambda value: hashlib.sha1(value.strip().encode()).hexdigest()
-        environment.filters["bool"] = lambda value: value.lower() == "true"
-        template = environment.from_string(template_str)
+        template = get_jinja_template(template_str)
         output_from_parsed_template = template.render(config=params_dict, config_version=config_version, tags=tags)
         return output_from_parsed_template
     except Exception as e:
@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+from io import StringIO
+
+import pytest
+
+from awsbatch import awsbatchd, awsbqueues
+from awsbatch.utils import concurrent_chain, fail, ordered_concurrent_map
+
+
+@pytest.mark.parametrize(
+    "command, argv, expected_delegable",
+    [
+        ("awsbstat", ["-c", "cluster", "-s", "ALL"], True),
+        ("awsbstat", ["-c", "cluster", "-w", "5"], False),
+        ("awsbstat", ["-c", "cluster", "--wat=5"], False),
+        ("awsbstat", ["-ew5"], False),
+        ("awsbstat", ["-o", "ndjson"], False),
+        ("awsbstat", ["--out=csv", "--no-sort"], False),
+        ("awsbstat", ["-o", "table", "--", "-w"], True),
+        ("awsbstat", ["--help"], False),
+        ("awsbstat", ["--unknown"], False),
+        ("awsbout", ["-t", "10", "job-id"], True),
+        ("awsbout", ["-s", "job-id"], False),
+        ("awsbout", ["-t10", "--", "-s"], True),
+        ("awsbkill", ["-f", "jobs.txt"], False),
+        ("awsbkill", ["-fjobs.txt"], False),
+        ("awsbkill", ["-r", "--from-file is not used", "job-id"], True),
+        ("awsbsub", ["sleep", "1"], False),
+    ],
+)
+def test_is_delegable(command, argv, expected_delegable):
+    assert awsbatchd._is_delegable(command, argv) == expected_delegable
+
+
+@pytest.fixture()
+def daemon(tmpdir, mocker):
+    socket_file = str(tmpdir.join("awsbatchd.sock"))
+    server = awsbatchd._create_server(socket_file, mocker.MagicMock())
+    sys.stdout, sys.stderr = server.stdout, server.stderr
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.start()
+    yield socket_file
+    server.shutdown()
+    server_thread.join()
+    sys.stdout, sys.stderr = server.stdout.stream, server.stderr.stream
+    server.server_close()
+
+
+def test_delegate(daemon, capsys, mocker):
+    def _main(argv):
+        print("queues of %s" % argv[1])
+        fail("Error: something went wrong")
+
+    mocker.patch.object(awsbqueues, "main", side_effect=_main)
+
+    assert awsbatchd.delegate("awsbqueues", ["-c", "cluster"], socket_file=daemon) == 1
+    assert capsys.readouterr() == ("queues of cluster\n", "Error: something went wrong\n")
+
+
+def test_delegate_rejected(daemon, mocker):
+    main_mock = mocker.patch.object(awsbqueues, "main")
+
+    # commands requiring the client terminal are not delegated
+    assert awsbatchd.delegate("awsbstat", ["--watch", "5"], socket_file=daemon) is None
+    # the daemon serves only clients with its same AWS environment
+    mocker.patch.dict(os.environ, {"AWS_PROFILE": "other"})
+    assert awsbatchd.delegate("awsbqueues", [], socket_file=daemon) is None
+    main_mock.assert_not_called()
+
+
+def test_delegate_without_daemon(tmpdir):
+    assert awsbatchd.delegate("awsbqueues", [], socket_file=str(tmpdir.join("awsbatchd.sock"))) is None
+
+
+@pytest.mark.parametrize("concurrent_func", [ordered_concurrent_map, concurrent_chain])
+def test_run_command_worker_output(mocker, concurrent_func):
+    def _get_queue(item):
+        if item == "failing":
+            fail("Error: queue (%s) not found" % item)
+        print("queue %s" % item)
+        return [item]
+
+    def _main(argv):
+        # wait for the results of the workers, the last one fails
+        list(concurrent_func(_get_queue, ["first", "failing"], max_workers=2))
+
+    mocker.patch.object(awsbqueues, "main", side_effect=_main)
+    daemon_stdout, daemon_stderr = StringIO(), StringIO()
+    stdout, stderr = awsbatchd._ThreadLocalStream(daemon_stdout), awsbatchd._ThreadLocalStream(daemon_stderr)
+    mocker.patch.object(sys, "stdout", stdout)
+    mocker.patch.object(sys, "stderr", stderr)
+
+    response = awsbatchd._run_command("awsbqueues", [], stdout, stderr)
+
+    # the output of the workers goes to the client, not to the daemon streams
+    assert response == {"exit_code": 1, "stdout": "queue first\n", "stderr": "Error: queue (failing) not found\n"}
+    assert daemon_stdout.getvalue() == daemon_stderr.getvalue() == ""
@@ -0,0 +1,160 @@
+import os
+
+import pytest
+
+from awsbatch import awsbhosts
+from tests.common import MockedBoto3Request
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    # we need to set the region in the environment because the Boto3ClientFactory requires it.
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+    return "awsbatch.common.boto3"
+
+
+def _container_instance(index, instance_type, cpu_avail, mem_avail, running_jobs):
+    return {
+        "containerInstanceArn": "arn:container-instance/{0}".format(index),
+        "ec2InstanceId": "i-{0}".format(index),
+        "status": "ACTIVE",
+        "attributes": [{"name": "ecs.instance-type", "value": instance_type}],
+        "registeredResources": [
+            {"name": "CPU", "type": "INTEGER", "integerValue": 4096},
+            {"name": "MEMORY", "type": "INTEGER", "integerValue": 8000},
+        ],
+        "remainingResources": [
+            {"name": "CPU", "type": "INTEGER", "integerValue": cpu_avail * 1024},
+            {"name": "MEMORY", "type": "INTEGER", "integerValue": mem_avail},
+        ],
+        "runningTasksCount": running_jobs,
+        "pendingTasksCount": 0,
+    }
+
+
+def _ec2_instance(index):
+    return {
+        "InstanceId": "i-{0}".format(index),
+        "PrivateIpAddress": "10.0.0.{0}".format(index),
+        "PrivateDnsName": "ip-10-0-0-{0}".format(index),
+        "PublicDnsName": "",
+    }
+
+
+@pytest.fixture()
+def hosts_stubber(boto3_stubber, awsbatchcliconfig_mock):
+    awsbatchcliconfig_mock.return_value.compute_environment = "compute-environment"
+
+    def _stub_hosts(container_instances, described_instance_ids):
+        boto3_stubber(
+            "batch",
+            MockedBoto3Request(
+                method="describe_compute_environments",
+                response={
+                    "computeEnvironments": [
+                        {
+                            "computeEnvironmentName": "compute-environment",
+                            "computeEnvironmentArn": "arn:compute-environment",
+                            "ecsClusterArn": "arn:ecs-cluster",
+                        }
+                    ]
+                },
+                expected_params={"computeEnvironments": ["compute-environment"], "nextToken": ""},
+            ),
+        )
+        boto3_stubber(
+            "ecs",
+            [
+                MockedBoto3Request(
+                    method="list_container_instances",
+                    response={
+                        "containerInstanceArns": [ci["containerInstanceArn"] for ci in container_instances[:2]],
+                        "nextToken": "token",
+                    },
+                    expected_params={"cluster": "arn:ecs-cluster", "maxResults": 100},
+                ),
+                MockedBoto3Request(
+                    method="describe_container_instances",
+                    response={"containerInstances": container_instances[:2]},
+                    expected_params={
+                        "cluster": "arn:ecs-cluster",
+                        "containerInstances": [ci["containerInstanceArn"] for ci in container_instances[:2]],
+                    },
+                ),
+                MockedBoto3Request(
+                    method="list_container_instances",
+                    response={"containerInstanceArns": [ci["containerInstanceArn"] for ci in container_instances[2:]]},
+                    expected_params={"cluster": "arn:ecs-cluster", "maxResults": 100, "nextToken": "token"},
+                ),
+                MockedBoto3Request(
+                    method="describe_container_instances",
+                    response={"containerInstances": container_instances[2:]},
+                    expected_params={
+                        "cluster": "arn:ecs-cluster",
+                        "containerInstances": [ci["containerInstanceArn"] for ci in container_instances[2:]],
+                    },
+                ),
+            ],
+        )
+        boto3_stubber(
+            "ec2",
+            [
+                MockedBoto3Request(
+                    method="describe_instances",
+                    response={"Reservations": [{"Instances": [_ec2_instance(index) for index in instance_ids]}]},
+                    expected_params={"InstanceIds": ["i-{0}".format(index) for index in instance_ids]},
+                )
+                for instance_ids in described_instance_ids
+            ],
+        )
+
+    return _stub_hosts
+
+
+class TestOutput(object):
+    def test_instance_ids_filtered_before_describing_instances(self, capsys, hosts_stubber):
+        hosts_stubber(
+            [
+                _container_instance(1, "c5.xlarge", 4, 8000, 0),
+                _container_instance(2, "c5.xlarge", 2, 4000, 1),
+                _container_instance(3, "m5.xlarge", 0, 0, 2),
+            ],
+            # i-1 is not requested, so it is not described
+            described_instance_ids=[[2], [3]],
+        )
+
+        awsbhosts.main(["-c", "cluster", "i-2", "i-3"])
+
+        output = capsys.readouterr().out
+        assert "i-1" not in output
+        assert "ec2InstanceId            : i-2" in output
+        assert "ec2InstanceId            : i-3" in output
+
+    def test_summary(self, capsys, hosts_stubber):
+        hosts_stubber(
+            [
+                _container_instance(1, "m5.xlarge", 0, 0, 2),
+                _container_instance(2, "c5.xlarge", 4, 8000, 0),
+                _container_instance(3, "c5.xlarge", 2, 4000, 1),
+            ],
+            described_instance_ids=[[1, 2], [3]],
+        )
+
+        awsbhosts.main(["-c", "cluster", "--summary"])
+
+        rows = [row.split() for row in capsys.readouterr().out.splitlines()]
+        assert rows[0] == [
+            "instanceType",
+            "hosts",
+            "runningJobs",
+            "registeredCPUs",
+            "usedCPUs",
+            "CPUUtilization[%]",
+            "registeredMemory[MB]",
+            "usedMemory[MB]",
+            "memoryUtilization[%]",
+        ]
+        assert rows[2:] == [
+            ["c5.xlarge", "2", "1", "8", "2", "25", "16000", "4000", "25"],
+            ["m5.xlarge", "1", "2", "4", "4", "100", "8000", "8000", "100"],
+        ]
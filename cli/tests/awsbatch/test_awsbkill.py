@@ -0,0 +1,144 @@
+import os
+
+import pytest
+
+from awsbatch import awsbkill
+from tests.common import MockedBoto3Request
+from tests.conftest import DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG
+
+
+class TestArgs(object):
+    def test_missing_job_ids(self, failed_with_message):
+        failed_with_message(
+            awsbkill.main, "Error: job IDs, --from-file, --status or --name-pattern are required\n", argv=[]
+        )
+
+    def test_invalid_status(self, failed_with_message):
+        failed_with_message(
+            awsbkill.main,
+            "Error: invalid status (SUCCEEDED), accepted values are: "
+            "['SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING', 'RUNNING']\n",
+            argv=["-s", "RUNNING,SUCCEEDED"],
+        )
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    # we need to set the region in the environment because the Boto3ClientFactory requires it.
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+    return "awsbatch.common.boto3"
+
+
+def _job(job_id, status, name="job"):
+    return {
+        "jobId": job_id,
+        "jobName": name,
+        "jobQueue": "queue",
+        "status": status,
+        "startedAt": 0,
+        "jobDefinition": "definition",
+    }
+
+
+def _job_summary(job_id, status, name):
+    return {"jobId": job_id, "jobName": name, "status": status}
+
+
+@pytest.mark.usefixtures("awsbatchcliconfig_mock")
+class TestKill(object):
+    def test_kill_by_ids(self, capsys, boto3_stubber):
+        boto3_stubber(
+            "batch",
+            [
+                MockedBoto3Request(
+                    method="describe_jobs",
+                    response={
+                        "jobs": [_job("array", "RUNNING"), _job("done", "SUCCEEDED"), _job("array:1", "RUNNING")]
+                    },
+                    expected_params={"jobs": ["array", "done", "missing", "array:1"]},
+                ),
+                MockedBoto3Request(
+                    method="terminate_job",
+                    response={},
+                    expected_params={"jobId": "array", "reason": "Terminated by the user"},
+                ),
+            ],
+        )
+
+        awsbkill.main(["-c", "cluster", "array", "done", "missing", "array:1", "array"])
+
+        assert capsys.readouterr().out == (
+            "Job (missing) not found.\n"
+            "Job (done) is already in (SUCCEEDED) status.\n"
+            "Your job termination request for job (array) in status (RUNNING) has been submitted.\n"
+            "Summary: 1 submitted, 1 already completed, 1 covered by parent, 1 not found, 0 failed\n"
+        )
+
+    def test_kill_from_file(self, capsys, boto3_stubber, tmpdir):
+        job_ids = ["job-{0}".format(index) for index in range(150)]
+        job_ids_file = tmpdir.join("job_ids.txt")
+        job_ids_file.write("\n".join(job_ids) + "\n\n")
+        mocked_requests = [
+            MockedBoto3Request(
+                method="describe_jobs",
+                response={"jobs": [_job(job_id, "RUNNABLE") for job_id in job_ids[index : index + 100]]},
+                expected_params={"jobs": job_ids[index : index + 100]},
+            )
+            for index in [0, 100]
+        ]
+        mocked_requests.extend(
+            MockedBoto3Request(
+                method="terminate_job", response={}, expected_params={"jobId": job_id, "reason": "sweep cancelled"}
+            )
+            for job_id in job_ids
+        )
+        boto3_stubber("batch", mocked_requests)
+
+        awsbkill.main(["-c", "cluster", "-r", "sweep cancelled", "-f", str(job_ids_file)])
+
+        output = capsys.readouterr().out.splitlines()
+        assert output[0] == "Your job cancellation request for job (job-0) in status (RUNNABLE) has been submitted."
+        assert output[-1] == "Summary: 150 submitted, 0 already completed, 0 covered by parent, 0 not found, 0 failed"
+
+    def test_kill_by_status_and_name(self, capsys, boto3_stubber):
+        listed_jobs = {
+            "RUNNABLE": [_job_summary("job-1", "RUNNABLE", "sweep-1"), _job_summary("job-2", "RUNNABLE", "other")],
+            # job-1 is listed again since it changed status while listing
+            "RUNNING": [_job_summary("job-3", "RUNNING", "sweep-2"), _job_summary("job-1", "RUNNING", "sweep-1")],
+        }
+        mocked_requests = [
+            MockedBoto3Request(
+                method="list_jobs",
+                response={"jobSummaryList": listed_jobs[status]},
+                expected_params={
+                    "jobQueue": DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG["job_queue"],
+                    "jobStatus": status,
+                    "nextToken": "",
+                },
+            )
+            for status in ["RUNNABLE", "RUNNING"]
+        ]
+        mocked_requests.extend(
+            [
+                MockedBoto3Request(
+                    method="terminate_job",
+                    response="Job cannot be terminated",
+                    expected_params={"jobId": "job-1", "reason": "Terminated by the user"},
+                    generate_error=True,
+                    error_code="ClientException",
+                ),
+                MockedBoto3Request(
+                    method="terminate_job",
+                    response={},
+                    expected_params={"jobId": "job-3", "reason": "Terminated by the user"},
+                ),
+            ]
+        )
+        boto3_stubber("batch", mocked_requests)
+
+        awsbkill.main(["-c", "cluster", "-s", "RUNNABLE,RUNNING", "-n", "sweep-*"])
+
+        output = capsys.readouterr().out.splitlines()
+        assert output[0].startswith("Error killing job (job-1). Failed with exception:")
+        assert output[1] == "Your job termination request for job (job-3) in status (RUNNING) has been submitted."
+        assert output[2] == "Summary: 1 submitted, 0 already completed, 0 covered by parent, 0 not found, 1 failed"
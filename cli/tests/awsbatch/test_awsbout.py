@@ -0,0 +1,260 @@
+import os
+
+import pytest
+
+from awsbatch import awsbout
+from awsbatch.awsbout import AdaptivePollingPeriod
+from tests.common import MockedBoto3Request
+
+
+class TestArgs(object):
+    def test_missing_job_ids(self, capsys):
+        with pytest.raises(SystemExit):
+            awsbout.main([])
+        assert "the following arguments are required: job_id" in capsys.readouterr().err
+
+    def test_head_and_stream(self, failed_with_message):
+        failed_with_message(
+            awsbout.main,
+            "Parameters validation error: --stream and --head option cannot be set at the same time\n",
+            argv=["-hd", "10", "-s", "job-1"],
+        )
+
+
+def test_adaptive_polling_period():
+    polling_period = AdaptivePollingPeriod(max_period=5)
+    assert polling_period.period == 1
+    for expected_period in [2, 4, 5, 5]:
+        polling_period.update(events_received=False)
+        assert polling_period.period == expected_period
+    for expected_period in [2.5, 1.25, 1]:
+        polling_period.update(events_received=True)
+        assert polling_period.period == expected_period
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    # we need to set the region in the environment because the Boto3ClientFactory requires it.
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+    return "awsbatch.common.boto3"
+
+
+def _job(job_id, log_stream=None, **kwargs):
+    job = {
+        "jobId": job_id,
+        "jobName": "job",
+        "jobQueue": "queue",
+        "status": "RUNNING" if log_stream else "RUNNABLE",
+        "startedAt": 0,
+        "jobDefinition": "definition",
+        "container": {"logStreamName": log_stream} if log_stream else {},
+    }
+    job.update(kwargs)
+    return job
+
+
+def _event(log_stream, timestamp, message):
+    return {"logStreamName": log_stream, "timestamp": timestamp, "message": message, "eventId": message}
+
+
+@pytest.mark.usefixtures("awsbatchcliconfig_mock", "convert_to_date_mock")
+class TestOutput(object):
+    def test_single_job(self, capsys, boto3_stubber):
+        boto3_stubber(
+            "batch",
+            MockedBoto3Request(
+                method="describe_jobs",
+                response={"jobs": [_job("job-1", "stream-1")]},
+                expected_params={"jobs": ["job-1"]},
+            ),
+        )
+        boto3_stubber(
+            "logs",
+            MockedBoto3Request(
+                method="get_log_events",
+                response={"events": [{"timestamp": 1, "message": "first"}, {"timestamp": 2, "message": "second"}]},
+                expected_params={
+                    "logGroupName": "/aws/batch/job",
+                    "logStreamName": "stream-1",
+                    "limit": 2,
+                    "startFromHead": True,
+                },
+            ),
+        )
+
+        awsbout.main(["-c", "cluster", "-hd", "2", "job-1"])
+
+        assert capsys.readouterr().out == "1970-01-01T00:00:00+00:00: first\n1970-01-01T00:00:00+00:00: second\n"
+
+    def test_array_and_mnp_jobs_interleaved(self, capsys, boto3_stubber):
+        boto3_stubber(
+            "batch",
+            [
+                MockedBoto3Request(
+                    method="describe_jobs",
+                    response={
+                        "jobs": [
+                            _job("array", arrayProperties={"size": 2}),
+                            _job("mnp", nodeProperties={"numNodes": 2, "mainNode": 0, "nodeRangeProperties": []}),
+                        ]
+                    },
+                    expected_params={"jobs": ["array", "mnp"]},
+                ),
+                MockedBoto3Request(
+                    method="describe_jobs",
+                    response={
+                        "jobs": [
+                            _job("array:0", "stream-a0"),
+                            _job("array:1", "stream-a1"),
+                            _job("mnp#0", "stream-m0"),
+                            _job("mnp#1"),
+                        ]
+                    },
+                    expected_params={"jobs": ["array:0", "array:1", "mnp#0", "mnp#1"]},
+                ),
+            ],
+        )
+        boto3_stubber(
+            "logs",
+            [
+                MockedBoto3Request(
+                    method="filter_log_events",
+                    response={
+                        "events": [_event("stream-a0", 1, "a0-first"), _event("stream-m0", 3, "m0-first")],
+                        "nextToken": "token",
+                    },
+                    expected_params={
+                        "logGroupName": "/aws/batch/job",
+                        "logStreamNames": ["stream-a0", "stream-a1", "stream-m0"],
+                    },
+                ),
+                MockedBoto3Request(
+                    method="filter_log_events",
+                    response={"events": [_event("stream-a1", 2, "a1-first")]},
+                    expected_params={
+                        "logGroupName": "/aws/batch/job",
+                        "logStreamNames": ["stream-a0", "stream-a1", "stream-m0"],
+                        "nextToken": "token",
+                    },
+                ),
+            ],
+        )
+
+        awsbout.main(["-c", "cluster", "array", "mnp"])
+
+        assert capsys.readouterr().out == (
+            "No log stream found for job (mnp#1) in the status (RUNNABLE)\n"
+            "1970-01-01T00:00:00+00:00: [array:0] a0-first\n"
+            "1970-01-01T00:00:00+00:00: [array:1] a1-first\n"
+            "1970-01-01T00:00:00+00:00: [mnp#0] m0-first\n"
+        )
+
+    def test_stream_multiple_jobs(self, capsys, boto3_stubber, mocker):
+        boto3_stubber(
+            "batch",
+            [
+                MockedBoto3Request(
+                    method="describe_jobs",
+                    response={"jobs": [_job("job-1", "stream-1"), _job("job-2")]},
+                    expected_params={"jobs": ["job-1", "job-2"]},
+                ),
+                # job-2 started while streaming
+                MockedBoto3Request(
+                    method="describe_jobs",
+                    response={"jobs": [_job("job-2", "stream-2")]},
+                    expected_params={"jobs": ["job-2"]},
+                ),
+            ],
+        )
+        boto3_stubber(
+            "logs",
+            [
+                MockedBoto3Request(
+                    method="get_log_events",
+                    response={"events": [{"timestamp": 1, "message": "job-1 first"}]},
+                    expected_params={
+                        "logGroupName": "/aws/batch/job",
+                        "logStreamName": "stream-1",
+                        "limit": 1,
+                        "startFromHead": False,
+                    },
+                ),
+                MockedBoto3Request(
+                    method="filter_log_events",
+                    response={
+                        "events": [
+                            # already printed event
+                            _event("stream-1", 1, "job-1 first"),
+                            _event("stream-2", 2, "job-2 first"),
+                        ]
+                    },
+                    expected_params={
+                        "logGroupName": "/aws/batch/job",
+                        "logStreamNames": ["stream-1", "stream-2"],
+                        "startTime": 0,
+                    },
+                ),
+            ],
+        )
+        sleep_mock = mocker.patch("awsbatch.awsbout.time.sleep", side_effect=[None, KeyboardInterrupt])
+
+        with pytest.raises(SystemExit):
+            awsbout.main(["-c", "cluster", "-s", "-t", "1", "job-1", "job-2"])
+
+        assert capsys.readouterr().out == (
+            "No log stream found for job (job-2) in the status (RUNNABLE)\n"
+            "1970-01-01T00:00:00+00:00: [job-1] job-1 first\n"
+            "1970-01-01T00:00:00+00:00: [job-2] job-2 first\n"
+        )
+        # the polling period is reduced when new events are received
+        assert [call[0][0] for call in sleep_mock.call_args_list] == [1, 1]
+
+    def test_stream_late_events(self, capsys, boto3_stubber, mocker):
+        boto3_stubber(
+            "batch",
+            MockedBoto3Request(
+                method="describe_jobs",
+                response={"jobs": [_job("job-1", "stream-1"), _job("job-2", "stream-2")]},
+                expected_params={"jobs": ["job-1", "job-2"]},
+            ),
+        )
+
+        def _filter_log_events_request(events, start_time=None):
+            expected_params = {"logGroupName": "/aws/batch/job", "logStreamNames": ["stream-1", "stream-2"]}
+            if start_time is not None:
+                expected_params["startTime"] = start_time
+            return MockedBoto3Request(
+                method="filter_log_events", response={"events": events}, expected_params=expected_params
+            )
+
+        boto3_stubber(
+            "logs",
+            [
+                _filter_log_events_request([_event("stream-1", 100000, "job-1 first")]),
+                # job-2 event ingested late, with a timestamp before the last printed one
+                _filter_log_events_request(
+                    [
+                        _event("stream-2", 90000, "job-2 first"),
+                        _event("stream-1", 100000, "job-1 first"),
+                        _event("stream-1", 140000, "job-1 second"),
+                    ],
+                    start_time=70000,
+                ),
+                # events out of the lag window are forgotten, the ones still in it are not printed again
+                _filter_log_events_request(
+                    [_event("stream-1", 140000, "job-1 second"), _event("stream-2", 150000, "job-2 second")],
+                    start_time=110000,
+                ),
+            ],
+        )
+        mocker.patch("awsbatch.awsbout.time.sleep", side_effect=[None, None, KeyboardInterrupt])
+
+        with pytest.raises(SystemExit):
+            awsbout.main(["-c", "cluster", "-s", "job-1", "job-2"])
+
+        assert capsys.readouterr().out == (
+            "1970-01-01T00:01:40+00:00: [job-1] job-1 first\n"
+            "1970-01-01T00:01:30+00:00: [job-2] job-2 first\n"
+            "1970-01-01T00:02:20+00:00: [job-1] job-1 second\n"
+            "1970-01-01T00:02:30+00:00: [job-2] job-2 second\n"
+        )
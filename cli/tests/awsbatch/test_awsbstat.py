@@ -1,9 +1,12 @@
 import json
 import os
+import time
 
 import pytest
+from botocore.exceptions import ClientError
 
 from awsbatch import awsbstat
+from awsbatch.common import LiveDisplay
 from tests.common import MockedBoto3Request, read_text
 from tests.conftest import DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG
 
@@ -15,6 +18,23 @@ class TestArgs(object):
     def test_missing_cluster_parameter(self, failed_with_message):
         failed_with_message(awsbstat.main, "Error: cluster parameter is required\n", argv=[])
 
+    def test_no_sort_with_table_output(self, failed_with_message):
+        failed_with_message(
+            awsbstat.main, "Error: --no-sort requires ndjson or csv output\n", argv=["-c", "cluster", "--no-sort"]
+        )
+
+
+@pytest.mark.usefixtures("awsbatchcliconfig_mock")
+@pytest.mark.parametrize(
+    "args, expected_retry",
+    [([], True), (["-o", "table"], True), (["-o", "ndjson"], False), (["-o", "csv"], False), (["-w", "5"], False)],
+)
+def test_retry_with_updated_cluster(mocker, args, expected_retry):
+    # commands printing jobs while running are not run again, not to print them twice
+    run_mock = mocker.patch("awsbatch.awsbstat.run_with_cluster_config")
+    awsbstat.main(["-c", "cluster"] + args)
+    assert run_mock.call_args[1] == {"retry": expected_retry}
+
 
 @pytest.fixture()
 def boto3_stubber_path():
@@ -110,6 +130,42 @@ class TestOutput(object):
 
         assert capsys.readouterr().out == read_text(test_datadir / "expected_output.txt")
 
+    @pytest.mark.parametrize(
+        "args, sort_buffer_size, expected",
+        [
+            (["-o", "csv"], 10000, "expected_output.csv"),
+            (["-o", "csv"], 4, "expected_output.csv"),
+            (["-o", "csv", "--no-sort"], 10000, "expected_output_unsorted.csv"),
+            (["-o", "ndjson"], 10000, "expected_output.ndjson"),
+        ],
+        ids=["csv", "csv_spilled_sort", "csv_unsorted", "ndjson"],
+    )
+    def test_all_status_streaming(
+        self, args, sort_buffer_size, expected, capsys, boto3_stubber, test_datadir, shared_datadir, mocker
+    ):
+        mocker.patch("awsbatch.common.StreamingOutput.SORT_BUFFER_SIZE", sort_buffer_size)
+        mocked_requests = []
+        for status in ALL_JOB_STATUS:
+            response = json.loads(
+                read_text(shared_datadir / "aws_api_responses/batch_list-jobs_{0}.json".format(status))
+            )
+            mocked_requests.append(
+                MockedBoto3Request(
+                    method="list_jobs",
+                    response=response,
+                    expected_params={
+                        "jobQueue": DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG["job_queue"],
+                        "jobStatus": status,
+                        "nextToken": "",
+                    },
+                )
+            )
+        boto3_stubber("batch", mocked_requests)
+
+        awsbstat.main(["-c", "cluster", "-s", "ALL"] + args)
+
+        assert capsys.readouterr().out == read_text(test_datadir / expected)
+
     def test_single_job_detailed(self, capsys, boto3_stubber, test_datadir, shared_datadir):
         response = json.loads(read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_job.json"))
         boto3_stubber(
@@ -446,3 +502,201 @@ class TestOutput(object):
         awsbstat.main(["-c", "cluster"] + args)
 
         assert capsys.readouterr().out == read_text(test_datadir / expected)
+
+
+@pytest.mark.usefixtures("awsbatchcliconfig_mock")
+@pytest.mark.usefixtures("convert_to_date_mock")
+class TestConcurrentDescribe(object):
+    @staticmethod
+    def _job(job_id, **kwargs):
+        job = {"jobId": job_id, "jobName": "job", "status": "RUNNING", "createdAt": 1543503601952}
+        job.update(kwargs)
+        return job
+
+    @pytest.fixture()
+    def batch_client(self, mocker):
+        boto3_factory = mocker.patch("awsbatch.awsbstat.Boto3ClientFactory", autospec=True)
+        return boto3_factory.return_value.get_client.return_value
+
+    def test_children_order_preserved(self, capsys, batch_client):
+        parent = self._job("parent", arrayProperties={"size": 250})
+
+        def _describe_jobs(jobs):
+            if jobs == ["parent"]:
+                return {"jobs": [parent]}
+            # make later chunks complete first
+            time.sleep(0.01 * (3 - int(jobs[0].split(":")[1]) // 100))
+            return {"jobs": [self._job(job_id) for job_id in jobs]}
+
+        batch_client.describe_jobs.side_effect = _describe_jobs
+
+        awsbstat.main(["-c", "cluster", "-o", "ndjson", "--no-sort", "--max-workers", "4", "parent"])
+
+        job_ids = [json.loads(line)["jobId"] for line in capsys.readouterr().out.splitlines()]
+        assert job_ids == ["parent [250]"] + ["parent:{0}".format(index) for index in range(250)]
+        assert [len(call[1]["jobs"]) for call in batch_client.describe_jobs.call_args_list[1:]] == [100, 100, 50]
+
+    def test_retry_on_throttling(self, capsys, batch_client, mocker):
+        sleep_mock = mocker.patch("awsbatch.utils.time.sleep")
+        throttling_error = ClientError({"Error": {"Code": "TooManyRequestsException"}}, "DescribeJobs")
+        batch_client.describe_jobs.side_effect = [throttling_error, throttling_error, {"jobs": [self._job("job-1")]}]
+
+        awsbstat.main(["-c", "cluster", "-o", "ndjson", "job-1"])
+
+        assert [json.loads(line)["jobId"] for line in capsys.readouterr().out.splitlines()] == ["job-1"]
+        assert batch_client.describe_jobs.call_count == 3
+        assert sleep_mock.call_count == 2
+
+    def test_details_reuse_described_jobs(self, capsys, batch_client):
+        batch_client.describe_jobs.return_value = {"jobs": [self._job("job-1")]}
+
+        awsbstat.main(["-c", "cluster", "-d", "-o", "ndjson", "job-1", "job-1"])
+
+        assert len(capsys.readouterr().out.splitlines()) == 1
+        batch_client.describe_jobs.assert_called_once_with(jobs=["job-1"])
+
+
+@pytest.mark.usefixtures("awsbatchcliconfig_mock")
+@pytest.mark.usefixtures("convert_to_date_mock")
+class TestListJobs(object):
+    def test_since_filter(self, capsys, boto3_stubber, shared_datadir):
+        jobs = []
+        for status in ALL_JOB_STATUS:
+            jobs.extend(
+                json.loads(read_text(shared_datadir / "aws_api_responses/batch_list-jobs_{0}.json".format(status)))[
+                    "jobSummaryList"
+                ]
+            )
+        boto3_stubber(
+            "batch",
+            MockedBoto3Request(
+                method="list_jobs",
+                response={"jobSummaryList": jobs},
+                expected_params={
+                    "jobQueue": DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG["job_queue"],
+                    "filters": [{"name": "AFTER_CREATED_AT", "values": ["1543502790000"]}],
+                    "nextToken": "",
+                },
+            ),
+        )
+
+        awsbstat.main(["-c", "cluster", "-s", "ALL", "--since", "2018-11-29T14:46:30Z", "-o", "ndjson"])
+
+        output = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [job["status"] for job in output] == [
+            "SUBMITTED",
+            "SUBMITTED",
+            "PENDING",
+            "STARTING",
+            "STARTING",
+            "RUNNING",
+            "RUNNING",
+        ]
+
+    def test_concurrent_status_listing(self, capsys, mocker):
+        boto3_factory = mocker.patch("awsbatch.awsbstat.Boto3ClientFactory", autospec=True)
+        batch_client = boto3_factory.return_value.get_client.return_value
+        # list_jobs filters are not supported by the installed botocore
+        batch_client.meta.service_model.operation_model.return_value.input_shape.members = {}
+
+        def _list_jobs(jobQueue, jobStatus, nextToken):
+            jobs = [
+                {"jobId": "job-{0}".format(jobStatus), "jobName": "job", "status": jobStatus, "createdAt": 1},
+                {"jobId": "other-{0}".format(jobStatus), "jobName": "other", "status": jobStatus, "createdAt": 1},
+            ]
+            if jobStatus in ["RUNNABLE", "RUNNING"]:
+                # the job changed status between the two listings
+                jobs.append({"jobId": "moving", "jobName": "job", "status": jobStatus, "createdAt": 1})
+            return {"jobSummaryList": jobs}
+
+        batch_client.list_jobs.side_effect = _list_jobs
+
+        awsbstat.main(["-c", "cluster", "--name-prefix", "jo", "-o", "ndjson", "--max-workers", "4"])
+
+        assert sorted(json.loads(line)["jobId"] for line in capsys.readouterr().out.splitlines()) == [
+            "job-PENDING",
+            "job-RUNNABLE",
+            "job-RUNNING",
+            "job-STARTING",
+            "job-SUBMITTED",
+            "moving",
+        ]
+        assert sorted(call[1]["jobStatus"] for call in batch_client.list_jobs.call_args_list) == sorted(
+            DEFAULT_JOB_STATUS
+        )
+
+
+@pytest.mark.usefixtures("convert_to_date_mock")
+class TestWatch(object):
+    def test_watch_polls_only_active_jobs(self, capsys, mocker):
+        boto3_factory = mocker.MagicMock()
+        batch_client = boto3_factory.get_client.return_value
+        # list_jobs filters are not supported by the installed botocore
+        batch_client.meta.service_model.operation_model.return_value.input_shape.members = {}
+
+        def _job(job_id, status):
+            return {"jobId": job_id, "jobName": job_id, "status": status, "createdAt": 1543503601952}
+
+        listed_jobs = {"RUNNING": [_job("job-a", "RUNNING")], "SUCCEEDED": [_job("job-b", "SUCCEEDED")]}
+
+        def _next_poll(interval):
+            # job-a terminates and job-c is submitted between the two polls
+            listed_jobs.clear()
+            listed_jobs.update({"RUNNABLE": [_job("job-c", "RUNNABLE")], "SUCCEEDED": [_job("job-a", "SUCCEEDED")]})
+
+        mocker.patch("awsbatch.awsbstat.time.sleep", side_effect=_next_poll)
+        batch_client.list_jobs.side_effect = lambda jobQueue, jobStatus, nextToken: {
+            "jobSummaryList": listed_jobs.get(jobStatus, [])
+        }
+        batch_client.describe_jobs.return_value = {"jobs": [_job("job-a", "SUCCEEDED")]}
+
+        command = awsbstat.AWSBstatCommand(mocker.MagicMock(), boto3_factory, max_workers=1)
+        command.watch(interval=5, job_status=ALL_JOB_STATUS, expand_children=False, job_queue="queue", iterations=2)
+
+        # terminal statuses are listed only at the first poll, job-a is described since it was running
+        assert [call[1]["jobStatus"] for call in batch_client.list_jobs.call_args_list] == (
+            ALL_JOB_STATUS + DEFAULT_JOB_STATUS
+        )
+        batch_client.describe_jobs.assert_called_once_with(jobs=["job-a"])
+        second_poll = capsys.readouterr().out.split("Every 5s")[2].splitlines()
+        assert [line.split()[:3] for line in second_poll[4:7]] == [
+            ["job-c", "job-c", "RUNNABLE"],
+            ["job-a", "job-a", "SUCCEEDED"],
+            ["job-b", "job-b", "SUCCEEDED"],
+        ]
+
+
+class TestLiveDisplay(object):
+    def test_redraw_changed_lines(self, mocker):
+        stdout = mocker.patch("awsbatch.common.sys.stdout")
+        stdout.isatty.return_value = True
+        stdout.fileno.side_effect = ValueError
+
+        display = LiveDisplay()
+        display.update("header\nrow 1\nrow 2")
+        assert "".join(call[0][0] for call in stdout.write.call_args_list) == (
+            "\x1b[H\x1b[2J\x1b[1;1Hheader\x1b[K\x1b[2;1Hrow 1\x1b[K\x1b[3;1Hrow 2\x1b[K\x1b[4;1H\x1b[J"
+        )
+        stdout.write.reset_mock()
+
+        display.update("header\nrow 1 changed")
+        assert "".join(call[0][0] for call in stdout.write.call_args_list) == (
+            "\x1b[2;1Hrow 1 changed\x1b[K\x1b[3;1H\x1b[J"
+        )
+
+
+def test_shared_described_jobs_cache(mocker):
+    time_mock = mocker.patch("awsbatch.awsbstat.time.time", return_value=100)
+    cache = awsbstat.SharedDescribedJobsCache(ttl=5, max_size=2)
+    cache.put({"jobId": "running", "status": "RUNNING"})
+    cache.put({"jobId": "succeeded", "status": "SUCCEEDED"})
+    assert cache.get("running")["status"] == "RUNNING"
+
+    # jobs not in a terminal status expire, the others are kept until evicted
+    time_mock.return_value = 105
+    assert cache.get("running") is None
+    assert cache.get("succeeded")["status"] == "SUCCEEDED"
+    cache.put({"jobId": "failed", "status": "FAILED"})
+    cache.put({"jobId": "runnable", "status": "RUNNABLE"})
+    assert cache.get("succeeded") is None
+    assert cache.get("failed")["status"] == "FAILED"
@@ -0,0 +1,257 @@
+import os
+
+import pytest
+
+from awsbatch import awsbsub, utils
+from awsbatch.utils import FileHashCache, compute_file_hash
+from tests.common import MockedBoto3Request
+from tests.conftest import DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    # we need to set the region in the environment because the Boto3ClientFactory requires it.
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+    return "awsbatch.common.boto3"
+
+
+@pytest.fixture()
+def manifest(tmpdir):
+    def _write_manifest(rows):
+        tmpdir.join("reference.dat").write("reference")
+        tmpdir.join("input-1.dat").write("input")
+        # same content of input-1.dat
+        tmpdir.join("input-2.dat").write("input")
+        manifest_file = tmpdir.join("jobs.csv")
+        manifest_file.write("\n".join(rows) + "\n")
+        return str(manifest_file)
+
+    cwd = os.getcwd()
+    tmpdir.chdir()
+    yield _write_manifest
+    os.chdir(cwd)
+
+
+class TestArgs(object):
+    def test_manifest_with_command(self, failed_with_message, manifest):
+        manifest_file = manifest(["name,command", "job,echo"])
+        failed_with_message(
+            awsbsub.main,
+            "Error: command and arguments cannot be specified with --manifest option.\n",
+            argv=["--manifest", manifest_file, "echo"],
+        )
+
+    @pytest.mark.parametrize(
+        "rows, error_message",
+        [
+            (["name,command", "job,"], "line 2: name and command are required"),
+            (["name,command", "job,echo", "job,echo"], "line 3: job name (job) is duplicated"),
+            (["name,command,vcpus", "job,echo,two"], "line 2: vcpus (two) must be an integer"),
+            (["name,command,input_files", "job,echo,missing.dat"], "line 2: input file (missing.dat) must be"),
+        ],
+    )
+    def test_invalid_manifest(self, capsys, manifest, rows, error_message):
+        args = awsbsub._get_parser().parse_args(["--manifest", "jobs.csv"])
+        with pytest.raises(SystemExit):
+            awsbsub._read_manifest(manifest(rows), args)
+        assert error_message in capsys.readouterr().err
+
+    def test_circular_dependencies(self, capsys, manifest):
+        args = awsbsub._get_parser().parse_args(["--manifest", "jobs.csv"])
+        jobs = awsbsub._read_manifest(
+            manifest(["name,command,depends_on", "first,echo,", "second,echo,third", "third,echo,first;second"]), args
+        )
+        with pytest.raises(SystemExit):
+            awsbsub._get_submission_waves(jobs)
+        assert "circular dependencies between the jobs (second, third)" in capsys.readouterr().err
+
+
+def _submit_job_request(job_name, command, job_id, depends_on, vcpus=1):
+    return MockedBoto3Request(
+        method="submit_job",
+        response={"jobId": job_id, "jobName": job_name},
+        expected_params={
+            "jobName": job_name,
+            "jobQueue": DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG["job_queue"],
+            "jobDefinition": "job-definition",
+            "dependsOn": [{"jobId": dependency} for dependency in depends_on],
+            "retryStrategy": {"attempts": 1},
+            "containerOverrides": {
+                "command": ["/bin/bash", "-c", command],
+                "vcpus": vcpus,
+                "memory": 128,
+                "environment": [
+                    {"name": "MASTER_IP", "value": "master-ip"},
+                    {"name": "PCLUSTER_JOB_S3_URL", "value": "s3://bucket/artifacts/batch/job-manifest-1/"},
+                ],
+            },
+            "arrayProperties": {},
+        },
+    )
+
+
+@pytest.fixture()
+def manifest_config_mock(awsbatchcliconfig_mock):
+    for key, value in {
+        "s3_bucket": "bucket",
+        "artifact_directory": "artifacts",
+        "job_definition": "job-definition",
+        "master_ip": "master-ip",
+    }.items():
+        setattr(awsbatchcliconfig_mock.return_value, key, value)
+
+
+@pytest.mark.usefixtures("manifest_config_mock")
+class TestManifest(object):
+    def test_submit_manifest(self, capsys, boto3_stubber, mocker, manifest):
+        mocker.patch("awsbatch.awsbsub._generate_unique_job_key", return_value="job-manifest-1")
+        s3_uploader_mock = mocker.patch("awsbatch.awsbsub.S3Uploader", autospec=True)
+        # reference.dat has been uploaded by a previous submission
+        s3_uploader_mock.return_value.exists.side_effect = lambda key, folder: key == compute_file_hash("reference.dat")
+        manifest_file = manifest(
+            [
+                "name,command,input_files,depends_on,vcpus",
+                "postprocess,./merge.sh,,sweep-1;sweep-2;existing-job,",
+                "sweep-1,./run.sh 1,input-1.dat,,2",
+                "sweep-2,./run.sh 2,input-2.dat,,2",
+            ]
+        )
+
+        input_key = "artifacts/batch/cas/" + compute_file_hash("input-1.dat")
+        reference_key = "artifacts/batch/cas/" + compute_file_hash("reference.dat")
+
+        def _command(input_files, command):
+            copies = "".join(
+                "aws s3 --region region cp s3://bucket/{0} {1} >/dev/null && ".format(key, name)
+                for key, name in input_files
+            )
+            return "mkdir -p job-${AWS_BATCH_JOB_ID} && cd job-${AWS_BATCH_JOB_ID} && " + copies + command
+
+        boto3_stubber(
+            "batch",
+            [
+                _submit_job_request(
+                    "sweep-1",
+                    _command([(reference_key, "reference.dat"), (input_key, "input-1.dat")], "./run.sh 1"),
+                    "job-id-1",
+                    [],
+                    vcpus=2,
+                ),
+                _submit_job_request(
+                    "sweep-2",
+                    _command([(reference_key, "reference.dat"), (input_key, "input-2.dat")], "./run.sh 2"),
+                    "job-id-2",
+                    [],
+                    vcpus=2,
+                ),
+                _submit_job_request(
+                    "postprocess",
+                    _command([(reference_key, "reference.dat")], "./merge.sh"),
+                    "job-id-3",
+                    ["job-id-1", "job-id-2", "existing-job"],
+                ),
+            ],
+        )
+
+        awsbsub.main(["-c", "cluster", "--manifest", manifest_file, "-if", "reference.dat"])
+
+        # files with the same content are uploaded once, files already staged are not uploaded
+        assert s3_uploader_mock.return_value.put_file.call_args_list == [
+            mocker.call("input-1.dat", compute_file_hash("input-1.dat"), folder="artifacts/batch/cas/")
+        ]
+        assert capsys.readouterr().out.splitlines() == [
+            "jobName      jobId",
+            "-----------  --------",
+            "sweep-1      job-id-1",
+            "sweep-2      job-id-2",
+            "postprocess  job-id-3",
+        ]
+
+    def test_dependency_not_submitted(self, capsys, boto3_stubber, mocker, manifest):
+        mocker.patch("awsbatch.awsbsub.S3Uploader", autospec=True)
+        boto3_stubber(
+            "batch",
+            MockedBoto3Request(
+                method="submit_job",
+                response="Job queue not found",
+                expected_params=None,
+                generate_error=True,
+                error_code="ClientException",
+            ),
+        )
+
+        with pytest.raises(SystemExit):
+            awsbsub.main(
+                [
+                    "-c",
+                    "cluster",
+                    "--manifest",
+                    manifest(["name,command,depends_on", "first,echo,", "second,echo,first"]),
+                ]
+            )
+
+        output = capsys.readouterr()
+        assert output.out.splitlines()[2:] == ["first      -", "second     -"]
+        assert output.err.splitlines()[1:] == [
+            "Job (second) not submitted since job (first) has not been submitted.",
+            "Error: 2 of 2 jobs have not been submitted.",
+        ]
+
+
+@pytest.mark.usefixtures("manifest_config_mock")
+def test_command_file_staged_by_hash(boto3_stubber, mocker, tmpdir):
+    tmpdir.chdir()
+    tmpdir.join("script.sh").write("echo $1")
+    mocker.patch("awsbatch.awsbsub._generate_unique_job_key", return_value="job-script-1")
+    mocker.patch("awsbatch.awsbsub.S3Uploader", autospec=True).return_value.exists.return_value = False
+    script_key = "artifacts/batch/cas/" + compute_file_hash("script.sh")
+    job_s3_folder = "artifacts/batch/job-script-1/"
+    boto3_stubber(
+        "batch",
+        MockedBoto3Request(
+            method="submit_job",
+            response={"jobId": "job-id", "jobName": "script"},
+            expected_params={
+                "jobName": "script",
+                "jobQueue": DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG["job_queue"],
+                "jobDefinition": "job-definition",
+                "dependsOn": [],
+                "retryStrategy": {"attempts": 1},
+                "containerOverrides": {
+                    "command": [
+                        "/bin/bash",
+                        "-c",
+                        "mkdir -p job-${AWS_BATCH_JOB_ID} && cd job-${AWS_BATCH_JOB_ID} && "
+                        "aws s3 --region region sync s3://bucket/" + job_s3_folder + " . >/dev/null && "
+                        "aws s3 --region region cp s3://bucket/" + script_key + " script.sh >/dev/null && "
+                        "chmod +x script.sh && ./script.sh first",
+                    ],
+                    "vcpus": 1,
+                    "memory": 128,
+                    "environment": [
+                        {"name": "MASTER_IP", "value": "master-ip"},
+                        {"name": "PCLUSTER_JOB_S3_URL", "value": "s3://bucket/" + job_s3_folder},
+                    ],
+                },
+                "arrayProperties": {},
+            },
+        ),
+    )
+
+    awsbsub.main(["-c", "cluster", "-jn", "script", "-cf", "script.sh", "first"])
+
+
+def test_file_hash_cache(tmpdir, mocker):
+    input_file = tmpdir.join("input.dat")
+    input_file.write("content")
+    compute_file_hash_spy = mocker.spy(utils, "compute_file_hash")
+
+    file_hash_cache = FileHashCache()
+    digest = file_hash_cache.get_hash(str(input_file))
+    file_hash_cache.save()
+    # an unchanged file is not read again, also by the following commands
+    assert FileHashCache().get_hash(str(input_file)) == digest
+    assert compute_file_hash_spy.call_count == 1
+
+    input_file.write("new content")
+    assert FileHashCache().get_hash(str(input_file)) == compute_file_hash(str(input_file)) != digest
@@ -0,0 +1,115 @@
+import logging
+import os
+
+import pytest
+
+from awsbatch.common import AWSBatchCliConfig, run_with_cluster_config
+from awsbatch.utils import fail
+from tests.common import MockedBoto3Request
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "awsbatch.common.boto3"
+
+
+@pytest.fixture()
+def home_dir(tmpdir, mocker):
+    mocker.patch("awsbatch.common.default_config_file_path", return_value=str(tmpdir.join("missing-config")))
+    mocker.patch.dict(os.environ, {"HOME": str(tmpdir), "AWS_DEFAULT_REGION": "us-east-1"})
+    return tmpdir
+
+
+def _describe_stacks_request(stack_id="id", job_queue="job-queue"):
+    return MockedBoto3Request(
+        method="describe_stacks",
+        response={
+            "Stacks": [
+                {
+                    "StackName": "parallelcluster-cluster",
+                    "StackId": "arn:aws:cloudformation:us-east-1:123456789012:stack/parallelcluster-cluster/"
+                    + stack_id,
+                    "CreationTime": "2020-01-01T00:00:00Z",
+                    "StackStatus": "CREATE_COMPLETE",
+                    "Outputs": [
+                        {"OutputKey": "ResourcesS3Bucket", "OutputValue": "bucket"},
+                        {"OutputKey": "ArtifactS3RootDirectory", "OutputValue": "artifacts"},
+                        {"OutputKey": "BatchComputeEnvironmentArn", "OutputValue": "compute-environment"},
+                        {"OutputKey": "BatchJobQueueArn", "OutputValue": job_queue},
+                        {"OutputKey": "BatchJobDefinitionArn", "OutputValue": "job-definition"},
+                        {"OutputKey": "MasterPrivateIP", "OutputValue": "10.0.0.1"},
+                    ],
+                }
+            ]
+        },
+        expected_params={"StackName": "parallelcluster-cluster"},
+    )
+
+
+def test_cluster_config_cached(boto3_stubber, home_dir, mocker):
+    # a single request for the two commands
+    boto3_stubber("cloudformation", _describe_stacks_request())
+    log = logging.getLogger("awsbatch-cli")
+
+    config = AWSBatchCliConfig(log, "cluster")
+    cached_config = AWSBatchCliConfig(log, "cluster")
+
+    for attribute in ["region", "s3_bucket", "artifact_directory", "job_queue", "job_definition", "master_ip"]:
+        assert getattr(cached_config, attribute) == getattr(config, attribute)
+    assert cached_config.job_queue == "job-queue"
+
+    # the information is described again after the time to live
+    cache_file = str(home_dir.join("awsbatch-cli-clusters.json"))
+    mocker.patch("awsbatch.common.time.time", return_value=os.path.getmtime(cache_file) + 11 * 60)
+    boto3_stubber("cloudformation", _describe_stacks_request())
+    AWSBatchCliConfig(log, "cluster")
+
+
+def test_cluster_config_cache_disabled(boto3_stubber, home_dir):
+    home_dir.join(".parallelcluster", "awsbatch-cli.cfg").write("[main]\ncache_ttl = 0\n", ensure=True)
+    boto3_stubber("cloudformation", [_describe_stacks_request(), _describe_stacks_request()])
+    log = logging.getLogger("awsbatch-cli")
+
+    AWSBatchCliConfig(log, "cluster")
+    AWSBatchCliConfig(log, "cluster")
+
+
+@pytest.mark.parametrize(
+    "recreated_stack, retry, expected_job_queues",
+    [
+        (True, True, ["job-queue", "new-job-queue"]),
+        (True, False, ["job-queue"]),
+        (False, True, ["job-queue"]),
+    ],
+)
+def test_run_with_cluster_config(boto3_stubber, home_dir, capsys, recreated_stack, retry, expected_job_queues):
+    log = logging.getLogger("awsbatch-cli")
+    boto3_stubber("cloudformation", _describe_stacks_request())
+    AWSBatchCliConfig(log, "cluster")
+
+    # the cached information is checked against the stack only when the command fails
+    boto3_stubber(
+        "cloudformation",
+        _describe_stacks_request(stack_id="new-id", job_queue="new-job-queue")
+        if recreated_stack
+        else _describe_stacks_request(),
+    )
+    config = AWSBatchCliConfig(log, "cluster")
+    job_queues = []
+
+    def _run(config):
+        job_queues.append(config.job_queue)
+        if config.job_queue == "job-queue":
+            fail("Job queue not found")
+
+    if expected_job_queues[-1] == "job-queue":
+        with pytest.raises(SystemExit):
+            run_with_cluster_config(log, config, _run, retry=retry)
+    else:
+        run_with_cluster_config(log, config, _run, retry=retry)
+
+    assert job_queues == expected_job_queues
+    if recreated_stack and not retry:
+        assert "please run the command again" in capsys.readouterr().err
+    # the cache entry is replaced with the information of the current stack
+    assert AWSBatchCliConfig(log, "cluster").job_queue == ("new-job-queue" if recreated_stack else "job-queue")
@@ -19,6 +19,67 @@ def clear_env():
         del os.environ["AWS_DEFAULT_REGION"]
 
 
+@pytest.fixture(autouse=True)
+def clear_instance_type_info_catalog():
+    """Prevent instance types retrieved by a test from being served from memory to the following ones."""
+    from pcluster.utils import INSTANCE_TYPE_INFO_CATALOG
+
+    INSTANCE_TYPE_INFO_CATALOG.clear()
+
+
+@pytest.fixture(autouse=True)
+def disable_metadata_cache(mocker):
+    """Prevent tests from reading or writing the EC2 metadata cache in the user's home directory."""
+    mocker.patch("pcluster.metadata_cache.METADATA_CACHE.enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def isolate_file_hash_cache(mocker, tmpdir):
+    """Prevent tests from reading or writing the file hash cache in the user's home directory."""
+    mocker.patch("awsbatch.utils.FILE_HASH_CACHE_FILE", str(tmpdir.join("awsbatch-cli-hashes.json")))
+
+
+@pytest.fixture(autouse=True)
+def isolate_template_cache(mocker, tmpdir):
+    """Prevent tests from reading or writing the template cache in the user's home directory."""
+    mocker.patch("pcluster.template_cache.TEMPLATE_CACHE.cache_dir", str(tmpdir.join("templates")))
+
+
+@pytest.fixture(autouse=True)
+def isolate_cluster_config_cache(mocker, tmpdir):
+    """Prevent tests from reading or writing the cluster information cache in the user's home directory."""
+    mocker.patch("awsbatch.common.CLUSTER_CONFIG_CACHE_FILE", str(tmpdir.join("awsbatch-cli-clusters.json")))
+
+
+@pytest.fixture(autouse=True)
+def serialize_validators(mocker):
+    """Run validators sequentially, so that stubbed boto3 responses are consumed in a deterministic order."""
+    mocker.patch("pcluster.config.validation_scheduler.ValidationScheduler.MAX_WORKERS", 1)
+
+
+@pytest.fixture(autouse=True)
+def serialize_awsbatch_requests(mocker):
+    """Make AWS Batch CLI requests sequentially, so that stubbed boto3 responses are consumed in order."""
+    for module in ["awsbstat", "awsbkill", "awsbout", "awsbhosts", "awsbsub"]:
+        mocker.patch("awsbatch.{0}.DEFAULT_MAX_WORKERS".format(module), 1)
+
+
+@pytest.fixture(autouse=True)
+def clear_validation_memo():
+    """Prevent validator results memoized by a test from being reused by the following ones."""
+    from pcluster.config.validation_scheduler import VALIDATION_MEMO
+
+    VALIDATION_MEMO.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_boto3_default_session():
+    """Prevent the boto3 client pool installed by a test from serving clients to the following ones."""
+    default_session = boto3.DEFAULT_SESSION
+    yield
+    boto3.DEFAULT_SESSION = default_session
+
+
 @pytest.fixture
 def failed_with_message(capsys):
     """Assert that the command exited with a specific error message."""
@@ -151,6 +212,8 @@ def awsbatchcliconfig_mock(request, mocker):
     mock = mocker.patch("awsbatch." + module_under_test + ".AWSBatchCliConfig", autospec=True)
     for key, value in DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG.items():
         setattr(mock.return_value, key, value)
+    # the cluster information is not read from the cache, failed commands are not run again
+    mock.return_value.refresh.return_value = False
     return mock
 
 
@@ -0,0 +1,195 @@
+"""This module provides unit tests for the functions in the pcluster.fleet_status module."""
+import json
+from argparse import Namespace
+
+import pytest
+from assertpy import assert_that
+
+from pcluster.cli_commands.fleet_status import fleet_status, get_fleet_status
+from tests.common import MockedBoto3Request
+
+REGION = "us-east-1"
+CE_ARN = "arn:aws:batch:us-east-1:123456789012:compute-environment/batch-ce"
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.cli_commands.fleet_status.boto3"
+
+
+def _stack(cluster_name, outputs, scheduler="slurm", parent_id=None, name_prefix="parallelcluster-"):
+    stack = {
+        "StackName": name_prefix + cluster_name,
+        "StackId": "arn:aws:cloudformation:us-east-1:123456789012:stack/{0}/1".format(cluster_name),
+        "StackStatus": "CREATE_COMPLETE",
+        "CreationTime": 0,
+        "Parameters": [{"ParameterKey": "Scheduler", "ParameterValue": scheduler}],
+        "Outputs": [{"OutputKey": key, "OutputValue": value} for key, value in outputs.items()],
+        "Tags": [{"Key": "Version", "Value": "2.10.1"}],
+    }
+    if parent_id:
+        stack["ParentId"] = parent_id
+    return stack
+
+
+def _master_filters(stack_names, node_tag):
+    return [
+        {"Name": "tag:Application", "Values": stack_names},
+        {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]},
+        {"Name": node_tag, "Values": ["Master"]},
+    ]
+
+
+def test_get_fleet_status(boto3_stubber, mocker):
+    status_manager_mock = mocker.patch("pcluster.cli_commands.fleet_status.ComputeFleetStatusManager", autospec=True)
+    status_manager_mock.return_value.get_status.return_value = "RUNNING"
+    boto3_stubber(
+        "cloudformation",
+        MockedBoto3Request(
+            method="describe_stacks",
+            response={
+                "Stacks": [
+                    _stack("sit", {"ASGName": "sit-asg"}, scheduler="sge"),
+                    _stack("hit", {"IsHITCluster": "true"}),
+                    _stack("batch", {"BatchComputeEnvironmentArn": CE_ARN}, scheduler="awsbatch"),
+                    _stack("hit-EBSCfnStack", {}, parent_id="parent"),
+                    _stack("other", {}, name_prefix="not-a-cluster-"),
+                ]
+            },
+            expected_params={},
+        ),
+    )
+    stack_names = ["parallelcluster-sit", "parallelcluster-hit", "parallelcluster-batch"]
+    boto3_stubber(
+        "ec2",
+        [
+            MockedBoto3Request(
+                method="describe_instances",
+                response={
+                    "Reservations": [
+                        {
+                            "Instances": [
+                                {
+                                    "InstanceId": "i-{0}".format(index),
+                                    "State": {"Name": "running"},
+                                    "Tags": [{"Key": "Application", "Value": stack_name}],
+                                }
+                                for index, stack_name in enumerate(stack_names[:2])
+                            ]
+                        }
+                    ]
+                },
+                expected_params={"Filters": _master_filters(stack_names, "tag:aws-parallelcluster-node-type")},
+            ),
+            # clusters without node type tag are looked up by name
+            MockedBoto3Request(
+                method="describe_instances",
+                response={"Reservations": []},
+                expected_params={"Filters": _master_filters(["parallelcluster-batch"], "tag:Name")},
+            ),
+        ],
+    )
+    boto3_stubber(
+        "autoscaling",
+        MockedBoto3Request(
+            method="describe_auto_scaling_groups",
+            response={
+                "AutoScalingGroups": [
+                    {
+                        "AutoScalingGroupName": "sit-asg",
+                        "MinSize": 0,
+                        "MaxSize": 10,
+                        "DesiredCapacity": 2,
+                        "DefaultCooldown": 300,
+                        "AvailabilityZones": ["us-east-1a"],
+                        "HealthCheckType": "EC2",
+                        "CreatedTime": 0,
+                    }
+                ]
+            },
+            expected_params={"AutoScalingGroupNames": ["sit-asg"]},
+        ),
+    )
+    boto3_stubber(
+        "batch",
+        MockedBoto3Request(
+            method="describe_compute_environments",
+            response={
+                "computeEnvironments": [
+                    {
+                        "computeEnvironmentName": "batch-ce",
+                        "computeEnvironmentArn": CE_ARN,
+                        "ecsClusterArn": "ecs-cluster",
+                        "computeResources": {
+                            "type": "EC2",
+                            "minvCpus": 0,
+                            "maxvCpus": 256,
+                            "desiredvCpus": 4,
+                            "subnets": [],
+                            "instanceRole": "role",
+                        },
+                    }
+                ]
+            },
+            expected_params={"computeEnvironments": [CE_ARN]},
+        ),
+    )
+
+    clusters = get_fleet_status([REGION], max_workers=4)
+
+    assert_that([cluster["cluster_name"] for cluster in clusters]).is_equal_to(["batch", "hit", "sit"])
+    assert_that(clusters[0]).is_equal_to(
+        {
+            "cluster_name": "batch",
+            "region": REGION,
+            "stack_status": "CREATE_COMPLETE",
+            "version": "2.10.1",
+            "scheduler": "awsbatch",
+            "head_node_state": None,
+            "compute_fleet_status": None,
+            "capacity": {"desired": 4, "min": 0, "max": 256, "unit": "vCPUs"},
+        }
+    )
+    assert_that(clusters[1]["head_node_state"]).is_equal_to("running")
+    assert_that(clusters[1]["compute_fleet_status"]).is_equal_to("RUNNING")
+    assert_that(clusters[1]["capacity"]).is_none()
+    assert_that(clusters[2]["capacity"]).is_equal_to({"desired": 2, "min": 0, "max": 10, "unit": "instances"})
+    # the compute fleet status is only read for the clusters storing it in DynamoDB
+    status_manager_mock.assert_called_once_with("hit", REGION)
+
+
+@pytest.mark.parametrize("output_json", [False, True])
+def test_fleet_status(mocker, output_json):
+    mocker.patch("pcluster.cli_commands.fleet_status.PclusterConfig.init_aws")
+    cluster = {
+        "cluster_name": "sit",
+        "region": "eu-west-1",
+        "stack_status": "UPDATE_COMPLETE",
+        "version": "2.10.1",
+        "scheduler": "sge",
+        "head_node_state": "running",
+        "compute_fleet_status": None,
+        "capacity": {"desired": 2, "min": 0, "max": 10, "unit": "instances"},
+    }
+    get_fleet_status_mock = mocker.patch("pcluster.cli_commands.fleet_status.get_fleet_status", return_value=[cluster])
+    logger_mock = mocker.patch("pcluster.cli_commands.fleet_status.LOGGER")
+
+    fleet_status(
+        Namespace(
+            cluster_name=None,
+            config_file=None,
+            all=False,
+            regions="eu-west-1, us-east-1",
+            json=output_json,
+            max_workers=8,
+        )
+    )
+
+    get_fleet_status_mock.assert_called_with(["eu-west-1", "us-east-1"], max_workers=8)
+    output = logger_mock.info.call_args[0][0]
+    if output_json:
+        assert_that(json.loads(output)).is_equal_to([cluster])
+    else:
+        assert_that(output.splitlines()[1].split()).is_equal_to(
+            ["sit", "eu-west-1", "UPDATE_COMPLETE", "2.10.1", "running", "-", "2", "(0-10)", "instances"]
+        )
@@ -13,6 +13,13 @@ import pytest
 from assertpy import assert_that
 
 from pcluster.cluster_model import ClusterModel, infer_cluster_model
+from pcluster.models.hit.hit_cluster_model import HITClusterModel
+from tests.common import MockedBoto3Request
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.cluster_model.boto3"
 
 
 @pytest.mark.parametrize(
@@ -75,3 +82,79 @@ def test_cluster_model(config_parser_cluster_dict, cfn_stack, expected_cluster_m
 
     cluster_model = infer_cluster_model(config_parser, "default", cfn_stack)
     assert_that(cluster_model).is_equal_to(expected_cluster_model)
+
+
+@pytest.mark.parametrize(
+    "dryrun_results, expected_error",
+    [
+        ({}, None),
+        ({"m5.large": (["m5 error"], [])}, "m5 error"),
+        (
+            {"c5.xlarge": (["c5 error"], []), "t2.micro": (["t2 error"], ["t2 warning"])},
+            "Dry-run tests failed for the following compute resources:\n"
+            "- queue1/cr1: c5 error\n"
+            "- queue1/cr2: t2 error\n"
+            "- queue2/cr3: c5 error",
+        ),
+    ],
+)
+def test_hit_test_compute_resources(mocker, dryrun_results, expected_error):
+    def _dryrun(**kwargs):
+        return dryrun_results.get(kwargs["InstanceType"], ([], []))
+
+    run_instance_dryrun_mock = mocker.patch.object(HITClusterModel, "_ec2_run_instance_dryrun", side_effect=_dryrun)
+    pcluster_config = mocker.MagicMock()
+    dryrun_tests = [
+        ("queue1/cr1", {"InstanceType": "c5.xlarge", "DryRun": True}),
+        ("queue1/cr2", {"InstanceType": "t2.micro", "DryRun": True}),
+        ("queue2/cr3", {"InstanceType": "c5.xlarge", "DryRun": True}),
+        ("queue2/cr4", {"InstanceType": "m5.large", "DryRun": True}),
+    ]
+
+    HITClusterModel()._HITClusterModel__test_compute_resources(pcluster_config, dryrun_tests)
+
+    # Compute resources with the same configuration are tested once
+    assert_that(run_instance_dryrun_mock.call_count).is_equal_to(3)
+    if "t2.micro" in dryrun_results:
+        pcluster_config.warn.assert_called_once_with("t2 warning")
+    if expected_error:
+        pcluster_config.error.assert_called_once_with(expected_error)
+    else:
+        pcluster_config.error.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "error_message, expected_errors",
+    [
+        (
+            "The instance type does not support specifying CpuOptions",
+            ["The instance type does not support specifying disable_hyperthreading"],
+        ),
+        ("The instance type is not supported", ["The instance type is not supported"]),
+    ],
+)
+def test_ec2_run_instance_dryrun_unsupported_operation(boto3_stubber, error_message, expected_errors):
+    run_instances_params = {
+        "InstanceType": "c5.xlarge",
+        "MinCount": 1,
+        "MaxCount": 1,
+        "ImageId": "ami-12345678",
+        "NetworkInterfaces": [{"DeviceIndex": 0, "SubnetId": "subnet-12345678"}],
+        "DryRun": True,
+    }
+    boto3_stubber(
+        "ec2",
+        MockedBoto3Request(
+            method="run_instances",
+            response=error_message,
+            expected_params=run_instances_params,
+            generate_error=True,
+            error_code="UnsupportedOperation",
+        ),
+    )
+
+    errors, warnings = HITClusterModel()._ec2_run_instance_dryrun(**run_instances_params)
+
+    # every error is reported once
+    assert_that(errors).is_equal_to(expected_errors)
+    assert_that(warnings).is_empty()
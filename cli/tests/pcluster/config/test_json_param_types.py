@@ -16,7 +16,8 @@ import pytest
 from assertpy import assert_that
 
 from pcluster.config.cfn_param_types import CfnSection
-from pcluster.config.mappings import CLUSTER_HIT
+from pcluster.config.json_param_types import JsonSection, QueueJsonSection
+from pcluster.config.mappings import CLUSTER_HIT, COMPUTE_RESOURCE, EBS, QUEUE
 from pcluster.config.param_types import SettingsParam, StorageData
 from pcluster.config.pcluster_config import PclusterConfig
 from tests.common import MockedBoto3Request
@@ -191,6 +192,58 @@ def test_config_from_json(mocker, boto3_stubber, test_datadir, pcluster_config_r
         )
 
 
+def test_incremental_refresh(mocker):
+    mocker.patch(
+        "pcluster.utils.get_instance_type",
+        side_effect=lambda instance_type: DESCRIBE_INSTANCE_TYPES_RESPONSES[instance_type]["InstanceTypes"][0],
+    )
+    mocker.patch("pcluster.config.pcluster_config.PclusterConfig.register_instance_types")
+    refresh_compute_resource_spy = mocker.spy(QueueJsonSection, "refresh_compute_resource")
+
+    pcluster_config = get_mocked_pcluster_config(mocker, auto_refresh=True)
+    cluster_section = CfnSection(CLUSTER_HIT, pcluster_config, section_label="default")
+    pcluster_config.add_section(cluster_section)
+
+    def _add_compute_resource(label, instance_type, queue_section):
+        compute_resource_section = JsonSection(
+            COMPUTE_RESOURCE, pcluster_config, section_label=label, parent_section=queue_section
+        )
+        compute_resource_section.get_param("instance_type").value = instance_type
+        pcluster_config.add_section(compute_resource_section)
+        return compute_resource_section
+
+    # Refresh is deferred until the end of the batch
+    with pcluster_config.batch_update():
+        queue_section = QueueJsonSection(QUEUE, pcluster_config, section_label="queue1", parent_section=cluster_section)
+        pcluster_config.add_section(queue_section)
+        compute_resource1 = _add_compute_resource("cr1", "c4.xlarge", queue_section)
+        assert_that(cluster_section.get_param_value("queue_settings")).is_none()
+
+    assert_that(cluster_section.get_param_value("queue_settings")).is_equal_to("queue1")
+    assert_that(cluster_section.get_param_value("default_queue")).is_equal_to("queue1")
+    assert_that(queue_section.get_param_value("compute_resource_settings")).is_equal_to("cr1")
+    assert_that(compute_resource1.get_param_value("vcpus")).is_equal_to(4)
+    assert_that(refresh_compute_resource_spy.call_count).is_equal_to(1)
+
+    # Sections not read by the compute resources do not refresh them again
+    pcluster_config.add_section(CfnSection(EBS, pcluster_config, section_label="ebs1"))
+    assert_that(cluster_section.get_param_value("ebs_settings")).is_equal_to("ebs1")
+    assert_that(refresh_compute_resource_spy.call_count).is_equal_to(1)
+
+    # A new compute resource is refreshed together with the existing ones whose dependencies changed
+    queue_section.get_param("disable_hyperthreading").value = True
+    compute_resource2 = _add_compute_resource("cr2", "t2.micro", queue_section)
+    assert_that(queue_section.get_param_value("compute_resource_settings")).is_equal_to("cr1,cr2")
+    assert_that(compute_resource1.get_param_value("vcpus")).is_equal_to(2)
+    assert_that(compute_resource2.get_param_value("vcpus")).is_equal_to(1)
+    assert_that(refresh_compute_resource_spy.call_count).is_equal_to(3)
+
+    # Removed sections are not referred anymore
+    pcluster_config.remove_section("compute_resource", "cr1")
+    assert_that(queue_section.get_param_value("compute_resource_settings")).is_equal_to("cr2")
+    assert_that(refresh_compute_resource_spy.call_count).is_equal_to(3)
+
+
 def _check_queue_section_from_json(json_config, pcluster_config, queue_section):
     """Check that the provided queue section has been loaded from Json config as expected."""
     queue_dict = json_config["cluster"]["queue_settings"][queue_section.label]
@@ -240,27 +293,25 @@ def _prepare_json_config(queues, test_datadir):
 def _mock_boto3(boto3_stubber, expected_json_params, master_instance_type=None):
     """Mock the boto3 client based on the expected json configuration."""
     expected_json_queue_settings = expected_json_params["cluster"].get("queue_settings", {})
-    mocked_requests = []
-
-    # One describe_instance_type for the Master node
-    if master_instance_type:
-        mocked_requests.append(
-            MockedBoto3Request(
-                method="describe_instance_types",
-                response=DESCRIBE_INSTANCE_TYPES_RESPONSES[master_instance_type],
-                expected_params={"InstanceTypes": [master_instance_type]},
-            )
-        )
 
-    # One describe_instance_type per compute resource
+    # A single describe_instance_types call for the Master node and all the compute resources
+    instance_types = [master_instance_type] if master_instance_type else []
     for _, queue in expected_json_queue_settings.items():
         for _, compute_resource in queue.get("compute_resource_settings", {}).items():
             instance_type = compute_resource["instance_type"]
-            mocked_requests.append(
-                MockedBoto3Request(
-                    method="describe_instance_types",
-                    response=DESCRIBE_INSTANCE_TYPES_RESPONSES[instance_type],
-                    expected_params={"InstanceTypes": [instance_type]},
-                )
-            )
+            if instance_type not in instance_types:
+                instance_types.append(instance_type)
+
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={
+                "InstanceTypes": [
+                    DESCRIBE_INSTANCE_TYPES_RESPONSES[instance_type]["InstanceTypes"][0]
+                    for instance_type in instance_types
+                ]
+            },
+            expected_params={"InstanceTypes": instance_types},
+        )
+    ]
     boto3_stubber("ec2", mocked_requests)
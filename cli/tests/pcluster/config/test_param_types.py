@@ -14,8 +14,10 @@ from assertpy import assert_that
 
 import tests.pcluster.config.utils as utils
 from pcluster.config.cfn_param_types import CfnParam, CfnSection, VolumeSizeParam
-from pcluster.config.mappings import EBS
-from pcluster.config.param_types import Param
+from pcluster.config.mappings import CLUSTER_HIT, CLUSTER_SIT, EBS
+from pcluster.config.param_types import Param, ParamDefinition, SectionDefinition, Visibility
+from pcluster.config.update_policy import UpdatePolicy
+from pcluster.config.validators import settings_validator
 
 
 class TestParam:
@@ -94,3 +96,47 @@ def test_volume_size_refresh(mocker, section_dict, expected_value):
 
     volume_size.refresh()
     assert_that(volume_size.value).is_equal_to(expected_value)
+
+
+def test_compiled_definitions():
+    cluster_definition = SectionDefinition.of(CLUSTER_HIT)
+    assert_that(SectionDefinition.of(CLUSTER_HIT)).is_same_as(cluster_definition)
+    assert_that(SectionDefinition.of(cluster_definition)).is_same_as(cluster_definition)
+
+    # Params shared between cluster models are compiled once
+    sit_definition = SectionDefinition.of(CLUSTER_SIT)
+    assert_that(cluster_definition.params["scheduler"]).is_same_as(sit_definition.params["scheduler"])
+    assert_that(cluster_definition.key).is_equal_to("cluster")
+    assert_that(cluster_definition.cluster_model).is_equal_to("HIT")
+    assert_that(cluster_definition.public_param_keys).contains("queue_settings").does_not_contain("default_queue")
+
+    # Descriptors expose the same keys of the original definitions
+    assert_that(cluster_definition.get("params")).is_same_as(cluster_definition.params)
+    assert_that(cluster_definition.get("default_label")).is_equal_to("default")
+
+    queue_settings = cluster_definition.params["queue_settings"]
+    queue_definition = CLUSTER_HIT["params"]["queue_settings"]["referred_section"]
+    assert_that(queue_settings.referred_section).is_same_as(SectionDefinition.of(queue_definition))
+    assert_that(list(queue_settings.validators).count(settings_validator)).is_equal_to(1)
+    assert_that(queue_settings.update_policy).is_equal_to(UpdatePolicy.COMPUTE_FLEET_STOP)
+
+    volume_type = ParamDefinition.of(EBS["params"]["volume_type"])
+    assert_that(volume_type.allowed_values_set).contains("gp2")
+    assert_that(volume_type.visibility).is_equal_to(Visibility.PUBLIC)
+
+    with pytest.raises(AttributeError):
+        volume_type.default = "io1"
+    with pytest.raises(TypeError):
+        volume_type["default"] = "io1"
+
+
+@pytest.mark.parametrize("settings_params", [1, 5])
+def test_settings_param_validators(mocker, settings_params):
+    """Verify that creating settings params does not change the validators in the definition."""
+    mocked_pcluster_config = utils.get_mocked_pcluster_config(mocker)
+    for _ in range(settings_params):
+        CfnSection(CLUSTER_HIT, mocked_pcluster_config)
+
+    validators = SectionDefinition.of(CLUSTER_HIT).params["queue_settings"].validators
+    assert_that(validators).is_length(2)
+    assert_that(CLUSTER_HIT["params"]["queue_settings"]["validators"]).is_length(1)
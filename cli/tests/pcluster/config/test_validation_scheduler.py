@@ -0,0 +1,159 @@
+"""This module provides unit tests for the pcluster.config.validation_scheduler module."""
+import threading
+import time
+
+import pytest
+from assertpy import assert_that
+
+from pcluster.config.validation_scheduler import VALIDATION_MEMO, ValidationScheduler, depends_on, remote_services
+
+
+def _make_validator(name, services=None, delay=0, errors=None, tracker=None):
+    def _validator(param_key, param_value, pcluster_config):
+        if tracker is not None:
+            tracker.enter(services)
+        time.sleep(delay)
+        if tracker is not None:
+            tracker.wait(services)
+            tracker.exit(services)
+        return errors or [], []
+
+    _validator.__name__ = name
+    return remote_services(*services)(_validator) if services else _validator
+
+
+class ConcurrencyTracker(object):
+    """
+    Track the number of validators running at the same time for each service.
+
+    Validators of a service with a target are held until the target number of them are running together, so that
+    the maximum concurrency is reached regardless of timing.
+    """
+
+    # Max time to hold validators, so that a scheduler not reaching the target makes the test fail instead of hang
+    TIMEOUT = 10
+
+    def __init__(self, targets=None):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.max_running = {}
+        self.targets = {service: (target, threading.Event()) for service, target in (targets or {}).items()}
+
+    def enter(self, services):
+        with self.lock:
+            for service in services or ("local",):
+                self.running[service] = self.running.get(service, 0) + 1
+                self.max_running[service] = max(self.max_running.get(service, 0), self.running[service])
+                if service in self.targets and self.running[service] >= self.targets[service][0]:
+                    self.targets[service][1].set()
+
+    def wait(self, services):
+        for service in services or ("local",):
+            if service in self.targets:
+                self.targets[service][1].wait(self.TIMEOUT)
+
+    def exit(self, services):
+        with self.lock:
+            for service in services or ("local",):
+                self.running[service] -= 1
+
+
+def test_results_reported_in_order():
+    scheduler = ValidationScheduler(max_workers=4)
+    reported = []
+    for i in range(8):
+        # Tasks added first complete last
+        validator = _make_validator("v{0}".format(i), services=("ec2",), delay=(8 - i) * 0.01)
+        scheduler.add_task(validator, ("key", i, None), lambda errors, warnings, i=i: reported.append(i))
+    scheduler.add_task(_make_validator("local"), ("key", 8, None), lambda errors, warnings: reported.append(8))
+    scheduler.run()
+    assert_that(reported).is_equal_to(list(range(9)))
+
+
+@pytest.mark.parametrize("max_workers, expected_max_running", [(1, 1), (8, 6)])
+def test_service_concurrency(max_workers, expected_max_running):
+    scheduler = ValidationScheduler(max_workers=max_workers)
+    tracker = ConcurrencyTracker(targets={"ec2": expected_max_running})
+    for i in range(12):
+        scheduler.add_task(
+            _make_validator("ec2", services=("ec2",), tracker=tracker), ("k", i, None), lambda e, w: None
+        )
+    for i in range(6):
+        scheduler.add_task(
+            _make_validator("iam", services=("iam",), delay=0.01, tracker=tracker), ("k", i, None), lambda e, w: None
+        )
+    scheduler.run()
+    assert_that(tracker.max_running["ec2"]).is_equal_to(expected_max_running)
+    assert_that(tracker.max_running["iam"]).is_less_than_or_equal_to(ValidationScheduler.SERVICE_MAX_CONCURRENCY["iam"])
+
+
+def test_exception_raised_in_order():
+    def _failing_validator(param_key, param_value, pcluster_config):
+        raise SystemExit("validator failed")
+
+    scheduler = ValidationScheduler(max_workers=4)
+    reported = []
+    scheduler.add_task(_make_validator("first", services=("ec2",)), ("k", 0, None), lambda e, w: reported.append(0))
+    scheduler.add_task(remote_services("s3")(_failing_validator), ("k", 1, None), lambda e, w: reported.append(1))
+    scheduler.add_task(_make_validator("last", services=("ec2",)), ("k", 2, None), lambda e, w: reported.append(2))
+
+    with pytest.raises(SystemExit, match="validator failed"):
+        scheduler.run()
+    assert_that(reported).is_equal_to([0])
+
+
+def _mock_pcluster_config(mocker, region="us-east-1", scheduler="slurm"):
+    cluster_section = mocker.MagicMock()
+    cluster_section.params = {"scheduler": mocker.MagicMock(value=scheduler)}
+    pcluster_config = mocker.MagicMock(region=region)
+    pcluster_config.get_sections.side_effect = lambda key: {"default": cluster_section} if key == "cluster" else {}
+    return pcluster_config
+
+
+def test_validation_memo(mocker):
+    calls = []
+
+    @remote_services("ec2")
+    @depends_on(("cluster", "scheduler"))
+    def _validator(param_key, param_value, pcluster_config):
+        calls.append((param_key, param_value))
+        return ["error for {0}".format(param_value)], []
+
+    pcluster_config = _mock_pcluster_config(mocker)
+    scheduler = ValidationScheduler(max_workers=4)
+    reported = []
+    for value in ["c5.xlarge", "c5.xlarge", "t2.micro", "c5.xlarge"]:
+        scheduler.add_task(_validator, ("instance_type", value, pcluster_config), lambda e, w: reported.append(e))
+    scheduler.run()
+
+    assert_that(calls).is_length(2)
+    assert_that(reported).is_equal_to(
+        [["error for c5.xlarge"], ["error for c5.xlarge"], ["error for t2.micro"], ["error for c5.xlarge"]]
+    )
+    assert_that(VALIDATION_MEMO.hits).is_equal_to(2)
+
+    # A different param key, region or dependency value invalidates the result
+    for args in [
+        ("compute_instance_type", "c5.xlarge", pcluster_config),
+        ("instance_type", "c5.xlarge", _mock_pcluster_config(mocker, region="eu-west-1")),
+        ("instance_type", "c5.xlarge", _mock_pcluster_config(mocker, scheduler="awsbatch")),
+    ]:
+        scheduler.add_task(_validator, args, lambda e, w: None)
+    scheduler.run()
+    assert_that(calls).is_length(5)
+
+
+def test_validation_memo_skips_exceptions(mocker):
+    validator_mock = mocker.MagicMock(side_effect=[SystemExit("failure"), ([], [])])
+
+    @depends_on()
+    def validator(param_key, param_value, pcluster_config):
+        return validator_mock(param_key, param_value, pcluster_config)
+
+    pcluster_config = _mock_pcluster_config(mocker)
+
+    with pytest.raises(SystemExit):
+        VALIDATION_MEMO.get(validator, ("key", "value", pcluster_config))
+    assert_that(VALIDATION_MEMO.get(validator, ("key", "value", pcluster_config))).is_equal_to(([], []))
+    assert_that(VALIDATION_MEMO.get(validator, ("key", "value", pcluster_config))).is_equal_to(([], []))
+    assert_that(validator_mock.call_count).is_equal_to(2)
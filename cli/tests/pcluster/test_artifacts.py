@@ -0,0 +1,179 @@
+"""This module provides unit tests for the pcluster.artifacts module."""
+import hashlib
+import os
+import zipfile
+from io import BytesIO
+
+import pytest
+from assertpy import assert_that
+from botocore.exceptions import ClientError
+from botocore.stub import ANY
+
+from pcluster.artifacts import ArtifactUploader, compute_etag, get_zip_artifact
+from pcluster.utils import zip_dir
+from tests.common import MockedBoto3Request
+
+BUCKET = "bucket"
+ARTIFACT_DIR = "artifact_dir"
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.artifacts.boto3"
+
+
+@pytest.fixture()
+def resources_dir(tmpdir):
+    resources = tmpdir.mkdir("resources")
+    code = resources.mkdir("code")
+    code.join("b.py").write("b")
+    code.join("a.py").write("a")
+    code.mkdir("sub").join("c.py").write("c")
+    resources.join("script.sh").write("#!/bin/bash")
+    return resources
+
+
+def test_zip_dir_is_reproducible(resources_dir):
+    code = str(resources_dir.join("code"))
+    first_zip = zip_dir(code).read()
+    os.utime(os.path.join(code, "a.py"), (0, 0))
+
+    assert_that(zip_dir(code).read()).is_equal_to(first_zip)
+    assert_that(zipfile.ZipFile(BytesIO(first_zip)).namelist()).is_equal_to(["a.py", "b.py", "sub/c.py"])
+
+
+def test_zip_dir_to_file(mocker, resources_dir, tmpdir):
+    # files are compressed a chunk at a time
+    mocker.patch("pcluster.utils.ZIP_CHUNK_SIZE", 1)
+    code = str(resources_dir.join("code"))
+    zip_file = str(tmpdir.join("code.zip"))
+
+    with open(zip_file, "w+b") as file_out:
+        assert_that(zip_dir(code, file_out)).is_same_as(file_out)
+    with open(zip_file, "rb") as f:
+        assert_that(f.read()).is_equal_to(zip_dir(code).read())
+
+
+def test_get_zip_artifact(mocker, resources_dir, tmpdir):
+    cache_dir = str(tmpdir.join("cache"))
+    code = str(resources_dir.join("code"))
+    zip_dir_mock = mocker.patch("pcluster.artifacts.zip_dir", side_effect=zip_dir)
+
+    def _get_zip_artifact():
+        with get_zip_artifact(code, cache_dir) as archive:
+            return archive.read()
+
+    first_zip = _get_zip_artifact()
+    assert_that(first_zip).is_equal_to(zip_dir(code).read())
+    assert_that(_get_zip_artifact()).is_equal_to(first_zip)
+    assert_that(zip_dir_mock.call_count).is_equal_to(1)
+    assert_that(os.listdir(cache_dir)).is_length(1)
+
+    # the archive is built again when the content changes, replacing the previous one
+    resources_dir.join("code", "a.py").write("changed")
+    assert_that(_get_zip_artifact()).is_not_equal_to(first_zip)
+    assert_that(zip_dir_mock.call_count).is_equal_to(2)
+    assert_that(os.listdir(cache_dir)).is_length(1)
+
+
+def test_compute_etag(mocker):
+    assert_that(compute_etag(b"content")).is_equal_to(hashlib.md5(b"content").hexdigest())
+
+    mocker.patch("pcluster.artifacts.MULTIPART_THRESHOLD", 4)
+    mocker.patch("pcluster.artifacts.MULTIPART_CHUNKSIZE", 4)
+    parts = hashlib.md5(b"cont").digest() + hashlib.md5(b"ent").digest()
+    assert_that(compute_etag(b"content")).is_equal_to("{0}-2".format(hashlib.md5(parts).hexdigest()))
+    assert_that(compute_etag(BytesIO(b"content"))).is_equal_to(compute_etag(b"content"))
+
+
+@pytest.mark.parametrize("skip_existing", [True, False])
+def test_artifact_uploader(mocker, boto3_stubber, resources_dir, tmpdir, skip_existing):
+    mocker.patch("pcluster.artifacts.get_artifacts_cache_dir", return_value=str(tmpdir.join("cache")))
+    code_zip = zip_dir(str(resources_dir.join("code"))).read()
+
+    def _key(key):
+        return "{0}/{1}".format(ARTIFACT_DIR, key)
+
+    mocked_requests = []
+    if skip_existing:
+        mocked_requests.append(
+            MockedBoto3Request(
+                method="head_object",
+                response={"ETag": '"{0}"'.format(compute_etag(code_zip)), "VersionId": "existing"},
+                expected_params={"Bucket": BUCKET, "Key": _key("code/artifacts.zip")},
+            )
+        )
+    else:
+        mocked_requests.append(
+            MockedBoto3Request(
+                method="put_object",
+                response={"VersionId": "zip"},
+                expected_params={"Bucket": BUCKET, "Key": _key("code/artifacts.zip"), "Body": ANY},
+            )
+        )
+    if skip_existing:
+        mocked_requests.append(
+            MockedBoto3Request(
+                method="head_object",
+                response="Not Found",
+                expected_params={"Bucket": BUCKET, "Key": _key("script.sh")},
+                generate_error=True,
+                error_code="404",
+            )
+        )
+    mocked_requests.append(
+        MockedBoto3Request(
+            method="put_object",
+            response={"VersionId": "script"},
+            expected_params={"Bucket": BUCKET, "Key": _key("script.sh"), "Body": ANY},
+        )
+    )
+    boto3_stubber("s3", mocked_requests)
+
+    # a single worker makes the requests follow the order of the stubbed responses
+    with ArtifactUploader(BUCKET, ARTIFACT_DIR, skip_existing=skip_existing, max_workers=1) as uploader:
+        uploader.add_resources_dir(str(resources_dir))
+        versions = uploader.wait()
+
+    assert_that(list(versions.items())).is_equal_to(
+        [("code/artifacts.zip", "existing" if skip_existing else "zip"), ("script.sh", "script")]
+    )
+    assert_that(uploader.skipped_keys).is_equal_to(["code/artifacts.zip"] if skip_existing else [])
+
+
+@pytest.mark.parametrize("list_bucket_allowed", [True, False])
+def test_artifact_uploader_forbidden_object(boto3_stubber, list_bucket_allowed):
+    key = "{0}/configs/cluster-config.json".format(ARTIFACT_DIR)
+    mocked_requests = [
+        MockedBoto3Request(
+            method="head_object",
+            response="Forbidden",
+            expected_params={"Bucket": BUCKET, "Key": key},
+            generate_error=True,
+            error_code="403",
+        ),
+        MockedBoto3Request(
+            method="list_objects_v2",
+            response={} if list_bucket_allowed else "Access Denied",
+            expected_params={"Bucket": BUCKET, "Prefix": "{0}/".format(ARTIFACT_DIR), "MaxKeys": 1},
+            generate_error=not list_bucket_allowed,
+            error_code=None if list_bucket_allowed else "AccessDenied",
+        ),
+    ]
+    if not list_bucket_allowed:
+        # without the s3:ListBucket permission a missing object is reported as forbidden
+        mocked_requests.append(
+            MockedBoto3Request(
+                method="put_object",
+                response={"VersionId": "config"},
+                expected_params={"Bucket": BUCKET, "Key": key, "Body": ANY},
+            )
+        )
+    boto3_stubber("s3", mocked_requests)
+
+    with ArtifactUploader(BUCKET, ARTIFACT_DIR, max_workers=1) as uploader:
+        if list_bucket_allowed:
+            with pytest.raises(ClientError, match="Forbidden"):
+                uploader.upload_object("configs/cluster-config.json", "{}")
+        else:
+            assert_that(uploader.upload_object("configs/cluster-config.json", "{}")).is_equal_to("config")
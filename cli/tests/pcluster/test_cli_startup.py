@@ -0,0 +1,61 @@
+"""This module provides regression tests for the startup time of the pcluster CLI."""
+import subprocess
+import sys
+
+import pytest
+from assertpy import assert_that
+
+# Max cumulative import time of the pcluster.cli module, as a fraction of the import time of boto3 on the same machine
+CLI_IMPORT_TIME_BUDGET = 0.5
+# Import times are measured a few times, keeping the fastest run, to filter out the noise of loaded machines
+IMPORT_TIME_RUNS = 3
+
+# Modules that must be imported only when a subcommand needs them
+DEFERRED_MODULES = [
+    "boto3",
+    "botocore",
+    "jinja2",
+    "tabulate",
+    "pkg_resources",
+    "pcluster.commands",
+    "pcluster.utils",
+    "pcluster.config.mappings",
+    "pcluster.configure.easyconfig",
+    "pcluster.createami",
+    "pcluster.dcv.connect",
+]
+
+
+def _run_python(code, *options):
+    return subprocess.check_output([sys.executable] + list(options) + ["-c", code], stderr=subprocess.STDOUT).decode()
+
+
+def _get_import_time(module):
+    """Return the lowest cumulative import time of the given module in a new interpreter, in microseconds."""
+    import_times = []
+    for _ in range(IMPORT_TIME_RUNS):
+        output = _run_python("import {0}".format(module), "-X", "importtime")
+        # Lines have the format "import time: self [us] | cumulative | imported package"
+        for line in output.splitlines():
+            fields = line.split("|")
+            if line.startswith("import time:") and len(fields) == 3 and fields[2].strip() == module:
+                import_times.append(int(fields[1]))
+    assert_that(import_times).is_length(IMPORT_TIME_RUNS)
+    return min(import_times)
+
+
+def test_cli_deferred_imports():
+    output = _run_python(
+        "import sys\n"
+        "import pcluster.cli\n"
+        "pcluster.cli._get_parser().parse_args(['version'])\n"
+        "print(' '.join(sorted(sys.modules)))"
+    )
+    imported_modules = output.split()
+    assert_that([module for module in DEFERRED_MODULES if module in imported_modules]).is_empty()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="-X importtime requires Python 3.7")
+def test_cli_import_time():
+    # the budget is relative to a heavy dependency, so that it does not depend on the speed of the machine
+    assert_that(_get_import_time("pcluster.cli")).is_less_than(_get_import_time("boto3") * CLI_IMPORT_TIME_BUDGET)
@@ -0,0 +1,76 @@
+"""This module provides unit tests for the pcluster.client_pool module."""
+import os
+import threading
+
+import boto3
+import pytest
+from assertpy import assert_that
+from botocore.config import Config
+
+from pcluster.client_pool import ClientPoolSession, install_client_pool
+
+
+@pytest.fixture()
+def client_pool_session():
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+    return ClientPoolSession(aws_access_key_id="fake_id", aws_secret_access_key="fake_secret")
+
+
+def test_clients_reused(client_pool_session):
+    ec2 = client_pool_session.client("ec2")
+    assert_that(client_pool_session.client("ec2")).is_same_as(ec2)
+    assert_that(client_pool_session.client("ec2", region_name="us-east-1")).is_same_as(ec2)
+
+    # Different service, region, credentials or config produce different clients
+    other_clients = [
+        client_pool_session.client("s3"),
+        client_pool_session.client("ec2", region_name="eu-west-1"),
+        client_pool_session.client("ec2", aws_access_key_id="other_id", aws_secret_access_key="other_secret"),
+        client_pool_session.client("ec2", config=Config(retries={"max_attempts": 3})),
+    ]
+    assert_that(set(id(client) for client in other_clients + [ec2])).is_length(5)
+    assert_that(client_pool_session.misses).is_equal_to(5)
+    assert_that(client_pool_session.hits).is_equal_to(2)
+
+    # Region is resolved at call time
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-1"
+    assert_that(client_pool_session.client("ec2")).is_same_as(other_clients[1])
+
+
+def test_default_retry_config(client_pool_session):
+    for _ in range(2):
+        retries = client_pool_session.client("ec2").meta.config.retries
+        assert_that(retries).is_equal_to({"mode": "adaptive", "total_max_attempts": 11})
+
+    retries = client_pool_session.client("ec2", config=Config(retries={"max_attempts": 3})).meta.config.retries
+    assert_that(retries).is_equal_to({"mode": "adaptive", "total_max_attempts": 4})
+
+
+def test_resources_use_pooled_clients(client_pool_session):
+    client_pool_session.resource("s3")
+    client_pool_session.resource("s3")
+    assert_that(client_pool_session.misses).is_equal_to(1)
+
+
+def test_concurrent_clients(client_pool_session):
+    clients = []
+
+    def _get_client():
+        clients.append(client_pool_session.client("cloudformation"))
+
+    threads = [threading.Thread(target=_get_client) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_that(set(id(client) for client in clients)).is_length(1)
+    assert_that(client_pool_session.misses).is_equal_to(1)
+
+
+def test_install_client_pool():
+    session = install_client_pool()
+    assert_that(boto3.DEFAULT_SESSION).is_same_as(session)
+    assert_that(install_client_pool()).is_same_as(session)
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+    assert_that(boto3.client("sqs")).is_same_as(boto3.client("sqs"))
@@ -78,7 +78,8 @@ def test_setup_bucket_with_resources_success(
     )
     mocker.patch("pcluster.utils.create_s3_bucket")
     check_bucket_mock = mocker.patch("pcluster.utils.check_s3_bucket_exists")
-    upload_resources_artifacts_mock = mocker.patch("pcluster.utils.upload_resources_artifacts")
+    uploader_mock = mocker.patch("pcluster.commands.ArtifactUploader", autospec=True)
+    uploader = uploader_mock.return_value.__enter__.return_value
     cleanup_s3_mock = mocker.patch("pcluster.utils.cleanup_s3_resources")
     upload_hit_resources_mock = mocker.patch("pcluster.commands.upload_hit_resources")
     upload_dashboard_resource = mocker.patch("pcluster.commands.upload_dashboard_resource")
@@ -95,19 +96,23 @@ def test_setup_bucket_with_resources_success(
     else:
         check_bucket_mock.assert_not_called()
     cleanup_s3_mock.assert_not_called()
-    upload_resources_artifacts_mock.assert_has_calls(
-        [
-            mocker.call(bucket_name, mock_artifact_dir, root=pkg_resources.resource_filename(utils.__name__, dir))
-            for dir in expected_dirs
-        ]
+    uploader_mock.assert_called_with(bucket_name, mock_artifact_dir, skip_existing=False)
+    uploader.add_resources_dir.assert_has_calls(
+        [mocker.call(pkg_resources.resource_filename(utils.__name__, dir)) for dir in expected_dirs]
     )
     if expect_upload_hit_resources:
         upload_hit_resources_mock.assert_called_with(
-            bucket_name, mock_artifact_dir, pcluster_config_mock, storage_data.json_params, {}
+            bucket_name, mock_artifact_dir, pcluster_config_mock, storage_data.json_params, {}, uploader
         )
     upload_dashboard_resource.assert_called_with(
-        bucket_name, mock_artifact_dir, pcluster_config_mock, storage_data.json_params, storage_data.cfn_params
+        bucket_name,
+        mock_artifact_dir,
+        pcluster_config_mock,
+        storage_data.json_params,
+        storage_data.cfn_params,
+        uploader,
     )
+    uploader.wait.assert_called_once()
     assert_that(bucket_name).is_equal_to(expected_bucket_name)
     assert_that(artifact_dir).is_equal_to(mock_artifact_dir)
     assert_that(remove_bucket).is_equal_to(expected_remove_bucket)
@@ -124,7 +129,7 @@ def test_setup_bucket_with_resources_creation_failure(mocker, caplog):
 
     mocker.patch("pcluster.utils.generate_random_name_with_prefix", side_effect=[mock_artifact_dir, bucket_name])
     mocker.patch("pcluster.utils.create_s3_bucket", side_effect=client_error)
-    mocker.patch("pcluster.utils.upload_resources_artifacts")
+    mocker.patch("pcluster.commands.ArtifactUploader", autospec=True)
     cleanup_s3_mock = mocker.patch("pcluster.utils.cleanup_s3_resources")
 
     pcluster_config_mock = _mock_pcluster_config(mocker, "slurm", region)
@@ -158,7 +163,10 @@ def test_setup_bucket_with_resources_upload_failure(
     )
     mocker.patch("pcluster.utils.create_s3_bucket")
     check_bucket_mock = mocker.patch("pcluster.utils.check_s3_bucket_exists")
-    mocker.patch("pcluster.utils.upload_resources_artifacts", side_effect=client_error)
+    uploader_mock = mocker.patch("pcluster.commands.ArtifactUploader", autospec=True)
+    uploader_mock.return_value.__enter__.return_value.wait.side_effect = client_error
+    mocker.patch("pcluster.commands.upload_hit_resources")
+    mocker.patch("pcluster.commands.upload_dashboard_resource")
     cleanup_s3_mock = mocker.patch("pcluster.utils.cleanup_s3_resources")
 
     pcluster_config_mock = _mock_pcluster_config(mocker, "slurm", region, provided_bucket_name)
@@ -187,7 +195,10 @@ def test_setup_bucket_with_resources_deletion_failure(mocker, caplog):
     mocker.patch("pcluster.utils.generate_random_name_with_prefix", side_effect=[mock_artifact_dir, bucket_name])
     mocker.patch("pcluster.utils.create_s3_bucket")
     # to check bucket deletion we need to trigger a failure in the upload
-    mocker.patch("pcluster.utils.upload_resources_artifacts", side_effect=client_error)
+    uploader_mock = mocker.patch("pcluster.commands.ArtifactUploader", autospec=True)
+    uploader_mock.return_value.__enter__.return_value.wait.side_effect = client_error
+    mocker.patch("pcluster.commands.upload_hit_resources")
+    mocker.patch("pcluster.commands.upload_dashboard_resource")
     cleanup_s3_mock = mocker.patch("pcluster.utils.delete_s3_artifacts", side_effect=client_error)
 
     pcluster_config_mock = _mock_pcluster_config(mocker, "slurm", region)
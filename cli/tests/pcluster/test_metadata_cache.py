@@ -0,0 +1,96 @@
+"""This module provides unit tests for the pcluster.metadata_cache module."""
+import json
+import os
+
+import pytest
+from assertpy import assert_that
+from botocore.exceptions import ClientError
+
+from pcluster.metadata_cache import MetadataCache
+
+
+@pytest.fixture()
+def metadata_cache(mocker, tmpdir):
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+    mocker.patch("pcluster.metadata_cache.pkg_resources.get_distribution").return_value.version = "2.10.1"
+    sts_mock = mocker.patch("pcluster.metadata_cache.boto3").client.return_value
+    sts_mock.get_caller_identity.return_value = {"Account": "123456789012"}
+    return MetadataCache(cache_dir=str(tmpdir))
+
+
+def test_cache_hit_and_miss(mocker, metadata_cache, tmpdir):
+    loader = mocker.MagicMock(return_value=["t2.micro", "c5.xlarge"])
+
+    assert_that(metadata_cache.get("instance_types", loader, 60)).is_equal_to(["t2.micro", "c5.xlarge"])
+    assert_that(metadata_cache.get("instance_types", loader, 60)).is_equal_to(["t2.micro", "c5.xlarge"])
+    loader.assert_called_once()
+
+    cache_file = os.path.join(str(tmpdir), "2.10.1", "123456789012", "us-east-1.json")
+    with open(cache_file) as f:
+        assert_that(json.load(f)["entries"]).contains_key("instance_types")
+    assert_that(os.listdir(os.path.dirname(cache_file))).is_equal_to(["us-east-1.json"])
+
+    # Entries are stored per region
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-1"
+    metadata_cache.get("instance_types", loader, 60)
+    assert_that(loader.call_count).is_equal_to(2)
+
+
+def test_expired_entry(mocker, metadata_cache):
+    time_mock = mocker.patch("pcluster.metadata_cache.time.time", return_value=1000)
+    loader = mocker.MagicMock(side_effect=["ami-1", "ami-2"])
+
+    assert_that(metadata_cache.get("ami", loader, 60)).is_equal_to("ami-1")
+    time_mock.return_value = 1059
+    assert_that(metadata_cache.get("ami", loader, 60)).is_equal_to("ami-1")
+    time_mock.return_value = 1060
+    assert_that(metadata_cache.get("ami", loader, 60)).is_equal_to("ami-2")
+
+
+def test_size_bounded_eviction(mocker, metadata_cache):
+    time_mock = mocker.patch("pcluster.metadata_cache.time.time", return_value=1000)
+    metadata_cache.max_file_size = 200
+    for i in range(5):
+        time_mock.return_value = 1000 + i
+        metadata_cache.get("key{0}".format(i), lambda: "x" * 40, 3600)
+
+    loader = mocker.MagicMock(return_value="reloaded")
+    assert_that(metadata_cache.get("key4", loader, 3600)).is_equal_to("x" * 40)
+    assert_that(metadata_cache.get("key0", loader, 3600)).is_equal_to("reloaded")
+
+
+def test_corrupted_cache_file(mocker, metadata_cache, tmpdir):
+    cache_file = os.path.join(str(tmpdir), "2.10.1", "123456789012", "us-east-1.json")
+    os.makedirs(os.path.dirname(cache_file))
+    with open(cache_file, "w") as f:
+        f.write("{not json")
+
+    assert_that(metadata_cache.get("key", lambda: "value", 60)).is_equal_to("value")
+    assert_that(metadata_cache.get("key", lambda: "other", 60)).is_equal_to("value")
+
+
+def test_disabled_cache(mocker, metadata_cache, tmpdir):
+    loader = mocker.MagicMock(return_value="value")
+    metadata_cache.enabled = False
+    metadata_cache.get("key", loader, 60)
+    metadata_cache.get("key", loader, 60)
+    assert_that(loader.call_count).is_equal_to(2)
+    assert_that(os.listdir(str(tmpdir))).is_empty()
+
+
+def test_unknown_account_disables_cache(mocker, metadata_cache):
+    mocker.patch("pcluster.metadata_cache.boto3").client.return_value.get_caller_identity.side_effect = ClientError(
+        {"Error": {"Code": "ExpiredToken", "Message": "expired"}}, "GetCallerIdentity"
+    )
+    loader = mocker.MagicMock(return_value="value")
+    metadata_cache.get("key", loader, 60)
+    metadata_cache.get("key", loader, 60)
+    assert_that(loader.call_count).is_equal_to(2)
+    assert_that(metadata_cache.enabled).is_false()
+
+
+def test_clear(metadata_cache, tmpdir):
+    metadata_cache.get("key", lambda: "value", 60)
+    metadata_cache.clear()
+    assert_that(os.path.exists(str(tmpdir))).is_false()
+    assert_that(metadata_cache.get("key", lambda: "other", 60)).is_equal_to("other")
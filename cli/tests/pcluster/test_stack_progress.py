@@ -0,0 +1,138 @@
+"""This module provides unit tests for the pcluster.stack_progress module."""
+import pytest
+from assertpy import assert_that
+from botocore.exceptions import ClientError
+
+from pcluster.stack_progress import StackProgressTracker
+
+STACK_ID = "arn:aws:cloudformation:us-east-1:123456789012:stack/parallelcluster-cluster/1"
+NESTED_STACK_ID = "arn:aws:cloudformation:us-east-1:123456789012:stack/parallelcluster-cluster-EBSCfnStack/2"
+STACK_TYPE = "AWS::CloudFormation::Stack"
+
+
+def _event(event_id, timestamp, status, stack_id=STACK_ID, logical_id="Resource", resource_type="AWS::EC2::Instance"):
+    physical_id = {STACK_TYPE: stack_id if logical_id == "Stack" else NESTED_STACK_ID}.get(resource_type, "id")
+    return {
+        "EventId": event_id,
+        "StackId": stack_id,
+        "LogicalResourceId": logical_id,
+        "PhysicalResourceId": physical_id,
+        "ResourceType": resource_type,
+        "ResourceStatus": status,
+        "Timestamp": timestamp,
+    }
+
+
+class _EventsClient(object):
+    """Fake CloudFormation client returning the events of every stack, newest first, in pages of page_size."""
+
+    def __init__(self, page_size=2):
+        self.events = {STACK_ID: [], NESTED_STACK_ID: []}
+        self.page_size = page_size
+        self.calls = []
+        self.throttled = False
+
+    def add(self, *events):
+        for event in events:
+            self.events[event["StackId"]].insert(0, event)
+
+    def describe_stack_events(self, StackName, NextToken=None):  # noqa: N803
+        self.calls.append((StackName, NextToken))
+        if self.throttled:
+            raise ClientError({"Error": {"Code": "Throttling", "Message": "Rate exceeded"}}, "DescribeStackEvents")
+        start = int(NextToken or 0)
+        response = {"StackEvents": self.events[StackName][start : start + self.page_size]}  # noqa: E203
+        if start + self.page_size < len(self.events[StackName]):
+            response["NextToken"] = str(start + self.page_size)
+        return response
+
+
+@pytest.fixture()
+def cfn_client():
+    client = _EventsClient()
+    client.add(
+        _event("old-1", 1, "CREATE_IN_PROGRESS", logical_id="Stack", resource_type=STACK_TYPE),
+        _event("old-2", 2, "CREATE_IN_PROGRESS"),
+        _event("old-3", 3, "CREATE_COMPLETE"),
+    )
+    return client
+
+
+def test_incremental_events(cfn_client):
+    received = []
+    tracker = StackProgressTracker(
+        {"StackId": STACK_ID, "StackStatus": "CREATE_IN_PROGRESS"}, cfn_client, callbacks=[received.append]
+    )
+
+    # the first poll only reads the first page, without dispatching past events
+    assert_that(tracker.poll()).is_empty()
+    assert_that(cfn_client.calls).is_equal_to([(STACK_ID, None)])
+
+    cfn_client.calls = []
+    assert_that(tracker.poll()).is_empty()
+    assert_that(cfn_client.calls).is_equal_to([(STACK_ID, None)])
+    assert_that(tracker.period).is_equal_to(10)
+
+    # new events are read up to the last seen one, across pages
+    cfn_client.calls = []
+    cfn_client.add(
+        _event("new-1", 4, "CREATE_IN_PROGRESS"),
+        _event("new-2", 5, "CREATE_IN_PROGRESS"),
+        _event("new-3", 6, "CREATE_COMPLETE", logical_id="Stack", resource_type=STACK_TYPE),
+    )
+    assert_that([event["EventId"] for event in tracker.poll()]).is_equal_to(["new-1", "new-2", "new-3"])
+    assert_that(cfn_client.calls).is_equal_to([(STACK_ID, None), (STACK_ID, "2")])
+    assert_that([event["EventId"] for event in received]).is_equal_to(["new-1", "new-2", "new-3"])
+    assert_that(tracker.stack_status).is_equal_to("CREATE_COMPLETE")
+    assert_that(tracker.period).is_equal_to(5)
+
+
+def test_nested_stacks(mocker, cfn_client):
+    sleep_mock = mocker.patch("pcluster.stack_progress.time.sleep")
+    received = []
+    tracker = StackProgressTracker(
+        {"StackId": STACK_ID, "StackStatus": "CREATE_IN_PROGRESS"}, cfn_client, callbacks=[received.append]
+    )
+
+    def _next_poll(period):
+        # the nested stack is created and completed while the tracker sleeps
+        if sleep_mock.call_count == 1:
+            cfn_client.add(
+                _event("parent-1", 4, "CREATE_IN_PROGRESS", logical_id="EBSCfnStack", resource_type=STACK_TYPE),
+                _event("nested-1", 5, "CREATE_IN_PROGRESS", stack_id=NESTED_STACK_ID),
+            )
+        elif sleep_mock.call_count == 2:
+            cfn_client.add(
+                _event("nested-2", 6, "CREATE_COMPLETE", stack_id=NESTED_STACK_ID),
+                _event("parent-2", 7, "CREATE_COMPLETE", logical_id="EBSCfnStack", resource_type=STACK_TYPE),
+            )
+        else:
+            cfn_client.add(_event("parent-3", 8, "CREATE_COMPLETE", logical_id="Stack", resource_type=STACK_TYPE))
+
+    sleep_mock.side_effect = _next_poll
+
+    assert_that(tracker.wait()).is_equal_to("CREATE_COMPLETE")
+    assert_that([event["EventId"] for event in received]).is_equal_to(
+        ["parent-1", "nested-1", "nested-2", "parent-2", "parent-3"]
+    )
+    # the nested stack is not polled anymore once completed
+    assert_that([stack_id for stack_id, _ in cfn_client.calls if stack_id == NESTED_STACK_ID]).is_length(2)
+
+
+def test_throttling(mocker, cfn_client):
+    mocker.patch("pcluster.stack_progress.random.uniform", side_effect=lambda low, high: high)
+    sleep_mock = mocker.patch("pcluster.stack_progress.time.sleep")
+    tracker = StackProgressTracker(
+        {"StackId": STACK_ID, "StackStatus": "CREATE_IN_PROGRESS"}, cfn_client, min_period=5, max_period=20
+    )
+
+    def _next_poll(period):
+        if sleep_mock.call_count == 3:
+            cfn_client.throttled = False
+            cfn_client.add(_event("new-1", 4, "CREATE_FAILED", logical_id="Stack", resource_type=STACK_TYPE))
+
+    sleep_mock.side_effect = _next_poll
+    cfn_client.throttled = True
+
+    assert_that(tracker.wait()).is_equal_to("CREATE_FAILED")
+    assert_that(sleep_mock.call_args_list).is_equal_to([mocker.call(10), mocker.call(20), mocker.call(20)])
@@ -0,0 +1,85 @@
+"""This module provides unit tests for the pcluster.template_cache module."""
+from urllib.error import HTTPError
+
+import pytest
+from assertpy import assert_that
+
+from pcluster.template_cache import TemplateCache, get_jinja_template
+from pcluster.utils import render_template
+from tests.common import MockedBoto3Request
+
+TEMPLATE_URL = "s3://bucket/templates/template.cfn.yaml"
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.template_cache.boto3"
+
+
+def _get_object_request(etag=None, content=None):
+    expected_params = {"Bucket": "bucket", "Key": "templates/template.cfn.yaml"}
+    if etag:
+        expected_params["IfNoneMatch"] = etag
+    if content is None:
+        return MockedBoto3Request(
+            method="get_object",
+            response="Not Modified",
+            expected_params=expected_params,
+            generate_error=True,
+            error_code="304",
+        )
+    return MockedBoto3Request(
+        method="get_object",
+        response={"Body": _Body(content), "ETag": '"{0}"'.format(len(content))},
+        expected_params=expected_params,
+    )
+
+
+class _Body(object):
+    def __init__(self, content):
+        self.content = content
+
+    def read(self):
+        return self.content.encode("utf-8")
+
+
+def test_read_s3_template(boto3_stubber, tmpdir):
+    boto3_stubber(
+        "s3",
+        [
+            _get_object_request(content="first"),
+            # the cached template is revalidated with its ETag
+            _get_object_request(etag='"5"'),
+            _get_object_request(etag='"5"', content="second"),
+        ],
+    )
+    template_cache = TemplateCache(str(tmpdir))
+
+    assert_that(template_cache.read(TEMPLATE_URL)).is_equal_to("first")
+    assert_that(template_cache.read(TEMPLATE_URL)).is_equal_to("first")
+    assert_that(template_cache.read(TEMPLATE_URL)).is_equal_to("second")
+
+
+def test_read_http_template(mocker, tmpdir):
+    url = "https://bucket.s3.amazonaws.com/templates/template.cfn.yaml"
+    response = mocker.MagicMock()
+    response.__enter__.return_value.read.return_value = b"content"
+    response.__enter__.return_value.info.return_value = {"ETag": '"etag"'}
+    urlopen_mock = mocker.patch(
+        "pcluster.template_cache.urllib.request.urlopen",
+        side_effect=[response, HTTPError(url, 304, "Not Modified", {}, None)],
+    )
+    template_cache = TemplateCache(str(tmpdir))
+
+    assert_that(template_cache.read(url)).is_equal_to("content")
+    assert_that(template_cache.read(url)).is_equal_to("content")
+    assert_that(urlopen_mock.call_args_list[0][0][0].get_header("If-none-match")).is_none()
+    assert_that(urlopen_mock.call_args_list[1][0][0].get_header("If-none-match")).is_equal_to('"etag"')
+
+
+def test_get_jinja_template():
+    template_str = "{{ config.value | sha1 }} {{ 'True' | bool }}"
+    assert_that(get_jinja_template(template_str)).is_same_as(get_jinja_template(template_str))
+    assert_that(render_template(template_str, {"value": " value "}, {})).is_equal_to(
+        "f32b67c7e26342af42efabc674d441dca0a281c5 True"
+    )
@@ -3,6 +3,8 @@
 import json
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from itertools import product
 from re import escape
 
@@ -11,6 +13,7 @@ from assertpy import assert_that
 from botocore.exceptions import ClientError, EndpointConnectionError
 
 import pcluster.utils as utils
+from pcluster.metadata_cache import MetadataCache
 from pcluster.utils import get_bucket_url
 from tests.common import MockedBoto3Request
 
@@ -294,10 +297,16 @@ def test_get_stack_retry(boto3_stubber, mocker):
 
 
 def test_verify_stack_creation_retry(boto3_stubber, mocker):
-    sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    sleep_mock = mocker.patch("pcluster.stack_progress.time.sleep")
+    mocker.patch("pcluster.stack_progress.random.uniform", side_effect=lambda low, high: high)
     mocker.patch(
-        "pcluster.utils.get_stack",
-        side_effect=[{"StackStatus": "CREATE_IN_PROGRESS"}, {"StackStatus": "CREATE_FAILED"}],
+        "pcluster.utils.get_stack", return_value={"StackId": FAKE_STACK_NAME, "StackStatus": "CREATE_IN_PROGRESS"}
+    )
+    in_progress_event = _generate_stack_event(event_id="1", status="CREATE_IN_PROGRESS")
+    rollback_event = _generate_stack_event(event_id="2", status="ROLLBACK_IN_PROGRESS")
+    failed_event = dict(
+        _generate_stack_event(event_id="3", status="CREATE_FAILED", logical_id="MasterServer"),
+        ResourceType="AWS::EC2::Instance",
     )
     mocked_requests = [
         MockedBoto3Request(
@@ -309,13 +318,25 @@ def test_verify_stack_creation_retry(boto3_stubber, mocker):
         ),
         MockedBoto3Request(
             method="describe_stack_events",
-            response={"StackEvents": [_generate_stack_event()]},
+            response={"StackEvents": [in_progress_event]},
+            expected_params={"StackName": FAKE_STACK_NAME},
+        ),
+        MockedBoto3Request(
+            method="describe_stack_events",
+            response={"StackEvents": [rollback_event, in_progress_event]},
+            expected_params={"StackName": FAKE_STACK_NAME},
+        ),
+        # failed events are logged at the end
+        MockedBoto3Request(
+            method="describe_stack_events",
+            response={"StackEvents": [failed_event, rollback_event, in_progress_event]},
             expected_params={"StackName": FAKE_STACK_NAME},
         ),
     ]
-    client = boto3_stubber("cloudformation", mocked_requests * 2)
+    client = boto3_stubber("cloudformation", mocked_requests)
     assert_that(utils.verify_stack_creation(FAKE_STACK_NAME, client)).is_false()
-    sleep_mock.assert_called_with(5)
+    # the polling period is increased when throttled
+    assert_that(sleep_mock.call_args_list).is_equal_to([mocker.call(10), mocker.call(10)])
 
 
 def test_get_stack_events_retry(boto3_stubber, mocker):
@@ -340,12 +361,14 @@ def test_get_stack_events_retry(boto3_stubber, mocker):
     sleep_mock.assert_called_with(5)
 
 
-def _generate_stack_event():
+def _generate_stack_event(event_id="id", status="status", logical_id=None):
     return {
-        "LogicalResourceId": "id",
-        "ResourceStatus": "status",
-        "StackId": "id",
-        "EventId": "id",
+        "LogicalResourceId": logical_id or FAKE_STACK_NAME,
+        "PhysicalResourceId": FAKE_STACK_NAME,
+        "ResourceType": STACK_TYPE,
+        "ResourceStatus": status,
+        "StackId": FAKE_STACK_NAME,
+        "EventId": event_id,
         "StackName": FAKE_STACK_NAME,
         "Timestamp": 0,
     }
@@ -565,6 +588,121 @@ def test_get_supported_architectures_for_instance_type(mocker, instance_type, su
         get_instance_types_info_patch.assert_called_with([instance_type])
 
 
+def test_instance_type_info_catalog_batched_lookups(boto3_stubber):
+    """Verify that registered instance types are retrieved with batched calls and then served from memory."""
+    instance_types = ["c5.{0}xlarge".format(i) for i in range(150)]
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={"InstanceTypes": [{"InstanceType": instance_type} for instance_type in chunk]},
+            expected_params={"InstanceTypes": chunk},
+        )
+        for chunk in [instance_types[:100], instance_types[100:]]
+    ]
+    boto3_stubber("ec2", mocked_requests)
+
+    catalog = utils.InstanceTypeInfoCatalog()
+    catalog.register(instance_types)
+    for instance_type in instance_types + instance_types:
+        assert_that(catalog.get(instance_type)).is_equal_to({"InstanceType": instance_type})
+    assert_that(catalog.misses).is_equal_to(1)
+    assert_that(catalog.hits).is_equal_to(299)
+
+
+def _describe_invalid_instance_types_request(instance_types):
+    return MockedBoto3Request(
+        method="describe_instance_types",
+        response="The following supplied instance types do not exist: [bad.instance]",
+        expected_params={"InstanceTypes": instance_types},
+        generate_error=True,
+        error_code="InvalidInstanceType",
+    )
+
+
+def _describe_instance_types_request(instance_types):
+    return MockedBoto3Request(
+        method="describe_instance_types",
+        response={"InstanceTypes": [{"InstanceType": instance_type} for instance_type in instance_types]},
+        expected_params={"InstanceTypes": instance_types},
+    )
+
+
+def test_instance_type_info_catalog_batch_failure(boto3_stubber):
+    """Verify that a batch failing for an invalid instance type is bisected to retrieve the valid ones."""
+    mocked_requests = [
+        _describe_invalid_instance_types_request(["t2.micro", "c5.xlarge", "m5.xlarge", "bad.instance", "c4.xlarge"]),
+        _describe_instance_types_request(["t2.micro", "c5.xlarge"]),
+        _describe_invalid_instance_types_request(["m5.xlarge", "bad.instance", "c4.xlarge"]),
+        _describe_instance_types_request(["m5.xlarge"]),
+        _describe_invalid_instance_types_request(["bad.instance", "c4.xlarge"]),
+        _describe_invalid_instance_types_request(["bad.instance"]),
+        _describe_instance_types_request(["c4.xlarge"]),
+        # the invalid instance type is retrieved alone when requested, to get the real error
+        _describe_invalid_instance_types_request(["bad.instance"]),
+    ]
+    boto3_stubber("ec2", mocked_requests)
+
+    catalog = utils.InstanceTypeInfoCatalog()
+    catalog.register(["c5.xlarge", "m5.xlarge", "bad.instance", "c4.xlarge"])
+    for instance_type in ["t2.micro", "c5.xlarge", "m5.xlarge", "c4.xlarge"]:
+        assert_that(catalog.get(instance_type)).is_equal_to({"InstanceType": instance_type})
+    with pytest.raises(ClientError, match="do not exist"):
+        catalog.get("bad.instance")
+    assert_that(catalog.misses).is_equal_to(2)
+
+
+def test_instance_type_info_catalog_batch_error(boto3_stubber):
+    """Verify that errors not caused by invalid instance types are raised without retrying."""
+    boto3_stubber(
+        "ec2",
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response="Not authorized",
+            expected_params={"InstanceTypes": ["t2.micro", "c5.xlarge"]},
+            generate_error=True,
+            error_code="UnauthorizedOperation",
+        ),
+    )
+
+    catalog = utils.InstanceTypeInfoCatalog()
+    catalog.register(["c5.xlarge"])
+    with pytest.raises(ClientError, match="Not authorized"):
+        catalog.get("t2.micro")
+
+
+def test_instance_type_info_catalog_concurrent_lookups(mocker):
+    """Verify that lookups are served while another thread fetches instance types, which are fetched only once."""
+    fetching = threading.Event()
+    release_fetch = threading.Event()
+
+    def _describe_instance_types(InstanceTypes):
+        fetching.set()
+        assert_that(release_fetch.wait(10)).is_true()
+        return {"InstanceTypes": [{"InstanceType": instance_type} for instance_type in InstanceTypes]}
+
+    ec2_client = mocker.patch("pcluster.utils.boto3").client.return_value
+    ec2_client.describe_instance_types.side_effect = [{"InstanceTypes": [{"InstanceType": "t2.micro"}]}]
+    catalog = utils.InstanceTypeInfoCatalog()
+    catalog.get("t2.micro")
+
+    ec2_client.describe_instance_types.side_effect = _describe_instance_types
+    catalog.register(["c5.xlarge"])
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first_lookup = executor.submit(catalog.get, "m5.xlarge")
+        assert_that(fetching.wait(10)).is_true()
+        # the lookup of a cached instance type does not wait for the fetch
+        assert_that(catalog.get("t2.micro")).is_equal_to({"InstanceType": "t2.micro"})
+        # the lookup of an instance type being fetched waits for the fetch
+        second_lookup = executor.submit(catalog.get, "c5.xlarge")
+        assert_that(second_lookup.done()).is_false()
+        release_fetch.set()
+        assert_that(first_lookup.result(10)).is_equal_to({"InstanceType": "m5.xlarge"})
+        assert_that(second_lookup.result(10)).is_equal_to({"InstanceType": "c5.xlarge"})
+
+    assert_that(ec2_client.describe_instance_types.call_count).is_equal_to(2)
+    ec2_client.describe_instance_types.assert_called_with(InstanceTypes=["m5.xlarge", "c5.xlarge"])
+
+
 @pytest.mark.parametrize(
     "node_type, expected_fallback, expected_response, expected_instances",
     [
@@ -879,6 +1017,27 @@ def test_get_cce_emsg_containing_supported_instance_types(mocker, boto3_stubber,
         assert_that(call_api_patch.call_count).is_equal_to(1)
 
 
+def test_batch_instance_types_and_families_cache(mocker, tmpdir):
+    """Verify that only the instance types parsed from the CreateComputeEnvironment error message are cached."""
+    mocker.patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    mocker.patch("pcluster.metadata_cache.pkg_resources.get_distribution").return_value.version = "2.10.1"
+    sts_mock = mocker.patch("pcluster.metadata_cache.boto3").client.return_value
+    sts_mock.get_caller_identity.return_value = {"Account": "123456789012"}
+    mocker.patch("pcluster.metadata_cache.METADATA_CACHE", MetadataCache(cache_dir=str(tmpdir)))
+    emsg_patch = mocker.patch(
+        "pcluster.utils._get_cce_emsg_containing_supported_instance_types",
+        side_effect=["Rate exceeded", "Instance type can only be one of [c5, m6g.xlarge, optimal]"],
+    )
+
+    with pytest.raises(utils.BatchErrorMessageParsingException, match="Rate exceeded"):
+        utils._get_batch_instance_types_and_families_from_cce_emsg()
+    for _ in range(2):
+        assert_that(utils._get_batch_instance_types_and_families_from_cce_emsg()).is_equal_to(
+            ["c5", "m6g.xlarge", "optimal"]
+        )
+    assert_that(emsg_patch.call_count).is_equal_to(2)
+
+
 @pytest.mark.parametrize("generate_error", [True, False])
 def test_get_supported_instance_types(mocker, boto3_stubber, generate_error):
     """Verify that get_supported_instance_types behaves as expected."""
@@ -0,0 +1,91 @@
+#!/usr/bin/python
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file.
+# This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+"""
+Measure the boto3 clients created by the validation phase of `pcluster create`, with and without the client pool.
+
+The script loads and validates the given configuration file, exactly as `pcluster create` does before creating the
+stack, so it requires valid AWS credentials and performs the same read-only AWS calls.
+Example: python benchmark_client_pool.py --config ~/.parallelcluster/config --cluster-template default
+"""
+import logging
+import time
+
+import argparse
+import boto3
+import botocore.session
+
+from pcluster.client_pool import install_client_pool
+from pcluster.config.pcluster_config import PclusterConfig
+from pcluster.metadata_cache import METADATA_CACHE
+from pcluster.utils import INSTANCE_TYPE_INFO_CATALOG
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+
+def _run_validation(args, use_client_pool):
+    """Validate the configuration and return the number of created clients and the elapsed time."""
+    # Start every run from a cold process state
+    boto3.DEFAULT_SESSION = None
+    INSTANCE_TYPE_INFO_CATALOG.clear()
+    if use_client_pool:
+        install_client_pool()
+
+    created_clients = []
+    create_client = botocore.session.Session.create_client
+
+    def _counting_create_client(session, service_name, *create_args, **create_kwargs):
+        created_clients.append(service_name)
+        return create_client(session, service_name, *create_args, **create_kwargs)
+
+    botocore.session.Session.create_client = _counting_create_client
+    try:
+        start = time.time()
+        pcluster_config = PclusterConfig(
+            config_file=args.config, cluster_label=args.cluster_template, fail_on_file_absence=True
+        )
+        pcluster_config.validate()
+        elapsed = time.time() - start
+    finally:
+        botocore.session.Session.create_client = create_client
+
+    return created_clients, elapsed
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the boto3 client pool on the pcluster create validation")
+    parser.add_argument("--config", required=True, help="ParallelCluster configuration file")
+    parser.add_argument("--cluster-template", help="Cluster section of the configuration file to validate")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs for each mode")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    # Cached EC2 metadata would hide the AWS calls done by the validators
+    METADATA_CACHE.enabled = False
+
+    for use_client_pool in [False, True]:
+        for run in range(args.runs):
+            created_clients, elapsed = _run_validation(args, use_client_pool)
+            logging.info(
+                "Client pool %s, run %d: %d clients created (%d distinct services) in %.2f seconds",
+                "enabled" if use_client_pool else "disabled",
+                run + 1,
+                len(created_clients),
+                len(set(created_clients)),
+                elapsed,
+            )
+
+
+if __name__ == "__main__":
+    main()